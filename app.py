@@ -2,12 +2,15 @@ import streamlit as st
 from modulos.registro_usuario import registrar_usuario
 from modulos.login import login
 from modulos.promotora import mostrar_promotora
-from modulos.distrito import mostrar_distrito
+from modulos.distrito import mostrar_distrito, mostrar_generar_ciclos_distrito
+from modulos.historial_asistencia import mostrar_asistencia_distrito
 from modulos.asistencia import mostrar_asistencia
 from modulos.integrada import mostrar_gestion_integrada
 from modulos.grupos import mostrar_grupos
 from modulos.reglamentos import mostrar_reglamentos
 from modulos.miembros import mostrar_miembro
+from modulos.cierre_lote import mostrar_cierre_lote
+from modulos.instrumentacion import iniciar_rerun, mostrar_panel_consultas
 
 # ---------------------------------------------------------
 # 🔧 DEBUG MEJORADO PARA DETECTAR ERRORES DE IMPORTACIÓN
@@ -306,7 +309,11 @@ def panel_promotora(usuario):
             st.metric("Módulo Consolidado", status)
 
     with tabs[1]: mostrar_promotora()
-    with tabs[2]: mostrar_distrito()
+    with tabs[2]:
+        mostrar_distrito()
+        st.write("---")
+        mostrar_generar_ciclos_distrito()
+        mostrar_asistencia_distrito()
     
     with tabs[3]: 
         if CONSOLIDADO_CARGADO:
@@ -334,6 +341,7 @@ def panel_admin():
 
     tabs = st.tabs([
         "📊 Consolidado Distritos",
+        "🔄 Cierre de Ciclos",
         "🧑‍💻 Registrar Usuario", 
         "🚪 Cerrar sesión"
     ])
@@ -370,10 +378,13 @@ def panel_admin():
             with col4:
                 st.metric("Préstamos Activos", "$18,750.00")
 
-    with tabs[1]: 
+    with tabs[1]:
+        mostrar_cierre_lote()
+
+    with tabs[2]: 
         registrar_usuario()
 
-    with tabs[2]:
+    with tabs[3]:
         if st.button("Cerrar sesión"):
             st.session_state.clear()
             st.session_state["pagina_actual"] = "sesion_cerrada"
@@ -382,6 +393,10 @@ def panel_admin():
 # ---------------------------------------------------------
 # FLUJO PRINCIPAL
 # ---------------------------------------------------------
+# Las consultas se cuentan por rerun: se reinicia el registro aquí y el
+# panel de SQL (solo administradoras) se dibuja al final, con todo ya ejecutado
+iniciar_rerun()
+
 if st.session_state["sesion_iniciada"]:
 
     usuario = st.session_state.get("usuario", "Usuario")
@@ -415,6 +430,9 @@ if st.session_state["sesion_iniciada"]:
     else:
         st.error("⚠️ Tipo de usuario no reconocido.")
 
+    if cargo == "ADMINISTRADOR":
+        mostrar_panel_consultas()
+
 else:
     if st.session_state["pagina_actual"] == "sesion_cerrada":
         st.success("Sesión finalizada.")
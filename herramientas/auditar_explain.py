@@ -0,0 +1,173 @@
+"""
+Auditoría EXPLAIN de las consultas calientes.
+
+Corre EXPLAIN (MySQL) o EXPLAIN QUERY PLAN (SQLite) sobre las consultas
+que las páginas ejecutan en cada reunión y falla si alguna recorre una
+tabla completa en vez de usar un índice. Los parámetros se toman de filas
+reales de la base (el primer grupo, miembro, reunión y préstamo), así el
+optimizador ve valores representativos.
+
+Uso (desde la raíz del repositorio, con la base ya migrada):
+
+    python -m herramientas.auditar_explain [--sqlite datos.db] [--filas-minimas 1000]
+"""
+import re
+import sys
+import argparse
+from datetime import date
+
+from herramientas.migrar import conectar
+from modulos import asistencia, multa, ahorros, pagoprestamo, movimientocaja
+
+# =============================================
+#  CONSULTAS AUDITADAS
+# =============================================
+# (nombre, constante SQL del módulo que la ejecuta, nombres de los parámetros)
+
+MUESTRAS = {
+    "id_grupo": "SELECT ID_Grupo FROM Grupo ORDER BY ID_Grupo LIMIT 1",
+    "id_miembro": "SELECT ID_Miembro FROM Miembro ORDER BY ID_Miembro LIMIT 1",
+    "id_reunion": "SELECT ID_Reunion FROM Reunion ORDER BY ID_Reunion LIMIT 1",
+    "id_prestamo": "SELECT ID_Prestamo FROM Prestamo ORDER BY ID_Prestamo LIMIT 1",
+}
+
+# Las consultas por lote llevan un IN ({marcadores}); se auditan con un
+# solo valor
+UN_VALOR = {"marcadores": "%s"}
+
+CONSULTAS = [
+    ("asistencia: reuniones del grupo", asistencia.CONSULTA_REUNIONES_GRUPO, ("id_grupo",)),
+    ("asistencia: miembros activos", asistencia.CONSULTA_MIEMBROS_ACTIVOS, ("id_grupo",)),
+    ("asistencia: registro previo de la reunión", asistencia.CONSULTA_ASISTENCIA_PREVIA, ("id_reunion",)),
+    ("asistencia: bloqueo de la reunión al guardar", asistencia.CONSULTA_BLOQUEO_REUNION, ("id_reunion",)),
+    ("asistencia: recuento de presentes", asistencia.CONSULTA_TOTAL_PRESENTES, ("id_reunion",)),
+    ("asistencia: multas existentes de la reunión", multa.CONSULTA_MULTAS_REUNION, ("id_reunion",)),
+    ("reglamento vigente del grupo", multa.CONSULTA_REGLAMENTO_MULTA, ("id_grupo",)),
+    ("ahorros: presentes de la reunión", ahorros.CONSULTA_PRESENTES_REUNION, ("id_reunion",)),
+    ("ahorros: saldos iniciales (última reunión anterior)",
+     ahorros.CONSULTA_SALDOS_INICIALES.format(**UN_VALOR), ("id_miembro", "hoy")),
+    ("ahorros: deudas pendientes", ahorros.CONSULTA_DEUDAS_PENDIENTES.format(**UN_VALOR), ("id_miembro",)),
+    ("pago préstamo: próxima cuota pendiente", pagoprestamo.CONSULTA_PROXIMA_CUOTA, ("id_prestamo",)),
+    ("cobro de la reunión: próxima cuota de cada préstamo", pagoprestamo.CONSULTA_CUOTAS_A_COBRAR, ("id_reunion",)),
+    ("cobro: bloqueo de los préstamos",
+     pagoprestamo.CONSULTA_BLOQUEO_PRESTAMOS.format(**UN_VALOR), ("id_prestamo",)),
+    ("cobro: pagado de cada préstamo",
+     pagoprestamo.CONSULTA_PAGADO_PRESTAMOS.format(**UN_VALOR), ("id_prestamo",)),
+    ("cobro: bloqueo de las cuotas no pagadas",
+     pagoprestamo.CONSULTA_BLOQUEO_CUOTAS.format(**UN_VALOR), ("id_prestamo",)),
+    ("caja: ahorros de la reunión", movimientocaja.CONSULTA_TOTAL_AHORROS, ("id_reunion",)),
+    ("caja: multas cobradas en la reunión", movimientocaja.CONSULTA_TOTAL_PAGOS_MULTAS, ("id_reunion",)),
+]
+
+
+def obtener_muestras(con):
+    cursor = con.cursor()
+    muestras = {"hoy": date.today().isoformat()}
+    for nombre, sql in MUESTRAS.items():
+        cursor.execute(sql)
+        fila = cursor.fetchone()
+        muestras[nombre] = fila[0] if fila else 0
+    cursor.close()
+    return muestras
+
+
+def planes_mysql(con, sql, params):
+    """Filas de EXPLAIN como dicts."""
+    cursor = con.cursor(dictionary=True)
+    cursor.execute("EXPLAIN " + sql, params)
+    filas = cursor.fetchall()
+    cursor.close()
+    return filas
+
+
+def recorridos_completos_mysql(filas, filas_minimas):
+    """
+    Tablas que el plan recorre enteras (type=ALL) con al menos `filas_minimas`
+    filas estimadas. Las tablas derivadas (<derivedN>) son resultados
+    intermedios, no tablas de la base.
+    """
+    return [
+        f"{f['table']} (type=ALL, ~{f.get('rows')} filas)"
+        for f in filas
+        if f.get("type") == "ALL" and int(f.get("rows") or 0) >= filas_minimas
+        and not str(f.get("table")).startswith("<derived")
+    ]
+
+
+def planes_sqlite(con, sql, params):
+    """SQLite no tiene FOR UPDATE: se audita la consulta sin el bloqueo."""
+    cursor = con.cursor()
+    cursor.execute("EXPLAIN QUERY PLAN " + sql.replace("%s", "?").replace("FOR UPDATE", ""), params)
+    filas = [f[-1] for f in cursor.fetchall()]
+    cursor.close()
+    return filas
+
+
+_RE_SCAN_SQLITE = re.compile(r"^SCAN (\w+)$")
+_RE_SUBCONSULTA_SQLITE = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)")
+
+
+def recorridos_completos_sqlite(filas):
+    """
+    'SCAN tabla' sin índice; 'SCAN ... USING INDEX' y 'SEARCH' usan índice.
+    Recorrer una subconsulta (CO-ROUTINE / MATERIALIZE) no cuenta.
+    """
+    subconsultas = set()
+    problemas = []
+    for d in filas:
+        subconsulta = _RE_SUBCONSULTA_SQLITE.match(d.strip())
+        if subconsulta:
+            subconsultas.add(subconsulta.group(1))
+        recorrido = _RE_SCAN_SQLITE.match(d.strip())
+        if recorrido and recorrido.group(1) not in subconsultas:
+            problemas.append(f"{d} (sin índice)")
+    return problemas
+
+
+def auditar(con, dialecto, filas_minimas=1000):
+    """Retorna [(nombre, [problemas], plan)] para cada consulta auditada."""
+    muestras = obtener_muestras(con)
+    resultados = []
+    for nombre, sql, nombres_params in CONSULTAS:
+        params = tuple(muestras[p] for p in nombres_params)
+        if dialecto == "mysql":
+            filas = planes_mysql(con, sql, params)
+            problemas = recorridos_completos_mysql(filas, filas_minimas)
+            plan = [f"{f['table']}: type={f.get('type')} key={f.get('key')}" for f in filas]
+        else:
+            plan = planes_sqlite(con, sql, params)
+            problemas = recorridos_completos_sqlite(plan)
+        resultados.append((nombre, problemas, plan))
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auditoría EXPLAIN de las consultas calientes")
+    parser.add_argument("--sqlite", metavar="ARCHIVO", help="auditar un archivo SQLite")
+    parser.add_argument("--filas-minimas", type=int, default=1000,
+                        help="en MySQL, ignorar recorridos completos de tablas más chicas")
+    parser.add_argument("-v", "--detalle", action="store_true", help="mostrar el plan de cada consulta")
+    args = parser.parse_args(argv)
+
+    con, dialecto = conectar(args.sqlite)
+    try:
+        resultados = auditar(con, dialecto, args.filas_minimas)
+    finally:
+        con.close()
+
+    fallas = 0
+    for nombre, problemas, plan in resultados:
+        print(f"{'❌' if problemas else '✅'} {nombre}")
+        for problema in problemas:
+            print(f"     recorrido completo: {problema}")
+        if args.detalle or problemas:
+            for linea in plan:
+                print(f"       {linea}")
+        fallas += bool(problemas)
+
+    print(f"\n{len(resultados) - fallas}/{len(resultados)} consultas usan índices")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Benchmark antes/después de las consultas reescritas por sargabilidad.
+
+Para cada caso corre la forma anterior (guardada aquí como referencia) y la
+forma actual del módulo sobre una muestra de grupos y fechas, verifica que
+den el mismo resultado y reporta p50/p95 de cada una. La corrida se agrega
+a benchmarks/consultas.json con el commit, igual que benchmark_paginas.
+
+Las formas anteriores usan YEAR/MONTH/DATE_FORMAT, así que esto corre
+contra MySQL (GAPCSV_DB_* apuntando a la base sembrada).
+
+Uso (desde la raíz del repositorio):
+
+    python -m herramientas.benchmark_consultas [-n 5] [--grupos 20]
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import date, datetime, timedelta
+
+from herramientas.migrar import conectar
+from herramientas.presupuesto_consultas import RAIZ
+from herramientas.benchmark_paginas import percentil, guardar_corrida, _commit_actual
+from modulos.pagoprestamo import buscar_reunion_mas_cercana
+
+HISTORIAL = os.path.join(RAIZ, "benchmarks", "consultas.json")
+
+# =============================================
+#  FORMAS ANTERIORES
+# =============================================
+
+ANTES_REUNION_MAS_CERCANA = """
+    SELECT ID_Reunion, fecha, lugar
+    FROM Reunion
+    WHERE ID_Grupo = %s
+      AND YEAR(fecha) = %s AND MONTH(fecha) = %s
+    ORDER BY ABS(DATEDIFF(fecha, %s)) ASC
+    LIMIT 1
+"""
+
+ANTES_SERIE_AHORROS = """
+    SELECT
+        DATE_FORMAT(r.fecha, '%%Y-%%m-%%d') as fecha,
+        COALESCE(SUM(a.monto_ahorro + a.monto_otros), 0) as ahorros
+    FROM Miembro m
+    LEFT JOIN Ahorro a ON m.ID_Miembro = a.ID_Miembro
+    LEFT JOIN Reunion r ON a.ID_Reunion = r.ID_Reunion
+    WHERE m.ID_Grupo = %s AND r.fecha BETWEEN %s AND %s
+    GROUP BY r.fecha
+    ORDER BY r.fecha
+"""
+
+# Igual a query_ahorros de consolidado_promotora.obtener_datos_serie_temporal
+# (el módulo configura la página al importarse, por eso no se importa)
+DESPUES_SERIE_AHORROS = """
+    SELECT
+        r.fecha as fecha,
+        COALESCE(SUM(a.monto_ahorro + a.monto_otros), 0) as ahorros
+    FROM Reunion r
+    JOIN Ahorro a ON a.ID_Reunion = r.ID_Reunion
+    JOIN Miembro m ON m.ID_Miembro = a.ID_Miembro
+    WHERE r.ID_Grupo = %s AND m.ID_Grupo = r.ID_Grupo
+      AND r.fecha BETWEEN %s AND %s
+    GROUP BY r.fecha
+    ORDER BY r.fecha
+"""
+
+
+# =============================================
+#  CASOS
+# =============================================
+# Cada función recibe (cursor, id_grupo, hoy) y retorna un resultado comparable
+
+def _fines_de_mes(hoy, meses):
+    primero = hoy.replace(day=1)
+    for _ in range(meses):
+        primero = (primero - timedelta(days=1)).replace(day=1)
+        yield (primero + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def reunion_cercana_antes(cursor, id_grupo, hoy):
+    resultado = []
+    for fin in _fines_de_mes(hoy, 12):
+        cursor.execute(ANTES_REUNION_MAS_CERCANA, (id_grupo, fin.year, fin.month, fin))
+        fila = cursor.fetchone()
+        # En empate el orden de la forma anterior no está definido: se compara la distancia
+        resultado.append(abs((fila[1] - fin).days) if fila else None)
+    return resultado
+
+
+def reunion_cercana_despues(cursor, id_grupo, hoy):
+    resultado = []
+    for fin in _fines_de_mes(hoy, 12):
+        fila = buscar_reunion_mas_cercana(cursor, id_grupo, fin, fin.replace(day=1), fin)
+        resultado.append(abs((fila[1] - fin).days) if fila else None)
+    return resultado
+
+
+def _serie(sql):
+    def correr(cursor, id_grupo, hoy):
+        cursor.execute(sql, (id_grupo, hoy - timedelta(days=180), hoy))
+        return [(str(fecha)[:10], round(float(total), 2)) for fecha, total in cursor.fetchall()]
+    return correr
+
+
+CASOS = [
+    ("reunión más cercana a fin de mes (12 meses)", reunion_cercana_antes, reunion_cercana_despues),
+    ("serie temporal de ahorros (180 días)", _serie(ANTES_SERIE_AHORROS), _serie(DESPUES_SERIE_AHORROS)),
+]
+
+
+def medir(con, funcion, grupos, hoy, repeticiones):
+    """(tiempos en ms por grupo y repetición, resultados por grupo)."""
+    cursor = con.cursor()
+    tiempos, resultados = [], {}
+    for _ in range(repeticiones):
+        for id_grupo in grupos:
+            inicio = time.perf_counter()
+            resultados[id_grupo] = funcion(cursor, id_grupo, hoy)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    cursor.close()
+    return tiempos, resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark antes/después de consultas reescritas")
+    parser.add_argument("-n", "--repeticiones", type=int, default=5)
+    parser.add_argument("--grupos", type=int, default=20, help="cantidad de grupos de la muestra")
+    parser.add_argument("--historial", default=HISTORIAL)
+    parser.add_argument("--etiqueta", help="nombre libre para la corrida")
+    args = parser.parse_args(argv)
+
+    con, _ = conectar()
+    hoy = date.today()
+    cursor = con.cursor()
+    cursor.execute("SELECT ID_Grupo FROM Grupo ORDER BY ID_Grupo LIMIT %s", (args.grupos,))
+    grupos = [fila[0] for fila in cursor.fetchall()]
+    cursor.close()
+
+    corrida = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "etiqueta": args.etiqueta,
+        "repeticiones": args.repeticiones,
+        "grupos": len(grupos),
+        "casos": {},
+    }
+
+    distintos = []
+    print(f"{'caso':<46}{'antes p50':>11}{'p95':>9}{'después p50':>13}{'p95':>9}{'×':>7}")
+    try:
+        for nombre, antes, despues in CASOS:
+            # Calentamiento: que ninguna de las dos formas pague el buffer pool frío
+            medir(con, antes, grupos, hoy, 1)
+            medir(con, despues, grupos, hoy, 1)
+            t_antes, r_antes = medir(con, antes, grupos, hoy, args.repeticiones)
+            t_despues, r_despues = medir(con, despues, grupos, hoy, args.repeticiones)
+
+            datos = {
+                "antes_p50_ms": round(percentil(t_antes, 50), 2),
+                "antes_p95_ms": round(percentil(t_antes, 95), 2),
+                "despues_p50_ms": round(percentil(t_despues, 50), 2),
+                "despues_p95_ms": round(percentil(t_despues, 95), 2),
+                "mismo_resultado": r_antes == r_despues,
+            }
+            corrida["casos"][nombre] = datos
+            mejora = datos["antes_p50_ms"] / datos["despues_p50_ms"] if datos["despues_p50_ms"] else 0
+            print(
+                f"{nombre:<46}{datos['antes_p50_ms']:>11.2f}{datos['antes_p95_ms']:>9.2f}"
+                f"{datos['despues_p50_ms']:>13.2f}{datos['despues_p95_ms']:>9.2f}{mejora:>6.1f}×"
+            )
+            if not datos["mismo_resultado"]:
+                distintos.append(nombre)
+    finally:
+        con.close()
+
+    guardar_corrida(args.historial, corrida)
+    print(f"\nCorrida guardada en {args.historial}")
+    for nombre in distintos:
+        print(f"❌ {nombre}: la forma nueva no da el mismo resultado que la anterior")
+    return 1 if distintos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Benchmark de render de las páginas más usadas.
+
+Renderiza cada página N veces en modo headless (AppTest) contra la base
+sembrada con herramientas.datos_sinteticos y reporta p50/p95/p99 del
+tiempo de pared, consultas SQL por render y el pico de memoria (RSS).
+Cada página corre en su propio proceso para que el pico de RSS sea suyo.
+
+Los resultados se agregan a un historial JSON (uno por corrida, con el
+commit) y se comparan contra la corrida anterior: si el p95 de alguna
+página empeora más que --tolerancia o sube su cantidad de consultas, el
+código de salida es 1.
+
+Uso (desde la raíz del repositorio, con GAPCSV_DB_* apuntando a la base local):
+
+    python -m herramientas.benchmark_paginas [-n 20] [--frio] [pagina ...]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from datetime import datetime
+
+from herramientas.presupuesto_consultas import RAIZ, PRESUPUESTOS, script_pagina, leer_resumen
+
+PAGINAS = [
+    "login",
+    "ahorros",
+    "asistencia",
+    "pago_prestamo",
+    "pago_multas",
+    "movimiento_caja",
+    "ciclo",
+    "consolidado_promotora",
+    "consolidado_general",
+]
+
+HISTORIAL = os.path.join(RAIZ, "benchmarks", "historial.json")
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano (p entre 0 y 100)."""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    k = max(0, min(len(ordenados) - 1, -(-p * len(ordenados) // 100) - 1))
+    return ordenados[int(k)]
+
+
+def _rss_pico_mb():
+    import resource
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo reporta en KB, macOS en bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def medir_en_este_proceso(nombre, repeticiones, calentamiento=1, frio=False, timeout=120):
+    """Renderiza `nombre` varias veces en una misma sesión y retorna las mediciones."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(script_pagina(nombre, limpiar_cache=frio), default_timeout=timeout)
+    for _ in range(calentamiento):
+        at.run()
+
+    tiempos, consultas, excepciones = [], [], []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        at.run()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        resumen = leer_resumen(at)
+        consultas.append(resumen["total_consultas"] if resumen else None)
+        excepciones.extend(str(e.value) for e in at.exception)
+
+    return {
+        "tiempos_ms": tiempos,
+        "consultas": consultas,
+        "rss_pico_mb": _rss_pico_mb(),
+        "excepciones": sorted(set(excepciones)),
+    }
+
+
+def medir_en_subproceso(nombre, repeticiones, calentamiento, frio):
+    comando = [
+        sys.executable, "-m", "herramientas.benchmark_paginas", "--interno", nombre,
+        "-n", str(repeticiones), "--calentamiento", str(calentamiento),
+    ] + (["--frio"] if frio else [])
+    salida = subprocess.run(comando, cwd=RAIZ, capture_output=True, text=True)
+    # La última línea es el JSON; lo demás son avisos de Streamlit
+    lineas = [l for l in salida.stdout.splitlines() if l.startswith("{")]
+    if salida.returncode != 0 or not lineas:
+        return {"error": (salida.stderr or salida.stdout).strip().splitlines()[-1:] or ["sin salida"]}
+    return json.loads(lineas[-1])
+
+
+def resumir(medicion):
+    tiempos = medicion["tiempos_ms"]
+    consultas = [c for c in medicion["consultas"] if c is not None]
+    return {
+        "p50_ms": round(percentil(tiempos, 50), 1),
+        "p95_ms": round(percentil(tiempos, 95), 1),
+        "p99_ms": round(percentil(tiempos, 99), 1),
+        "consultas": max(consultas) if consultas else None,
+        "rss_pico_mb": round(medicion["rss_pico_mb"], 1),
+        "excepciones": medicion["excepciones"],
+    }
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def cargar_historial(ruta):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_corrida(ruta, corrida):
+    historial = cargar_historial(ruta)
+    historial.append(corrida)
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(historial, f, ensure_ascii=False, indent=2)
+
+
+def comparar(anterior, actual, tolerancia):
+    """Regresiones de `actual` respecto de `anterior` (lista de textos)."""
+    regresiones = []
+    for nombre, datos in actual["paginas"].items():
+        previo = anterior["paginas"].get(nombre)
+        if not previo or "error" in datos or "error" in previo:
+            continue
+        if previo["p95_ms"] and datos["p95_ms"] > previo["p95_ms"] * (1 + tolerancia):
+            regresiones.append(
+                f"{nombre}: p95 {previo['p95_ms']} → {datos['p95_ms']} ms "
+                f"(+{(datos['p95_ms'] / previo['p95_ms'] - 1) * 100:.0f}%)"
+            )
+        if previo["consultas"] is not None and datos["consultas"] is not None \
+                and datos["consultas"] > previo["consultas"]:
+            regresiones.append(f"{nombre}: consultas {previo['consultas']} → {datos['consultas']}")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de render de páginas")
+    parser.add_argument("paginas", nargs="*", help=f"páginas (por defecto: {', '.join(PAGINAS)})")
+    parser.add_argument("-n", "--repeticiones", type=int, default=20)
+    parser.add_argument("--calentamiento", type=int, default=1, help="renders descartados al inicio")
+    parser.add_argument("--frio", action="store_true", help="vaciar st.cache_data antes de cada render")
+    parser.add_argument("--historial", default=HISTORIAL)
+    parser.add_argument("--tolerancia", type=float, default=0.20, help="empeoramiento de p95 permitido")
+    parser.add_argument("--etiqueta", help="nombre libre para la corrida")
+    parser.add_argument("--interno", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.interno:
+        medicion = medir_en_este_proceso(args.interno, args.repeticiones, args.calentamiento, args.frio)
+        print(json.dumps(medicion))
+        return 0
+
+    paginas = args.paginas or PAGINAS
+    desconocidas = [p for p in paginas if p not in PRESUPUESTOS]
+    if desconocidas:
+        parser.error(f"páginas desconocidas: {', '.join(desconocidas)}")
+
+    corrida = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "etiqueta": args.etiqueta,
+        "repeticiones": args.repeticiones,
+        "frio": args.frio,
+        "paginas": {},
+    }
+
+    print(f"{'página':<24}{'p50':>9}{'p95':>9}{'p99':>9}{'consultas':>11}{'RSS MB':>9}")
+    for nombre in paginas:
+        medicion = medir_en_subproceso(nombre, args.repeticiones, args.calentamiento, args.frio)
+        if "error" in medicion:
+            corrida["paginas"][nombre] = medicion
+            print(f"{nombre:<24}ERROR: {medicion['error'][0]}")
+            continue
+        datos = resumir(medicion)
+        corrida["paginas"][nombre] = datos
+        print(
+            f"{nombre:<24}{datos['p50_ms']:>9.0f}{datos['p95_ms']:>9.0f}{datos['p99_ms']:>9.0f}"
+            f"{datos['consultas'] if datos['consultas'] is not None else '-':>11}{datos['rss_pico_mb']:>9.0f}"
+        )
+        for error in datos["excepciones"]:
+            print(f"    ⚠️ {error}")
+
+    historial = cargar_historial(args.historial)
+    regresiones = comparar(historial[-1], corrida, args.tolerancia) if historial else []
+    guardar_corrida(args.historial, corrida)
+    print(f"\nCorrida guardada en {args.historial}")
+
+    if historial:
+        previo = historial[-1]
+        print(f"Comparada con {previo.get('commit') or previo['fecha']}:")
+        for regresion in regresiones:
+            print(f"❌ {regresion}")
+        if not regresiones:
+            print("✅ Sin regresiones")
+
+    # Una página que falla no tiene tiempos válidos: la corrida tampoco
+    fallidas = [n for n, d in corrida["paginas"].items() if "error" in d or d["excepciones"]]
+    if fallidas:
+        print(f"❌ Páginas con errores: {', '.join(fallidas)}")
+    return 1 if regresiones or fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
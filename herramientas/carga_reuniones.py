@@ -0,0 +1,322 @@
+"""
+Prueba de carga: K secretarias registrando su reunión al mismo tiempo.
+
+Cada sesión (un hilo con su propia conexión) toma el grupo de
+secretaria<i> y recorre las próximas reuniones de ese grupo con el mismo
+flujo y las mismas sentencias que las páginas:
+
+    asistencia (con sus multas) → ahorros → pagos de préstamo → caja
+
+Reporta el rendimiento (reuniones y sentencias por segundo), la
+distribución de latencias por paso, las esperas de bloqueo de InnoDB
+(Innodb_row_lock_*) y los errores 1205 (lock wait timeout) y 1213
+(deadlock) que recibieron las sesiones.
+
+Uso (desde la raíz del repositorio, contra una base local sembrada con
+herramientas.datos_sinteticos):
+
+    GAPCSV_DB_HOST=127.0.0.1 GAPCSV_DB_NAME=gapcsv_local ... \\
+        python -m herramientas.carga_reuniones -k 30 --reuniones 2
+"""
+import sys
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+
+import mysql.connector
+import pandas as pd
+
+from herramientas.datos_sinteticos import exigir_base_local
+from herramientas.benchmark_paginas import percentil
+from modulos.config.conexion import obtener_conexion
+from modulos.instrumentacion import iniciar_rerun, resumen_rerun
+from modulos.asistencia import guardar_asistencia, CONSULTA_BLOQUEO_REUNION
+from modulos.ahorros import obtener_saldos_iniciales, calcular_ahorros, guardar_ahorros
+from modulos.movimientocaja import obtener_saldo_anterior, obtener_totales_reunion
+from modulos.pagoprestamo import obtener_cuotas_a_cobrar, aplicar_pagos_lote
+from modulos.dinero import a_centavos, desde_centavos
+
+PASOS = ["asistencia", "ahorros", "pagos_prestamo", "caja"]
+
+ERROR_LOCK_WAIT = 1205
+ERROR_DEADLOCK = 1213
+
+
+class Resultados:
+    """Mediciones compartidas por todas las sesiones."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencias = defaultdict(list)   # paso -> [ms]
+        self.errores = defaultdict(int)      # (paso, errno) -> cantidad
+        self.reuniones = 0
+        self.sentencias = 0
+
+    def registrar(self, paso, ms):
+        with self.lock:
+            self.latencias[paso].append(ms)
+
+    def error(self, paso, errno):
+        with self.lock:
+            self.errores[(paso, errno)] += 1
+
+
+# =============================================
+#  PASOS DEL FLUJO DE REUNIÓN
+# =============================================
+# Cada paso reproduce las sentencias de su página (asistencia.py, que
+# también genera las multas, ahorros.py, pagoprestamo.py, movimientocaja.py) y termina
+# con commit, igual que el botón "Guardar" correspondiente.
+
+def _asistencia_al_azar(rnd):
+    # Presente, llegada tardía o falta (a veces justificada), como en la página
+    sorteo = rnd.random()
+    if sorteo < 0.80:
+        return 1, ""
+    if sorteo < 0.88:
+        return 2, ""
+    return 0, ("Enfermedad" if rnd.random() < 0.4 else "")
+
+
+def paso_asistencia(con, rnd, reunion, miembros, id_grupo, generar_multas):
+    # Mismo camino que "Guardar asistencia": reunión bloqueada y
+    # asistencia.guardar_asistencia en la misma transacción
+    cursor = con.cursor()
+    cursor.execute(CONSULTA_BLOQUEO_REUNION, (reunion["id"],))
+    cursor.fetchone()
+    asistencias = {id_miembro: _asistencia_al_azar(rnd) for id_miembro in miembros}
+    guardar_asistencia(cursor, reunion["id"], id_grupo, asistencias, reunion["fecha"], generar_multas)
+    con.commit()
+    cursor.close()
+    # Ahorros y cobros de la reunión se registran a quienes marcaron "Sí"
+    return [i for i, (asistio, _) in asistencias.items() if asistio == 1]
+
+
+def paso_ahorros(con, rnd, reunion, presentes):
+    # Mismo camino que el botón "Guardar Ahorros": saldos en lote y un upsert
+    saldos = obtener_saldos_iniciales(con, presentes, reunion["fecha"])
+    base = pd.DataFrame({"nombre": "", "deuda": 0}, index=presentes)
+    base["saldo_inicial"] = pd.Series(saldos, dtype="int64").reindex(base.index, fill_value=0)
+    entrada = pd.DataFrame({
+        "Ahorro": [rnd.randrange(1, 21) * 0.5 for _ in presentes],
+        "Otras actividades": 0.0,
+        "Retiro": False,
+    }, index=presentes)
+    guardar_ahorros(con, reunion["id"], reunion["fecha"], calcular_ahorros(base, entrada))
+    con.commit()
+
+
+def paso_pagos_prestamo(con, rnd, reunion, presentes, id_grupo):
+    # Mismo camino que "Cobro de la reunión": próximas cuotas en una consulta
+    # y todo el lote en una transacción
+    pagos = []
+    for cuota in obtener_cuotas_a_cobrar(con, reunion["id"]):
+        pendiente = a_centavos(cuota["total_programado"]) - a_centavos(cuota["total_pagado"])
+        completo = rnd.random() < 0.8
+        pagos.append((cuota["ID_Prestamo"], desde_centavos(pendiente if completo else min(pendiente, 100))))
+    if pagos:
+        ok, msg = aplicar_pagos_lote(con, pagos, reunion["fecha"], reunion["id"], id_grupo)
+        if not ok:
+            raise RuntimeError(msg)
+
+
+def paso_caja(con, reunion, id_grupo):
+    cursor = con.cursor(dictionary=True)
+    saldo_anterior = obtener_saldo_anterior(cursor, reunion["id"], id_grupo)
+    totales = obtener_totales_reunion(cursor, reunion["id"])
+
+    # Mismas escrituras que guardar_resumen_caja, sin atrapar el error
+    # para poder distinguir esperas de bloqueo y deadlocks
+    cursor.execute("DELETE FROM Movimiento_de_caja WHERE ID_Reunion = %s", (reunion["id"],))
+    saldo = saldo_anterior
+    for tipo, clave, signo in ((1, "detalle_ingresos", 1), (2, "detalle_egresos", -1)):
+        for movimiento in totales[clave]:
+            saldo += signo * movimiento["monto"]
+            cursor.execute("""
+                INSERT INTO Movimiento_de_caja
+                (ID_Reunion, ID_Tipo_movimiento, monto, categoria, descripcion, fecha, saldo_final)
+                VALUES (%s, %s, %s, %s, %s, NOW(), %s)
+            """, (reunion["id"], tipo, movimiento["monto"], movimiento["concepto"],
+                  movimiento["descripcion"], saldo))
+    con.commit()
+    cursor.close()
+
+
+# =============================================
+#  SESIÓN DE UNA SECRETARIA
+# =============================================
+
+def _datos_grupo(con, usuario, reuniones):
+    cursor = con.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT g.ID_Grupo
+        FROM Grupo g JOIN Usuario u ON u.ID_Usuario = g.ID_Usuario
+        WHERE u.Usuario = %s
+        ORDER BY g.ID_Grupo DESC LIMIT 1
+    """, (usuario,))
+    fila = cursor.fetchone()
+    if not fila:
+        cursor.close()
+        return None
+    id_grupo = fila["ID_Grupo"]
+
+    cursor.execute("SELECT ID_Miembro FROM Miembro WHERE ID_Grupo = %s AND ID_Estado = 1", (id_grupo,))
+    miembros = [f["ID_Miembro"] for f in cursor.fetchall()]
+
+    # Las próximas reuniones del grupo: las que se registran "el día de la reunión"
+    cursor.execute("""
+        SELECT ID_Reunion AS id, fecha
+        FROM Reunion
+        WHERE ID_Grupo = %s AND fecha >= CURDATE()
+        ORDER BY fecha
+        LIMIT %s
+    """, (id_grupo, reuniones))
+    proximas = cursor.fetchall()
+    cursor.close()
+    return id_grupo, miembros, proximas
+
+
+def sesion(numero, args, resultados, barrera):
+    rnd = random.Random(args.semilla + numero)
+    iniciar_rerun()
+    con = obtener_conexion()
+    if not con:
+        resultados.error("conexion", None)
+        barrera.wait()
+        return
+
+    datos = _datos_grupo(con, f"secretaria{numero}", args.reuniones)
+    barrera.wait()   # todas empiezan la reunión a la vez
+    if not datos:
+        resultados.error("sin_grupo", None)
+        con.close()
+        return
+    id_grupo, miembros, proximas = datos
+
+    for reunion in proximas:
+        inicio_reunion = time.perf_counter()
+        presentes = []
+        completa = True
+        pasos = [
+            ("asistencia", lambda: paso_asistencia(con, rnd, reunion, miembros, id_grupo, not args.sin_multas)),
+            ("ahorros", lambda: paso_ahorros(con, rnd, reunion, presentes)),
+            ("pagos_prestamo", lambda: paso_pagos_prestamo(con, rnd, reunion, presentes, id_grupo)),
+            ("caja", lambda: paso_caja(con, reunion, id_grupo)),
+        ]
+        for paso, ejecutar in pasos:
+            inicio = time.perf_counter()
+            try:
+                resultado = ejecutar()
+                if paso == "asistencia":
+                    presentes = resultado
+            except mysql.connector.Error as e:
+                completa = False
+                con.rollback()
+                resultados.error(paso, e.errno)
+            except RuntimeError:
+                # El lote fue rechazado por validación (ya revertido)
+                completa = False
+                resultados.error(paso, None)
+            finally:
+                resultados.registrar(paso, (time.perf_counter() - inicio) * 1000)
+
+        if completa:
+            resultados.registrar("reunion_completa", (time.perf_counter() - inicio_reunion) * 1000)
+            with resultados.lock:
+                resultados.reuniones += 1
+
+    con.close()
+    with resultados.lock:
+        resultados.sentencias += resumen_rerun()["total_consultas"]
+
+
+# =============================================
+#  MÉTRICAS DE INNODB
+# =============================================
+
+def leer_metricas_innodb():
+    """Contadores globales de bloqueos (None si el servidor no los expone)."""
+    con = obtener_conexion()
+    if not con:
+        return None
+    cursor = con.cursor()
+    try:
+        cursor.execute("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock%'")
+        metricas = {nombre: float(valor) for nombre, valor in cursor.fetchall()}
+        try:
+            cursor.execute("""
+                SELECT COUNT FROM information_schema.INNODB_METRICS WHERE NAME = 'lock_deadlocks'
+            """)
+            fila = cursor.fetchone()
+            if fila:
+                metricas["lock_deadlocks"] = float(fila[0])
+        except mysql.connector.Error:
+            pass
+        return metricas
+    finally:
+        cursor.close()
+        con.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de reuniones concurrentes")
+    parser.add_argument("-k", "--sesiones", type=int, default=20, help="secretarias concurrentes")
+    parser.add_argument("--reuniones", type=int, default=1, help="reuniones por sesión")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--sin-multas", action="store_true",
+                        help="guardar la asistencia sin generar multas por inasistencia")
+    args = parser.parse_args(argv)
+
+    exigir_base_local()
+    antes = leer_metricas_innodb()
+
+    resultados = Resultados()
+    barrera = threading.Barrier(args.sesiones, timeout=120)
+    hilos = [
+        threading.Thread(target=sesion, args=(i, args, resultados, barrera), daemon=True)
+        for i in range(1, args.sesiones + 1)
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    despues = leer_metricas_innodb()
+
+    print(f"Sesiones: {args.sesiones} · duración: {segundos:.1f} s")
+    print(f"Reuniones completas: {resultados.reuniones} ({resultados.reuniones / segundos:.2f}/s)")
+    print(f"Sentencias SQL: {resultados.sentencias} ({resultados.sentencias / segundos:.0f}/s)\n")
+
+    print(f"{'paso':<18}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'máx ms':>10}")
+    for paso in PASOS + ["reunion_completa"]:
+        valores = resultados.latencias.get(paso)
+        if not valores:
+            continue
+        print(
+            f"{paso:<18}{len(valores):>6}{percentil(valores, 50):>10.0f}{percentil(valores, 95):>10.0f}"
+            f"{percentil(valores, 99):>10.0f}{max(valores):>10.0f}"
+        )
+
+    deadlocks = sum(n for (_, errno), n in resultados.errores.items() if errno == ERROR_DEADLOCK)
+    esperas = sum(n for (_, errno), n in resultados.errores.items() if errno == ERROR_LOCK_WAIT)
+    print(f"\nDeadlocks (1213): {deadlocks} · Lock wait timeout (1205): {esperas}")
+    for (paso, errno), n in sorted(resultados.errores.items(), key=lambda x: (x[0][0], x[0][1] or 0)):
+        print(f"    {paso}: error {errno} × {n}")
+
+    if antes and despues:
+        delta = {k: despues.get(k, 0) - antes.get(k, 0) for k in despues}
+        print(
+            f"InnoDB: {delta.get('Innodb_row_lock_waits', 0):.0f} esperas de bloqueo, "
+            f"{delta.get('Innodb_row_lock_time', 0):.0f} ms esperando, "
+            f"máx {despues.get('Innodb_row_lock_time_max', 0):.0f} ms"
+            + (f", {delta['lock_deadlocks']:.0f} deadlocks" if "lock_deadlocks" in delta else "")
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,604 @@
+"""
+Generador de datos sintéticos a escala configurable.
+
+Crea el esquema que usan las páginas (tablas en singular: Grupo, Miembro,
+Reunion, Ahorro, Prestamo, ...) y lo llena con datos coherentes: distritos,
+promotoras, grupos con su reglamento, miembros, reuniones semanales o
+quincenales durante N años, asistencia, ahorros con saldo acumulado,
+préstamos con cronograma y pagos, y multas por inasistencia con sus pagos.
+Las tablas en plural de las consultas heredadas de consultas_db no se
+generan.
+
+Los usuarios de prueba (admin1, promotora1, secretaria1, presidente1, ...)
+usan la clave GAPCSV_CLAVE_PRUEBA, la misma que espera
+herramientas.presupuesto_consultas.
+
+Uso (desde la raíz del repositorio):
+
+    python -m herramientas.datos_sinteticos --sqlite datos.db --escala mediana
+    GAPCSV_DB_HOST=127.0.0.1 GAPCSV_DB_NAME=gapcsv_local ... \\
+        python -m herramientas.datos_sinteticos --mysql --escala produccion
+
+Con --mysql las tablas se BORRAN y se vuelven a crear, por eso exige que
+GAPCSV_DB_HOST esté definido explícitamente (nunca usa el servidor por
+defecto de obtener_conexion).
+"""
+import os
+import sys
+import time
+import bisect
+import random
+import hashlib
+import argparse
+import itertools
+from collections import namedtuple
+from datetime import date, datetime, time as hora, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from modulos.dinero import desde_centavos, dividir
+from herramientas.migrar import TABLA_VERSIONES, aplicar_pendientes
+
+CLAVE_PRUEBA = os.environ.get("GAPCSV_CLAVE_PRUEBA", "gapcsv123")
+
+# =============================================
+#  ESQUEMA
+# =============================================
+# (tabla, [(columna, tipo)], [columnas de cada UNIQUE]). El primer
+# campo "pk" es la llave primaria; el generador asigna los IDs él mismo
+# para no depender de LAST_INSERT_ID al cargar en lote. Los índices y las
+# llaves únicas de las rutas calientes vienen de migraciones/ y se crean
+# después de la carga (herramientas.migrar).
+
+TIPOS = {
+    #            MySQL                             SQLite
+    "pk":       ("INT AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY"),
+    "id":       ("INT",                            "INTEGER"),
+    "entero":   ("INT",                            "INTEGER"),
+    "texto":    ("VARCHAR(120)",                   "TEXT"),
+    "corto":    ("VARCHAR(30)",                    "TEXT"),
+    "largo":    ("TEXT",                           "TEXT"),
+    "dinero":   ("DECIMAL(12,2)",                  "NUMERIC"),
+    "fecha":    ("DATE",                           "DATE"),
+    "hora":     ("TIME",                           "TEXT"),
+    "fechahora": ("DATETIME",                      "TIMESTAMP"),
+}
+
+ESQUEMA = [
+    ("Estado", [("ID_Estado", "pk"), ("nombre", "texto")], []),
+    ("Estado_prestamo", [("ID_Estado_prestamo", "pk"), ("estado_prestamo", "texto")], []),
+    ("Estado_multa", [("ID_Estado_multa", "pk"), ("estado_multa", "texto")], []),
+    ("Estado_reunion", [("ID_Estado_reunion", "pk"), ("estado_reunion", "texto")], []),
+    ("Tipo_movimiento", [("ID_Tipo_movimiento", "pk"), ("tipo_movimiento", "texto")], []),
+    ("Rol", [("ID_Rol", "pk"), ("nombre_rol", "texto")], []),
+    ("Cargo", [("ID_Cargo", "pk"), ("tipo_de_cargo", "texto")], []),
+    ("Tipo_de_usuario", [("ID_Tipo_usuario", "pk"), ("Tipo_usuario", "texto")], []),
+    ("Usuario", [
+        ("ID_Usuario", "pk"), ("ID_Tipo_usuario", "id"), ("ID_Cargo", "id"),
+        ("Usuario", "texto"), ("Contraseña", "texto"), ("DUI", "corto"),
+    ], [("Usuario",)]),
+    ("Distrito", [("ID_Distrito", "pk"), ("nombre", "texto"), ("codigo", "corto")], []),
+    ("Promotora", [
+        ("ID_Promotora", "pk"), ("nombre", "texto"), ("telefono", "corto"), ("ID_Estado", "id"),
+    ], []),
+    ("Grupo", [
+        ("ID_Grupo", "pk"), ("nombre", "texto"), ("ID_Distrito", "id"), ("fecha_inicio", "fecha"),
+        ("ID_Promotora", "id"), ("ID_Estado", "id"), ("ID_Usuario", "id"),
+        ("estado", "entero"), ("fecha_creacion", "fecha"),
+    ], []),
+    ("Grupos_Asignados", [("ID_Usuario", "id"), ("ID_Grupo", "id")], []),
+    ("Reglamento", [
+        ("ID_Reglamento", "pk"), ("ID_Grupo", "id"), ("dia_reunion", "corto"), ("hora_reunion", "hora"),
+        ("lugar_reunion", "texto"), ("frecuencia_reunion", "corto"), ("monto_multa_asistencia", "dinero"),
+        ("justificacion_ausencia", "largo"), ("ahorro_minimo", "dinero"), ("interes_por_diez", "dinero"),
+        ("monto_maximo_prestamo", "dinero"), ("plazo_maximo_prestamo", "entero"),
+        ("un_prestamo_vez", "corto"), ("fecha_inicio_ciclo", "fecha"), ("duracion_ciclo", "entero"),
+        ("meta_social", "largo"), ("otras_reglas", "largo"), ("fecha_creacion", "fecha"),
+    ], []),
+    ("Miembro", [
+        ("ID_Miembro", "pk"), ("ID_Grupo", "id"), ("nombre", "texto"), ("apellido", "texto"),
+        ("DUI", "corto"), ("telefono", "corto"), ("ID_Rol", "id"), ("ID_Estado", "id"),
+        ("fecha_inscripcion", "fecha"),
+    ], []),
+    ("Reunion", [
+        ("ID_Reunion", "pk"), ("ID_Grupo", "id"), ("fecha", "fecha"), ("Hora", "hora"),
+        ("lugar", "texto"), ("ID_Estado_reunion", "id"), ("total_presentes", "entero"),
+    ], []),
+    ("Miembroxreunion", [
+        ("ID_MiembroxReunion", "pk"), ("ID_Miembro", "id"), ("ID_Reunion", "id"), ("asistio", "entero"),
+        ("justificacion", "texto"), ("fecha_registro", "fechahora"),
+    ], []),
+    ("Ahorro", [
+        ("ID_Ahorro", "pk"), ("ID_Miembro", "id"), ("ID_Reunion", "id"), ("fecha", "fecha"),
+        ("monto_ahorro", "dinero"), ("monto_otros", "dinero"), ("monto_retiros", "dinero"),
+        ("saldos_ahorros", "dinero"), ("saldo_inicial", "dinero"),
+    ], []),
+    ("Prestamo", [
+        ("ID_Prestamo", "pk"), ("ID_Miembro", "id"), ("fecha_desembolso", "fecha"), ("monto", "dinero"),
+        ("total_interes", "dinero"), ("ID_Estado_prestamo", "id"), ("plazo", "entero"),
+        ("proposito", "texto"), ("monto_total_pagar", "dinero"), ("cuota_mensual", "dinero"),
+    ], []),
+    ("CuotaPrestamo", [
+        ("ID_Cuota", "pk"), ("ID_Prestamo", "id"), ("numero_cuota", "entero"),
+        ("fecha_programada", "fecha"), ("capital_programado", "dinero"), ("interes_programado", "dinero"),
+        ("total_programado", "dinero"), ("estado", "corto"), ("capital_pagado", "dinero"),
+        ("interes_pagado", "dinero"), ("total_pagado", "dinero"),
+    ], []),
+    ("Pago_prestamo", [
+        ("ID_Pago", "pk"), ("ID_Prestamo", "id"), ("ID_Reunion", "id"), ("fecha_pago", "fecha"),
+        ("monto_capital", "dinero"), ("monto_interes", "dinero"), ("total_cancelado", "dinero"),
+    ], []),
+    ("PagoPrestamo", [
+        ("ID_PagoPrestamo", "pk"), ("ID_Prestamo", "id"), ("monto_pagado", "dinero"), ("fecha_pago", "fecha"),
+    ], []),
+    ("Multa", [
+        ("ID_Multa", "pk"), ("ID_Reunion", "id"), ("ID_Reglamento", "id"), ("fecha", "fecha"),
+        ("ID_Estado_multa", "id"),
+    ], []),
+    ("MiembroxMulta", [
+        ("ID_Miembro", "id"), ("ID_Multa", "id"), ("monto_a_pagar", "dinero"), ("monto_pagado", "dinero"),
+    ], []),
+    ("PagoMulta", [
+        ("ID_PagoMulta", "pk"), ("ID_Miembro", "id"), ("ID_Multa", "id"), ("monto_pagado", "dinero"),
+        ("fecha_pago", "fecha"), ("ID_Reunion_pago", "id"), ("fecha_limite_pago", "fecha"),
+    ], []),
+    ("Movimiento_de_caja", [
+        ("ID_Movimiento_caja", "pk"), ("ID_Reunion", "id"), ("ID_Tipo_movimiento", "id"),
+        ("monto", "dinero"), ("categoria", "texto"), ("descripcion", "texto"), ("fecha", "fecha"),
+        ("saldo_final", "dinero"),
+    ], []),
+]
+
+COLUMNAS = {tabla: [c for c, _ in columnas] for tabla, columnas, _ in ESQUEMA}
+
+
+def _quote(nombre, dialecto):
+    return f"`{nombre}`" if dialecto == "mysql" else f'"{nombre}"'
+
+
+def ddl(dialecto):
+    """Sentencias DROP/CREATE del esquema para 'mysql' o 'sqlite'."""
+    i = 0 if dialecto == "mysql" else 1
+    # Esquema nuevo: las migraciones se vuelven a aplicar desde cero
+    sentencias = [f"DROP TABLE IF EXISTS {_quote(TABLA_VERSIONES, dialecto)}"]
+    for tabla, columnas, unicas in ESQUEMA:
+        partes = [f"{_quote(c, dialecto)} {TIPOS[t][i]}" for c, t in columnas]
+        for n, cols in enumerate(unicas, 1):
+            lista = ", ".join(_quote(c, dialecto) for c in cols)
+            if dialecto == "mysql":
+                partes.append(f"UNIQUE KEY uq_{tabla.lower()}_{n} ({lista})")
+            else:
+                partes.append(f"UNIQUE ({lista})")
+        sufijo = " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4" if dialecto == "mysql" else ""
+        sentencias.append(f"DROP TABLE IF EXISTS {_quote(tabla, dialecto)}")
+        sentencias.append(
+            f"CREATE TABLE {_quote(tabla, dialecto)} (\n    " + ",\n    ".join(partes) + f"\n){sufijo}"
+        )
+    return sentencias
+
+
+# =============================================
+#  CARGA EN LOTE
+# =============================================
+
+class Cargador:
+    """Acumula filas por tabla y las inserta con executemany en lotes."""
+
+    def __init__(self, con, dialecto, lote=5000):
+        self.con = con
+        self.dialecto = dialecto
+        self.lote = lote
+        self.buffers = {tabla: [] for tabla in COLUMNAS}
+        self.totales = dict.fromkeys(COLUMNAS, 0)
+        marcador = "%s" if dialecto == "mysql" else "?"
+        self.sql = {
+            tabla: "INSERT INTO {} ({}) VALUES ({})".format(
+                _quote(tabla, dialecto),
+                ", ".join(_quote(c, dialecto) for c in columnas),
+                ", ".join([marcador] * len(columnas)),
+            )
+            for tabla, columnas in COLUMNAS.items()
+        }
+
+    def agregar(self, tabla, fila):
+        buffer = self.buffers[tabla]
+        buffer.append(fila)
+        if len(buffer) >= self.lote:
+            self._vaciar(tabla)
+
+    def _vaciar(self, tabla):
+        buffer = self.buffers[tabla]
+        if not buffer:
+            return
+        cursor = self.con.cursor()
+        cursor.executemany(self.sql[tabla], buffer)
+        cursor.close()
+        self.con.commit()
+        self.totales[tabla] += len(buffer)
+        buffer.clear()
+
+    def terminar(self):
+        for tabla in self.buffers:
+            self._vaciar(tabla)
+        return self.totales
+
+
+def conectar_sqlite(ruta):
+    import sqlite3
+    from decimal import Decimal
+
+    sqlite3.register_adapter(Decimal, str)
+    sqlite3.register_adapter(date, date.isoformat)
+    sqlite3.register_adapter(datetime, lambda v: v.isoformat(" "))
+    sqlite3.register_adapter(hora, hora.isoformat)
+    con = sqlite3.connect(ruta)
+    con.execute("PRAGMA journal_mode = OFF")
+    con.execute("PRAGMA synchronous = OFF")
+    return con
+
+
+def exigir_base_local():
+    """Las herramientas que escriben datos nunca usan el servidor por defecto."""
+    if "GAPCSV_DB_HOST" not in os.environ:
+        raise SystemExit(
+            "❌ Define GAPCSV_DB_HOST (y GAPCSV_DB_NAME, ...) apuntando a una base LOCAL: "
+            "esta herramienta escribe en las tablas."
+        )
+
+
+def conectar_mysql():
+    exigir_base_local()
+    from modulos.config.conexion import obtener_conexion
+
+    con = obtener_conexion()
+    if not con:
+        raise SystemExit("❌ No se pudo conectar a la base de datos.")
+    cursor = con.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    cursor.execute("SET UNIQUE_CHECKS = 0")
+    cursor.close()
+    return con
+
+
+# =============================================
+#  GENERACIÓN
+# =============================================
+
+Escala = namedtuple("Escala", "distritos grupos_por_distrito miembros_por_grupo anios")
+
+ESCALAS = {
+    "pequena": Escala(2, 3, 12, 1),
+    "mediana": Escala(5, 8, 20, 2),
+    "produccion": Escala(20, 15, 25, 4),
+}
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+NOMBRES = ["María", "Ana", "Rosa", "Carmen", "Lucía", "Marta", "Elena", "Sofía", "Juana", "Teresa",
+           "José", "Carlos", "Luis", "Pedro", "Jorge", "Miguel", "Juan", "Mario", "Óscar", "Raúl"]
+APELLIDOS = ["Hernández", "López", "Martínez", "García", "Rodríguez", "Pérez", "Flores", "Ramírez",
+             "Cruz", "Rivera", "Gómez", "Díaz", "Morales", "Reyes", "Ortiz", "Vásquez"]
+LUGARES = ["Casa comunal", "Escuela", "Iglesia", "Casa de la presidenta", "Cooperativa"]
+PROPOSITOS = ["Compra de materiales", "Gastos médicos", "Capital de trabajo", "Útiles escolares",
+              "Mejoras de vivienda", "Siembra"]
+
+CATALOGOS = {
+    "Estado": ["Activo", "Inactivo"],
+    "Estado_prestamo": ["Activo", "Pagado", "Cancelado"],
+    "Estado_multa": ["Pendiente", "Pagada"],
+    "Estado_reunion": ["Programada", "Realizada", "Cancelada"],
+    "Tipo_movimiento": ["Ingreso", "Egreso"],
+    "Rol": ["Presidenta", "Secretaria", "Tesorera", "Encargada de llave", "Miembro"],
+    "Cargo": ["Administrador", "Promotora", "Secretaria", "Presidente"],
+    "Tipo_de_usuario": ["editor", "promotora"],
+}
+CARGO = {nombre: i for i, nombre in enumerate(CATALOGOS["Cargo"], 1)}
+
+
+def _dui(rnd):
+    return f"{rnd.randrange(10**8):08d}-{rnd.randrange(10)}"
+
+
+def _telefono(rnd):
+    return f"{rnd.choice('67')}{rnd.randrange(10**7):07d}"
+
+
+class _Generador:
+    """Estado de una corrida: contadores de IDs, semilla y destino."""
+
+    def __init__(self, cargador, escala, semilla, hoy):
+        self.c = cargador
+        self.escala = escala
+        self.rnd = random.Random(semilla)
+        self.hoy = hoy
+        self.ids = {tabla: itertools.count(1) for tabla in COLUMNAS}
+        self.hash_clave = hashlib.sha256(CLAVE_PRUEBA.encode()).hexdigest()
+
+    def nuevo_id(self, tabla):
+        return next(self.ids[tabla])
+
+    def usuario(self, nombre, cargo, tipo=1):
+        id_usuario = self.nuevo_id("Usuario")
+        self.c.agregar("Usuario", (id_usuario, tipo, CARGO[cargo], nombre, self.hash_clave, _dui(self.rnd)))
+        return id_usuario
+
+    def generar(self):
+        for tabla, valores in CATALOGOS.items():
+            for valor in valores:
+                self.c.agregar(tabla, (self.nuevo_id(tabla), valor))
+
+        self.usuario("admin1", "Administrador")
+        n_grupo = 0
+        for d in range(1, self.escala.distritos + 1):
+            id_distrito = self.nuevo_id("Distrito")
+            self.c.agregar("Distrito", (id_distrito, f"Distrito {d}", f"D{d:03d}"))
+
+            # Una promotora por distrito; su fila en Promotora lleva el mismo
+            # nombre que su usuario (así la busca consolidado_promotora)
+            nombre_promotora = f"promotora{d}"
+            id_usuario_promotora = self.usuario(nombre_promotora, "Promotora", tipo=2)
+            id_promotora = self.nuevo_id("Promotora")
+            self.c.agregar("Promotora", (id_promotora, nombre_promotora, _telefono(self.rnd), 1))
+
+            for _ in range(self.escala.grupos_por_distrito):
+                n_grupo += 1
+                id_grupo = self.grupo(n_grupo, id_distrito, id_promotora)
+                self.c.agregar("Grupos_Asignados", (id_usuario_promotora, id_grupo))
+
+    def grupo(self, n, id_distrito, id_promotora):
+        rnd = self.rnd
+        id_usuario = self.usuario(f"secretaria{n}", "Secretaria")
+        self.usuario(f"presidente{n}", "Presidente")
+
+        inicio = self.hoy - timedelta(days=365 * self.escala.anios + rnd.randrange(60))
+        dia = rnd.randrange(6)
+        inicio += timedelta(days=(dia - inicio.weekday()) % 7)
+        frecuencia = "QUINCENAL" if rnd.random() < 0.2 else "SEMANAL"
+        hora_reunion = hora(rnd.choice([8, 9, 14, 15, 16]), rnd.choice([0, 30]))
+        lugar = rnd.choice(LUGARES)
+
+        id_grupo = self.nuevo_id("Grupo")
+        self.c.agregar("Grupo", (
+            id_grupo, f"Grupo {n}", id_distrito, inicio, id_promotora, 1, id_usuario, 1, inicio
+        ))
+
+        multa_c = rnd.choice([25, 50, 100])
+        interes_por_diez_c = rnd.choice([10, 20, 50])
+        maximo_c = rnd.choice([30000, 50000, 80000])
+        plazo_maximo = rnd.choice([6, 8, 12])
+        id_reglamento = self.nuevo_id("Reglamento")
+        self.c.agregar("Reglamento", (
+            id_reglamento, id_grupo, DIAS_SEMANA[dia], hora_reunion, lugar, frecuencia,
+            desde_centavos(multa_c), "Enfermedad o viaje avisado con anticipación",
+            desde_centavos(100), desde_centavos(interes_por_diez_c), desde_centavos(maximo_c),
+            plazo_maximo, "Sí", inicio, 12, "Apoyar a miembros en emergencias",
+            "Puntualidad y respeto en las reuniones", inicio,
+        ))
+
+        miembros = []
+        for i in range(self.escala.miembros_por_grupo):
+            id_miembro = self.nuevo_id("Miembro")
+            # Algunos miembros se incorporan después de que empezó el grupo
+            ingreso = inicio if i < self.escala.miembros_por_grupo * 0.8 else \
+                inicio + timedelta(days=rnd.randrange(max(1, (self.hoy - inicio).days)))
+            self.c.agregar("Miembro", (
+                id_miembro, id_grupo, rnd.choice(NOMBRES), rnd.choice(APELLIDOS), _dui(rnd),
+                _telefono(rnd), i + 1 if i < 4 else 5, 1, ingreso,
+            ))
+            miembros.append((id_miembro, ingreso))
+
+        paso = 14 if frecuencia == "QUINCENAL" else 7
+        fechas = []
+        fecha = inicio
+        while fecha <= self.hoy + timedelta(days=28):
+            fechas.append(fecha)
+            fecha += timedelta(days=paso)
+        reuniones = [(self.nuevo_id("Reunion"), f) for f in fechas]
+
+        self.reuniones_grupo(id_grupo, id_reglamento, reuniones, miembros, lugar, hora_reunion,
+                             multa_c, interes_por_diez_c, maximo_c, plazo_maximo)
+        return id_grupo
+
+    def reuniones_grupo(self, id_grupo, id_reglamento, reuniones, miembros, lugar, hora_reunion,
+                        multa_c, interes_por_diez_c, maximo_c, plazo_maximo):
+        rnd, c = self.rnd, self.c
+        fechas = [f for _, f in reuniones]
+        saldo = {m: 0 for m, _ in miembros}
+        libre_desde = {m: ingreso for m, ingreso in miembros}
+        multas_pendientes = []   # (id_miembro, id_multa, monto_c, fecha_multa)
+        emitidas = []            # (id_miembro, id_multa, monto_c)
+
+        for posicion, (id_reunion, fecha) in enumerate(reuniones):
+            realizada = fecha <= self.hoy
+            presentes = 0
+
+            if realizada:
+                ausentes = []
+                for id_miembro, ingreso in miembros:
+                    if ingreso > fecha:
+                        continue
+                    dado = rnd.random()
+                    if dado < 0.82:
+                        asistio, justificacion = 1, None
+                    elif dado < 0.88:
+                        asistio, justificacion = 2, None
+                    elif dado < 0.93:
+                        asistio, justificacion = 0, "Enfermedad"
+                    else:
+                        asistio, justificacion = 0, None
+                    c.agregar("Miembroxreunion", (
+                        self.nuevo_id("Miembroxreunion"), id_miembro, id_reunion, asistio, justificacion, datetime.combine(fecha, hora_reunion)
+                    ))
+                    if asistio == 0:
+                        if justificacion is None:
+                            ausentes.append(id_miembro)
+                        continue
+
+                    presentes += 1
+                    self.ahorro(id_miembro, id_reunion, fecha, saldo)
+
+                    if libre_desde[id_miembro] <= fecha and rnd.random() < 0.02:
+                        libre_desde[id_miembro] = self.prestamo(
+                            id_miembro, fecha, fechas, reuniones, interes_por_diez_c, maximo_c, plazo_maximo
+                        )
+
+                    # Pagos de multas pendientes de este miembro
+                    for pendiente in [p for p in multas_pendientes if p[0] == id_miembro]:
+                        if rnd.random() < 0.7:
+                            multas_pendientes.remove(pendiente)
+                            _, id_multa, monto, fecha_multa = pendiente
+                            c.agregar("PagoMulta", (
+                                self.nuevo_id("PagoMulta"), id_miembro, id_multa, desde_centavos(monto),
+                                fecha, id_reunion, fecha_multa + timedelta(days=30),
+                            ))
+
+                if ausentes:
+                    id_multa = self.nuevo_id("Multa")
+                    c.agregar("Multa", (id_multa, id_reunion, id_reglamento, fecha, 1))
+                    for id_miembro in ausentes:
+                        emitidas.append((id_miembro, id_multa, multa_c))
+                        multas_pendientes.append((id_miembro, id_multa, multa_c, fecha))
+
+            c.agregar("Reunion", (
+                id_reunion, id_grupo, fecha, hora_reunion, lugar, 2 if realizada else 1, presentes
+            ))
+
+        # Cada multa queda con el monto pagado según si se llegó a pagar
+        pendientes = {(m, id_multa) for m, id_multa, _, _ in multas_pendientes}
+        for id_miembro, id_multa, monto in emitidas:
+            pagado = 0 if (id_miembro, id_multa) in pendientes else monto
+            c.agregar("MiembroxMulta", (id_miembro, id_multa, desde_centavos(monto), desde_centavos(pagado)))
+
+    def ahorro(self, id_miembro, id_reunion, fecha, saldo):
+        rnd = self.rnd
+        ahorro = rnd.randrange(1, 21) * 50
+        otros = rnd.choice([0, 0, 0, 25, 100])
+        retiro = rnd.randrange(1, 5) * 500 if rnd.random() < 0.01 else 0
+        retiro = min(retiro, saldo[id_miembro])
+        inicial = saldo[id_miembro]
+        saldo[id_miembro] = inicial + ahorro + otros - retiro
+        self.c.agregar("Ahorro", (
+            self.nuevo_id("Ahorro"), id_miembro, id_reunion, fecha,
+            desde_centavos(ahorro), desde_centavos(otros), desde_centavos(retiro),
+            desde_centavos(saldo[id_miembro]), desde_centavos(inicial),
+        ))
+
+    def prestamo(self, id_miembro, fecha, fechas, reuniones, interes_por_diez_c, maximo_c, plazo_maximo):
+        """Registra un préstamo con su cronograma y pagos; retorna la fecha en que queda libre."""
+        rnd, c = self.rnd, self.c
+        monto = rnd.randrange(5, maximo_c // 1000 + 1) * 1000
+        plazo = rnd.randrange(2, plazo_maximo + 1)
+        # interes_por_diez: $ de interés mensual por cada $10 prestados
+        interes_mensual = monto * interes_por_diez_c // 1000
+        total_interes = interes_mensual * plazo
+        total = monto + total_interes
+        cuota = dividir(total, plazo)
+        interes_cuota = dividir(total_interes, plazo)
+
+        id_prestamo = self.nuevo_id("Prestamo")
+        saldo_capital, saldo_interes = monto, total_interes
+        todas_pagadas = True
+        ultima = fecha
+        for i in range(1, plazo + 1):
+            if i == plazo:
+                interes, capital = saldo_interes, saldo_capital
+            else:
+                interes, capital = interes_cuota, cuota - interes_cuota
+            saldo_capital -= capital
+            saldo_interes -= interes
+
+            # Reunión más cercana a los 30 días de cada cuota
+            objetivo = fecha + timedelta(days=30 * i)
+            k = min(bisect.bisect_left(fechas, objetivo), len(fechas) - 1)
+            id_reunion, programada = reuniones[k]
+            ultima = programada
+
+            pagada = programada <= self.hoy and rnd.random() < 0.93
+            todas_pagadas &= pagada
+            pagado = (capital, interes, capital + interes) if pagada else (0, 0, 0)
+            c.agregar("CuotaPrestamo", (
+                self.nuevo_id("CuotaPrestamo"), id_prestamo, i, programada,
+                desde_centavos(capital), desde_centavos(interes), desde_centavos(capital + interes),
+                "pagado" if pagada else "pendiente", *map(desde_centavos, pagado),
+            ))
+            if pagada:
+                c.agregar("Pago_prestamo", (
+                    self.nuevo_id("Pago_prestamo"), id_prestamo, id_reunion, programada,
+                    desde_centavos(capital), desde_centavos(interes), desde_centavos(capital + interes),
+                ))
+                c.agregar("PagoPrestamo", (
+                    self.nuevo_id("PagoPrestamo"), id_prestamo, desde_centavos(capital + interes), programada,
+                ))
+
+        c.agregar("Prestamo", (
+            id_prestamo, id_miembro, fecha, desde_centavos(monto), desde_centavos(total_interes),
+            2 if todas_pagadas else 1, plazo, rnd.choice(PROPOSITOS),
+            desde_centavos(total), desde_centavos(cuota),
+        ))
+        return ultima + timedelta(days=1)
+
+
+def generar_datos(con, dialecto, escala, semilla=42, hoy=None, lote=5000, migrar=True):
+    """
+    Crea el esquema en `con`, lo llena y (si `migrar`) aplica las
+    migraciones. Retorna {tabla: filas insertadas}.
+    """
+    cursor = con.cursor()
+    for sentencia in ddl(dialecto):
+        cursor.execute(sentencia)
+    cursor.close()
+    con.commit()
+
+    cargador = Cargador(con, dialecto, lote)
+    _Generador(cargador, escala, semilla, hoy or date.today()).generar()
+    totales = cargador.terminar()
+
+    # Índices después de la carga: insertar sin ellos es bastante más rápido
+    if migrar:
+        aplicar_pendientes(con, dialecto, avisar=lambda _: None)
+    return totales
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos")
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument("--sqlite", metavar="ARCHIVO", help="cargar en un archivo SQLite")
+    destino.add_argument("--mysql", action="store_true", help="cargar en el MySQL de GAPCSV_DB_*")
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--distritos", type=int)
+    parser.add_argument("--grupos-por-distrito", type=int)
+    parser.add_argument("--miembros-por-grupo", type=int)
+    parser.add_argument("--anios", type=int)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=5000, help="filas por executemany")
+    parser.add_argument("--sin-migraciones", action="store_true", help="no crear los índices de migraciones/")
+    args = parser.parse_args(argv)
+
+    escala = ESCALAS[args.escala]._replace(**{
+        campo: getattr(args, campo) for campo in Escala._fields if getattr(args, campo) is not None
+    })
+
+    if args.sqlite:
+        if os.path.exists(args.sqlite):
+            os.remove(args.sqlite)
+        con, dialecto = conectar_sqlite(args.sqlite), "sqlite"
+    else:
+        con, dialecto = conectar_mysql(), "mysql"
+
+    inicio = time.perf_counter()
+    totales = generar_datos(con, dialecto, escala, args.semilla, lote=args.lote,
+                            migrar=not args.sin_migraciones)
+    con.close()
+    segundos = time.perf_counter() - inicio
+
+    for tabla, filas in totales.items():
+        if filas:
+            print(f"{tabla:<20}{filas:>12,}")
+    total = sum(totales.values())
+    print(f"{'TOTAL':<20}{total:>12,}  en {segundos:.1f} s ({total / max(segundos, 1e-9):,.0f} filas/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
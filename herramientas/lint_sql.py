@@ -0,0 +1,140 @@
+"""
+Lint de predicados no sargables en el SQL de modulos/.
+
+Recorre cada literal de texto que parece SQL y marca las cláusulas WHERE,
+ON, GROUP BY y ORDER BY que envuelven una columna en una función
+(YEAR(fecha) = ..., DATE_FORMAT(...), ABS(DATEDIFF(...)), UPPER(col), ...)
+o que buscan con LIKE '%...'. En esos casos el motor no puede usar el
+índice de la columna y termina recorriendo la tabla.
+
+Lo que se acepta a propósito va en PERMITIDOS con su motivo.
+
+Uso (desde la raíz del repositorio):
+
+    python -m herramientas.lint_sql [archivo.py ...]
+"""
+import os
+import re
+import ast
+import sys
+import argparse
+from collections import namedtuple
+
+from herramientas.presupuesto_consultas import RAIZ
+
+CARPETA_MODULOS = os.path.join(RAIZ, "modulos")
+
+FUNCIONES_NO_SARGABLES = (
+    "YEAR", "MONTH", "DAY", "DAYOFWEEK", "WEEK", "DATE", "DATE_FORMAT", "DATEDIFF",
+    "TIMESTAMPDIFF", "EXTRACT", "STR_TO_DATE", "ABS", "UPPER", "LOWER", "TRIM",
+    "CAST", "CONVERT", "COALESCE", "IFNULL", "CONCAT", "SUBSTRING", "LEFT",
+)
+
+# (archivo relativo a la raíz, función) -> motivo
+PERMITIDOS = {
+    ("modulos/reglamentos.py", "UPPER"):
+        "Rol es un catálogo de pocas filas; el nombre del cargo se compara sin distinguir mayúsculas",
+}
+
+Hallazgo = namedtuple("Hallazgo", "archivo linea clausula problema fragmento")
+
+_RE_ES_SQL = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.I)
+_RE_CLAUSULA = re.compile(
+    r"\b(WHERE|ON|GROUP\s+BY|ORDER\s+BY|HAVING|SELECT|FROM|(?:LEFT\s+|INNER\s+|RIGHT\s+)?JOIN|"
+    r"LIMIT|SET|VALUES|UNION)\b",
+    re.I,
+)
+_CLAUSULAS_REVISADAS = {"WHERE", "ON", "GROUP BY", "ORDER BY"}
+_RE_FUNCION = re.compile(r"\b(" + "|".join(FUNCIONES_NO_SARGABLES) + r")\s*\(\s*([^,()]*)", re.I)
+_RE_LIKE_COMODIN = re.compile(r"\bLIKE\s+(?:'%|CONCAT\s*\(\s*'%')", re.I)
+_RE_SUBCONSULTA = re.compile(r"\(\s*SELECT\b", re.I)
+_RE_COLUMNA = re.compile(r"^[A-Za-z_][\w]*(\.[A-Za-z_]\w*)?$")
+
+
+def _clausulas(sql):
+    """[(nombre, desplazamiento, texto)] de cada cláusula del SQL."""
+    marcas = list(_RE_CLAUSULA.finditer(sql))
+    for i, m in enumerate(marcas):
+        fin = marcas[i + 1].start() if i + 1 < len(marcas) else len(sql)
+        yield " ".join(m.group(1).upper().split()), m.end(), sql[m.end():fin]
+
+
+def revisar_sql(sql):
+    """[(clausula, desplazamiento, problema, fragmento)] de un texto SQL."""
+    problemas = []
+    for clausula, inicio, texto in _clausulas(sql):
+        if clausula not in _CLAUSULAS_REVISADAS:
+            continue
+        for m in _RE_FUNCION.finditer(texto):
+            funcion, argumento = m.group(1).upper(), m.group(2).strip()
+            if argumento and not _RE_COLUMNA.match(argumento):
+                continue
+            # Sin argumento simple: COALESCE((SELECT ...), 0) compara una subconsulta,
+            # pero ABS(DATEDIFF(col, ...)) sigue envolviendo la columna
+            if not argumento and _RE_SUBCONSULTA.match(sql, inicio + m.end()):
+                continue
+            problemas.append((clausula, inicio + m.start(), funcion, m.group(0).strip()))
+        for m in _RE_LIKE_COMODIN.finditer(texto):
+            problemas.append((clausula, inicio + m.start(), "LIKE '%...'", m.group(0).strip()))
+    return problemas
+
+
+def _literales(arbol):
+    """(nodo, texto) de cada literal de texto, incluidas las partes fijas de los f-strings."""
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Constant) and isinstance(nodo.value, str):
+            yield nodo, nodo.value
+        elif isinstance(nodo, ast.JoinedStr):
+            partes = [p.value if isinstance(p, ast.Constant) else "%s" for p in nodo.values]
+            yield nodo, "".join(partes)
+
+
+def revisar_archivo(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        arbol = ast.parse(f.read(), filename=ruta)
+
+    relativa = os.path.relpath(ruta, RAIZ).replace(os.sep, "/")
+    vistos = set()
+    hallazgos = []
+    for nodo, texto in _literales(arbol):
+        if not _RE_ES_SQL.match(texto):
+            continue
+        for clausula, desplazamiento, problema, fragmento in revisar_sql(texto):
+            linea = nodo.lineno + texto.count("\n", 0, desplazamiento)
+            # Las partes de un f-string aparecen dos veces en el árbol
+            if (linea, problema) in vistos:
+                continue
+            vistos.add((linea, problema))
+            hallazgos.append(Hallazgo(relativa, linea, clausula, problema, fragmento))
+    return hallazgos
+
+
+def archivos_modulos(carpeta=CARPETA_MODULOS):
+    for raiz, carpetas, archivos in os.walk(carpeta):
+        carpetas[:] = [c for c in carpetas if c != "__pycache__"]
+        for archivo in sorted(archivos):
+            if archivo.endswith(".py"):
+                yield os.path.join(raiz, archivo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lint de predicados no sargables")
+    parser.add_argument("archivos", nargs="*", help="por defecto, todo modulos/")
+    args = parser.parse_args(argv)
+
+    errores = 0
+    for ruta in args.archivos or sorted(archivos_modulos()):
+        for h in revisar_archivo(ruta):
+            motivo = PERMITIDOS.get((h.archivo, h.problema))
+            if motivo:
+                print(f"   {h.archivo}:{h.linea}: {h.problema} en {h.clausula} (permitido: {motivo})")
+                continue
+            errores += 1
+            print(f"❌ {h.archivo}:{h.linea}: {h.problema} en {h.clausula} → {h.fragmento}")
+
+    print(f"\n{errores} predicado(s) no sargable(s)" if errores else "✅ Sin predicados no sargables")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Migraciones versionadas del esquema.
+
+Cada archivo de migraciones/ se llama NNNN_descripcion.sql y se aplica una
+sola vez, en orden. Las versiones aplicadas quedan en la tabla
+Migracion_esquema junto con el checksum del archivo (si alguien edita una
+migración ya aplicada se avisa, pero no se vuelve a aplicar).
+
+Uso (desde la raíz del repositorio):
+
+    python -m herramientas.migrar              # MySQL de GAPCSV_DB_* (o el de obtener_conexion)
+    python -m herramientas.migrar --sqlite datos.db
+    python -m herramientas.migrar --estado     # solo listar aplicadas / pendientes
+"""
+import os
+import re
+import sys
+import hashlib
+import argparse
+from collections import namedtuple
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+CARPETA_MIGRACIONES = os.path.join(RAIZ, "migraciones")
+TABLA_VERSIONES = "Migracion_esquema"
+
+# MySQL: "Duplicate key name" (el índice ya existía, creado a mano)
+ERROR_INDICE_DUPLICADO = 1061
+
+Migracion = namedtuple("Migracion", "version nombre ruta checksum")
+
+_RE_ARCHIVO = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+def listar_migraciones(carpeta=CARPETA_MIGRACIONES):
+    """Migraciones disponibles, ordenadas por versión."""
+    migraciones = []
+    for archivo in sorted(os.listdir(carpeta)):
+        m = _RE_ARCHIVO.match(archivo)
+        if not m:
+            continue
+        ruta = os.path.join(carpeta, archivo)
+        with open(ruta, "rb") as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+        migraciones.append(Migracion(int(m.group(1)), m.group(2), ruta, checksum))
+    return migraciones
+
+
+def sentencias(ruta):
+    """Sentencias de un archivo .sql (sin comentarios de línea, separadas por ';')."""
+    with open(ruta, encoding="utf-8") as f:
+        lineas = [l for l in f.read().splitlines() if not l.strip().startswith("--")]
+    return [s.strip() for s in "\n".join(lineas).split(";") if s.strip()]
+
+
+def adaptar(sentencia, dialecto):
+    """
+    Las migraciones se escriben para MySQL; en SQLite solo sobra
+    AUTO_INCREMENT (una columna INTEGER PRIMARY KEY ya se autonumera).
+    """
+    if dialecto == "sqlite":
+        return re.sub(r"\s+AUTO_INCREMENT\b", "", sentencia, flags=re.IGNORECASE)
+    return sentencia
+
+
+def _marcador(dialecto):
+    return "%s" if dialecto == "mysql" else "?"
+
+
+def asegurar_tabla_versiones(con):
+    cursor = con.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLA_VERSIONES} (
+            version INT PRIMARY KEY,
+            nombre VARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            aplicada DATETIME NOT NULL
+        )
+    """)
+    cursor.close()
+    con.commit()
+
+
+def versiones_aplicadas(con):
+    """{version: checksum} de las migraciones ya aplicadas."""
+    asegurar_tabla_versiones(con)
+    cursor = con.cursor()
+    cursor.execute(f"SELECT version, checksum FROM {TABLA_VERSIONES}")
+    aplicadas = {int(v): c for v, c in cursor.fetchall()}
+    cursor.close()
+    return aplicadas
+
+
+def _es_indice_duplicado(error):
+    return getattr(error, "errno", None) == ERROR_INDICE_DUPLICADO or \
+        "already exists" in str(error)
+
+
+def aplicar_pendientes(con, dialecto, carpeta=CARPETA_MIGRACIONES, avisar=print):
+    """
+    Aplica en orden las migraciones que falten. Retorna la lista de versiones
+    aplicadas en esta llamada. Si una sentencia falla se detiene ahí (la
+    versión no queda registrada, así que se reintenta la próxima vez).
+    """
+    aplicadas = versiones_aplicadas(con)
+    nuevas = []
+    for m in listar_migraciones(carpeta):
+        if m.version in aplicadas:
+            if aplicadas[m.version] != m.checksum:
+                avisar(f"⚠️ {m.version:04d}_{m.nombre} cambió después de aplicarse (no se reaplica)")
+            continue
+
+        cursor = con.cursor()
+        for sentencia in sentencias(m.ruta):
+            try:
+                cursor.execute(adaptar(sentencia, dialecto))
+            except Exception as e:
+                # Un índice que ya existe (creado a mano) no impide seguir;
+                # así una migración a medio aplicar se puede reintentar
+                if _es_indice_duplicado(e):
+                    avisar(f"   (ya existía) {sentencia.splitlines()[0]}")
+                    continue
+                con.rollback()
+                cursor.close()
+                raise RuntimeError(f"Migración {m.version:04d}_{m.nombre} falló en:\n{sentencia}\n→ {e}") from e
+
+        cursor.execute(
+            f"INSERT INTO {TABLA_VERSIONES} (version, nombre, checksum, aplicada) "
+            f"VALUES ({', '.join([_marcador(dialecto)] * 4)})",
+            (m.version, m.nombre, m.checksum, datetime.now().isoformat(" ", timespec="seconds")),
+        )
+        con.commit()
+        cursor.close()
+        avisar(f"✅ {m.version:04d}_{m.nombre}")
+        nuevas.append(m.version)
+    return nuevas
+
+
+def conectar(ruta_sqlite=None):
+    """(conexión, dialecto) para SQLite si se da una ruta, si no el MySQL de obtener_conexion."""
+    if ruta_sqlite:
+        import sqlite3
+        return sqlite3.connect(ruta_sqlite), "sqlite"
+
+    from modulos.config.conexion import obtener_conexion
+    con = obtener_conexion()
+    if not con:
+        raise SystemExit("❌ No se pudo conectar a la base de datos.")
+    return con, "mysql"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migraciones versionadas del esquema")
+    parser.add_argument("--sqlite", metavar="ARCHIVO", help="migrar un archivo SQLite")
+    parser.add_argument("--estado", action="store_true", help="solo listar aplicadas y pendientes")
+    args = parser.parse_args(argv)
+
+    con, dialecto = conectar(args.sqlite)
+    try:
+        if args.estado:
+            aplicadas = versiones_aplicadas(con)
+            for m in listar_migraciones():
+                marca = "aplicada " if m.version in aplicadas else "PENDIENTE"
+                print(f"{marca}  {m.version:04d}_{m.nombre}")
+            return 0
+
+        try:
+            nuevas = aplicar_pendientes(con, dialecto)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        if not nuevas:
+            print("Sin migraciones pendientes.")
+        return 0
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
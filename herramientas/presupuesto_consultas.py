@@ -0,0 +1,217 @@
+"""
+Presupuesto de consultas SQL por página.
+
+Renderiza cada punto de entrada `mostrar_*` con el modo headless de
+Streamlit (streamlit.testing.v1.AppTest) contra una base local sembrada y
+falla si alguna página supera su presupuesto de sentencias SQL o de
+conexiones abiertas. Sirve para que los patrones N+1 que ya se corrigieron
+(ahorros, multas, consolidado de promotora, ...) no vuelvan.
+
+Uso (desde la raíz del repositorio):
+
+    GAPCSV_DB_HOST=127.0.0.1 GAPCSV_DB_NAME=gapcsv_local ... \\
+        python -m herramientas.presupuesto_consultas [--medir] [pagina ...]
+
+--medir solo imprime lo medido (para recalibrar la tabla) sin fallar.
+El código de salida es 1 si alguna página se pasa del presupuesto o falla.
+"""
+import os
+import sys
+import argparse
+import textwrap
+from collections import namedtuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# =============================================
+#  PERFILES DE PRUEBA
+# =============================================
+# Usuarios que crea el generador de datos sintéticos; se pueden cambiar con
+# GAPCSV_USUARIO_<PERFIL> y GAPCSV_CLAVE_PRUEBA.
+
+CLAVE_PRUEBA = os.environ.get("GAPCSV_CLAVE_PRUEBA", "gapcsv123")
+
+PERFILES = {
+    perfil: os.environ.get(f"GAPCSV_USUARIO_{perfil.upper()}", usuario)
+    for perfil, usuario in {
+        "secretaria": "secretaria1",
+        "presidente": "presidente1",
+        "promotora": "promotora1",
+        "administrador": "admin1",
+    }.items()
+}
+
+# =============================================
+#  TABLA DE PRESUPUESTOS
+# =============================================
+# Una fila por página. `reunion` indica que la página necesita una
+# reunión activa en la sesión (la que normalmente elige Asistencia);
+# la fila "login" mide el inicio de sesión en sí.
+
+Presupuesto = namedtuple(
+    "Presupuesto", "modulo funcion perfil consultas conexiones reunion"
+)
+
+PRESUPUESTOS = {
+    "grupos":                 Presupuesto("modulos.grupos", "mostrar_grupos", "secretaria", 6, 2, False),
+    "miembros":               Presupuesto("modulos.miembros", "mostrar_miembro", "secretaria", 6, 1, False),
+    "reglamentos":            Presupuesto("modulos.reglamentos", "mostrar_reglamentos", "secretaria", 6, 1, False),
+    "asistencia":             Presupuesto("modulos.asistencia", "mostrar_asistencia", "secretaria", 4, 1, False),
+    "ahorros":                Presupuesto("modulos.ahorros", "mostrar_ahorros", "secretaria", 8, 2, True),
+    "prestamo":               Presupuesto("modulos.prestamo", "mostrar_prestamo", "secretaria", 5, 2, True),
+    "pago_prestamo":          Presupuesto("modulos.pagoprestamo", "mostrar_pago_prestamo", "secretaria", 8, 2, True),
+    "multas":                 Presupuesto("modulos.multa", "mostrar_multas", "secretaria", 8, 2, True),
+    "pago_multas":            Presupuesto("modulos.pagomulta", "mostrar_pago_multas", "secretaria", 8, 2, True),
+    "movimiento_caja":        Presupuesto("modulos.movimientocaja", "mostrar_movimiento_caja", "secretaria", 10, 2, True),
+    "reuniones":              Presupuesto("modulos.reuniones", "mostrar_reuniones", "secretaria", 6, 1, False),
+    "gestion_integrada":      Presupuesto("modulos.integrada", "mostrar_gestion_integrada", "secretaria", 45, 12, False),
+    "ciclo":                  Presupuesto("modulos.ciclo", "mostrar_ciclo", "secretaria", 8, 4, False),
+    "promotora":              Presupuesto("modulos.promotora", "mostrar_promotora", "promotora", 3, 1, False),
+    "distrito":               Presupuesto("modulos.distrito", "mostrar_distrito", "promotora", 3, 1, False),
+    "consolidado_promotora":  Presupuesto("modulos.consolidado_promotora", "mostrar_consolidado_promotora", "promotora", 10, 2, False),
+    "consolidado_general":    Presupuesto("modulos.consolidado_administrador", "mostrar_consolidado_general", "administrador", 6, 5, False),
+    "cierre_lote":            Presupuesto("modulos.cierre_lote", "mostrar_cierre_lote", "administrador", 6, 3, False),
+    "login":                  Presupuesto(None, None, "secretaria", 3, 2, False),
+}
+
+# =============================================
+#  SCRIPT QUE EJECUTA APPTEST
+# =============================================
+# Inicia sesión y prepara la reunión FUERA de la medición, vacía los
+# cachés de datos para medir en frío y deja el resumen en session_state
+# (el script corre en otro hilo que el de este proceso). La fila "login"
+# no tiene página: lo medido es el propio inicio de sesión.
+
+_ENCABEZADO = '''
+import sys
+sys.path.insert(0, {raiz!r})
+
+import streamlit as st
+from modulos.sesion import cargar_contexto_sesion, iniciar_sesion
+from modulos.instrumentacion import iniciar_rerun, resumen_rerun
+from modulos.config.conexion import obtener_conexion
+'''
+
+_LOGIN = '''
+contexto = cargar_contexto_sesion({usuario!r}, {clave!r})
+if contexto is None:
+    raise RuntimeError("No se pudo iniciar sesión con el usuario de prueba {usuario}")
+iniciar_sesion(contexto)
+'''
+
+_REUNION = '''
+if "reunion_actual" not in st.session_state:
+    con = obtener_conexion()
+    cursor = con.cursor()
+    cursor.execute(
+        "SELECT ID_Reunion, ID_Grupo, fecha, lugar FROM Reunion "
+        "WHERE ID_Grupo = %s AND fecha <= CURDATE() ORDER BY fecha DESC LIMIT 1",
+        (st.session_state.get("id_grupo"),)
+    )
+    fila = cursor.fetchone()
+    con.close()
+    if fila:
+        st.session_state.reunion_actual = {
+            "id_reunion": fila[0], "id_grupo": fila[1],
+            "nombre_reunion": f"{fila[2]} | {fila[3]}",
+        }
+'''
+
+
+def script_pagina(nombre, limpiar_cache=True):
+    """Código del script que AppTest ejecuta para medir la página `nombre`."""
+    p = PRESUPUESTOS[nombre]
+    datos = {"raiz": RAIZ, "usuario": PERFILES[p.perfil], "clave": CLAVE_PRUEBA}
+    partes = [_ENCABEZADO.format(**datos)]
+
+    if p.funcion is None:
+        if limpiar_cache:
+            partes.append("st.cache_data.clear()")
+        partes.append("iniciar_rerun()")
+        partes.append(_LOGIN.format(**datos))
+    else:
+        partes.append('if "contexto_sesion" not in st.session_state:')
+        partes.append(textwrap.indent(_LOGIN.format(**datos), "    "))
+        if p.reunion:
+            partes.append(_REUNION)
+        if limpiar_cache:
+            partes.append("st.cache_data.clear()")
+        partes.append("iniciar_rerun()")
+        partes.append(f"from {p.modulo} import {p.funcion}\n{p.funcion}()")
+
+    partes.append('st.session_state["_resumen_presupuesto"] = resumen_rerun()')
+    return "\n".join(partes)
+
+
+def leer_resumen(at):
+    """Resumen de consultas que dejó el último run de `at` (o None)."""
+    if "_resumen_presupuesto" in at.session_state:
+        return at.session_state["_resumen_presupuesto"]
+    return None
+
+
+def medir_pagina(nombre, timeout=60):
+    """Renderiza una página y retorna (resumen, excepciones) de ese render."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(script_pagina(nombre), default_timeout=timeout).run()
+    return leer_resumen(at), [e.value for e in at.exception]
+
+
+def revisar(paginas, solo_medir=False):
+    """Mide cada página y compara contra su presupuesto. Retorna la lista de fallas."""
+    fallas = []
+    print(f"{'página':<24}{'consultas':>12}{'conexiones':>12}{'ms':>10}")
+    for nombre in paginas:
+        p = PRESUPUESTOS[nombre]
+        try:
+            resumen, excepciones = medir_pagina(nombre)
+        except Exception as e:
+            excepciones, resumen = [str(e)], None
+
+        if resumen is None:
+            print(f"{nombre:<24}{'ERROR':>12}")
+            fallas.append(f"{nombre}: no terminó de renderizar ({'; '.join(map(str, excepciones))})")
+            continue
+
+        consultas, conexiones = resumen["total_consultas"], resumen["total_conexiones"]
+        print(
+            f"{nombre:<24}{consultas:>7} / {p.consultas:<3}{conexiones:>7} / {p.conexiones:<3}"
+            f"{resumen['total_ms']:>10.0f}"
+        )
+        if excepciones:
+            fallas.append(f"{nombre}: excepción durante el render ({'; '.join(map(str, excepciones))})")
+        if consultas > p.consultas:
+            repetidas = [f"{g['veces']}× {g['sql'][:80]}" for g in resumen["formas"] if g["veces"] > 1]
+            fallas.append(
+                f"{nombre}: {consultas} consultas (presupuesto {p.consultas})"
+                + (f"; repetidas: {' | '.join(repetidas)}" if repetidas else "")
+            )
+        if conexiones > p.conexiones:
+            fallas.append(f"{nombre}: {conexiones} conexiones (presupuesto {p.conexiones})")
+
+    if solo_medir:
+        return []
+    return fallas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Presupuesto de consultas SQL por página")
+    parser.add_argument("paginas", nargs="*", help="páginas a revisar (por defecto todas)")
+    parser.add_argument("--medir", action="store_true", help="solo imprimir lo medido, sin fallar")
+    args = parser.parse_args(argv)
+
+    desconocidas = [p for p in args.paginas if p not in PRESUPUESTOS]
+    if desconocidas:
+        parser.error(f"páginas desconocidas: {', '.join(desconocidas)}")
+
+    fallas = revisar(args.paginas or list(PRESUPUESTOS), solo_medir=args.medir)
+    for falla in fallas:
+        print(f"❌ {falla}")
+    if not fallas:
+        print("✅ Todas las páginas dentro del presupuesto")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Prueba de punta a punta del modo sin conexión.
+
+Captura una reunión completa (asistencia, ahorros y cobro de cuotas) en un
+diario local temporal, como lo harían las páginas con el modo sin conexión
+activo, y la sincroniza contra la base de GAPCSV_DB_*. Verifica:
+
+  - que la captura no toca la base central y cuánto tarda;
+  - que un cambio hecho "en línea" sobre un (miembro, reunión) ya capturado
+    queda en conflicto y no se pisa;
+  - que todo lo demás llega a la base central con el valor capturado;
+  - idempotencia: una copia del diario tomada antes de sincronizar (como si
+    el equipo se hubiera apagado después del commit y antes de marcar) se
+    vuelve a sincronizar sin aplicar nada dos veces;
+  - que resolver el conflicto a favor del valor local lo aplica y que una
+    última pasada ya no tiene nada pendiente.
+
+Escribe en la reunión elegida: úsese contra una base LOCAL sembrada con
+herramientas.datos_sinteticos y migrada con herramientas.migrar.
+
+    GAPCSV_DB_HOST=127.0.0.1 GAPCSV_DB_NAME=gapcsv_local ... \\
+        python -m herramientas.simular_offline [--grupo 3] [--lote 7]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import date
+
+import pandas as pd
+
+from herramientas.datos_sinteticos import exigir_base_local
+from modulos.config.conexion import obtener_conexion
+from modulos.ahorros import calcular_ahorros
+from modulos.dinero import a_centavos
+from modulos.diario_local import (
+    DiarioLocal, valor_asistencia, capturar_asistencia, capturar_ahorros, capturar_pagos,
+    ASISTENCIA, PENDIENTE, CONFLICTO,
+)
+from modulos.sincronizacion import sincronizar, APLICADO, YA_APLICADO
+
+
+class Verificacion:
+    def __init__(self):
+        self.fallas = []
+
+    def __call__(self, condicion, descripcion):
+        print(f"{'✅' if condicion else '❌'} {descripcion}")
+        if not condicion:
+            self.fallas.append(descripcion)
+
+
+def _reunion_de_prueba(cursor, id_grupo):
+    """
+    La próxima reunión del grupo sin ahorros registrados (así la prueba se
+    puede repetir: cada corrida usa una reunión nueva) y sus miembros activos.
+    """
+    if id_grupo is None:
+        cursor.execute("SELECT MIN(ID_Grupo) FROM Miembro WHERE ID_Estado = 1")
+        id_grupo = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT r.ID_Reunion, r.fecha FROM Reunion r
+        WHERE r.ID_Grupo = %s AND r.fecha >= %s
+          AND NOT EXISTS (SELECT 1 FROM Ahorro a WHERE a.ID_Reunion = r.ID_Reunion)
+        ORDER BY r.fecha, r.ID_Reunion
+        LIMIT 1
+    """, (id_grupo, date.today()))
+    reunion = cursor.fetchone()
+    cursor.execute("SELECT ID_Miembro FROM Miembro WHERE ID_Grupo = %s AND ID_Estado = 1", (id_grupo,))
+    miembros = [fila[0] for fila in cursor.fetchall()]
+    return id_grupo, reunion, miembros
+
+
+def _proximas_cuotas(con, miembros):
+    """
+    Próxima cuota no pagada de cada préstamo activo de los miembros, con las
+    columnas de obtener_cuotas_a_cobrar que usa capturar_pagos (sin exigir
+    asistencia, que en esta prueba todavía no está en la base central).
+    """
+    cursor = con.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT ID_Prestamo, ID_Miembro, ID_Cuota, total_programado, total_pagado
+        FROM (
+            SELECT p.ID_Prestamo, p.ID_Miembro, c.ID_Cuota, c.total_programado,
+                   COALESCE(c.total_pagado, 0) AS total_pagado,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY p.ID_Prestamo ORDER BY c.fecha_programada, c.numero_cuota
+                   ) AS orden
+            FROM Prestamo p
+            JOIN CuotaPrestamo c ON c.ID_Prestamo = p.ID_Prestamo AND c.estado != 'pagado'
+            WHERE p.ID_Miembro IN ({", ".join(["%s"] * len(miembros))}) AND p.ID_Estado_prestamo != 3
+        ) proximas
+        WHERE orden = 1
+    """, tuple(miembros))
+    cuotas = cursor.fetchall()
+    cursor.close()
+    return cuotas
+
+
+def _asistencia_central(cursor, id_reunion):
+    cursor.execute("SELECT ID_Miembro, asistio, justificacion FROM Miembroxreunion WHERE ID_Reunion = %s",
+                   (id_reunion,))
+    return {i: (asistio, just) for i, asistio, just in cursor.fetchall()}
+
+
+def _contar(cursor, sql, parametros):
+    cursor.execute(sql, parametros)
+    return cursor.fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de punta a punta del modo sin conexión")
+    parser.add_argument("--grupo", type=int, help="ID_Grupo (por defecto el primero con miembros activos)")
+    parser.add_argument("--lote", type=int, default=7, help="tamaño de lote de la sincronización")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    exigir_base_local()
+    con = obtener_conexion()
+    if not con:
+        raise SystemExit("❌ No se pudo conectar a la base de datos.")
+    cursor = con.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM Cambio_sincronizado")
+        cursor.fetchone()
+    except Exception:
+        raise SystemExit("❌ Falta la tabla Cambio_sincronizado: corre python -m herramientas.migrar")
+
+    id_grupo, reunion, miembros = _reunion_de_prueba(cursor, args.grupo)
+    if not reunion or not miembros:
+        raise SystemExit("❌ El grupo no tiene una reunión próxima sin ahorros ni miembros activos para probar.")
+    id_reunion, fecha = reunion
+    print(f"Grupo {id_grupo} · reunión {id_reunion} ({fecha}) · {len(miembros)} miembros activos\n")
+
+    rnd = random.Random(args.semilla)
+    carpeta = tempfile.mkdtemp(prefix="gapcsv_offline_")
+    diario = DiarioLocal(os.path.join(carpeta, "diario.db"))
+    verificar = Verificacion()
+    try:
+        # ---------- captura (lo que harían las páginas en modo sin conexión) ----------
+        previas = _asistencia_central(cursor, id_reunion)
+        cuotas = _proximas_cuotas(con, miembros)
+        con.commit()   # cierra la instantánea de lectura antes de los cambios "en línea"
+        deudoras = {c["ID_Miembro"] for c in cuotas}
+        # Quien tiene cuota queda presente, como en un cobro de reunión
+        asistencias = {
+            i: (1, "") if i in deudoras else rnd.choice([(1, ""), (1, ""), (2, ""), (0, ""), (0, "Enfermedad")])
+            for i in miembros
+        }
+        presentes = [i for i, (asistio, _) in asistencias.items() if asistio]
+        base_ahorros = pd.DataFrame({"nombre": "", "saldo_inicial": 0, "deuda": 0}, index=presentes)
+        entrada = pd.DataFrame({
+            "Ahorro": [rnd.randrange(1, 21) * 0.5 for _ in presentes],
+            "Otras actividades": 0.0,
+            "Retiro": False,
+        }, index=presentes)
+        cobros = [
+            (c, min(a_centavos(c["total_programado"]) - a_centavos(c["total_pagado"]), 100))
+            for c in cuotas
+        ]
+
+        inicio = time.perf_counter()
+        n_asistencia = capturar_asistencia(diario, id_grupo, id_reunion, asistencias, previas, True)
+        n_ahorros = capturar_ahorros(diario, id_grupo, id_reunion, fecha, calcular_ahorros(base_ahorros, entrada))
+        n_pagos = capturar_pagos(diario, id_grupo, id_reunion, fecha, cobros)
+        ms_captura = (time.perf_counter() - inicio) * 1000
+        print(f"Captura local: {n_asistencia} asistencia, {n_ahorros} ahorros, {n_pagos} pagos "
+              f"en {ms_captura:.1f} ms")
+        verificar(diario.resumen().get(PENDIENTE) == n_asistencia + n_ahorros + n_pagos,
+                  "todo lo capturado queda pendiente en el diario")
+        verificar(_asistencia_central(cursor, id_reunion) == previas, "la captura no tocó la base central")
+        con.commit()
+
+        # ---------- cambio en línea que debe producir un conflicto ----------
+        capturadas = diario.capturas_pendientes(ASISTENCIA, id_reunion)
+        candidatas = [i for i in capturadas if i not in deudoras]
+        en_conflicto = candidatas[0] if candidatas else None
+        if en_conflicto is not None:
+            deseado = capturadas[en_conflicto]["asistio"]
+            previo = previas.get(en_conflicto, (None, ""))[0]
+            otro = next(v for v in (0, 1, 2) if v not in (deseado, previo))
+            cursor.execute("""
+                INSERT INTO Miembroxreunion (ID_Miembro, ID_Reunion, asistio, justificacion, fecha_registro)
+                VALUES (%s, %s, %s, '', CURRENT_TIMESTAMP)
+                ON DUPLICATE KEY UPDATE asistio = VALUES(asistio), justificacion = VALUES(justificacion)
+            """, (en_conflicto, id_reunion, otro))
+            con.commit()
+            print(f"Cambio en línea: miembro {en_conflicto} → asistio={otro}")
+
+        # Copia del diario antes de sincronizar, para la prueba de idempotencia
+        copia = os.path.join(carpeta, "diario_copia.db")
+        diario.respaldar(copia)
+
+        pagos_antes = _contar(cursor, "SELECT COUNT(*) FROM Pago_prestamo WHERE ID_Reunion = %s", (id_reunion,))
+        con.commit()
+
+        # ---------- primera sincronización ----------
+        inicio = time.perf_counter()
+        resumen = sincronizar(diario, con, args.lote)
+        print(f"\nSincronización 1 ({(time.perf_counter() - inicio) * 1000:.0f} ms): {dict(resumen)}")
+        conflictos = diario.por_resolver()
+        verificar(
+            [c.id_miembro for c in conflictos] == ([en_conflicto] if en_conflicto is not None else []),
+            "solo el (miembro, reunión) cambiado en línea queda en conflicto",
+        )
+
+        centrales = _asistencia_central(cursor, id_reunion)
+        distintos = [
+            i for i, datos in capturadas.items()
+            if i != en_conflicto and valor_asistencia(*centrales.get(i, (None, None))) != valor_asistencia(
+                datos["asistio"], datos["justificacion"])
+        ]
+        verificar(not distintos, "la asistencia capturada llegó a la base central")
+        if en_conflicto is not None:
+            verificar(centrales[en_conflicto][0] == otro, "el valor cambiado en línea no se pisó")
+
+        cursor.execute("SELECT ID_Miembro, monto_ahorro FROM Ahorro WHERE ID_Reunion = %s", (id_reunion,))
+        ahorros = {i: a_centavos(monto) for i, monto in cursor.fetchall()}
+        esperados = {i: a_centavos(monto) for i, monto in entrada["Ahorro"].items()}
+        verificar(all(ahorros.get(i) == c for i, c in esperados.items()), "los ahorros capturados llegaron")
+
+        pagos_despues = _contar(cursor, "SELECT COUNT(*) FROM Pago_prestamo WHERE ID_Reunion = %s", (id_reunion,))
+        con.commit()
+        verificar(pagos_despues - pagos_antes == n_pagos, f"se registraron {n_pagos} pagos de préstamo")
+
+        # ---------- idempotencia: la copia vieja del diario ----------
+        diario_copia = DiarioLocal(copia)
+        try:
+            resumen_copia = sincronizar(diario_copia, con, args.lote)
+        finally:
+            diario_copia.cerrar()
+        print(f"Sincronización de la copia: {dict(resumen_copia)}")
+        verificar(resumen_copia.get(APLICADO, 0) == 0, "la copia no vuelve a aplicar nada")
+        verificar(resumen_copia.get(YA_APLICADO, 0) == resumen.get(APLICADO, 0),
+                  "todo lo aplicado se reconoce como ya aplicado")
+        pagos_copia = _contar(cursor, "SELECT COUNT(*) FROM Pago_prestamo WHERE ID_Reunion = %s", (id_reunion,))
+        con.commit()
+        verificar(pagos_copia == pagos_despues, "no se duplicaron pagos")
+
+        # ---------- resolver el conflicto y última pasada ----------
+        for cambio in conflictos:
+            if cambio.estado == CONFLICTO:
+                diario.resolver(cambio.id, "local")
+        resumen = sincronizar(diario, con, args.lote)
+        print(f"Sincronización 2: {dict(resumen)}")
+        if en_conflicto is not None:
+            centrales = _asistencia_central(cursor, id_reunion)
+            con.commit()
+            verificar(centrales[en_conflicto][0] == capturadas[en_conflicto]["asistio"],
+                      "al conservar el valor local, se aplicó")
+        verificar(not sincronizar(diario, con, args.lote), "la última pasada no tiene nada pendiente")
+    finally:
+        diario.cerrar()
+        cursor.close()
+        con.close()
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+    print(f"\n{'✅ Todo en orden' if not verificar.fallas else f'❌ {len(verificar.fallas)} verificaciones fallaron'}")
+    return 1 if verificar.fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
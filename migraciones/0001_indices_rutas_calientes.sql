@@ -0,0 +1,27 @@
+-- Índices compuestos para las búsquedas más frecuentes de las páginas.
+-- Solo CREATE INDEX: la misma sintaxis sirve en MySQL y en SQLite.
+
+-- Reuniones de un grupo por fecha (asistencia, pagos, saldo anterior de caja)
+CREATE INDEX idx_reunion_grupo_fecha ON Reunion (ID_Grupo, fecha);
+
+-- Presentes de una reunión (ahorros, conteo de asistencia)
+CREATE INDEX idx_miembroxreunion_reunion_asistio ON Miembroxreunion (ID_Reunion, asistio);
+
+-- Próxima cuota pendiente de un préstamo
+CREATE INDEX idx_cuota_prestamo_estado_fecha ON CuotaPrestamo (ID_Prestamo, estado, fecha_programada);
+
+-- Miembros activos de un grupo
+CREATE INDEX idx_miembro_grupo_estado ON Miembro (ID_Grupo, ID_Estado);
+
+-- Multas cobradas en una reunión
+CREATE INDEX idx_pagomulta_reunion_pago ON PagoMulta (ID_Reunion_pago);
+
+-- Préstamos vigentes de un miembro (Prestamo no guarda ID_Reunion)
+CREATE INDEX idx_prestamo_miembro_estado ON Prestamo (ID_Miembro, ID_Estado_prestamo);
+
+-- Último reglamento de un grupo
+CREATE INDEX idx_reglamento_grupo ON Reglamento (ID_Grupo, ID_Reglamento);
+
+-- Totales de caja por reunión
+CREATE INDEX idx_ahorro_reunion ON Ahorro (ID_Reunion);
+CREATE INDEX idx_multa_reunion ON Multa (ID_Reunion);
@@ -0,0 +1,22 @@
+-- Llaves únicas que necesitan los "insertar o actualizar" de las páginas
+-- (ON DUPLICATE KEY UPDATE / verificar y luego insertar).
+--
+-- Si una falla con "Duplicate entry" hay filas repetidas que limpiar antes,
+-- por ejemplo:
+--   SELECT ID_Miembro, ID_Reunion, COUNT(*) FROM Ahorro
+--   GROUP BY ID_Miembro, ID_Reunion HAVING COUNT(*) > 1;
+
+-- Un registro de asistencia por miembro y reunión
+CREATE UNIQUE INDEX uq_miembroxreunion_miembro_reunion ON Miembroxreunion (ID_Miembro, ID_Reunion);
+
+-- Un ahorro por miembro y reunión (también sirve la búsqueda por miembro)
+CREATE UNIQUE INDEX uq_ahorro_miembro_reunion ON Ahorro (ID_Miembro, ID_Reunion);
+
+-- Una línea por miembro en cada multa
+CREATE UNIQUE INDEX uq_miembroxmulta_miembro_multa ON MiembroxMulta (ID_Miembro, ID_Multa);
+
+-- Números de cuota únicos dentro de un préstamo
+CREATE UNIQUE INDEX uq_cuota_prestamo_numero ON CuotaPrestamo (ID_Prestamo, numero_cuota);
+
+-- Asignación de grupos a promotoras sin repetir
+CREATE UNIQUE INDEX uq_grupos_asignados_usuario_grupo ON Grupos_Asignados (ID_Usuario, ID_Grupo);
@@ -0,0 +1,12 @@
+-- Cambios del modo sin conexión (modulos/sincronizacion.py) ya aplicados en
+-- la base central. La sincronización escribe aquí en la misma transacción
+-- que aplica el cambio y lo consulta antes de aplicar, así que reintentar un
+-- lote (por ejemplo, después de perder la conexión a medio camino) no aplica
+-- nada dos veces.
+CREATE TABLE Cambio_sincronizado (
+    id_cambio CHAR(36) NOT NULL PRIMARY KEY,
+    tipo VARCHAR(20) NOT NULL,
+    ID_Reunion INT NOT NULL,
+    ID_Miembro INT NOT NULL,
+    aplicado DATETIME NOT NULL
+);
@@ -0,0 +1,9 @@
+-- Índices para las multas que se generan al guardar la asistencia
+-- (multa.sincronizar_multas_asistencia). Solo CREATE INDEX: la misma
+-- sintaxis sirve en MySQL y en SQLite.
+
+-- Miembros de las multas de una reunión (la llave única empieza por ID_Miembro)
+CREATE INDEX idx_miembroxmulta_multa ON MiembroxMulta (ID_Multa);
+
+-- Pagos de la multa de un miembro
+CREATE INDEX idx_pagomulta_multa_miembro ON PagoMulta (ID_Multa, ID_Miembro);
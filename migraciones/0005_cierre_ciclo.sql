@@ -0,0 +1,19 @@
+-- Snapshots del cierre de ciclo en lote (modulos/cierre_lote.py), que la
+-- pestaña de ciclos cerrados (modulos/ciclo.py) lee por grupo. Antes la
+-- creaba la app al vuelo; en las bases donde ya existe, CREATE TABLE no
+-- hace nada y la llave única se reporta como ya existente.
+-- En SQLite herramientas.migrar quita AUTO_INCREMENT (INTEGER PRIMARY KEY
+-- ya se autonumera) y LONGTEXT se toma como texto.
+CREATE TABLE IF NOT EXISTS Cierre_ciclo (
+    ID_Cierre INTEGER PRIMARY KEY AUTO_INCREMENT,
+    ID_Grupo INT NOT NULL,
+    fecha_inicio DATE NOT NULL,
+    fecha_fin DATE NOT NULL,
+    fecha_cierre DATETIME NOT NULL,
+    metodo_distribucion VARCHAR(30) NOT NULL,
+    datos LONGTEXT NOT NULL
+);
+
+-- Un snapshot por grupo y rango (el guardado es ON DUPLICATE KEY UPDATE);
+-- también sirve la lectura por grupo
+CREATE UNIQUE INDEX uq_cierre_grupo_rango ON Cierre_ciclo (ID_Grupo, fecha_inicio, fecha_fin);
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 from modulos.config.conexion import obtener_conexion
 from datetime import date
+from modulos.dinero import formato_moneda, a_centavos, centavos_serie, desde_centavos
+from modulos.versiones_cache import version_actual, incrementar_version, ambito_grupo
+from modulos.diario_local import diario_compartido, modo_offline_activo, capturar_ahorros, AHORRO, FOTO_AHORROS
 
 def obtener_ahorros_grupo():
     """
@@ -91,88 +94,228 @@ def obtener_total_ahorros_ciclo():
         st.error(f"❌ Error calculando total de ahorros: {e}")
         return 0.00
 
-def obtener_saldo_inicial_corregido(id_miembro, fecha_reunion_actual):
+# =============================================
+#  REGISTRO DE AHORROS EN UNA SOLA TABLA
+# =============================================
+# Los presentes, sus saldos iniciales y sus deudas se cargan en tres
+# consultas para toda la reunión y quedan en caché hasta que cambia la
+# versión del grupo. La tabla se edita dentro del formulario (editar no
+# re-ejecuta la página) y los saldos se recalculan de una vez para todas
+# las filas, en centavos.
+
+# Red de seguridad para pagos o préstamos registrados desde otra sesión
+TTL_BASE_AHORROS = 60
+
+COLUMNAS_EDITABLES = ["Ahorro", "Otras actividades", "Retiro"]
+
+# Las tres consultas de la base, auditadas por herramientas.auditar_explain.
+# Las de lote llevan la lista IN en {marcadores}.
+CONSULTA_PRESENTES_REUNION = """
+    SELECT r.fecha, m.ID_Miembro, m.nombre
+    FROM Reunion r
+    LEFT JOIN Miembroxreunion mr ON mr.ID_Reunion = r.ID_Reunion AND mr.asistio = 1
+    LEFT JOIN Miembro m ON m.ID_Miembro = mr.ID_Miembro
+    WHERE r.ID_Reunion = %s
+    ORDER BY m.nombre
+"""
+
+CONSULTA_SALDOS_INICIALES = """
+    SELECT ID_Miembro, saldos_ahorros
+    FROM (
+        SELECT a.ID_Miembro, a.saldos_ahorros,
+               ROW_NUMBER() OVER (
+                   PARTITION BY a.ID_Miembro ORDER BY r.fecha DESC, a.ID_Ahorro DESC
+               ) AS orden
+        FROM Ahorro a
+        JOIN Reunion r ON a.ID_Reunion = r.ID_Reunion
+        WHERE a.ID_Miembro IN ({marcadores})
+          AND r.fecha < %s
+    ) ultimos
+    WHERE orden = 1
+"""
+
+CONSULTA_DEUDAS_PENDIENTES = """
+    SELECT p.ID_Miembro, p.monto_total_pagar,
+           COALESCE(SUM(cp.total_pagado), 0) AS pagado,
+           COUNT(cp.ID_Prestamo) AS cuotas
+    FROM Prestamo p
+    LEFT JOIN CuotaPrestamo cp ON cp.ID_Prestamo = p.ID_Prestamo
+    WHERE p.ID_Miembro IN ({marcadores})
+      AND p.ID_Estado_prestamo != 3
+    GROUP BY p.ID_Prestamo, p.ID_Miembro, p.monto_total_pagar
+"""
+
+
+def _marcadores(valores):
+    return ", ".join(["%s"] * len(valores))
+
+
+def obtener_saldos_iniciales(con, ids_miembros, fecha_reunion_actual):
     """
-    Obtiene el saldo inicial CORREGIDO - saldo final de la reunión anterior
+    Saldo final de la reunión anterior más reciente de cada miembro, en
+    centavos, con una sola consulta: {ID_Miembro: centavos}.
     """
-    try:
-        con = obtener_conexion()
-        cursor = con.cursor()
-       
-        # Obtener el saldo final de la reunión anterior MÁS RECIENTE
-        cursor.execute("""
-            SELECT COALESCE(a.saldos_ahorros, 0) as saldo_final_anterior
-            FROM Ahorro a
-            JOIN Reunion r ON a.ID_Reunion = r.ID_Reunion
-            WHERE a.ID_Miembro = %s
-            AND r.fecha < %s
-            ORDER BY r.fecha DESC, a.ID_Ahorro DESC
-            LIMIT 1
-        """, (id_miembro, fecha_reunion_actual))
-       
-        resultado = cursor.fetchone()
-        saldo_inicial = float(resultado[0]) if resultado and resultado[0] is not None else 0.00
-       
-        return saldo_inicial
-       
-    except Exception as e:
-        st.error(f"❌ Error obteniendo saldo inicial: {e}")
-        return 0.00
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
-        if 'con' in locals():
-            con.close()
+    if not ids_miembros:
+        return {}
+    cursor = con.cursor()
+    cursor.execute(CONSULTA_SALDOS_INICIALES.format(marcadores=_marcadores(ids_miembros)),
+                   (*ids_miembros, fecha_reunion_actual))
+    saldos = {id_miembro: a_centavos(saldo) for id_miembro, saldo in cursor.fetchall()}
+    cursor.close()
+    return saldos
+
+
+def obtener_deudas_pendientes(con, ids_miembros):
+    """
+    Deuda de préstamos no cancelados de cada miembro, en centavos, con una
+    sola consulta: {ID_Miembro: centavos}. Cuentan los préstamos sin cuotas
+    y los que tienen pagado menos que el total a pagar.
+    """
+    if not ids_miembros:
+        return {}
+    cursor = con.cursor()
+    cursor.execute(CONSULTA_DEUDAS_PENDIENTES.format(marcadores=_marcadores(ids_miembros)),
+                   tuple(ids_miembros))
+    prestamos = pd.DataFrame(cursor.fetchall(), columns=["ID_Miembro", "total", "pagado", "cuotas"])
+    cursor.close()
+    if prestamos.empty:
+        return {}
+
+    total = centavos_serie(prestamos["total"])
+    pagado = centavos_serie(prestamos["pagado"])
+    vigentes = (pagado < total) | (prestamos["cuotas"] == 0)
+    deuda = (total - pagado)[vigentes].groupby(prestamos["ID_Miembro"][vigentes]).sum()
+    return {int(id_miembro): int(c) for id_miembro, c in deuda.items()}
+
+
+def _base_ahorros_reunion(id_grupo, id_reunion, sin_conexion):
+    """
+    Base de la tabla de ahorros. En línea se lee de la base central y se
+    guarda como foto en el diario local; sin conexión se usa esa foto
+    (None si este equipo nunca abrió la reunión).
+    """
+    diario = diario_compartido()
+    if sin_conexion:
+        foto = diario.leer_foto(id_grupo, id_reunion, FOTO_AHORROS)
+        if foto is None:
+            return None
+        base = pd.DataFrame(foto["filas"], columns=["ID_Miembro", "nombre", "saldo_inicial", "deuda"])
+        return base.astype({"saldo_inicial": "int64", "deuda": "int64"}).set_index("ID_Miembro")
+
+    fecha, base = _cargar_base_ahorros(id_reunion, version_actual(ambito_grupo(id_grupo)))
+    diario.guardar_foto(id_grupo, id_reunion, FOTO_AHORROS, {
+        "fecha": fecha,
+        "filas": [
+            (int(id_miembro), fila["nombre"], int(fila["saldo_inicial"]), int(fila["deuda"]))
+            for id_miembro, fila in base.iterrows()
+        ],
+    })
+    return base
 
-def obtener_deuda_prestamo_pendiente(id_miembro, con):
+
+@st.cache_data(ttl=TTL_BASE_AHORROS, show_spinner=False)
+def _cargar_base_ahorros(id_reunion, version):
     """
-    Obtiene la deuda total pendiente de préstamos para un miembro
-    Revisa SI TIENE CUALQUIER PRÉSTAMO sin pagar completamente a la fecha
+    Fecha de la reunión y presentes con saldo inicial y deuda (centavos),
+    indexados por ID_Miembro. `version` solo forma parte de la llave de caché.
     """
+    con = obtener_conexion()
+    if not con:
+        raise ConnectionError("No se pudo conectar a la base de datos.")
+
     try:
         cursor = con.cursor()
-        
-        # CONSULTA CORREGIDA: Verificar TODOS los préstamos que no estén completamente pagados
-        cursor.execute("""
-            SELECT 
-                COALESCE(SUM(
-                    p.monto_total_pagar - 
-                    COALESCE((
-                        SELECT SUM(cp.total_pagado) 
-                        FROM CuotaPrestamo cp 
-                        WHERE cp.ID_Prestamo = p.ID_Prestamo
-                    ), 0)
-                ), 0) as deuda_pendiente
-            FROM Prestamo p
-            WHERE p.ID_Miembro = %s 
-            AND p.ID_Estado_prestamo != 3  -- Excluir préstamos cancelados
-            AND (
-                -- Préstamos donde el total pagado es menor al monto total a pagar
-                COALESCE((
-                    SELECT SUM(cp.total_pagado) 
-                    FROM CuotaPrestamo cp 
-                    WHERE cp.ID_Prestamo = p.ID_Prestamo
-                ), 0) < p.monto_total_pagar
-                OR 
-                -- O préstamos que no tienen ninguna cuota registrada (préstamo nuevo)
-                NOT EXISTS (
-                    SELECT 1 FROM CuotaPrestamo cp 
-                    WHERE cp.ID_Prestamo = p.ID_Prestamo
-                )
-            )
-        """, (id_miembro,))
-        
-        resultado = cursor.fetchone()
-        deuda_pendiente = float(resultado[0]) if resultado and resultado[0] is not None else 0.00
-        
-        return deuda_pendiente
-        
-    except Exception as e:
-        st.error(f"❌ Error obteniendo deuda pendiente: {e}")
-        return 0.00
+        cursor.execute(CONSULTA_PRESENTES_REUNION, (id_reunion,))
+        filas = cursor.fetchall()
+        cursor.close()
+
+        fecha_reunion = filas[0][0] if filas else None
+        presentes = [(id_miembro, nombre) for _, id_miembro, nombre in filas if id_miembro is not None]
+        ids = [id_miembro for id_miembro, _ in presentes]
+        saldos = obtener_saldos_iniciales(con, ids, fecha_reunion)
+        deudas = obtener_deudas_pendientes(con, ids)
     finally:
-        if 'cursor' in locals():
-            cursor.close()
+        con.close()
+
+    base = pd.DataFrame(presentes, columns=["ID_Miembro", "nombre"]).set_index("ID_Miembro")
+    base["saldo_inicial"] = pd.Series(saldos, dtype="int64").reindex(base.index, fill_value=0)
+    base["deuda"] = pd.Series(deudas, dtype="int64").reindex(base.index, fill_value=0)
+    return fecha_reunion, base
+
+
+def calcular_ahorros(base, entrada=None):
+    """
+    Cálculo de toda la tabla en un solo paso (centavos). Sin retiro, el saldo
+    final es saldo inicial + ahorro + otros. Con retiro se entrega lo
+    acumulado menos la deuda y el saldo final queda en la deuda pendiente
+    (0 si no hay deuda).
+    """
+    calculo = base.copy()
+    if entrada is None:
+        calculo["ahorro"] = 0
+        calculo["otros"] = 0
+        calculo["retiro"] = False
+    else:
+        entrada = entrada.reindex(calculo.index)
+        calculo["ahorro"] = centavos_serie(entrada["Ahorro"])
+        calculo["otros"] = centavos_serie(entrada["Otras actividades"])
+        calculo["retiro"] = entrada["Retiro"].fillna(False).astype(bool)
+
+    acumulado = calculo["saldo_inicial"] + calculo["ahorro"] + calculo["otros"]
+    calculo["monto_retiro"] = (acumulado - calculo["deuda"]).clip(lower=0).where(calculo["retiro"], 0)
+    calculo["saldo_final"] = acumulado.where(~calculo["retiro"], calculo["deuda"].clip(lower=0))
+    return calculo
+
+
+def tabla_ahorros(calculo):
+    """Tabla para st.data_editor (montos en float, como los requiere el widget)."""
+    return pd.DataFrame({
+        "Socios/as": calculo["nombre"],
+        "Saldo inicial": calculo["saldo_inicial"] / 100,
+        "Ahorro": calculo["ahorro"] / 100,
+        "Otras actividades": calculo["otros"] / 100,
+        "Deuda préstamo": calculo["deuda"] / 100,
+        "Retiro": calculo["retiro"],
+        "Monto retiro": calculo["monto_retiro"] / 100,
+        "Saldo final": calculo["saldo_final"] / 100,
+    }, index=calculo.index)
+
+
+def guardar_ahorros(con, id_reunion, fecha_ahorro, calculo):
+    """
+    Guarda en una sola escritura (upsert por miembro y reunión) las filas con
+    ahorro, otros o retiro. Retorna cuántas filas se enviaron; el commit
+    queda a cargo del llamador.
+    """
+    filas = calculo[(calculo["ahorro"] > 0) | (calculo["otros"] > 0) | (calculo["monto_retiro"] > 0)]
+    if filas.empty:
+        return 0
+
+    cursor = con.cursor()
+    cursor.executemany("""
+        INSERT INTO Ahorro (
+            ID_Miembro, ID_Reunion, fecha,
+            monto_ahorro, monto_otros, monto_retiros,
+            saldos_ahorros, saldo_inicial
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            fecha = VALUES(fecha),
+            monto_ahorro = VALUES(monto_ahorro),
+            monto_otros = VALUES(monto_otros),
+            monto_retiros = VALUES(monto_retiros),
+            saldos_ahorros = VALUES(saldos_ahorros),
+            saldo_inicial = VALUES(saldo_inicial)
+    """, [
+        (
+            int(id_miembro), id_reunion, fecha_ahorro,
+            desde_centavos(f.ahorro), desde_centavos(f.otros), desde_centavos(f.monto_retiro),
+            desde_centavos(f.saldo_final), desde_centavos(f.saldo_inicial),
+        )
+        for id_miembro, f in filas.iterrows()
+    ])
+    cursor.close()
+    return len(filas)
+
 
 def mostrar_ahorros():
     st.header("💰 Control de Ahorros")
@@ -182,278 +325,138 @@ def mostrar_ahorros():
         st.warning("⚠️ Primero debes seleccionar una reunión en el módulo de Asistencia.")
         return
 
+    # Obtener la reunión del session_state
+    reunion_info = st.session_state.reunion_actual
+    id_reunion = reunion_info['id_reunion']
+    id_grupo = reunion_info['id_grupo']
+    nombre_reunion = reunion_info['nombre_reunion']
+
+    # Mostrar información de la reunión actual
+    st.info(f"📅 **Reunión actual:** {nombre_reunion}")
+
+    anotados = st.session_state.pop("ahorros_anotados", None)
+    if anotados is not None:
+        st.success(f"📴 Ahorros guardados en este equipo ({anotados} registros); "
+                   "se suben a la base central en segundo plano.")
+
+    guardados = st.session_state.pop("ahorros_guardados", None)
+    if guardados is not None:
+        if guardados > 0:
+            st.success(f"✅ Se guardaron/actualizaron {guardados} registros de ahorro correctamente.")
+        else:
+            st.info("ℹ️ No se guardaron registros nuevos (no se ingresaron montos o retiros).")
+
+    sin_conexion = modo_offline_activo()
     try:
-        con = obtener_conexion()
-        cursor = con.cursor()
+        base = _base_ahorros_reunion(id_grupo, id_reunion, sin_conexion)
+    except Exception as e:
+        st.error(f"❌ Error cargando los ahorros de la reunión: {e}")
+        return
 
-        # Obtener la reunión del session_state
-        reunion_info = st.session_state.reunion_actual
-        id_reunion = reunion_info['id_reunion']
-        id_grupo = reunion_info['id_grupo']
-        nombre_reunion = reunion_info['nombre_reunion']
+    if base is None:
+        st.warning("📴 Este equipo no tiene copia de los ahorros de esta reunión; "
+                   "abre esta página una vez con conexión.")
+        return
 
-        # Mostrar información de la reunión actual
-        st.info(f"📅 **Reunión actual:** {nombre_reunion}")
+    if base.empty:
+        st.warning(f"⚠️ No hay miembros registrados como presentes en esta reunión.")
+        st.info("Por favor, registra la asistencia primero en el módulo correspondiente.")
+        return
 
-        # OBTENER LA FECHA DE LA REUNIÓN ACTUAL PARA ENCONTRAR LA REUNIÓN ANTERIOR
-        cursor.execute("SELECT fecha FROM Reunion WHERE ID_Reunion = %s", (id_reunion,))
-        fecha_reunion_actual = cursor.fetchone()[0]
+    # Lo ingresado se guarda al calcular; cada cálculo usa una llave de tabla
+    # nueva para que el editor arranque de los valores ya recalculados
+    clave_entrada = f"ahorros_entrada_{id_reunion}"
+    clave_edicion = f"ahorros_edicion_{id_reunion}"
+    entrada = st.session_state.get(clave_entrada)
+    # En modo sin conexión la tabla arranca de lo capturado aquí que aún no se sincronizó
+    if entrada is None and sin_conexion:
+        capturadas = diario_compartido().capturas_pendientes(AHORRO, id_reunion)
+        if capturadas:
+            st.caption(f"📴 {len(capturadas)} ahorros de esta reunión esperan sincronizarse.")
+            entrada = pd.DataFrame.from_dict({
+                id_miembro: {"Ahorro": d["ahorro"] / 100, "Otras actividades": d["otros"] / 100, "Retiro": d["retiro"]}
+                for id_miembro, d in capturadas.items()
+            }, orient="index")
+    calculo = calcular_ahorros(base, entrada)
 
-        # -----------------------------
-        # CARGAR MIEMBROS QUE ASISTIERON A ESTA REUNIÓN (SOLO LOS QUE MARCARON SI)
-        # -----------------------------
-        cursor.execute("""
-            SELECT m.ID_Miembro, m.nombre
-            FROM Miembro m
-            JOIN Miembroxreunion mr ON m.ID_Miembro = mr.ID_Miembro
-            WHERE mr.ID_Reunion = %s AND mr.asistio = 1
-            ORDER BY m.nombre
-        """, (id_reunion,))
-       
-        miembros_presentes = cursor.fetchall()
+    # -------------------------------------
+    # TABLA DE AHORROS PARA TODOS LOS MIEMBROS
+    # -------------------------------------
+    with st.form("form_ahorro"):
+        st.subheader("📝 Registro de Ahorros")
 
-        if not miembros_presentes:
-            st.warning(f"⚠️ No hay miembros registrados como presentes en esta reunión.")
-            st.info("Por favor, registra la asistencia primero en el módulo correspondiente.")
-            return
+        # Mostrar fecha de la reunión
+        fecha_ahorro = st.date_input(
+            "Fecha del ahorro:",
+            value=date.today()
+        )
 
-        # -------------------------------------
-        # TABLA DE AHORROS PARA TODOS LOS MIEMBROS
-        # -------------------------------------
-        with st.form("form_ahorro"):
-            st.subheader("📝 Registro de Ahorros")
-           
-            # Mostrar fecha de la reunión
-            fecha_ahorro = st.date_input(
-                "Fecha del ahorro:",
-                value=date.today()
+        formato = st.column_config.NumberColumn(format="$%.2f")
+        editada = st.data_editor(
+            tabla_ahorros(calculo),
+            key=f"tabla_ahorros_{id_reunion}_{st.session_state.get(clave_edicion, 0)}",
+            hide_index=True,
+            use_container_width=True,
+            disabled=["Socios/as", "Saldo inicial", "Deuda préstamo", "Monto retiro", "Saldo final"],
+            column_config={
+                "Saldo inicial": formato,
+                "Ahorro": st.column_config.NumberColumn(min_value=0.0, step=0.01, format="$%.2f"),
+                "Otras actividades": st.column_config.NumberColumn(min_value=0.0, step=0.01, format="$%.2f"),
+                "Deuda préstamo": formato,
+                "Retiro": st.column_config.CheckboxColumn(help="Retira lo acumulado menos la deuda pendiente"),
+                "Monto retiro": formato,
+                "Saldo final": formato,
+            },
+        )
+
+        col_calcular, col_guardar = st.columns(2)
+        calcular = col_calcular.form_submit_button("🧮 Calcular saldos")
+        enviar = col_guardar.form_submit_button("💾 Guardar Ahorros")
+
+    if calcular:
+        st.session_state[clave_entrada] = editada[COLUMNAS_EDITABLES]
+        st.session_state[clave_edicion] = st.session_state.get(clave_edicion, 0) + 1
+        st.rerun()
+
+    calculo = calcular_ahorros(base, editada[COLUMNAS_EDITABLES])
+    con_deuda = calculo[calculo["retiro"] & (calculo["deuda"] > 0)]
+    for _, fila in con_deuda.iterrows():
+        acumulado = fila["saldo_inicial"] + fila["ahorro"] + fila["otros"]
+        st.caption(
+            f"💡 {fila['nombre']}: retiro con deuda {formato_moneda(desde_centavos(acumulado))} - "
+            f"{formato_moneda(desde_centavos(fila['deuda']))} = {formato_moneda(desde_centavos(fila['monto_retiro']))}"
+        )
+
+    # Sin conexión se anota en el diario local, sin esperar a la base central
+    if sin_conexion:
+        if enviar:
+            st.session_state["ahorros_anotados"] = capturar_ahorros(
+                diario_compartido(), id_grupo, id_reunion, fecha_ahorro, calculo
             )
+            st.session_state.pop(clave_entrada, None)
+            st.session_state[clave_edicion] = st.session_state.get(clave_edicion, 0) + 1
+            st.rerun()
+        st.markdown("---")
+        st.caption("📴 El historial de ahorros necesita conexión.")
+        return
 
-            # TABLA DE AHORROS CON FORMATO ESPECÍFICO
-            st.markdown("---")
-            st.markdown("### 💰 Control de Ahorros")
-           
-            # ENCABEZADO DE LA TABLA - UNA SOLA FILA PARA LOS TÍTULOS
-            cols_titulos = st.columns([2, 1, 1, 1, 1, 1, 1])  # Agregada columna para Deuda
-            with cols_titulos[0]:
-                st.markdown("**Socios/as**")
-            with cols_titulos[1]:
-                st.markdown("**Saldo inicial**")
-            with cols_titulos[2]:
-                st.markdown("**Ahorro**")
-            with cols_titulos[3]:
-                st.markdown("**Otras actividades**")
-            with cols_titulos[4]:
-                st.markdown("**Deuda préstamo**")
-            with cols_titulos[5]:
-                st.markdown("**Retiros**")
-            with cols_titulos[6]:
-                st.markdown("**Saldo final**")
-
-            # Diccionarios para almacenar los datos de cada miembro
-            ahorros_data = {}
-            otros_data = {}
-            retiros_data = {}
-            saldos_iniciales = {}
-            retiros_activados = {}
-            montos_retiro_calculados = {}
-            saldos_finales = {}
-            deudas_miembros = {}
-
-            # FILAS PARA CADA MIEMBRO - UNA FILA POR MIEMBRO
-            for id_miembro, nombre_miembro in miembros_presentes:
-                cols = st.columns([2, 1, 1, 1, 1, 1, 1])  # Agregada columna para Deuda
-               
-                with cols[0]:
-                    # Mostrar nombre del miembro
-                    st.write(f"**{nombre_miembro}**")
-               
-                with cols[1]:
-                    # OBTENER EL SALDO INICIAL CORREGIDO
-                    saldo_inicial = obtener_saldo_inicial_corregido(id_miembro, fecha_reunion_actual)
-                   
-                    # Mostrar saldo inicial (saldo final de la reunión anterior)
-                    st.write(f"${saldo_inicial:,.2f}")
-                    saldos_iniciales[id_miembro] = saldo_inicial
-               
-                with cols[2]:
-                    # Input para ahorro - INICIA EN 0 (limpio)
-                    monto_ahorro = st.number_input(
-                        "Ahorro",
-                        min_value=0.00,
-                        value=0.00,
-                        format="%.2f",
-                        step=0.01,
-                        key=f"ahorro_{id_miembro}",
-                        label_visibility="collapsed"
-                    )
-                    ahorros_data[id_miembro] = monto_ahorro
-               
-                with cols[3]:
-                    # Input para otras actividades - INICIA EN 0 (limpio)
-                    monto_otros = st.number_input(
-                        "Otras actividades",
-                        min_value=0.00,
-                        value=0.00,
-                        format="%.2f",
-                        step=0.01,
-                        key=f"otros_{id_miembro}",
-                        label_visibility="collapsed"
-                    )
-                    otros_data[id_miembro] = monto_otros
-               
-                with cols[4]:
-                    # OBTENER DEUDA DE PRÉSTAMOS PENDIENTES
-                    deuda_pendiente = obtener_deuda_prestamo_pendiente(id_miembro, con)
-                    deudas_miembros[id_miembro] = deuda_pendiente
-                    
-                    if deuda_pendiente > 0:
-                        st.error(f"**${deuda_pendiente:,.2f}**")
-                    else:
-                        st.success(f"**$0.00**")
-               
-                with cols[5]:
-                    # Checkbox para activar retiros
-                    retiro_activado = st.checkbox(
-                        "Activar retiro",
-                        key=f"retiro_check_{id_miembro}",
-                        value=False
-                    )
-                    retiros_activados[id_miembro] = retiro_activado
-                   
-                    if retiro_activado:
-                        # CALCULAR RETIRO CONSIDERANDO DEUDA: (Saldo Inicial + Ahorros actuales + Otros actuales) - Deuda pendiente
-                        total_acumulado = saldo_inicial + monto_ahorro + monto_otros
-                        monto_retiros_calculado = max(0, total_acumulado - deuda_pendiente)
-                       
-                        # Mostrar el monto de retiro calculado
-                        if deuda_pendiente > 0:
-                            st.warning(f"**${monto_retiros_calculado:,.2f}**")
-                            st.caption(f"💡 Con deuda: ${total_acumulado:,.2f} - ${deuda_pendiente:,.2f}")
-                        else:
-                            st.error(f"**${monto_retiros_calculado:,.2f}**")
-                       
-                        # Guardar el cálculo del retiro
-                        montos_retiro_calculados[id_miembro] = monto_retiros_calculado
-                        retiros_data[id_miembro] = monto_retiros_calculado
-                    else:
-                        monto_retiros = 0.00
-                        st.info("**$0.00**")
-                        retiros_data[id_miembro] = 0.00
-                        montos_retiro_calculados[id_miembro] = 0.00
-               
-                with cols[6]:
-                    # CALCULAR Y MOSTRAR SALDO FINAL CORREGIDO
-                    if retiro_activado:
-                        if deuda_pendiente > 0:
-                            # Si hay deuda y retiro: Saldo final = Deuda pendiente (porque se usó el dinero para pagar la deuda)
-                            saldo_final = deuda_pendiente
-                        else:
-                            # Si no hay deuda y hay retiro: Saldo final = 0
-                            saldo_final = 0.00
-                    else:
-                        # Sin retiro: Saldo Inicial + Ahorros + Otros
-                        saldo_final = saldo_inicial + monto_ahorro + monto_otros
-                   
-                    saldos_finales[id_miembro] = saldo_final
-                   
-                    # Mostrar saldo final con color según el resultado
-                    if saldo_final == 0 and retiro_activado and deuda_pendiente == 0:
-                        st.success(f"**${saldo_final:,.2f}** 🏁 RETIRADO")
-                    elif saldo_final == deuda_pendiente and retiro_activado and deuda_pendiente > 0:
-                        st.warning(f"**${saldo_final:,.2f}** 📋 DEUDA PENDIENTE")
-                    elif saldo_final < 0:
-                        st.error(f"**${saldo_final:,.2f}**")
-                    else:
-                        st.success(f"**${saldo_final:,.2f}**")
-
-                # Línea separadora entre miembros
-                st.markdown("---")
-
-            # Botón de envío FUERA de las columnas
-            enviar = st.form_submit_button("💾 Guardar Ahorros")
-
-            if enviar:
-                try:
-                    registros_guardados = 0
-                   
-                    for id_miembro, nombre_miembro in miembros_presentes:
-                        monto_ahorro = ahorros_data.get(id_miembro, 0)
-                        monto_otros = otros_data.get(id_miembro, 0)
-                        monto_retiros = retiros_data.get(id_miembro, 0)
-                        saldo_inicial = saldos_iniciales.get(id_miembro, 0)
-                        retiro_activado = retiros_activados.get(id_miembro, False)
-                        saldo_final = saldos_finales.get(id_miembro, 0)
-                        deuda_pendiente = deudas_miembros.get(id_miembro, 0)
-                       
-                        # Solo guardar si hay al menos un monto ingresado o retiro
-                        if monto_ahorro > 0 or monto_otros > 0 or monto_retiros > 0:
-                            # Verificar si ya existe un registro para este miembro en esta reunión
-                            cursor.execute("""
-                                SELECT COUNT(*) FROM Ahorro
-                                WHERE ID_Miembro = %s AND ID_Reunion = %s
-                            """, (id_miembro, id_reunion))
-                           
-                            existe_registro = cursor.fetchone()[0] > 0
-                           
-                            if not existe_registro:
-                                # Insertar el nuevo registro
-                                cursor.execute("""
-                                    INSERT INTO Ahorro (
-                                        ID_Miembro, ID_Reunion, fecha,
-                                        monto_ahorro, monto_otros, monto_retiros,
-                                        saldos_ahorros, saldo_inicial
-                                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                                """, (
-                                    id_miembro, id_reunion, fecha_ahorro,
-                                    monto_ahorro, monto_otros, monto_retiros,
-                                    saldo_final, saldo_inicial
-                                ))
-                                registros_guardados += 1
-                                
-                                # Mostrar mensaje detallado
-                                if retiro_activado:
-                                    if deuda_pendiente > 0:
-                                        total_acumulado = saldo_inicial + monto_ahorro + monto_otros
-                                        st.success(f"✅ {nombre_miembro}: (${saldo_inicial:,.2f} + ${monto_ahorro:,.2f} + ${monto_otros:,.2f}) - ${deuda_pendiente:,.2f} = ${monto_retiros:,.2f} RETIRADO | Deuda pendiente: ${deuda_pendiente:,.2f}")
-                                    else:
-                                        st.success(f"✅ {nombre_miembro}: ${saldo_inicial:,.2f} + ${monto_ahorro:,.2f} + ${monto_otros:,.2f} - ${monto_retiros:,.2f} = ${saldo_final:,.2f} (RETIRADO)")
-                                else:
-                                    st.success(f"✅ {nombre_miembro}: ${saldo_inicial:,.2f} + ${monto_ahorro:,.2f} + ${monto_otros:,.2f} = ${saldo_final:,.2f}")
-                            else:
-                                # Actualizar registro existente
-                                cursor.execute("""
-                                    UPDATE Ahorro
-                                    SET monto_ahorro = %s, monto_otros = %s, monto_retiros = %s,
-                                        saldos_ahorros = %s, saldo_inicial = %s, fecha = %s
-                                    WHERE ID_Miembro = %s AND ID_Reunion = %s
-                                """, (
-                                    monto_ahorro, monto_otros, monto_retiros,
-                                    saldo_final, saldo_inicial, fecha_ahorro,
-                                    id_miembro, id_reunion
-                                ))
-                                registros_guardados += 1
-                                if retiro_activado:
-                                    if deuda_pendiente > 0:
-                                        total_acumulado = saldo_inicial + monto_ahorro + monto_otros
-                                        st.success(f"✅ {nombre_miembro}: Registro actualizado - (${saldo_inicial:,.2f} + ${monto_ahorro:,.2f} + ${monto_otros:,.2f}) - ${deuda_pendiente:,.2f} = ${monto_retiros:,.2f} RETIRADO | Deuda pendiente: ${deuda_pendiente:,.2f}")
-                                    else:
-                                        st.success(f"✅ {nombre_miembro}: Registro actualizado - ${saldo_inicial:,.2f} + ${monto_ahorro:,.2f} + ${monto_otros:,.2f} - ${monto_retiros:,.2f} = ${saldo_final:,.2f} (RETIRADO)")
-                                else:
-                                    st.success(f"✅ {nombre_miembro}: Registro actualizado - ${saldo_final:,.2f}")
-
-                    con.commit()
-                   
-                    if registros_guardados > 0:
-                        st.success(f"✅ Se guardaron/actualizaron {registros_guardados} registros de ahorro correctamente.")
-                    else:
-                        st.info("ℹ️ No se guardaron registros nuevos (no se ingresaron montos o retiros).")
-                   
-                    st.rerun()
-
-                except Exception as e:
-                    con.rollback()
-                    st.error(f"❌ Error al registrar los ahorros: {e}")
+    try:
+        con = obtener_conexion()
+        cursor = con.cursor()
+
+        if enviar:
+            try:
+                registros_guardados = guardar_ahorros(con, id_reunion, fecha_ahorro, calculo)
+                con.commit()
+                incrementar_version(ambito_grupo(id_grupo))
+                st.session_state.pop(clave_entrada, None)
+                st.session_state[clave_edicion] = st.session_state.get(clave_edicion, 0) + 1
+                st.session_state["ahorros_guardados"] = registros_guardados
+                st.rerun()
+
+            except Exception as e:
+                con.rollback()
+                st.error(f"❌ Error al registrar los ahorros: {e}")
 
         # -------------------------------------
         # HISTORIAL DE AHORROS REGISTRADOS (ACTUALIZADO DESPUÉS DE GUARDAR)
@@ -490,7 +493,7 @@ def mostrar_ahorros():
             # Formatear columnas numéricas
             numeric_cols = ["Ahorros", "Otros", "Retiros", "Saldo Inicial", "Saldo Final"]
             for col in numeric_cols:
-                df[col] = df[col].apply(lambda x: f"${x:,.2f}")
+                df[col] = df[col].map(formato_moneda)
            
             st.dataframe(df.drop("ID", axis=1), use_container_width=True)
            
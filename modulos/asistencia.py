@@ -1,5 +1,83 @@
 import streamlit as st
+from datetime import date
 from modulos.config.conexion import obtener_conexion
+from modulos.versiones_cache import incrementar_version, ambito_grupo
+from modulos.historial_asistencia import mostrar_historial_asistencia
+from modulos.multa import sincronizar_multas_asistencia
+from modulos.diario_local import (
+    diario_compartido, modo_offline_activo, capturar_asistencia,
+    ASISTENCIA, FOTO_REUNIONES, FOTO_MIEMBROS, FOTO_ASISTENCIA,
+)
+
+# =============================================
+#  CONSULTAS DE LA PÁGINA
+# =============================================
+# A nivel de módulo para que herramientas.auditar_explain audite estas
+# mismas sentencias.
+
+CONSULTA_REUNIONES_GRUPO = """
+    SELECT ID_Reunion, lugar, fecha, ID_Grupo
+    FROM Reunion
+    WHERE ID_Grupo = %s
+    ORDER BY fecha DESC
+"""
+
+CONSULTA_MIEMBROS_ACTIVOS = """
+    SELECT ID_Miembro, nombre
+    FROM Miembro
+    WHERE ID_Grupo = %s AND ID_Estado = 1
+    ORDER BY nombre
+"""
+
+CONSULTA_ASISTENCIA_PREVIA = """
+    SELECT ID_Miembro, asistio, justificacion
+    FROM Miembroxreunion
+    WHERE ID_Reunion = %s
+"""
+
+# Bloquea la reunión: dos guardados a la vez no duplican multas
+CONSULTA_BLOQUEO_REUNION = "SELECT fecha FROM Reunion WHERE ID_Reunion = %s FOR UPDATE"
+
+# Presentes = SI + LLEGADA TARDÍA
+CONSULTA_TOTAL_PRESENTES = """
+    SELECT COUNT(*)
+    FROM Miembroxreunion
+    WHERE ID_Reunion = %s AND (asistio = 1 OR asistio = 2)
+"""
+
+
+def guardar_asistencia(cursor, id_reunion, id_grupo, asistencias, fecha, generar_multas):
+    """
+    Escrituras de "Guardar asistencia", compartidas con la sincronización del
+    diario local y la prueba de carga. `asistencias` es {ID_Miembro: (asistio,
+    justificacion)}. Corre en la transacción de quien llama, que ya bloqueó la
+    fila de Reunion (FOR UPDATE) y hace el commit. Retorna (total_presentes,
+    multas) con multas como en sincronizar_multas_asistencia, o None si no se
+    pidieron.
+    """
+    cursor.executemany("""
+        INSERT INTO Miembroxreunion (ID_Miembro, ID_Reunion, asistio, justificacion, fecha_registro)
+        VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON DUPLICATE KEY UPDATE
+            asistio = VALUES(asistio),
+            justificacion = VALUES(justificacion),
+            fecha_registro = VALUES(fecha_registro)
+    """, [(i, id_reunion, asistio_val, just) for i, (asistio_val, just) in asistencias.items()])
+
+    cursor.execute(CONSULTA_TOTAL_PRESENTES, (id_reunion,))
+    total_presentes = cursor.fetchone()[0]
+
+    cursor.execute("""
+        UPDATE Reunion
+        SET total_presentes = %s
+        WHERE ID_Reunion = %s
+    """, (total_presentes, id_reunion))
+
+    multas = None
+    if generar_multas:
+        multas = sincronizar_multas_asistencia(cursor, id_reunion, id_grupo, asistencias, fecha)
+    return total_presentes, multas
+
 
 def mostrar_asistencia():
     st.header("📝 Control de asistencia por reunión")
@@ -10,22 +88,31 @@ def mostrar_asistencia():
         st.error("⚠️ No tienes un grupo asociado. Crea primero un grupo en el módulo 'Grupos'.")
         return
 
-    try:
-        con = obtener_conexion()
-        if not con:
-            st.error("❌ No se pudo conectar a la base de datos.")
-            return
+    # Sin conexión la página se dibuja con la foto de la última carga en
+    # línea y no abre ninguna conexión (cada rerun esperaría a la red)
+    sin_conexion = modo_offline_activo()
+    diario = diario_compartido()
+    con = None
 
-        cursor = con.cursor()
-
-        # 1. Cargar SOLO las reuniones del grupo del usuario
-        cursor.execute("""
-            SELECT ID_Reunion, lugar, fecha, ID_Grupo
-            FROM Reunion
-            WHERE ID_Grupo = %s
-            ORDER BY fecha DESC
-        """, (id_grupo,))
-        reuniones = cursor.fetchall()
+    try:
+        if sin_conexion:
+            reuniones = diario.leer_foto(id_grupo, 0, FOTO_REUNIONES)
+            if reuniones is None:
+                st.warning("📴 Este equipo no tiene copia de las reuniones del grupo; "
+                           "abre esta página una vez con conexión.")
+                return
+        else:
+            con = obtener_conexion()
+            if not con:
+                st.error("❌ No se pudo conectar a la base de datos.")
+                return
+
+            cursor = con.cursor()
+
+            # 1. Cargar SOLO las reuniones del grupo del usuario
+            cursor.execute(CONSULTA_REUNIONES_GRUPO, (id_grupo,))
+            reuniones = cursor.fetchall()
+            diario.guardar_foto(id_grupo, 0, FOTO_REUNIONES, reuniones)
 
         if not reuniones:
             st.warning("⚠ No hay reuniones registradas para tu grupo.")
@@ -52,26 +139,37 @@ def mostrar_asistencia():
             'nombre_reunion': reuniones_dict[id_reunion]
         }
 
-        # 2. Cargar SOLO miembros ACTIVOS del grupo (ID_Estado = 1)
-        cursor.execute("""
-            SELECT ID_Miembro, nombre
-            FROM Miembro
-            WHERE ID_Grupo = %s AND ID_Estado = 1
-            ORDER BY nombre
-        """, (id_grupo_reunion,))
-        miembros = cursor.fetchall()
+        if sin_conexion:
+            miembros = diario.leer_foto(id_grupo_reunion, 0, FOTO_MIEMBROS) or []
+            previa = diario.leer_foto(id_grupo_reunion, id_reunion, FOTO_ASISTENCIA)
+            if previa is None:
+                previa = []
+                st.caption("📴 Sin copia de la asistencia de esta reunión: se parte de cero y lo "
+                           "que ya tenga la base central quedará en conflicto al sincronizar.")
+        else:
+            # 2. Cargar SOLO miembros ACTIVOS del grupo (ID_Estado = 1)
+            cursor.execute(CONSULTA_MIEMBROS_ACTIVOS, (id_grupo_reunion,))
+            miembros = cursor.fetchall()
+
+            # 3. Cargar asistencia previa (incluye justificación)
+            cursor.execute(CONSULTA_ASISTENCIA_PREVIA, (id_reunion,))
+            previa = cursor.fetchall()
+            diario.guardar_foto(id_grupo_reunion, 0, FOTO_MIEMBROS, miembros)
+            diario.guardar_foto(id_grupo_reunion, id_reunion, FOTO_ASISTENCIA, previa)
 
         if not miembros:
             st.warning("⚠ No hay miembros ACTIVOS en este grupo.")
             return
 
-        # 3. Cargar asistencia previa (incluye justificación)
-        cursor.execute("""
-            SELECT ID_Miembro, asistio, justificacion
-            FROM Miembroxreunion
-            WHERE ID_Reunion = %s
-        """, (id_reunion,))
-        asistencia_previa = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        asistencia_previa = {row[0]: (row[1], row[2]) for row in previa}
+
+        # En modo sin conexión se muestra lo capturado aquí que aún no se sincronizó
+        mostrada = dict(asistencia_previa)
+        if sin_conexion:
+            capturadas = diario.capturas_pendientes(ASISTENCIA, id_reunion)
+            mostrada.update({i: (d["asistio"], d["justificacion"]) for i, d in capturadas.items()})
+            if capturadas:
+                st.caption(f"📴 {len(capturadas)} cambios de esta reunión esperan sincronizarse.")
 
         st.subheader("👥 Lista de asistencia (miembros ACTIVOS)")
 
@@ -82,7 +180,7 @@ def mostrar_asistencia():
             st.write("### Tabla de asistencia")
 
             for id_miembro, nombre in miembros:
-                asistio_prev, just_prev = asistencia_previa.get(id_miembro, (0, ""))
+                asistio_prev, just_prev = mostrada.get(id_miembro, (0, ""))
 
                 col1, col2, col3 = st.columns([2, 1, 3])
 
@@ -127,64 +225,62 @@ def mostrar_asistencia():
                     
                 justificaciones[id_miembro] = justificacion
 
+            generar_multas = st.checkbox(
+                "💰 Generar multas por inasistencia sin justificación",
+                value=True,
+                key="generar_multas_asistencia",
+                help="Usa el monto de multa del reglamento; volver a guardar no duplica multas",
+            )
             guardar = st.form_submit_button("💾 Guardar asistencia")
 
-        if guardar:
+        if guardar and sin_conexion:
+            asistencias = {
+                id_miembro: (asistio_val, justificaciones[id_miembro] if asistio_val == 0 else "")
+                for id_miembro, asistio_val in checkboxes.items()
+            }
+            anotados = capturar_asistencia(diario, id_grupo_reunion, id_reunion,
+                                           asistencias, asistencia_previa, generar_multas)
+            st.success(f"📴 Asistencia guardada en este equipo ({anotados} cambios); "
+                       "se sube a la base central en segundo plano.")
+
+        elif guardar:
             try:
-                for id_miembro in checkboxes.keys():
-                    asistio_val = checkboxes[id_miembro]
-                    # Solo guardar justificación para NO o JUSTIFICACIÓN (asistio_val = 0)
-                    just_val = justificaciones[id_miembro] if asistio_val == 0 else ""
-
-                    # ¿Existe ya?
-                    cursor.execute("""
-                        SELECT ID_MiembroxReunion
-                        FROM Miembroxreunion
-                        WHERE ID_Miembro = %s AND ID_Reunion = %s
-                        LIMIT 1
-                    """, (id_miembro, id_reunion))
-                    existe = cursor.fetchone()
-
-                    if existe:
-                        cursor.execute("""
-                            UPDATE Miembroxreunion
-                            SET asistio = %s, justificacion = %s, fecha_registro = CURRENT_TIMESTAMP
-                            WHERE ID_Miembro = %s AND ID_Reunion = %s
-                        """, (asistio_val, just_val, id_miembro, id_reunion))
-                    else:
-                        cursor.execute("""
-                            INSERT INTO Miembroxreunion (ID_Miembro, ID_Reunion, asistio, justificacion, fecha_registro)
-                            VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
-                        """, (id_miembro, id_reunion, asistio_val, just_val))
-
-                con.commit()
-
-                # Contar presentes (SI + LLEGADA TARDÍA)
-                cursor.execute("""
-                    SELECT COUNT(*)
-                    FROM Miembroxreunion
-                    WHERE ID_Reunion = %s AND (asistio = 1 OR asistio = 2)
-                """, (id_reunion,))
-                total_presentes = cursor.fetchone()[0]
-
-                cursor.execute("""
-                    UPDATE Reunion
-                    SET total_presentes = %s
-                    WHERE ID_Reunion = %s
-                """, (total_presentes, id_reunion))
+                cursor.execute(CONSULTA_BLOQUEO_REUNION, (id_reunion,))
+                fila_reunion = cursor.fetchone()
+                fecha_reunion = fila_reunion[0] if fila_reunion and fila_reunion[0] else date.today()
+
+                # Solo se guarda justificación para NO o JUSTIFICACIÓN (asistio = 0)
+                asistencias = {
+                    id_miembro: (asistio_val, justificaciones[id_miembro] if asistio_val == 0 else "")
+                    for id_miembro, asistio_val in checkboxes.items()
+                }
+                total_presentes, multas = guardar_asistencia(cursor, id_reunion, id_grupo_reunion,
+                                                             asistencias, fecha_reunion, generar_multas)
                 con.commit()
+                incrementar_version(ambito_grupo(id_grupo_reunion))
 
                 st.success(f"✅ Asistencia guardada. Presentes: {total_presentes}")
+                if generar_multas and multas is None:
+                    st.warning("⚠️ El reglamento no define monto de multa por inasistencia; no se generaron multas.")
+                elif multas and any(multas):
+                    creadas, anuladas = multas
+                    st.info(f"💰 Multas por inasistencia: {creadas} nuevas, {anuladas} anuladas.")
 
             except Exception as e:
                 con.rollback()
                 st.error(f"❌ Error al guardar asistencia: {e}")
 
+        st.write("---")
+        if sin_conexion:
+            st.caption("📴 El historial de asistencia necesita conexión.")
+        elif st.checkbox("📊 Ver historial de asistencia del grupo", key="ver_historial_asistencia"):
+            mostrar_historial_asistencia(con, id_grupo_reunion)
+
     except Exception as e:
         st.error(f"❌ Error: {e}")
 
     finally:
         if "cursor" in locals():
             cursor.close()
-        if "con" in locals():
+        if con:
             con.close()
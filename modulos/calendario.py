@@ -0,0 +1,340 @@
+import calendar
+import streamlit as st
+import pandas as pd
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+
+from modulos.pagomulta import calcular_fecha_siguiente_reunion
+from modulos.versiones_cache import incrementar_version, ambito_grupo
+
+# Estado "Programada" de Reunion (ver reuniones.mostrar_reuniones)
+ESTADO_PROGRAMADA = 1
+
+# =============================================
+#  FERIADOS Y REGLAS DE OMISIÓN
+# =============================================
+#
+# Los feriados fijos se dan como (mes, día) y valen para cualquier año; los
+# móviles (Semana Santa, fiestas patronales del municipio) se pasan como
+# fechas concretas. Qué hacer cuando una reunión cae en feriado lo decide
+# `si_feriado`:
+#   "omitir"    la reunión de esa fecha no se crea
+#   "siguiente" se corre al día siguiente que no sea feriado
+#   "mantener"  se crea igual
+
+FERIADOS_FIJOS = (
+    (1, 1),    # Año Nuevo
+    (5, 1),    # Día del Trabajo
+    (5, 10),   # Día de la Madre
+    (6, 17),   # Día del Padre
+    (8, 6),    # Fiestas agostinas
+    (9, 15),   # Independencia
+    (11, 2),   # Día de los Difuntos
+    (12, 25),  # Navidad
+)
+
+REGLAS_FERIADO = ("omitir", "siguiente", "mantener")
+
+ReglasCalendario = namedtuple(
+    "ReglasCalendario", "feriados_fijos feriados si_feriado excluir",
+    defaults=(FERIADOS_FIJOS, (), "omitir", ()),
+)
+
+ReunionPlanificada = namedtuple("ReunionPlanificada", "fecha nominal movida")
+
+
+def es_feriado(fecha, reglas):
+    return (fecha.month, fecha.day) in reglas.feriados_fijos or fecha in reglas.feriados
+
+
+def _aplicar_reglas(fecha, reglas):
+    """Fecha final de una reunión según las reglas, o None si se omite."""
+    if fecha in reglas.excluir:
+        return None
+    if not es_feriado(fecha, reglas) or reglas.si_feriado == "mantener":
+        return fecha
+    if reglas.si_feriado == "siguiente":
+        while es_feriado(fecha, reglas) or fecha in reglas.excluir:
+            fecha += timedelta(days=1)
+        return fecha
+    return None
+
+
+# =============================================
+#  FECHAS DEL CICLO
+# =============================================
+
+def sumar_meses(fecha, meses):
+    """Misma fecha `meses` después (el día se recorta al último del mes)."""
+    total = fecha.month - 1 + int(meses)
+    anio, mes = fecha.year + total // 12, total % 12 + 1
+    return date(anio, mes, min(fecha.day, calendar.monthrange(anio, mes)[1]))
+
+
+def fin_de_ciclo(reglamento):
+    return sumar_meses(_a_fecha(reglamento['fecha_inicio_ciclo']), reglamento.get('duracion_ciclo') or 12)
+
+
+def _a_fecha(valor):
+    return valor.date() if isinstance(valor, datetime) else valor
+
+
+def planificar_ciclo(reglamento, reglas=ReglasCalendario()):
+    """
+    Reuniones del ciclo de un reglamento: desde el primer día de reunión en o
+    después de fecha_inicio_ciclo hasta el fin del ciclo (sin incluirlo).
+
+    Las fechas nominales se encadenan con calcular_fecha_siguiente_reunion;
+    correr una reunión por feriado no corre las siguientes.
+    """
+    inicio = _a_fecha(reglamento['fecha_inicio_ciclo'])
+    if not inicio:
+        return []
+    fin = fin_de_ciclo(reglamento)
+    dia = reglamento.get('dia_reunion')
+    frecuencia = reglamento.get('frecuencia_reunion')
+
+    planificadas = []
+    usadas = set()
+    nominal = calcular_fecha_siguiente_reunion(inicio - timedelta(days=1), dia, 'SEMANAL')
+    while nominal < fin:
+        fecha = _aplicar_reglas(nominal, reglas)
+        # Correr una reunión no puede pasarla al ciclo siguiente ni juntarla con otra
+        if fecha is not None and fecha < fin and fecha not in usadas:
+            usadas.add(fecha)
+            planificadas.append(ReunionPlanificada(fecha, nominal, fecha != nominal))
+        nominal = calcular_fecha_siguiente_reunion(nominal, dia, frecuencia)
+    return planificadas
+
+
+def parsear_hora_reunion(valor):
+    """Hora del reglamento ("07:00 PM", "19:00", TIME) como "HH:MM:SS"; None si no se entiende."""
+    if valor is None:
+        return None
+    if isinstance(valor, time):
+        return valor.strftime("%H:%M:%S")
+    if isinstance(valor, timedelta):
+        # mysql-connector devuelve las columnas TIME como timedelta
+        return (datetime.min + valor).strftime("%H:%M:%S")
+    texto = " ".join(str(valor).strip().upper().replace(".", "").split())
+    for formato in ("%I:%M %p", "%H:%M", "%H:%M:%S", "%I %p"):
+        try:
+            return datetime.strptime(texto, formato).strftime("%H:%M:%S")
+        except ValueError:
+            continue
+    return None
+
+
+# =============================================
+#  GENERACIÓN EN LOTE
+# =============================================
+
+_COLUMNAS_REGLAMENTO = """
+    r.ID_Grupo, r.dia_reunion, r.hora_reunion, r.lugar_reunion, r.frecuencia_reunion,
+    r.fecha_inicio_ciclo, r.duracion_ciclo
+"""
+
+
+def obtener_reglamentos_distrito(con, id_distrito):
+    """Reglamento vigente (el último registrado) de cada grupo del distrito."""
+    cursor = con.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT ID_Grupo, dia_reunion, hora_reunion, lugar_reunion, frecuencia_reunion,
+               fecha_inicio_ciclo, duracion_ciclo
+        FROM (
+            SELECT {_COLUMNAS_REGLAMENTO},
+                   ROW_NUMBER() OVER (PARTITION BY r.ID_Grupo ORDER BY r.ID_Reglamento DESC) AS orden
+            FROM Reglamento r
+            JOIN Grupo g ON g.ID_Grupo = r.ID_Grupo
+            WHERE g.ID_Distrito = %s
+        ) ultimos
+        WHERE orden = 1
+        ORDER BY ID_Grupo
+    """, (id_distrito,))
+    reglamentos = cursor.fetchall()
+    cursor.close()
+    return reglamentos
+
+
+def obtener_reglamento_grupo(con, id_grupo):
+    cursor = con.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT {_COLUMNAS_REGLAMENTO}
+        FROM Reglamento r
+        WHERE r.ID_Grupo = %s
+        ORDER BY r.ID_Reglamento DESC
+        LIMIT 1
+    """, (id_grupo,))
+    reglamento = cursor.fetchone()
+    cursor.close()
+    return reglamento
+
+
+def _fechas_existentes(con, ids_grupo, desde, hasta):
+    """{id_grupo: {fechas con reunión}} en el rango, con una sola consulta."""
+    existentes = {i: set() for i in ids_grupo}
+    if not ids_grupo:
+        return existentes
+    marcadores = ", ".join(["%s"] * len(ids_grupo))
+    cursor = con.cursor()
+    cursor.execute(f"""
+        SELECT ID_Grupo, fecha
+        FROM Reunion
+        WHERE ID_Grupo IN ({marcadores}) AND fecha >= %s AND fecha < %s
+    """, (*ids_grupo, desde, hasta))
+    for id_grupo, fecha in cursor.fetchall():
+        existentes[id_grupo].add(_a_fecha(fecha))
+    cursor.close()
+    return existentes
+
+
+def generar_ciclos(con, reglamentos, reglas=ReglasCalendario(), confirmar=True):
+    """
+    Crea las reuniones del ciclo de cada reglamento que todavía no existan
+    (una reunión por grupo y fecha), con un solo INSERT en lote.
+
+    Retorna {id_grupo: {"planificadas": n, "nuevas": [fechas], "existentes": n}}.
+    Con confirmar=False solo calcula (vista previa), sin escribir.
+    """
+    reglamentos = [r for r in reglamentos if r and r.get('fecha_inicio_ciclo')]
+    if not reglamentos:
+        return {}
+
+    planes = {r['ID_Grupo']: (r, planificar_ciclo(r, reglas)) for r in reglamentos}
+    desde = min(_a_fecha(r['fecha_inicio_ciclo']) for r in reglamentos)
+    hasta = max(fin_de_ciclo(r) for r in reglamentos)
+    existentes = _fechas_existentes(con, list(planes), desde, hasta)
+
+    resumen, filas = {}, []
+    for id_grupo, (reglamento, planificadas) in planes.items():
+        nuevas = [p.fecha for p in planificadas if p.fecha not in existentes[id_grupo]]
+        hora = parsear_hora_reunion(reglamento.get('hora_reunion'))
+        filas.extend(
+            (id_grupo, fecha, hora, reglamento.get('lugar_reunion') or "", ESTADO_PROGRAMADA, 0)
+            for fecha in nuevas
+        )
+        resumen[id_grupo] = {
+            "planificadas": len(planificadas),
+            "nuevas": nuevas,
+            "existentes": len(planificadas) - len(nuevas),
+        }
+
+    if confirmar and filas:
+        cursor = con.cursor()
+        try:
+            cursor.executemany("""
+                INSERT INTO Reunion (ID_Grupo, fecha, Hora, lugar, ID_Estado_reunion, total_presentes)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, filas)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        finally:
+            cursor.close()
+        incrementar_version(*[ambito_grupo(i) for i, r in resumen.items() if r["nuevas"]])
+    return resumen
+
+
+def generar_ciclo_grupo(con, id_grupo, reglas=ReglasCalendario(), confirmar=True):
+    """generar_ciclos para un solo grupo; {} si el grupo no tiene reglamento con inicio de ciclo."""
+    return generar_ciclos(con, [obtener_reglamento_grupo(con, id_grupo)], reglas, confirmar)
+
+
+def generar_ciclos_distrito(con, id_distrito, reglas=ReglasCalendario(), confirmar=True):
+    return generar_ciclos(con, obtener_reglamentos_distrito(con, id_distrito), reglas, confirmar)
+
+
+# =============================================
+#  INTERFAZ
+# =============================================
+
+_ETIQUETAS_FERIADO = {
+    "omitir": "No reunirse",
+    "siguiente": "Pasar al día siguiente",
+    "mantener": "Reunirse igual",
+}
+
+
+def _leer_fechas(texto):
+    """Fechas AAAA-MM-DD separadas por línea o coma; (fechas, inválidas)."""
+    fechas, invalidas = [], []
+    for parte in texto.replace(",", "\n").splitlines():
+        parte = parte.strip()
+        if not parte:
+            continue
+        try:
+            fechas.append(date.fromisoformat(parte))
+        except ValueError:
+            invalidas.append(parte)
+    return tuple(fechas), invalidas
+
+
+def pedir_reglas_calendario(clave):
+    """Controles de feriados y omisiones; retorna ReglasCalendario o None si hay fechas mal escritas."""
+    col1, col2 = st.columns(2)
+    with col1:
+        si_feriado = st.selectbox(
+            "Si la reunión cae en feriado:",
+            REGLAS_FERIADO,
+            format_func=_ETIQUETAS_FERIADO.get,
+            key=f"{clave}_si_feriado",
+        )
+        usar_fijos = st.checkbox("Incluir feriados nacionales", value=True, key=f"{clave}_fijos")
+    with col2:
+        texto_feriados = st.text_area(
+            "Otros feriados (AAAA-MM-DD, uno por línea):",
+            key=f"{clave}_feriados",
+            help="Semana Santa, fiestas patronales, etc.",
+        )
+        texto_excluir = st.text_area(
+            "Fechas sin reunión (AAAA-MM-DD):",
+            key=f"{clave}_excluir",
+            help="Estas fechas no se crean, sin importar la regla de feriados",
+        )
+
+    feriados, malas_f = _leer_fechas(texto_feriados)
+    excluir, malas_e = _leer_fechas(texto_excluir)
+    if malas_f or malas_e:
+        st.error("❌ Fechas no válidas: " + ", ".join(malas_f + malas_e))
+        return None
+    return ReglasCalendario(FERIADOS_FIJOS if usar_fijos else (), feriados, si_feriado, excluir)
+
+
+def mostrar_generador_ciclo(con, reglamentos, reglas, clave, nombres=None):
+    """Vista previa de las reuniones a crear y botón para crearlas en lote."""
+    try:
+        previa = generar_ciclos(con, reglamentos, reglas, confirmar=False)
+    except Exception as e:
+        st.error(f"❌ Error calculando el calendario: {e}")
+        return
+
+    if not previa:
+        st.info("No hay reglamentos con fecha de inicio de ciclo para generar reuniones.")
+        return
+
+    nombres = nombres or {}
+    st.dataframe(pd.DataFrame([
+        {
+            "Grupo": nombres.get(id_grupo, id_grupo),
+            "Reuniones del ciclo": r["planificadas"],
+            "Ya registradas": r["existentes"],
+            "Por crear": len(r["nuevas"]),
+            "Primera nueva": r["nuevas"][0] if r["nuevas"] else None,
+        }
+        for id_grupo, r in previa.items()
+    ]), use_container_width=True, hide_index=True)
+
+    total = sum(len(r["nuevas"]) for r in previa.values())
+    if total == 0:
+        st.success("✅ Todas las reuniones del ciclo ya están registradas.")
+        return
+
+    if st.button(f"🗓️ Crear {total} reuniones", key=f"{clave}_crear"):
+        try:
+            resumen = generar_ciclos(con, reglamentos, reglas)
+            creadas = sum(len(r["nuevas"]) for r in resumen.values())
+            st.success(f"✅ {creadas} reuniones creadas.")
+            st.rerun()
+        except Exception as e:
+            st.error(f"❌ Error al crear las reuniones: {e}")
@@ -1,12 +1,29 @@
 import streamlit as st
 import pandas as pd
+import json
 from datetime import datetime, timedelta
 import sys
 import os
+from collections import namedtuple
 
 # Agregar la ruta de tus módulos (por si este archivo está en otra carpeta)
 sys.path.append(os.path.dirname(__file__))
 
+from modulos.distribucion import (
+    METODOS_DISTRIBUCION,
+    obtener_movimientos_ahorro_ciclo,
+    calcular_distribucion,
+    distribucion_a_registros,
+    mostrar_tabla_distribucion,
+)
+from modulos.lectura_lotes import filas_a_dataframe
+from modulos.dinero import formato_moneda, sumar, a_centavos, a_float
+
+# Filas compactas (tuplas con nombre, sin dict por fila) para los reportes del ciclo
+AhorroMiembro = namedtuple("AhorroMiembro", "miembro total_ahorros total_otros total_general")
+MultaPagada   = namedtuple("MultaPagada", "monto_pagado fecha_pago nombre_miembro")
+PrestamoCiclo = namedtuple("PrestamoCiclo", "monto_capital monto_intereses monto_total estado nombre_miembro")
+
 # =============================================
 #  UTILIDADES DE MÓDULOS
 # =============================================
@@ -67,11 +84,10 @@ def obtener_ahorros_por_miembro_ciclo(fecha_inicio=None, fecha_fin=None):
         id_grupo = obtener_id_grupo_usuario()
         
         con = obtener_conexion()
-        cursor = con.cursor(dictionary=True)
+        cursor = con.cursor()
         
         query = """
             SELECT 
-                m.ID_Miembro,
                 m.nombre AS nombre_miembro,
                 COALESCE(SUM(a.monto_ahorro), 0)                 AS total_ahorros,
                 COALESCE(SUM(a.monto_otros), 0)                  AS total_otros,
@@ -98,14 +114,10 @@ def obtener_ahorros_por_miembro_ciclo(fecha_inicio=None, fecha_fin=None):
         cursor.execute(query, tuple(params))
         ahorros_miembros = cursor.fetchall()
         
-        resultado = []
-        for row in ahorros_miembros:
-            resultado.append({
-                "miembro":       row["nombre_miembro"],
-                "total_ahorros": float(row["total_ahorros"]),
-                "total_otros":   float(row["total_otros"]),
-                "total_general": float(row["total_general"]),
-            })
+        resultado = [
+            AhorroMiembro(nombre, float(ahorros), float(otros), float(general))
+            for nombre, ahorros, otros, general in ahorros_miembros
+        ]
         
         cursor.close()
         con.close()
@@ -115,39 +127,6 @@ def obtener_ahorros_por_miembro_ciclo(fecha_inicio=None, fecha_fin=None):
         st.error(f"❌ Error obteniendo ahorros por miembro: {e}")
         return []
 
-def obtener_total_miembros_activos():
-    """
-    Obtiene el total de miembros activos (ID_Estado = 1) del grupo DEL USUARIO.
-    """
-    try:
-        from modulos.config.conexion import obtener_conexion
-        
-        if not verificar_grupo_usuario():
-            return 0
-            
-        id_grupo = obtener_id_grupo_usuario()
-        
-        con = obtener_conexion()
-        cursor = con.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT COUNT(*) AS total_miembros
-            FROM Miembro 
-            WHERE ID_Grupo = %s AND ID_Estado = 1
-        """, (id_grupo,))
-        
-        resultado = cursor.fetchone()
-        total_miembros = resultado["total_miembros"] if resultado else 0
-        
-        cursor.close()
-        con.close()
-        
-        return total_miembros
-        
-    except Exception as e:
-        st.error(f"❌ Error obteniendo miembros activos: {e}")
-        return 0
-
 # =============================================
 #  PRÉSTAMOS
 # =============================================
@@ -158,24 +137,19 @@ def obtener_datos_prestamos_desde_bd(fecha_inicio=None, fecha_fin=None):
     con filtro opcional de fechas PARA EL GRUPO DEL USUARIO.
     """
     try:
-        from modulos.config.conexion import obtener_conexion
+        from modulos.lectura_lotes import iterar_filas
         
         if not verificar_grupo_usuario():
             return []
             
         id_grupo = obtener_id_grupo_usuario()
         
-        con = obtener_conexion()
-        cursor = con.cursor(dictionary=True)
-        
         query = """
             SELECT 
-                p.ID_Prestamo,
                 p.monto,
                 p.total_interes,
                 p.monto_total_pagar,
                 p.ID_Estado_prestamo,
-                p.fecha_desembolso,
                 m.nombre AS nombre_miembro
             FROM Prestamo p
             JOIN Miembro m ON p.ID_Miembro = m.ID_Miembro
@@ -190,28 +164,19 @@ def obtener_datos_prestamos_desde_bd(fecha_inicio=None, fecha_fin=None):
             query += " AND p.fecha_desembolso BETWEEN %s AND %s"
             params.extend([fecha_inicio, fecha_fin])
         
-        cursor.execute(query, tuple(params))
-        prestamos = cursor.fetchall()
-        
+        # Lectura por lotes: no se materializa el resultado completo del cursor
         resultado = []
-        for p in prestamos:
-            monto_capital   = p.get("monto", 0) or 0
-            monto_intereses = p.get("total_interes", 0) or 0
-            monto_total     = p.get("monto_total_pagar")
+        for monto, total_interes, monto_total, estado, nombre_miembro in iterar_filas(query, params):
+            monto_capital   = monto or 0
+            monto_intereses = total_interes or 0
             
             if monto_total is None:
                 monto_total = monto_capital + monto_intereses
                 
-            resultado.append({
-                "monto_capital":   float(monto_capital),
-                "monto_intereses": float(monto_intereses),
-                "monto_total":     float(monto_total),
-                "estado":          p["ID_Estado_prestamo"],
-                "nombre_miembro":  p["nombre_miembro"],
-            })
-        
-        cursor.close()
-        con.close()
+            resultado.append(PrestamoCiclo(
+                float(monto_capital), float(monto_intereses), float(monto_total),
+                estado, nombre_miembro,
+            ))
         
         return resultado
         
@@ -237,11 +202,10 @@ def obtener_datos_multas_desde_bd(fecha_inicio=None, fecha_fin=None):
         id_grupo = obtener_id_grupo_usuario()
         
         con = obtener_conexion()
-        cursor = con.cursor(dictionary=True)
+        cursor = con.cursor()
         
         query = """
             SELECT 
-                pm.ID_PagoMulta,
                 pm.monto_pagado,
                 pm.fecha_pago,
                 m.nombre AS nombre_miembro
@@ -261,14 +225,10 @@ def obtener_datos_multas_desde_bd(fecha_inicio=None, fecha_fin=None):
         cursor.execute(query, tuple(params))
         multas = cursor.fetchall()
         
-        resultado = []
-        for multa in multas:
-            resultado.append({
-                "monto_pagado":  float(multa.get("monto_pagado", 0) or 0),
-                "fecha_pago":    multa["fecha_pago"],
-                "nombre_miembro": multa["nombre_miembro"],
-                "descripcion":   multa["descripcion"],
-            })
+        resultado = [
+            MultaPagada(float(monto_pagado or 0), fecha_pago, nombre_miembro)
+            for monto_pagado, fecha_pago, nombre_miembro in multas
+        ]
         
         cursor.close()
         con.close()
@@ -295,12 +255,7 @@ def obtener_datos_reales(fecha_inicio=None, fecha_fin=None):
     
     # 🔹 AHORROS (a partir de ahorros_por_miembro con rango de fechas)
     try:
-        ahorros_por_miembro = obtener_ahorros_por_miembro_ciclo(fecha_inicio, fecha_fin)
-        for m in ahorros_por_miembro:
-            ahorros_data.append({
-                "monto_ahorro": m["total_ahorros"],
-                "monto_otros":  m["total_otros"],
-            })
+        ahorros_data = obtener_ahorros_por_miembro_ciclo(fecha_inicio, fecha_fin)
     except Exception as e:
         st.error(f"❌ Error en ahorros: {e}")
     
@@ -333,23 +288,12 @@ def calcular_totales_reales(fecha_inicio=None, fecha_fin=None):
         st.warning("⚠️ No se encontraron datos en el rango seleccionado.")
         return 0.00, 0.00, 0.00, 0.00
     
-    # 🔹 Ahorros
-    ahorros_totales = 0.0
-    for ahorro in ahorros_data:
-        ahorros_totales += float(ahorro.get("monto_ahorro", 0) or 0) \
-                         + float(ahorro.get("monto_otros", 0) or 0)
-    
-    # 🔹 Multas
-    multas_totales = 0.0
-    for multa in multas_data:
-        multas_totales += float(multa.get("monto_pagado", 0) or 0)
-    
-    # 🔹 Préstamos (capital e intereses separados)
-    prestamos_capital   = 0.0
-    prestamos_intereses = 0.0
-    for prestamo in prestamos_data:
-        prestamos_capital   += float(prestamo.get("monto_capital", 0) or 0)
-        prestamos_intereses += float(prestamo.get("monto_intereses", 0) or 0)
+    # Totales en centavos enteros (suma exacta y reproducible)
+    ahorros_totales     = a_float(sumar([a.total_ahorros for a in ahorros_data])
+                                  + sumar([a.total_otros for a in ahorros_data]))
+    multas_totales      = a_float(sumar([m.monto_pagado for m in multas_data]))
+    prestamos_capital   = a_float(sumar([p.monto_capital for p in prestamos_data]))
+    prestamos_intereses = a_float(sumar([p.monto_intereses for p in prestamos_data]))
     
     return ahorros_totales, multas_totales, prestamos_capital, prestamos_intereses
 
@@ -423,8 +367,9 @@ def mostrar_resumen_completo(fecha_inicio, fecha_fin):
         ahorros_totales, multas_totales, prestamos_capital, prestamos_intereses = \
             calcular_totales_reales(fecha_inicio, fecha_fin)
     
-    prestamos_total = prestamos_capital + prestamos_intereses
-    total_ingresos  = ahorros_totales + multas_totales + prestamos_total
+    prestamos_total = a_float(a_centavos(prestamos_capital) + a_centavos(prestamos_intereses))
+    total_ingresos  = a_float(a_centavos(ahorros_totales) + a_centavos(multas_totales)
+                              + a_centavos(prestamos_total))
     
     # Tabla resumen
     st.write("### 📋 Tabla de Consolidado")
@@ -438,11 +383,11 @@ def mostrar_resumen_completo(fecha_inicio, fecha_fin):
             "💵 **TOTAL INGRESOS**",
         ],
         "Monto": [
-            f"${ahorros_totales:,.2f}",
-            f"${multas_totales:,.2f}",
-            f"${prestamos_capital:,.2f}",
-            f"${prestamos_intereses:,.2f}",
-            f"**${total_ingresos:,.2f}**",
+            formato_moneda(ahorros_totales),
+            formato_moneda(multas_totales),
+            formato_moneda(prestamos_capital),
+            formato_moneda(prestamos_intereses),
+            f"**{formato_moneda(total_ingresos)}**",
         ],
     }
     
@@ -454,13 +399,13 @@ def mostrar_resumen_completo(fecha_inicio, fecha_fin):
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Ahorros", f"${ahorros_totales:,.2f}")
+        st.metric("Ahorros", formato_moneda(ahorros_totales))
     with col2:
-        st.metric("Multas", f"${multas_totales:,.2f}")
+        st.metric("Multas", formato_moneda(multas_totales))
     with col3:
-        st.metric("Préstamos", f"${prestamos_capital:,.2f}")
+        st.metric("Préstamos", formato_moneda(prestamos_capital))
     with col4:
-        st.metric("Intereses", f"${prestamos_intereses:,.2f}")
+        st.metric("Intereses", formato_moneda(prestamos_intereses))
     
     # Ahorros por miembro
     st.write("### 📊 Ahorros por Miembro (Ciclo Completo)")
@@ -469,53 +414,73 @@ def mostrar_resumen_completo(fecha_inicio, fecha_fin):
     
     if ahorros_por_miembro:
         tabla_data = {
-            "Miembro":       [m["miembro"] for m in ahorros_por_miembro],
-            "Total Ahorros": [f"${m['total_ahorros']:,.2f}" for m in ahorros_por_miembro],
-            "Total Otros":   [f"${m['total_otros']:,.2f}" for m in ahorros_por_miembro],
-            "TOTAL":         [f"${m['total_general']:,.2f}" for m in ahorros_por_miembro],
+            "Miembro":       [m.miembro for m in ahorros_por_miembro],
+            "Total Ahorros": [formato_moneda(m.total_ahorros) for m in ahorros_por_miembro],
+            "Total Otros":   [formato_moneda(m.total_otros) for m in ahorros_por_miembro],
+            "TOTAL":         [formato_moneda(m.total_general) for m in ahorros_por_miembro],
         }
         
         df_tabla = pd.DataFrame(tabla_data)
         st.dataframe(df_tabla, use_container_width=True, hide_index=True)
         
-        total_general_miembros = sum(item["total_general"] for item in ahorros_por_miembro)
-        st.info(f"**💵 Total general de ahorros de todos los miembros: ${total_general_miembros:,.2f}**")
+        total_general_miembros = a_float(sumar([item.total_general for item in ahorros_por_miembro]))
+        st.info(f"**💵 Total general de ahorros de todos los miembros: {formato_moneda(total_general_miembros)}**")
     else:
         st.info("ℹ️ No se encontraron datos de ahorros por miembro dentro del rango.")
     
     # Distribución de beneficios (intereses)
     st.write("### 📊 Distribución de Beneficios")
     
-    total_miembros_activos = obtener_total_miembros_activos()
+    metodo_distribucion = st.selectbox(
+        "Método de distribución",
+        options=list(METODOS_DISTRIBUCION.keys()),
+        format_func=lambda x: METODOS_DISTRIBUCION[x],
+        key="metodo_distribucion",
+    )
+    
+    movimientos = obtener_movimientos_ahorro_ciclo(
+        obtener_id_grupo_usuario(), fecha_inicio, fecha_fin
+    )
+    total_miembros_activos = int(movimientos["ID_Miembro"].nunique())
     
     distribucion_por_miembro = 0
+    distribucion_miembros = []
     if total_miembros_activos > 0 and prestamos_intereses > 0:
-        distribucion_por_miembro = prestamos_intereses / total_miembros_activos
+        df_distribucion = calcular_distribucion(
+            movimientos, prestamos_intereses, metodo_distribucion, fecha_fin
+        )
+        distribucion_miembros = distribucion_a_registros(df_distribucion)
+        distribucion_por_miembro = a_float(a_centavos(prestamos_intereses) // total_miembros_activos)
         
         distribucion_data = {
             "Concepto": [
                 "Total de Miembros Activos",
                 "Total de Intereses a Distribuir",
-                "Distribución por Miembro",
+                "Método",
+                "Promedio por Miembro",
             ],
             "Valor": [
                 f"{total_miembros_activos}",
-                f"${prestamos_intereses:,.2f}",
-                f"${distribucion_por_miembro:,.2f}",
+                formato_moneda(prestamos_intereses),
+                METODOS_DISTRIBUCION[metodo_distribucion],
+                formato_moneda(distribucion_por_miembro),
             ],
         }
         
-        df_distribucion = pd.DataFrame(distribucion_data)
-        st.dataframe(df_distribucion, use_container_width=True, hide_index=True)
+        df_resumen_distribucion = pd.DataFrame(distribucion_data)
+        st.dataframe(df_resumen_distribucion, use_container_width=True, hide_index=True)
         
-        st.success(f"**🎯 A cada miembro activo le corresponde: ${distribucion_por_miembro:,.2f}**")
+        st.write("#### 🎯 Lo que le corresponde a cada miembro")
+        mostrar_tabla_distribucion(distribucion_miembros)
         
         with st.expander("🔍 Ver Cálculo Detallado"):
             st.write(f"""
-            **Fórmula de distribución:**
-            - Total Intereses: ${prestamos_intereses:,.2f}
-            - Total Miembros Activos: {total_miembros_activos}
-            - Distribución: ${prestamos_intereses:,.2f} ÷ {total_miembros_activos} = **${distribucion_por_miembro:,.2f} por miembro**
+            **Fórmula de distribución ({METODOS_DISTRIBUCION[metodo_distribucion]}):**
+            - Total Intereses: {formato_moneda(prestamos_intereses)}
+            - Partes iguales: cada miembro activo recibe la misma parte.
+            - Proporcional al ahorro: parte = ahorro neto del miembro ÷ ahorro neto del grupo.
+            - Proporcional al ahorro y al tiempo: cada depósito pesa por los días que estuvo en el fondo hasta el {fecha_fin}.
+            - Los montos se redondean al centavo y los centavos sobrantes se asignan a los mayores residuos, por lo que la suma es exactamente {formato_moneda(prestamos_intereses)}.
             """)
     
     elif total_miembros_activos == 0:
@@ -529,7 +494,7 @@ def mostrar_resumen_completo(fecha_inicio, fecha_fin):
         try:
             prestamos_detalle = obtener_datos_prestamos_desde_bd(fecha_inicio, fecha_fin)
             if prestamos_detalle:
-                df_prestamos = pd.DataFrame(prestamos_detalle)
+                df_prestamos = filas_a_dataframe(prestamos_detalle, PrestamoCiclo)
                 st.dataframe(
                     df_prestamos[
                         ["nombre_miembro", "monto_capital", "monto_intereses", "monto_total"]
@@ -549,7 +514,10 @@ def mostrar_resumen_completo(fecha_inicio, fecha_fin):
         "total_ingresos":          total_ingresos,
         "total_miembros_activos":  total_miembros_activos,
         "distribucion_por_miembro": distribucion_por_miembro,
-        "ahorros_por_miembro":     ahorros_por_miembro,
+        "metodo_distribucion":     metodo_distribucion,
+        "distribucion_miembros":   distribucion_miembros,
+        # El snapshot del ciclo se guarda como dicts (igual que en el cierre por lote)
+        "ahorros_por_miembro":     [m._asdict() for m in ahorros_por_miembro],
         "fecha_inicio":            fecha_inicio.strftime("%Y-%m-%d"),
         "fecha_fin":               fecha_fin.strftime("%Y-%m-%d"),
         "fecha_cierre":            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -598,26 +566,71 @@ def pestaña_ciclo_activo():
             st.balloons()
             st.info("📁 Puedes ver el historial en la pestaña 'Registro de Ciclos Cerrados'.")
 
+def obtener_cierres_guardados():
+    """
+    Snapshots del grupo del usuario guardados por el cierre en lote
+    (tabla Cierre_ciclo), del más reciente al más antiguo. Tienen las
+    mismas claves que los ciclos cerrados en esta pestaña.
+    """
+    try:
+        from modulos.config.conexion import obtener_conexion
+
+        con = obtener_conexion()
+        try:
+            cursor = con.cursor()
+            cursor.execute("""
+                SELECT fecha_inicio, fecha_fin, fecha_cierre, datos
+                FROM Cierre_ciclo
+                WHERE ID_Grupo = %s
+                ORDER BY fecha_cierre DESC
+            """, (obtener_id_grupo_usuario(),))
+            filas = cursor.fetchall()
+            cursor.close()
+        finally:
+            con.close()
+
+        return [
+            {
+                "titulo":       "Cierre guardado",
+                "datos":        json.loads(datos),
+                "fecha_cierre": fecha_cierre,
+                "rango_fechas": f"{fecha_inicio} a {fecha_fin}",
+            }
+            for fecha_inicio, fecha_fin, fecha_cierre, datos in filas
+        ]
+
+    except Exception as e:
+        st.error(f"❌ Error obteniendo los cierres guardados: {e}")
+        return []
+
 def pestaña_ciclos_cerrados():
-    """Pestaña 2: Registro de Ciclos Cerrados - Historial del grupo del usuario."""
+    """
+    Pestaña 2: Registro de Ciclos Cerrados - Historial del grupo del usuario.
+    Muestra los ciclos cerrados en esta sesión y los guardados en Cierre_ciclo.
+    """
     st.header("📁 Registro de Ciclos Cerrados")
     
     if not verificar_grupo_usuario():
         return
     
-    if not st.session_state.ciclos_cerrados:
+    ciclos = [
+        dict(ciclo, titulo=f"Ciclo {ciclo['numero_ciclo']}")
+        for ciclo in reversed(st.session_state.ciclos_cerrados)
+    ] + obtener_cierres_guardados()
+
+    if not ciclos:
         st.info("ℹ️ No hay ciclos cerrados registrados. Los ciclos cerrados aparecerán aquí.")
         return
     
-    for i, ciclo in enumerate(st.session_state.ciclos_cerrados):
+    for i, ciclo in enumerate(ciclos):
         with st.expander(
-            f"📊 Ciclo {ciclo['numero_ciclo']} - {ciclo['rango_fechas']} - {ciclo['fecha_cierre']}",
+            f"📊 {ciclo['titulo']} - {ciclo['rango_fechas']} - {ciclo['fecha_cierre']}",
             expanded=(i == 0),
         ):
             datos = ciclo["datos"]
             
             st.write(
-                f"**Ciclo {ciclo['numero_ciclo']} - Rango: {ciclo['rango_fechas']} - Cerrado el: {ciclo['fecha_cierre']}**"
+                f"**{ciclo['titulo']} - Rango: {ciclo['rango_fechas']} - Cerrado el: {ciclo['fecha_cierre']}**"
             )
             
             # Consolidado
@@ -631,11 +644,11 @@ def pestaña_ciclos_cerrados():
                     "💵 **TOTAL INGRESOS**",
                 ],
                 "Monto": [
-                    f"${datos['ahorros_totales']:,.2f}",
-                    f"${datos['multas_totales']:,.2f}",
-                    f"${datos['prestamos_capital']:,.2f}",
-                    f"${datos['prestamos_intereses']:,.2f}",
-                    f"**${datos['total_ingresos']:,.2f}**",
+                    formato_moneda(datos['ahorros_totales']),
+                    formato_moneda(datos['multas_totales']),
+                    formato_moneda(datos['prestamos_capital']),
+                    formato_moneda(datos['prestamos_intereses']),
+                    f"**{formato_moneda(datos['total_ingresos'])}**",
                 ],
             }
             df_resumen = pd.DataFrame(resumen_data)
@@ -645,30 +658,35 @@ def pestaña_ciclos_cerrados():
             st.write("#### 📈 Métricas del Ciclo")
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Ahorros", f"${datos['ahorros_totales']:,.2f}")
+                st.metric("Ahorros", formato_moneda(datos['ahorros_totales']))
             with col2:
-                st.metric("Multas", f"${datos['multas_totales']:,.2f}")
+                st.metric("Multas", formato_moneda(datos['multas_totales']))
             with col3:
-                st.metric("Préstamos", f"${datos['prestamos_capital']:,.2f}")
+                st.metric("Préstamos", formato_moneda(datos['prestamos_capital']))
             with col4:
-                st.metric("Intereses", f"${datos['prestamos_intereses']:,.2f}")
+                st.metric("Intereses", formato_moneda(datos['prestamos_intereses']))
             
             # Ahorros por miembro
             if datos["ahorros_por_miembro"]:
                 st.write("#### 📊 Ahorros por Miembro")
                 tabla_data = {
                     "Miembro":       [m["miembro"] for m in datos["ahorros_por_miembro"]],
-                    "Total Ahorros": [f"${m['total_ahorros']:,.2f}" for m in datos["ahorros_por_miembro"]],
-                    "Total Otros":   [f"${m['total_otros']:,.2f}" for m in datos["ahorros_por_miembro"]],
-                    "TOTAL":         [f"${m['total_general']:,.2f}" for m in datos["ahorros_por_miembro"]],
+                    "Total Ahorros": [formato_moneda(m['total_ahorros']) for m in datos["ahorros_por_miembro"]],
+                    "Total Otros":   [formato_moneda(m['total_otros']) for m in datos["ahorros_por_miembro"]],
+                    "TOTAL":         [formato_moneda(m['total_general']) for m in datos["ahorros_por_miembro"]],
                 }
                 df_tabla = pd.DataFrame(tabla_data)
                 st.dataframe(df_tabla, use_container_width=True, hide_index=True)
             
             # Distribución de beneficios
-            if datos["distribucion_por_miembro"] > 0:
+            if datos.get("distribucion_miembros"):
+                st.write("#### 📊 Distribución de Beneficios")
+                metodo = datos.get("metodo_distribucion", "igualitario")
+                st.caption(f"Método: {METODOS_DISTRIBUCION.get(metodo, metodo)}")
+                mostrar_tabla_distribucion(datos["distribucion_miembros"])
+            elif datos["distribucion_por_miembro"] > 0:
                 st.write("#### 📊 Distribución de Beneficios")
-                st.info(f"**Distribución por miembro: ${datos['distribucion_por_miembro']:,.2f}**")
+                st.info(f"**Distribución por miembro: {formato_moneda(datos['distribucion_por_miembro'])}**")
 
 # =============================================
 #  FUNCIÓN PRINCIPAL
@@ -0,0 +1,381 @@
+import streamlit as st
+import pandas as pd
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, date, timedelta
+from modulos.config.conexion import obtener_conexion
+from modulos.dinero import formato_moneda, a_centavos, centavos_serie, a_float
+from modulos.distribucion import (
+    METODOS_DISTRIBUCION,
+    COLUMNAS_MOVIMIENTOS,
+    calcular_distribucion,
+    distribucion_a_registros,
+)
+
+# =============================================
+#  CIERRE DE CICLO EN LOTE (ADMINISTRADORA)
+# =============================================
+# Cada trabajador procesa un bloque de grupos: obtiene los datos de TODO el
+# bloque con consultas agrupadas (IN + GROUP BY), calcula los cierres en
+# memoria y guarda el snapshot de cada grupo en su propia transacción.
+
+TAMANO_BLOQUE = 25
+TRABAJADORES = 4
+
+
+def obtener_grupos_activos():
+    """Lista de grupos activos para seleccionar en el cierre en lote."""
+    con = obtener_conexion()
+    if not con:
+        return []
+
+    try:
+        cursor = con.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT g.ID_Grupo, g.nombre AS nombre_grupo, d.nombre AS nombre_distrito
+            FROM Grupo g
+            LEFT JOIN Distrito d ON g.ID_Distrito = d.ID_Distrito
+            WHERE g.ID_Estado = 1
+            ORDER BY d.nombre, g.nombre
+        """)
+        grupos = cursor.fetchall()
+        cursor.close()
+        return grupos
+    except Exception as e:
+        st.error(f"❌ Error obteniendo grupos activos: {e}")
+        return []
+    finally:
+        con.close()
+
+
+def _consultar_bloque(cursor, ids_grupos, fecha_inicio, fecha_fin):
+    """Obtiene ahorros, préstamos y multas de todos los grupos del bloque (3 consultas)."""
+    placeholders = ",".join(["%s"] * len(ids_grupos))
+
+    cursor.execute(f"""
+        SELECT
+            m.ID_Grupo,
+            m.ID_Miembro,
+            m.nombre AS nombre_miembro,
+            r.fecha  AS fecha_reunion,
+            a.monto_ahorro,
+            a.monto_otros,
+            a.monto_retiros
+        FROM Miembro m
+        LEFT JOIN (
+            Ahorro a
+            JOIN Reunion r ON a.ID_Reunion = r.ID_Reunion
+                          AND r.fecha BETWEEN %s AND %s
+        ) ON a.ID_Miembro = m.ID_Miembro
+        WHERE m.ID_Grupo IN ({placeholders})
+          AND m.ID_Estado = 1
+        ORDER BY m.ID_Grupo, m.nombre, r.fecha
+    """, (fecha_inicio, fecha_fin, *ids_grupos))
+    movimientos = pd.DataFrame(cursor.fetchall(), columns=["ID_Grupo"] + COLUMNAS_MOVIMIENTOS)
+
+    cursor.execute(f"""
+        SELECT
+            m.ID_Grupo,
+            COALESCE(SUM(p.monto), 0)         AS prestamos_capital,
+            COALESCE(SUM(p.total_interes), 0) AS prestamos_intereses
+        FROM Prestamo p
+        JOIN Miembro m ON p.ID_Miembro = m.ID_Miembro
+        WHERE m.ID_Grupo IN ({placeholders})
+          AND p.ID_Estado_prestamo != 3
+          AND p.fecha_desembolso BETWEEN %s AND %s
+        GROUP BY m.ID_Grupo
+    """, (*ids_grupos, fecha_inicio, fecha_fin))
+    prestamos = {fila[0]: (a_centavos(fila[1]), a_centavos(fila[2])) for fila in cursor.fetchall()}
+
+    cursor.execute(f"""
+        SELECT
+            m.ID_Grupo,
+            COALESCE(SUM(pm.monto_pagado), 0) AS multas_totales
+        FROM PagoMulta pm
+        JOIN Miembro m ON pm.ID_Miembro = m.ID_Miembro
+        WHERE m.ID_Grupo IN ({placeholders})
+          AND pm.fecha_pago BETWEEN %s AND %s
+        GROUP BY m.ID_Grupo
+    """, (*ids_grupos, fecha_inicio, fecha_fin))
+    multas = {fila[0]: a_centavos(fila[1]) for fila in cursor.fetchall()}
+
+    return movimientos, prestamos, multas
+
+
+def calcular_cierre_grupo(movimientos, prestamos, multas, id_grupo, fecha_inicio, fecha_fin, metodo):
+    """Arma el snapshot de cierre de un grupo (mismas claves que ciclo.mostrar_resumen_completo)."""
+    ahorros_por_miembro = []
+    if not movimientos.empty:
+        montos = movimientos.assign(
+            monto_ahorro=centavos_serie(movimientos["monto_ahorro"]),
+            monto_otros=centavos_serie(movimientos["monto_otros"]),
+        )
+        resumen = (
+            montos.groupby(["ID_Miembro", "nombre_miembro"], sort=False)
+            .agg(total_ahorros=("monto_ahorro", "sum"), total_otros=("monto_otros", "sum"))
+            .reset_index()
+        )
+        ahorros_por_miembro = [
+            {
+                "miembro":       fila.nombre_miembro,
+                "total_ahorros": a_float(fila.total_ahorros),
+                "total_otros":   a_float(fila.total_otros),
+                "total_general": a_float(fila.total_ahorros + fila.total_otros),
+            }
+            for fila in resumen.itertuples(index=False)
+        ]
+        ahorros_centavos = int(resumen["total_ahorros"].sum() + resumen["total_otros"].sum())
+    else:
+        ahorros_centavos = 0
+
+    capital_centavos, intereses_centavos = prestamos.get(id_grupo, (0, 0))
+    multas_centavos = multas.get(id_grupo, 0)
+    ahorros_totales = a_float(ahorros_centavos)
+    prestamos_capital = a_float(capital_centavos)
+    prestamos_intereses = a_float(intereses_centavos)
+    multas_totales = a_float(multas_centavos)
+    total_miembros_activos = int(movimientos["ID_Miembro"].nunique()) if not movimientos.empty else 0
+
+    distribucion_miembros = []
+    distribucion_por_miembro = 0
+    if total_miembros_activos > 0 and prestamos_intereses > 0:
+        distribucion_miembros = distribucion_a_registros(
+            calcular_distribucion(movimientos, prestamos_intereses, metodo, fecha_fin)
+        )
+        distribucion_por_miembro = a_float(intereses_centavos // total_miembros_activos)
+
+    return {
+        "ahorros_totales":          ahorros_totales,
+        "multas_totales":           multas_totales,
+        "prestamos_capital":        prestamos_capital,
+        "prestamos_intereses":      prestamos_intereses,
+        "total_ingresos":           a_float(ahorros_centavos + multas_centavos
+                                            + capital_centavos + intereses_centavos),
+        "total_miembros_activos":   total_miembros_activos,
+        "distribucion_por_miembro": distribucion_por_miembro,
+        "metodo_distribucion":      metodo,
+        "distribucion_miembros":    distribucion_miembros,
+        "ahorros_por_miembro":      ahorros_por_miembro,
+        "fecha_inicio":             fecha_inicio.strftime("%Y-%m-%d"),
+        "fecha_fin":                fecha_fin.strftime("%Y-%m-%d"),
+        "fecha_cierre":             datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def guardar_snapshot_cierre(con, id_grupo, datos):
+    """Guarda (o reemplaza) el snapshot de cierre del grupo en una sola transacción."""
+    cursor = con.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO Cierre_ciclo
+                (ID_Grupo, fecha_inicio, fecha_fin, fecha_cierre, metodo_distribucion, datos)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                fecha_cierre = VALUES(fecha_cierre),
+                metodo_distribucion = VALUES(metodo_distribucion),
+                datos = VALUES(datos)
+        """, (
+            id_grupo, datos["fecha_inicio"], datos["fecha_fin"], datos["fecha_cierre"],
+            datos["metodo_distribucion"], json.dumps(datos, default=str),
+        ))
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _procesar_bloque(ids_grupos, fecha_inicio, fecha_fin, metodo):
+    """Trabajador: consulta el bloque completo y cierra cada grupo en su transacción."""
+    con = obtener_conexion()
+    if not con:
+        return [{"id_grupo": g, "ok": False, "mensaje": "Sin conexión"} for g in ids_grupos]
+
+    resultados = []
+    try:
+        cursor = con.cursor()
+        movimientos, prestamos, multas = _consultar_bloque(cursor, ids_grupos, fecha_inicio, fecha_fin)
+        cursor.close()
+        con.commit()  # cerrar la transacción de lectura antes de escribir
+
+        por_grupo = dict(tuple(movimientos.groupby("ID_Grupo", sort=False)))
+        vacio = movimientos.iloc[0:0]
+
+        for id_grupo in ids_grupos:
+            try:
+                datos = calcular_cierre_grupo(
+                    por_grupo.get(id_grupo, vacio), prestamos, multas,
+                    id_grupo, fecha_inicio, fecha_fin, metodo,
+                )
+                guardar_snapshot_cierre(con, id_grupo, datos)
+                resultados.append({
+                    "id_grupo": id_grupo, "ok": True,
+                    "mensaje": f"Ingresos {formato_moneda(datos['total_ingresos'])} · "
+                               f"{datos['total_miembros_activos']} miembros",
+                })
+            except Exception as e:
+                resultados.append({"id_grupo": id_grupo, "ok": False, "mensaje": str(e)})
+
+    except Exception as e:
+        pendientes = [g for g in ids_grupos if g not in {r["id_grupo"] for r in resultados}]
+        resultados.extend({"id_grupo": g, "ok": False, "mensaje": str(e)} for g in pendientes)
+    finally:
+        con.close()
+
+    return resultados
+
+
+def ejecutar_cierre_lote(ids_grupos, fecha_inicio, fecha_fin, metodo="proporcional_tiempo",
+                         trabajadores=TRABAJADORES, tamano_bloque=TAMANO_BLOQUE, al_progresar=None):
+    """
+    Cierra el ciclo de varios grupos en paralelo.
+
+    `al_progresar(procesados, total, resultados_bloque)` se llama desde el hilo
+    principal cada vez que termina un bloque, para poder actualizar la UI o la consola.
+    """
+    if metodo not in METODOS_DISTRIBUCION:
+        raise ValueError(f"Método de distribución desconocido: {metodo}")
+
+    ids_grupos = list(dict.fromkeys(ids_grupos))
+    if not ids_grupos:
+        return []
+
+    bloques = [ids_grupos[i:i + tamano_bloque] for i in range(0, len(ids_grupos), tamano_bloque)]
+    resultados = []
+
+    with ThreadPoolExecutor(max_workers=max(1, trabajadores)) as pool:
+        futuros = [
+            pool.submit(_procesar_bloque, bloque, fecha_inicio, fecha_fin, metodo)
+            for bloque in bloques
+        ]
+        for futuro in as_completed(futuros):
+            resultados_bloque = futuro.result()
+            resultados.extend(resultados_bloque)
+            if al_progresar:
+                al_progresar(len(resultados), len(ids_grupos), resultados_bloque)
+
+    return resultados
+
+
+# =============================================
+#  INTERFAZ (PANEL DE ADMINISTRADORA)
+# =============================================
+
+def mostrar_cierre_lote():
+    """Pestaña del panel de administradora para cerrar ciclos de muchos grupos a la vez."""
+    st.header("🔄 Cierre de Ciclos en Lote")
+
+    grupos = obtener_grupos_activos()
+    if not grupos:
+        st.warning("📭 No hay grupos activos para cerrar.")
+        return
+
+    etiquetas = {
+        g["ID_Grupo"]: f"{g['nombre_grupo']} ({g['nombre_distrito'] or 'Sin distrito'})"
+        for g in grupos
+    }
+    seleccion = st.multiselect(
+        "Grupos a cerrar",
+        options=list(etiquetas.keys()),
+        default=list(etiquetas.keys()),
+        format_func=lambda x: etiquetas[x],
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fecha_inicio = st.date_input(
+            "Fecha de Inicio del Ciclo",
+            value=datetime.now().date() - timedelta(days=180),
+            key="lote_fecha_inicio",
+        )
+    with col2:
+        fecha_fin = st.date_input(
+            "Fecha de Fin del Ciclo",
+            value=datetime.now().date(),
+            key="lote_fecha_fin",
+        )
+
+    col3, col4 = st.columns(2)
+    with col3:
+        metodo = st.selectbox(
+            "Método de distribución",
+            options=list(METODOS_DISTRIBUCION.keys()),
+            format_func=lambda x: METODOS_DISTRIBUCION[x],
+            key="lote_metodo",
+        )
+    with col4:
+        trabajadores = st.slider("Trabajadores en paralelo", 1, 8, TRABAJADORES)
+
+    if fecha_inicio > fecha_fin:
+        st.error("❌ La fecha de inicio no puede ser mayor que la fecha de fin")
+        return
+
+    if not st.button("🔐 CERRAR CICLOS SELECCIONADOS", type="primary", use_container_width=True):
+        return
+
+    if not seleccion:
+        st.warning("⚠️ Selecciona al menos un grupo.")
+        return
+
+    barra = st.progress(0.0, text="Iniciando cierre...")
+
+    def al_progresar(procesados, total, _resultados_bloque):
+        barra.progress(procesados / total, text=f"Procesados {procesados} de {total} grupos")
+
+    try:
+        resultados = ejecutar_cierre_lote(
+            seleccion, fecha_inicio, fecha_fin, metodo,
+            trabajadores=trabajadores, al_progresar=al_progresar,
+        )
+    except Exception as e:
+        st.error(f"❌ Error en el cierre en lote: {e}")
+        return
+
+    exitos = sum(1 for r in resultados if r["ok"])
+    if exitos == len(resultados):
+        st.success(f"🎉 Se cerraron {exitos} ciclos correctamente.")
+    else:
+        st.warning(f"⚠️ {exitos} de {len(resultados)} ciclos cerrados. Revisa los errores.")
+
+    st.dataframe(pd.DataFrame([
+        {
+            "Grupo":   etiquetas.get(r["id_grupo"], r["id_grupo"]),
+            "Estado":  "✅" if r["ok"] else "❌",
+            "Detalle": r["mensaje"],
+        }
+        for r in resultados
+    ]), use_container_width=True, hide_index=True)
+
+
+# =============================================
+#  LÍNEA DE COMANDOS
+# =============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Cierre de ciclo en lote para varios grupos.")
+    parser.add_argument("--desde", required=True, type=date.fromisoformat, help="Fecha de inicio (AAAA-MM-DD)")
+    parser.add_argument("--hasta", required=True, type=date.fromisoformat, help="Fecha de fin (AAAA-MM-DD)")
+    parser.add_argument("--grupos", nargs="*", type=int, help="IDs de grupo (por defecto todos los activos)")
+    parser.add_argument("--metodo", default="proporcional_tiempo", choices=list(METODOS_DISTRIBUCION))
+    parser.add_argument("--trabajadores", type=int, default=TRABAJADORES)
+    args = parser.parse_args()
+
+    ids_grupos = args.grupos or [g["ID_Grupo"] for g in obtener_grupos_activos()]
+
+    def al_progresar(procesados, total, resultados_bloque):
+        for r in resultados_bloque:
+            print(f"[{procesados}/{total}] Grupo {r['id_grupo']}: {'OK' if r['ok'] else 'ERROR'} - {r['mensaje']}")
+
+    resultados = ejecutar_cierre_lote(
+        ids_grupos, args.desde, args.hasta, args.metodo,
+        trabajadores=args.trabajadores, al_progresar=al_progresar,
+    )
+    fallidos = [r for r in resultados if not r["ok"]]
+    print(f"Cierres completados: {len(resultados) - len(fallidos)} / {len(resultados)}")
+    raise SystemExit(1 if fallidos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
+import os
 import mysql.connector
 import streamlit as st
+from modulos.instrumentacion import ConexionInstrumentada
+
+# Los parámetros pueden sobreescribirse con variables de entorno
+# (GAPCSV_DB_HOST, GAPCSV_DB_USER, GAPCSV_DB_PASSWORD, GAPCSV_DB_NAME, GAPCSV_DB_PORT)
+# GAPCSV_DB_TIMEOUT: segundos para conectar; con el enlace caído la página
+# falla pronto en vez de quedarse esperando (el modo sin conexión no conecta)
+TIMEOUT_CONEXION = int(os.environ.get("GAPCSV_DB_TIMEOUT", "5"))
 
 def obtener_conexion():
     try:
         conexion = mysql.connector.connect(
-            host="bxdoosqjcoa8senn4bzt-mysql.services.clever-cloud.com",        # Ejemplo: "bxd...clever-cloud.com"
-            user="uew98fb7s6o8aam5",     # Ejemplo: "uabcxyz"
-            password="E9LAVdpxhYFonyDcjRl0",
-            database="bxdoosqjcoa8senn4bzt"  # Ejemplo: "bxd...4bzt"
+            host=os.environ.get("GAPCSV_DB_HOST", "bxdoosqjcoa8senn4bzt-mysql.services.clever-cloud.com"),
+            user=os.environ.get("GAPCSV_DB_USER", "uew98fb7s6o8aam5"),
+            password=os.environ.get("GAPCSV_DB_PASSWORD", "E9LAVdpxhYFonyDcjRl0"),
+            database=os.environ.get("GAPCSV_DB_NAME", "bxdoosqjcoa8senn4bzt"),
+            port=int(os.environ.get("GAPCSV_DB_PORT", "3306")),
+            connection_timeout=TIMEOUT_CONEXION,
         )
-        return conexion
+        return ConexionInstrumentada(conexion)
     except mysql.connector.Error as e:
         st.error(f"Error al conectar a la base de datos: {e}")
         return None
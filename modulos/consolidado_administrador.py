@@ -5,10 +5,21 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sys
 import os
+import tempfile
 
 # Agregar la ruta de tus módulos
 sys.path.append(os.path.dirname(__file__))
 
+from collections import namedtuple
+from modulos.lectura_lotes import iterar_filas, exportar_csv, filas_a_dataframe
+from modulos.dinero import formato_moneda, sumar, a_float
+
+# Filas compactas por grupo (tuplas con nombre, sin dict por fila)
+AhorrosGrupo   = namedtuple("AhorrosGrupo", "id_grupo grupo distrito total_ahorros total_otros total_general total_miembros")
+PrestamosGrupo = namedtuple("PrestamosGrupo", "id_grupo grupo distrito total_capital total_intereses total_pagar total_prestamos")
+MultasGrupo    = namedtuple("MultasGrupo", "id_grupo grupo distrito total_multas total_multas_pagadas")
+PagosGrupo     = namedtuple("PagosGrupo", "id_grupo grupo distrito total_pagos total_pagos_realizados")
+
 # =============================================
 #  CONEXIÓN A BASE DE DATOS
 # =============================================
@@ -55,12 +66,6 @@ def obtener_todos_los_grupos():
 def obtener_ahorros_todos_grupos(fecha_inicio=None, fecha_fin=None):
     """Obtiene los ahorros de TODOS los grupos."""
     try:
-        con = obtener_conexion()
-        if con is None:
-            return []
-        
-        cursor = con.cursor(dictionary=True)
-        
         query = """
             SELECT 
                 g.ID_Grupo,
@@ -90,23 +95,15 @@ def obtener_ahorros_todos_grupos(fecha_inicio=None, fecha_fin=None):
             ORDER BY d.nombre, g.nombre
         """
         
-        cursor.execute(query, tuple(params))
-        ahorros_grupos = cursor.fetchall()
-        
-        resultado = []
-        for row in ahorros_grupos:
-            resultado.append({
-                "id_grupo": row["ID_Grupo"],
-                "grupo": row["nombre_grupo"],
-                "distrito": row["nombre_distrito"] or "Sin distrito",
-                "total_ahorros": float(row["total_ahorros"]),
-                "total_otros": float(row["total_otros"]),
-                "total_general": float(row["total_general"]),
-                "total_miembros": row["total_miembros"]
-            })
+        resultado = [
+            AhorrosGrupo(
+                id_grupo, nombre_grupo, nombre_distrito or "Sin distrito",
+                float(total_ahorros), float(total_otros), float(total_general), total_miembros
+            )
+            for (id_grupo, nombre_grupo, nombre_distrito, total_ahorros,
+                 total_otros, total_general, total_miembros) in iterar_filas(query, params)
+        ]
         
-        cursor.close()
-        con.close()
         return resultado
 
     except Exception as e:
@@ -116,12 +113,6 @@ def obtener_ahorros_todos_grupos(fecha_inicio=None, fecha_fin=None):
 def obtener_prestamos_todos_grupos(fecha_inicio=None, fecha_fin=None):
     """Obtiene los préstamos de TODOS los grupos."""
     try:
-        con = obtener_conexion()
-        if con is None:
-            return []
-        
-        cursor = con.cursor(dictionary=True)
-        
         query = """
             SELECT 
                 g.ID_Grupo,
@@ -151,23 +142,15 @@ def obtener_prestamos_todos_grupos(fecha_inicio=None, fecha_fin=None):
             ORDER BY d.nombre, g.nombre
         """
         
-        cursor.execute(query, tuple(params))
-        prestamos_grupos = cursor.fetchall()
-        
-        resultado = []
-        for row in prestamos_grupos:
-            resultado.append({
-                "id_grupo": row["ID_Grupo"],
-                "grupo": row["nombre_grupo"],
-                "distrito": row["nombre_distrito"] or "Sin distrito",
-                "total_capital": float(row["total_capital"]),
-                "total_intereses": float(row["total_intereses"]),
-                "total_pagar": float(row["total_pagar"]),
-                "total_prestamos": row["total_prestamos"]
-            })
+        resultado = [
+            PrestamosGrupo(
+                id_grupo, nombre_grupo, nombre_distrito or "Sin distrito",
+                float(total_capital), float(total_intereses), float(total_pagar), total_prestamos
+            )
+            for (id_grupo, nombre_grupo, nombre_distrito, total_capital,
+                 total_intereses, total_pagar, total_prestamos) in iterar_filas(query, params)
+        ]
         
-        cursor.close()
-        con.close()
         return resultado
 
     except Exception as e:
@@ -177,12 +160,6 @@ def obtener_prestamos_todos_grupos(fecha_inicio=None, fecha_fin=None):
 def obtener_multas_todos_grupos(fecha_inicio=None, fecha_fin=None):
     """Obtiene las multas de TODOS los grupos."""
     try:
-        con = obtener_conexion()
-        if con is None:
-            return []
-        
-        cursor = con.cursor(dictionary=True)
-        
         query = """
             SELECT 
                 g.ID_Grupo,
@@ -209,21 +186,15 @@ def obtener_multas_todos_grupos(fecha_inicio=None, fecha_fin=None):
             ORDER BY d.nombre, g.nombre
         """
         
-        cursor.execute(query, tuple(params))
-        multas_grupos = cursor.fetchall()
-        
-        resultado = []
-        for row in multas_grupos:
-            resultado.append({
-                "id_grupo": row["ID_Grupo"],
-                "grupo": row["nombre_grupo"],
-                "distrito": row["nombre_distrito"] or "Sin distrito",
-                "total_multas": float(row["total_multas"]),
-                "total_multas_pagadas": row["total_multas_pagadas"]
-            })
+        resultado = [
+            MultasGrupo(
+                id_grupo, nombre_grupo, nombre_distrito or "Sin distrito",
+                float(total_multas), total_multas_pagadas
+            )
+            for (id_grupo, nombre_grupo, nombre_distrito, total_multas,
+                 total_multas_pagadas) in iterar_filas(query, params)
+        ]
         
-        cursor.close()
-        con.close()
         return resultado
 
     except Exception as e:
@@ -233,12 +204,6 @@ def obtener_multas_todos_grupos(fecha_inicio=None, fecha_fin=None):
 def obtener_pagos_prestamos_todos_grupos(fecha_inicio=None, fecha_fin=None):
     """Obtiene los pagos de préstamos de TODOS los grupos."""
     try:
-        con = obtener_conexion()
-        if con is None:
-            return []
-        
-        cursor = con.cursor(dictionary=True)
-        
         query = """
             SELECT 
                 g.ID_Grupo,
@@ -266,27 +231,51 @@ def obtener_pagos_prestamos_todos_grupos(fecha_inicio=None, fecha_fin=None):
             ORDER BY d.nombre, g.nombre
         """
         
-        cursor.execute(query, tuple(params))
-        pagos_grupos = cursor.fetchall()
-        
-        resultado = []
-        for row in pagos_grupos:
-            resultado.append({
-                "id_grupo": row["ID_Grupo"],
-                "grupo": row["nombre_grupo"],
-                "distrito": row["nombre_distrito"] or "Sin distrito",
-                "total_pagos": float(row["total_pagos"]),
-                "total_pagos_realizados": row["total_pagos_realizados"]
-            })
+        resultado = [
+            PagosGrupo(
+                id_grupo, nombre_grupo, nombre_distrito or "Sin distrito",
+                float(total_pagos), total_pagos_realizados
+            )
+            for (id_grupo, nombre_grupo, nombre_distrito, total_pagos,
+                 total_pagos_realizados) in iterar_filas(query, params)
+        ]
         
-        cursor.close()
-        con.close()
         return resultado
 
     except Exception as e:
         st.error(f"❌ Error obteniendo pagos de préstamos de todos los grupos: {e}")
         return []
 
+def exportar_historial_ahorros_csv(archivo, fecha_inicio=None, fecha_fin=None):
+    """
+    Exporta a CSV todos los movimientos de ahorro de TODOS los grupos,
+    lote por lote (memoria acotada sin importar el tamaño del historial).
+    Retorna la cantidad de filas exportadas.
+    """
+    query = """
+        SELECT 
+            d.nombre AS distrito,
+            g.nombre AS grupo,
+            m.nombre AS miembro,
+            r.fecha AS fecha_reunion,
+            a.monto_ahorro,
+            a.monto_otros,
+            a.monto_retiros,
+            a.saldos_ahorros
+        FROM Ahorro a
+        JOIN Miembro m ON a.ID_Miembro = m.ID_Miembro
+        JOIN Grupo g ON m.ID_Grupo = g.ID_Grupo
+        LEFT JOIN Distrito d ON g.ID_Distrito = d.ID_Distrito
+        JOIN Reunion r ON a.ID_Reunion = r.ID_Reunion
+    """
+    params = []
+    if fecha_inicio and fecha_fin:
+        query += " WHERE r.fecha BETWEEN %s AND %s"
+        params.extend([fecha_inicio, fecha_fin])
+    query += " ORDER BY g.ID_Grupo, r.fecha, m.ID_Miembro"
+
+    return exportar_csv(query, params, archivo)
+
 # =============================================
 #  CÁLCULO DE TOTALES GENERALES
 # =============================================
@@ -301,16 +290,21 @@ def calcular_totales_generales(fecha_inicio=None, fecha_fin=None):
         multas_data = obtener_multas_todos_grupos(fecha_inicio, fecha_fin)
         pagos_data = obtener_pagos_prestamos_todos_grupos(fecha_inicio, fecha_fin)
     
-    # Calcular totales
-    total_ahorros = sum(item["total_general"] for item in ahorros_data)
-    total_prestamos_capital = sum(item["total_capital"] for item in prestamos_data)
-    total_prestamos_intereses = sum(item["total_intereses"] for item in prestamos_data)
-    total_multas = sum(item["total_multas"] for item in multas_data)
-    total_pagos_prestamos = sum(item["total_pagos"] for item in pagos_data)
+    # Calcular totales (en centavos enteros: suma exacta)
+    c_ahorros = sumar([item.total_general for item in ahorros_data])
+    c_capital = sumar([item.total_capital for item in prestamos_data])
+    c_intereses = sumar([item.total_intereses for item in prestamos_data])
+    c_multas = sumar([item.total_multas for item in multas_data])
+    
+    total_ahorros = a_float(c_ahorros)
+    total_prestamos_capital = a_float(c_capital)
+    total_prestamos_intereses = a_float(c_intereses)
+    total_multas = a_float(c_multas)
+    total_pagos_prestamos = a_float(sumar([item.total_pagos for item in pagos_data]))
     
-    total_ingresos = total_ahorros + total_multas + total_prestamos_capital + total_prestamos_intereses
+    total_ingresos = a_float(c_ahorros + c_multas + c_capital + c_intereses)
     total_grupos = len(ahorros_data)
-    total_miembros = sum(item["total_miembros"] for item in ahorros_data)
+    total_miembros = sum(item.total_miembros for item in ahorros_data)
     
     return {
         "total_ahorros": total_ahorros,
@@ -392,16 +386,16 @@ def crear_graficos_consolidado_general(totales, fecha_inicio, fecha_fin):
         # Agrupar por distrito
         distritos_data = {}
         for item in totales["ahorros_detalle"]:
-            distrito = item["distrito"]
+            distrito = item.distrito
             if distrito not in distritos_data:
                 distritos_data[distrito] = {
                     "total_ahorros": 0,
                     "total_grupos": 0,
                     "total_miembros": 0
                 }
-            distritos_data[distrito]["total_ahorros"] += item["total_general"]
+            distritos_data[distrito]["total_ahorros"] += item.total_general
             distritos_data[distrito]["total_grupos"] += 1
-            distritos_data[distrito]["total_miembros"] += item["total_miembros"]
+            distritos_data[distrito]["total_miembros"] += item.total_miembros
         
         if distritos_data:
             distritos = list(distritos_data.keys())
@@ -476,6 +470,40 @@ def mostrar_consolidado_general():
     
     st.markdown("---")
     
+    with st.expander("📥 Exportar historial de ahorros (CSV)"):
+        if st.button("Preparar archivo", key="preparar_export_ahorros"):
+            # Un archivo propio por exportación: dos sesiones no comparten ruta
+            anterior = st.session_state.pop("export_ahorros", None)
+            if anterior:
+                try:
+                    os.remove(anterior[0])
+                except FileNotFoundError:
+                    pass
+            descriptor, ruta = tempfile.mkstemp(prefix="historial_ahorros_", suffix=".csv")
+            os.close(descriptor)
+            try:
+                with st.spinner("Exportando por lotes..."):
+                    total_filas = exportar_historial_ahorros_csv(ruta, fecha_inicio, fecha_fin)
+                st.session_state["export_ahorros"] = (ruta, total_filas, fecha_inicio, fecha_fin)
+            except Exception as e:
+                os.remove(ruta)
+                st.error(f"❌ Error exportando historial: {e}")
+
+        if "export_ahorros" in st.session_state:
+            ruta, total_filas, desde, hasta = st.session_state["export_ahorros"]
+            try:
+                with open(ruta, "rb") as archivo:
+                    st.caption(f"{total_filas} movimientos exportados ({desde} a {hasta})")
+                    st.download_button(
+                        "⬇️ Descargar CSV",
+                        data=archivo,
+                        file_name=f"historial_ahorros_{desde}_{hasta}.csv",
+                        mime="text/csv"
+                    )
+            except FileNotFoundError:
+                st.session_state.pop("export_ahorros", None)
+                st.warning("⚠️ El archivo exportado ya no existe; vuelve a prepararlo.")
+
     if st.button("🚀 Generar Consolidado General", type="primary", use_container_width=True):
         # Calcular totales generales
         totales = calcular_totales_generales(fecha_inicio, fecha_fin)
@@ -489,9 +517,9 @@ def mostrar_consolidado_general():
         with col2:
             st.metric("Total Miembros", f"{totales['total_miembros']}")
         with col3:
-            st.metric("Total Ahorros", f"${totales['total_ahorros']:,.2f}")
+            st.metric("Total Ahorros", formato_moneda(totales['total_ahorros']))
         with col4:
-            st.metric("Total Préstamos", f"${totales['total_prestamos_capital']:,.2f}")
+            st.metric("Total Préstamos", formato_moneda(totales['total_prestamos_capital']))
         
         # Mostrar gráficos
         crear_graficos_consolidado_general(totales, fecha_inicio, fecha_fin)
@@ -514,13 +542,13 @@ def mostrar_consolidado_general():
             'Valor': [
                 f"{totales['total_grupos']}",
                 f"{totales['total_miembros']}",
-                f"${totales['total_ahorros']:,.2f}",
-                f"${totales['total_prestamos_capital']:,.2f}",
-                f"${totales['total_prestamos_intereses']:,.2f}",
-                f"${totales['total_multas']:,.2f}",
-                f"${totales['total_pagos_prestamos']:,.2f}",
-                f"**${totales['total_ingresos']:,.2f}**",
-                f"**${totales['total_ingresos'] - totales['total_pagos_prestamos']:,.2f}**"
+                formato_moneda(totales['total_ahorros']),
+                formato_moneda(totales['total_prestamos_capital']),
+                formato_moneda(totales['total_prestamos_intereses']),
+                formato_moneda(totales['total_multas']),
+                formato_moneda(totales['total_pagos_prestamos']),
+                f"**{formato_moneda(totales['total_ingresos'])}**",
+                f"**{formato_moneda(totales['total_ingresos'] - totales['total_pagos_prestamos'])}**"
             ]
         }
         
@@ -534,28 +562,28 @@ def mostrar_consolidado_general():
         
         with tab1:
             if totales["ahorros_detalle"]:
-                df_ahorros = pd.DataFrame(totales["ahorros_detalle"])
+                df_ahorros = filas_a_dataframe(totales["ahorros_detalle"], AhorrosGrupo)
                 st.dataframe(df_ahorros, use_container_width=True)
             else:
                 st.info("No hay datos de ahorros para mostrar.")
         
         with tab2:
             if totales["prestamos_detalle"]:
-                df_prestamos = pd.DataFrame(totales["prestamos_detalle"])
+                df_prestamos = filas_a_dataframe(totales["prestamos_detalle"], PrestamosGrupo)
                 st.dataframe(df_prestamos, use_container_width=True)
             else:
                 st.info("No hay datos de préstamos para mostrar.")
         
         with tab3:
             if totales["multas_detalle"]:
-                df_multas = pd.DataFrame(totales["multas_detalle"])
+                df_multas = filas_a_dataframe(totales["multas_detalle"], MultasGrupo)
                 st.dataframe(df_multas, use_container_width=True)
             else:
                 st.info("No hay datos de multas para mostrar.")
         
         with tab4:
             if totales["pagos_detalle"]:
-                df_pagos = pd.DataFrame(totales["pagos_detalle"])
+                df_pagos = filas_a_dataframe(totales["pagos_detalle"], PagosGrupo)
                 st.dataframe(df_pagos, use_container_width=True)
             else:
                 st.info("No hay datos de pagos de préstamos para mostrar.")
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 import sys
 import os
 import traceback
+from modulos.dinero import formato_moneda
 
 # Configuración de la página
 st.set_page_config(
@@ -71,22 +72,24 @@ def obtener_datos_serie_temporal(id_grupo, fecha_inicio, fecha_fin):
             
         cursor = con.cursor(dictionary=True)
         
-        # Obtener datos semanales
+        # Obtener datos semanales. Se agrupa por la fecha tal cual (sin
+        # DATE_FORMAT) y los ahorros parten del rango (ID_Grupo, fecha) de Reunion
         query_ahorros = """
             SELECT 
-                DATE_FORMAT(r.fecha, '%%Y-%%m-%%d') as fecha,
+                r.fecha as fecha,
                 COALESCE(SUM(a.monto_ahorro + a.monto_otros), 0) as ahorros
-            FROM Miembro m
-            LEFT JOIN Ahorro a ON m.ID_Miembro = a.ID_Miembro
-            LEFT JOIN Reunion r ON a.ID_Reunion = r.ID_Reunion
-            WHERE m.ID_Grupo = %s AND r.fecha BETWEEN %s AND %s
+            FROM Reunion r
+            JOIN Ahorro a ON a.ID_Reunion = r.ID_Reunion
+            JOIN Miembro m ON m.ID_Miembro = a.ID_Miembro
+            WHERE r.ID_Grupo = %s AND m.ID_Grupo = r.ID_Grupo
+              AND r.fecha BETWEEN %s AND %s
             GROUP BY r.fecha
             ORDER BY r.fecha
         """
         
         query_prestamos = """
             SELECT 
-                DATE_FORMAT(p.fecha_desembolso, '%%Y-%%m-%%d') as fecha,
+                p.fecha_desembolso as fecha,
                 COALESCE(SUM(p.monto), 0) as prestamos,
                 COALESCE(SUM(p.total_interes), 0) as intereses
             FROM Prestamo p
@@ -98,7 +101,7 @@ def obtener_datos_serie_temporal(id_grupo, fecha_inicio, fecha_fin):
         
         query_multas = """
             SELECT 
-                DATE_FORMAT(pm.fecha_pago, '%%Y-%%m-%%d') as fecha,
+                pm.fecha_pago as fecha,
                 COALESCE(SUM(pm.monto_pagado), 0) as multas
             FROM PagoMulta pm
             JOIN Miembro m ON pm.ID_Miembro = m.ID_Miembro
@@ -509,11 +512,11 @@ def mostrar_resultados_completo(datos_consolidado, series_temporales, es_promoto
         fila = {
             "Grupo": dato["nombre_grupo"],
             "Miembros": dato["total_miembros"],
-            "Ahorros": f"${dato['total_ahorros']:,.2f}",
-            "Préstamos": f"${dato['total_prestamos']:,.2f}",
-            "Intereses": f"${dato['total_intereses']:,.2f}",
-            "Multas": f"${dato['total_multas']:,.2f}",
-            "TOTAL": f"${dato['total_general']:,.2f}"
+            "Ahorros": formato_moneda(dato['total_ahorros']),
+            "Préstamos": formato_moneda(dato['total_prestamos']),
+            "Intereses": formato_moneda(dato['total_intereses']),
+            "Multas": formato_moneda(dato['total_multas']),
+            "TOTAL": formato_moneda(dato['total_general'])
         }
         
         if es_promotora_acceso_total:
@@ -547,15 +550,15 @@ def mostrar_resultados_completo(datos_consolidado, series_temporales, es_promoto
             st.metric("Total Miembros", totales["miembros"])
             
         with col2:
-            st.metric("Ahorros", f"${totales['ahorros']:,.2f}")
-            st.metric("Multas", f"${totales['multas']:,.2f}")
+            st.metric("Ahorros", formato_moneda(totales['ahorros']))
+            st.metric("Multas", formato_moneda(totales['multas']))
             
         with col3:
-            st.metric("Préstamos", f"${totales['prestamos']:,.2f}")
-            st.metric("Intereses", f"${totales['intereses']:,.2f}")
+            st.metric("Préstamos", formato_moneda(totales['prestamos']))
+            st.metric("Intereses", formato_moneda(totales['intereses']))
             
         with col4:
-            st.metric("TOTAL GENERAL", f"${totales['general']:,.2f}")
+            st.metric("TOTAL GENERAL", formato_moneda(totales['general']))
     else:
         col1, col2, col3 = st.columns(3)
         
@@ -564,12 +567,12 @@ def mostrar_resultados_completo(datos_consolidado, series_temporales, es_promoto
             st.metric("Total Miembros", totales["miembros"])
             
         with col2:
-            st.metric("Ahorros", f"${totales['ahorros']:,.2f}")
-            st.metric("Préstamos", f"${totales['prestamos']:,.2f}")
+            st.metric("Ahorros", formato_moneda(totales['ahorros']))
+            st.metric("Préstamos", formato_moneda(totales['prestamos']))
             
         with col3:
-            st.metric("Intereses", f"${totales['intereses']:,.2f}")
-            st.metric("TOTAL GENERAL", f"${totales['general']:,.2f}")
+            st.metric("Intereses", formato_moneda(totales['intereses']))
+            st.metric("TOTAL GENERAL", formato_moneda(totales['general']))
     
     # 3. GRÁFICOS CON STREAMLIT NATIVO
     st.subheader("📊 Gráficos de Consolidado")
@@ -659,7 +662,7 @@ def mostrar_resultados_completo(datos_consolidado, series_temporales, es_promoto
         st.markdown("##### 📊 Estadísticas de Grupos")
         st.write(f"**Grupo con mayor total:** {df_graficos.loc[df_graficos['total_general'].idxmax(), 'nombre_grupo']}")
         st.write(f"**Grupo con más miembros:** {df_graficos.loc[df_graficos['total_miembros'].idxmax(), 'nombre_grupo']}")
-        st.write(f"**Promedio por grupo:** ${(totales['general']/len(datos_consolidado)):,.2f}")
+        st.write(f"**Promedio por grupo:** {formato_moneda((totales['general']/len(datos_consolidado)))}")
     
     with col2:
         st.markdown("##### 💵 Distribución Porcentual")
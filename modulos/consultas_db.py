@@ -17,7 +17,9 @@ def obtener_grupos():
         LEFT JOIN Usuario u ON g.ID_Usuario_Responsable = u.ID_Usuario
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="g.ID_Grupo", columna_registro="g.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY g.Nombre_Grupo"
     
     con = obtener_conexion()
@@ -49,7 +51,9 @@ def obtener_registros_actividades():
         LEFT JOIN Grupos g ON ra.ID_Grupo = g.ID_Grupo
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="ra.ID_Grupo", columna_registro="ra.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY ra.Fecha_Registro DESC"
     
     con = obtener_conexion()
@@ -100,7 +104,9 @@ def obtener_miembros():
         LEFT JOIN Usuario u ON m.ID_Usuario_Registro = u.ID_Usuario
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="m.ID_Grupo", columna_registro="m.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY m.Nombre"
     
     con = obtener_conexion()
@@ -133,7 +139,9 @@ def obtener_ahorros():
         LEFT JOIN Usuario u ON a.ID_Usuario_Registro = u.ID_Usuario
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="m.ID_Grupo", columna_registro="a.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY a.Fecha_Registro DESC"
     
     con = obtener_conexion()
@@ -166,7 +174,9 @@ def obtener_asistencia():
         LEFT JOIN Usuario u ON a.ID_Usuario_Registro = u.ID_Usuario
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="m.ID_Grupo", columna_registro="a.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY a.Fecha_Asistencia DESC"
     
     con = obtener_conexion()
@@ -199,7 +209,9 @@ def obtener_prestamos():
         LEFT JOIN Usuario u ON p.ID_Usuario_Registro = u.ID_Usuario
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="m.ID_Grupo", columna_registro="p.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY p.Fecha_Prestamo DESC"
     
     con = obtener_conexion()
@@ -234,7 +246,9 @@ def obtener_pagos_prestamos():
         LEFT JOIN Usuario u ON pp.ID_Usuario_Registro = u.ID_Usuario
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="m.ID_Grupo", columna_registro="pp.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY pp.Fecha_Pago DESC"
     
     con = obtener_conexion()
@@ -266,7 +280,9 @@ def obtener_reuniones():
         LEFT JOIN Usuario u ON r.ID_Usuario_Registro = u.ID_Usuario
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="r.ID_Grupo", columna_registro="r.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY r.Fecha_Reunion DESC"
     
     con = obtener_conexion()
@@ -298,7 +314,9 @@ def obtener_reglamentos():
         LEFT JOIN Usuario u ON r.ID_Usuario_Registro = u.ID_Usuario
     """
     
-    query_filtrada, params = aplicar_filtros_usuarios(query, permisos)
+    query_filtrada, params = aplicar_filtros_usuarios(
+        query, permisos, columna_grupo="r.ID_Grupo", columna_registro="r.ID_Usuario_Registro"
+    )
     query_filtrada += " ORDER BY g.Nombre_Grupo, r.Titulo"
     
     con = obtener_conexion()
@@ -0,0 +1,423 @@
+import os
+import json
+import uuid
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+import streamlit as st
+
+from modulos.dinero import a_centavos, desde_centavos, formato_moneda
+
+# =============================================
+#  DIARIO LOCAL PARA CAPTURA SIN CONEXIÓN
+# =============================================
+#
+# En modo sin conexión, asistencia, ahorros y cobro de la reunión no
+# escriben en MySQL: cada dato se guarda primero como un "cambio" en un
+# archivo SQLite de este equipo, y modulos/sincronizacion.py lo sube después
+# a la base central, en lotes y en segundo plano.
+#
+# Cada cambio lleva la llave (tipo, reunión, miembro[, préstamo]), lo que se
+# capturó (`datos`) y el valor central que se veía al capturar (`base`).
+# Si al sincronizar la base central ya no tiene ese valor, alguien más lo
+# cambió mientras tanto: el cambio queda en conflicto y se resuelve a mano.
+#
+#   GAPCSV_DIARIO_LOCAL   archivo del diario (datos_locales/diario_offline.db)
+#   GAPCSV_MODO_OFFLINE   1 para que las sesiones arranquen en modo sin conexión
+
+RUTA_DIARIO = os.environ.get("GAPCSV_DIARIO_LOCAL", os.path.join("datos_locales", "diario_offline.db"))
+MODO_OFFLINE_POR_DEFECTO = os.environ.get("GAPCSV_MODO_OFFLINE", "0") == "1"
+CLAVE_MODO_OFFLINE = "modo_offline"
+
+# Tipos de cambio
+ASISTENCIA = "asistencia"
+AHORRO = "ahorro"
+PAGO_PRESTAMO = "pago_prestamo"
+
+# Estados de un cambio en el diario
+PENDIENTE = "pendiente"
+SINCRONIZADO = "sincronizado"
+CONFLICTO = "conflicto"
+ERROR = "error"            # la base central lo rechazó (por ejemplo, un pago mayor al saldo)
+DESCARTADO = "descartado"
+
+# Fotos: lo último que las páginas leyeron de la base central, por grupo y
+# reunión. En modo sin conexión las páginas se dibujan desde aquí y no
+# abren ninguna conexión. Las partes del grupo van con id_reunion = 0.
+FOTO_REUNIONES = "reuniones"        # [(ID_Reunion, lugar, fecha, ID_Grupo)]
+FOTO_MIEMBROS = "miembros"          # [(ID_Miembro, nombre)] activos
+FOTO_ASISTENCIA = "asistencia"      # [(ID_Miembro, asistio, justificacion)]
+FOTO_AHORROS = "ahorros"            # {"fecha", "filas": [(ID_Miembro, nombre, saldo_inicial, deuda)]}
+FOTO_CUOTAS = "cuotas"              # filas de pagoprestamo.obtener_cuotas_a_cobrar
+
+# `base` de una captura cuando la página no conoce el valor central: se
+# toma lo último que este diario sincronizó para la misma llave
+DEL_DIARIO = object()
+
+Captura = namedtuple(
+    "Captura", "tipo id_grupo id_reunion id_miembro datos base id_prestamo",
+    defaults=(DEL_DIARIO, None),
+)
+
+Cambio = namedtuple(
+    "Cambio",
+    "id id_cambio tipo clave id_grupo id_reunion id_miembro id_prestamo "
+    "datos base central estado intentos detalle creado",
+)
+
+_ESQUEMA = """
+    CREATE TABLE IF NOT EXISTS cambio (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_cambio TEXT NOT NULL UNIQUE,
+        tipo TEXT NOT NULL,
+        clave TEXT NOT NULL,
+        id_grupo INTEGER NOT NULL,
+        id_reunion INTEGER NOT NULL,
+        id_miembro INTEGER NOT NULL,
+        id_prestamo INTEGER,
+        datos TEXT NOT NULL,
+        base TEXT,
+        central TEXT,
+        estado TEXT NOT NULL,
+        intentos INTEGER NOT NULL DEFAULT 0,
+        detalle TEXT,
+        creado TEXT NOT NULL,
+        actualizado TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_cambio_estado ON cambio (estado, id);
+    CREATE INDEX IF NOT EXISTS idx_cambio_clave ON cambio (clave, estado);
+    CREATE TABLE IF NOT EXISTS foto (
+        id_grupo INTEGER NOT NULL,
+        id_reunion INTEGER NOT NULL,
+        parte TEXT NOT NULL,
+        datos TEXT NOT NULL,
+        actualizado TEXT NOT NULL,
+        PRIMARY KEY (id_grupo, id_reunion, parte)
+    );
+"""
+
+_COLUMNAS = ", ".join(Cambio._fields)
+
+
+def clave_cambio(tipo, id_reunion, id_miembro, id_prestamo=None):
+    clave = f"{tipo}:{id_reunion}:{id_miembro}"
+    return f"{clave}:{id_prestamo}" if id_prestamo is not None else clave
+
+
+def _ahora():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _json(valor):
+    return None if valor is None else json.dumps(valor, sort_keys=True)
+
+
+def _sin_efecto(tipo, datos, base):
+    """
+    True si la captura deja la llave como está en la base central: vuelve
+    al valor `base` o, en ahorros y pagos, no anota nada (montos en cero,
+    que en línea tampoco se guardan).
+    """
+    if tipo == ASISTENCIA:
+        return valor_asistencia(datos["asistio"], datos["justificacion"]) == base
+    if tipo == AHORRO:
+        valor = {"ahorro": datos["ahorro"], "otros": datos["otros"], "retiro": datos["retiro"]}
+        return valor == base or valor == {"ahorro": 0, "otros": 0, "retiro": False}
+    return datos["monto"] == 0
+
+
+class DiarioLocal:
+    """
+    Cambios capturados en este equipo. Una instancia se comparte entre las
+    sesiones y el hilo de sincronización: cada operación toma el lock.
+    """
+
+    def __init__(self, ruta=RUTA_DIARIO):
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        # Se activa con cada captura; el sincronizador lo espera para no
+        # quedarse dormido el intervalo completo
+        self.hay_cambios = threading.Event()
+        self._con = sqlite3.connect(ruta, check_same_thread=False, timeout=10)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.executescript(_ESQUEMA)
+        self._con.commit()
+
+    def _leer(self, sql, parametros=()):
+        with self._lock:
+            filas = self._con.execute(sql, parametros).fetchall()
+        return [self._cambio(fila) for fila in filas]
+
+    @staticmethod
+    def _cambio(fila):
+        fila = list(fila)
+        for i in (8, 9, 10):   # datos, base, central
+            fila[i] = json.loads(fila[i]) if fila[i] is not None else None
+        return Cambio(*fila)
+
+    # ---------- captura ----------
+
+    def registrar(self, capturas):
+        """
+        Guarda las capturas en una sola transacción local y retorna cuántas
+        llaves cambiaron. Una captura reemplaza a la pendiente de la misma
+        llave (y hereda su `base`: lo que se vio antes de la primera edición)
+        y descarta los conflictos o errores que esa llave tuviera. Si la
+        captura no tiene efecto (vuelve a la base, o montos en cero) solo se
+        descarta lo anterior; si repite la pendiente, no se toca nada.
+        """
+        ahora = _ahora()
+        anotados = 0
+        with self._lock, self._con:
+            for captura in capturas:
+                clave = clave_cambio(captura.tipo, captura.id_reunion, captura.id_miembro, captura.id_prestamo)
+                datos = _json(captura.datos)
+                previa = self._con.execute(
+                    "SELECT base, datos FROM cambio WHERE clave = ? AND estado = ? ORDER BY id DESC LIMIT 1",
+                    (clave, PENDIENTE),
+                ).fetchone()
+                if previa and previa[1] == datos:
+                    continue
+                if previa:
+                    base = previa[0]
+                elif captura.base is DEL_DIARIO:
+                    ultima = self._con.execute("""
+                        SELECT central FROM cambio
+                        WHERE clave = ? AND estado = ? AND central IS NOT NULL
+                        ORDER BY id DESC LIMIT 1
+                    """, (clave, SINCRONIZADO)).fetchone()
+                    base = ultima[0] if ultima else None
+                else:
+                    base = _json(captura.base)
+
+                sin_efecto = _sin_efecto(captura.tipo, captura.datos, json.loads(base) if base else None)
+                descartados = self._con.execute("""
+                    UPDATE cambio SET estado = ?, detalle = ?, actualizado = ?
+                    WHERE clave = ? AND estado IN (?, ?, ?)
+                """, (DESCARTADO,
+                      "Se volvió al valor de la base central" if sin_efecto else "Reemplazado por una captura posterior",
+                      ahora, clave, PENDIENTE, CONFLICTO, ERROR)).rowcount
+                if sin_efecto:
+                    anotados += 1 if descartados else 0
+                    continue
+                self._con.execute("""
+                    INSERT INTO cambio (id_cambio, tipo, clave, id_grupo, id_reunion, id_miembro,
+                                        id_prestamo, datos, base, estado, creado, actualizado)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (str(uuid.uuid4()), captura.tipo, clave, captura.id_grupo, captura.id_reunion,
+                      captura.id_miembro, captura.id_prestamo, datos, base,
+                      PENDIENTE, ahora, ahora))
+                anotados += 1
+        if anotados:
+            self.hay_cambios.set()
+        return anotados
+
+    # ---------- sincronización ----------
+
+    def pendientes(self, limite):
+        return self._leer(
+            f"SELECT {_COLUMNAS} FROM cambio WHERE estado = ? ORDER BY id LIMIT ?", (PENDIENTE, limite)
+        )
+
+    def hay_pendientes(self):
+        with self._lock:
+            return self._con.execute(
+                "SELECT 1 FROM cambio WHERE estado = ? LIMIT 1", (PENDIENTE,)
+            ).fetchone() is not None
+
+    def marcar(self, resultados):
+        """`resultados` es [(id, estado, detalle, central)]."""
+        ahora = _ahora()
+        with self._lock, self._con:
+            self._con.executemany("""
+                UPDATE cambio
+                SET estado = ?, detalle = ?, central = ?, intentos = intentos + 1, actualizado = ?
+                WHERE id = ?
+            """, [(estado, detalle, _json(central), ahora, id_) for id_, estado, detalle, central in resultados])
+
+    def fallo(self, ids, detalle):
+        """El intento no llegó a la base central: los cambios siguen pendientes."""
+        ahora = _ahora()
+        with self._lock, self._con:
+            self._con.executemany(
+                "UPDATE cambio SET intentos = intentos + 1, detalle = ?, actualizado = ? WHERE id = ?",
+                [(detalle, ahora, id_) for id_ in ids],
+            )
+
+    # ---------- consulta y resolución ----------
+
+    def resumen(self):
+        """{estado: cantidad} de todo el diario."""
+        with self._lock:
+            return dict(self._con.execute("SELECT estado, COUNT(*) FROM cambio GROUP BY estado").fetchall())
+
+    def por_resolver(self):
+        """Cambios en conflicto o rechazados, los más viejos primero."""
+        return self._leer(
+            f"SELECT {_COLUMNAS} FROM cambio WHERE estado IN (?, ?) ORDER BY id", (CONFLICTO, ERROR)
+        )
+
+    def capturas_pendientes(self, tipo, id_reunion):
+        """
+        {ID_Miembro: datos} de lo capturado y aún no sincronizado de una
+        reunión; en pagos la llave es ID_Prestamo.
+        """
+        cambios = self._leer(
+            f"SELECT {_COLUMNAS} FROM cambio WHERE tipo = ? AND id_reunion = ? AND estado = ? ORDER BY id",
+            (tipo, id_reunion, PENDIENTE),
+        )
+        return {c.id_prestamo if tipo == PAGO_PRESTAMO else c.id_miembro: c.datos for c in cambios}
+
+    def resolver(self, id_, conservar):
+        """
+        conservar="local": se vuelve a encolar; si era un conflicto, con el
+        valor central que lo causó como base (al sincronizar, pisa ese valor).
+        conservar="central": el cambio local se descarta.
+        """
+        ahora = _ahora()
+        with self._lock, self._con:
+            if conservar == "local":
+                # Un error se reintenta tal cual; un conflicto pasa a tener
+                # como base lo que hoy hay en la base central
+                self._con.execute("""
+                    UPDATE cambio
+                    SET base = CASE WHEN estado = ? THEN central ELSE base END,
+                        estado = ?, detalle = NULL, actualizado = ?
+                    WHERE id = ? AND estado IN (?, ?)
+                """, (CONFLICTO, PENDIENTE, ahora, id_, CONFLICTO, ERROR))
+            else:
+                self._con.execute("""
+                    UPDATE cambio SET estado = ?, detalle = ?, actualizado = ?
+                    WHERE id = ? AND estado IN (?, ?)
+                """, (DESCARTADO, "Se conservó el valor de la base central", ahora, id_, CONFLICTO, ERROR))
+        if conservar == "local":
+            self.hay_cambios.set()
+
+    # ---------- fotos para trabajar sin conexión ----------
+
+    def guardar_foto(self, id_grupo, id_reunion, parte, datos):
+        """Reemplaza la foto de `parte`; fechas y Decimal se guardan como texto."""
+        with self._lock, self._con:
+            self._con.execute("""
+                INSERT INTO foto (id_grupo, id_reunion, parte, datos, actualizado)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (id_grupo, id_reunion, parte)
+                DO UPDATE SET datos = excluded.datos, actualizado = excluded.actualizado
+            """, (id_grupo, id_reunion or 0, parte, json.dumps(datos, default=str), _ahora()))
+
+    def leer_foto(self, id_grupo, id_reunion, parte):
+        """Datos de la foto (fechas como texto) o None si nunca se cargó en línea."""
+        with self._lock:
+            fila = self._con.execute(
+                "SELECT datos FROM foto WHERE id_grupo = ? AND id_reunion = ? AND parte = ?",
+                (id_grupo, id_reunion or 0, parte),
+            ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def respaldar(self, destino):
+        """
+        Copia consistente del diario en `destino` (API de respaldo de SQLite:
+        copiar el archivo a mano pierde lo que aún está en el -wal).
+        """
+        copia = sqlite3.connect(destino)
+        try:
+            with self._lock:
+                self._con.backup(copia)
+        finally:
+            copia.close()
+
+    def cerrar(self):
+        with self._lock:
+            self._con.close()
+
+
+@st.cache_resource
+def diario_compartido():
+    """Diario único por proceso, compartido por todas las sesiones."""
+    return DiarioLocal(RUTA_DIARIO)
+
+
+def modo_offline_activo():
+    return bool(st.session_state.get(CLAVE_MODO_OFFLINE, MODO_OFFLINE_POR_DEFECTO))
+
+
+# =============================================
+#  CAPTURAS DESDE LAS PÁGINAS
+# =============================================
+
+def valor_asistencia(asistio, justificacion):
+    """Forma comparable de un registro de Miembroxreunion (justificación solo si faltó)."""
+    asistio = int(asistio or 0)
+    return {"asistio": asistio, "justificacion": (justificacion or "") if asistio == 0 else ""}
+
+
+def capturar_asistencia(diario, id_grupo, id_reunion, asistencias, previas, generar_multas):
+    """
+    `asistencias` y `previas` (lo que hay en la base central) son
+    {ID_Miembro: (asistio, justificacion)}. Se envían todos los miembros:
+    registrar ignora a los que quedan como en la base central y descarta su
+    captura pendiente si la tenían. Retorna cuántos cambios se anotaron.
+    """
+    return diario.registrar([
+        Captura(
+            ASISTENCIA, id_grupo, id_reunion, id_miembro,
+            dict(valor_asistencia(asistio, justificacion), generar_multas=bool(generar_multas)),
+            valor_asistencia(*previas[id_miembro]) if id_miembro in previas else None,
+        )
+        for id_miembro, (asistio, justificacion) in asistencias.items()
+    ])
+
+
+def capturar_ahorros(diario, id_grupo, id_reunion, fecha_ahorro, calculo):
+    """
+    Anota las filas de `calculo` (ahorros.calcular_ahorros). Las filas en
+    cero no se anotan, pero descartan la captura pendiente del miembro.
+    """
+    return diario.registrar([
+        Captura(AHORRO, id_grupo, id_reunion, int(id_miembro), {
+            "ahorro": int(f.ahorro), "otros": int(f.otros), "retiro": bool(f.retiro),
+            "fecha": fecha_ahorro.isoformat(),
+        })
+        for id_miembro, f in calculo.iterrows()
+    ])
+
+
+def capturar_pagos(diario, id_grupo, id_reunion, fecha_pago, cobros):
+    """
+    `cobros` es [(cuota, monto_c)] con las filas de
+    pagoprestamo.obtener_cuotas_a_cobrar; la base es lo pagado de esa cuota.
+    Un monto en cero descarta el cobro pendiente de ese préstamo.
+    """
+    return diario.registrar([
+        Captura(
+            PAGO_PRESTAMO, id_grupo, id_reunion, cuota["ID_Miembro"],
+            {"monto": int(monto_c), "fecha": fecha_pago.isoformat()},
+            {"id_cuota": cuota["ID_Cuota"], "total_pagado": a_centavos(cuota["total_pagado"])},
+            cuota["ID_Prestamo"],
+        )
+        for cuota, monto_c in cobros
+    ])
+
+
+_ESTADOS_ASISTENCIA = {0: "Ausente", 1: "Presente", 2: "Llegada tardía"}
+
+
+def describir_valor(tipo, valor):
+    """Texto corto de un valor de `datos`, `base` o `central` para la interfaz."""
+    if valor is None:
+        return "sin registro"
+    if tipo == ASISTENCIA:
+        texto = _ESTADOS_ASISTENCIA.get(valor.get("asistio"), str(valor.get("asistio")))
+        return f"{texto} ({valor['justificacion']})" if valor.get("justificacion") else texto
+    if tipo == AHORRO:
+        texto = (f"ahorro {formato_moneda(desde_centavos(valor['ahorro']))} · "
+                 f"otros {formato_moneda(desde_centavos(valor['otros']))}")
+        return texto + (" · con retiro" if valor.get("retiro") else "")
+    if "monto" in valor:
+        return f"pago de {formato_moneda(desde_centavos(valor['monto']))}"
+    return f"cuota con {formato_moneda(desde_centavos(valor['total_pagado']))} pagado"
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from decimal import Decimal, ROUND_HALF_UP
+
+# =============================================
+#  DINERO EN CENTAVOS ENTEROS
+# =============================================
+#
+# Todos los cálculos de montos se hacen en centavos (int). Los valores que
+# vienen de columnas DECIMAL(…,2) se convierten una sola vez con
+# a_centavos / centavos_serie y los resultados vuelven a la BD con
+# desde_centavos (Decimal exacto). El redondeo es siempre "mitad hacia
+# arriba" (ROUND_HALF_UP), igual que en los cronogramas de préstamos.
+
+CENTAVO = Decimal("0.01")
+
+
+def a_centavos(valor):
+    """Convierte un monto (Decimal, float, int, str o None) a centavos enteros."""
+    if valor is None or valor == "":
+        return 0
+    if not isinstance(valor, Decimal):
+        valor = Decimal(str(valor))
+    return int((valor * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def centavos_serie(valores):
+    """
+    Versión vectorizada de a_centavos para listas, Series o arrays.
+    Los nulos cuentan como 0. Retorna un array int64 (o Series si se pasó una Series).
+    """
+    numeros = pd.to_numeric(pd.Series(valores) if not isinstance(valores, pd.Series) else valores,
+                            errors="coerce").fillna(0).to_numpy(dtype="float64")
+    # Mitad hacia arriba simétrica; el 1e-9 absorbe el error binario de x*100
+    centavos = (np.sign(numeros) * np.floor(np.abs(numeros) * 100 + 0.5 + 1e-9)).astype("int64")
+    if isinstance(valores, pd.Series):
+        return pd.Series(centavos, index=valores.index)
+    return centavos
+
+
+def desde_centavos(centavos):
+    """Centavos enteros → Decimal con dos decimales (para guardar en la BD)."""
+    return (Decimal(int(centavos)) / 100).quantize(CENTAVO)
+
+
+def a_float(centavos):
+    """Centavos enteros → float (para widgets y gráficos que requieren float)."""
+    return int(centavos) / 100
+
+
+def redondear(valor):
+    """Redondea un monto a dos decimales (mitad hacia arriba) y lo devuelve como Decimal."""
+    return desde_centavos(a_centavos(valor))
+
+
+def dividir(centavos, partes):
+    """Divide centavos enteros en `partes` redondeando mitad hacia arriba."""
+    centavos, partes = int(centavos), int(partes)
+    signo = -1 if centavos < 0 else 1
+    return signo * ((2 * abs(centavos) + partes) // (2 * partes))
+
+
+def sumar(valores):
+    """Suma exacta de montos; retorna centavos enteros."""
+    return int(np.sum(centavos_serie(valores), dtype="int64"))
+
+
+def repartir(total_centavos, pesos):
+    """
+    Reparte `total_centavos` en proporción a `pesos` (enteros) usando el método
+    del mayor residuo: cada parte recibe el piso de su cuota exacta y los
+    centavos sobrantes se asignan a los mayores residuos. La suma es exacta.
+    """
+    pesos = pd.Series(pesos).astype(object)
+    suma = int(pesos.sum())
+    if suma <= 0 or total_centavos <= 0:
+        return pd.Series(0, index=pesos.index, dtype="int64")
+
+    productos = pesos * int(total_centavos)
+    base = (productos // suma).astype("int64")
+    residuos = (productos % suma).astype("int64")
+
+    sobrante = int(total_centavos) - int(base.sum())
+    if sobrante > 0:
+        ganadores = residuos.sort_values(ascending=False, kind="stable").index[:sobrante]
+        base.loc[ganadores] += 1
+    return base
+
+
+def formato_moneda(valor):
+    """Formato único para mostrar montos: $1,234.56 (acepta montos o Decimal)."""
+    centavos = a_centavos(valor)
+    signo = "-" if centavos < 0 else ""
+    enteros, resto = divmod(abs(centavos), 100)
+    return f"{signo}${enteros:,}.{resto:02d}"
@@ -0,0 +1,143 @@
+import streamlit as st
+import pandas as pd
+from modulos.config.conexion import obtener_conexion
+from modulos.dinero import a_centavos, centavos_serie, repartir, formato_moneda
+
+# =============================================
+#  MÉTODOS DE DISTRIBUCIÓN DE BENEFICIOS
+# =============================================
+
+METODOS_DISTRIBUCION = {
+    "proporcional_tiempo": "Proporcional al ahorro y al tiempo",
+    "proporcional":        "Proporcional al ahorro",
+    "igualitario":         "Partes iguales",
+}
+
+COLUMNAS_MOVIMIENTOS = [
+    "ID_Miembro", "nombre_miembro", "fecha_reunion",
+    "monto_ahorro", "monto_otros", "monto_retiros",
+]
+
+
+def obtener_movimientos_ahorro_ciclo(id_grupo, fecha_inicio, fecha_fin):
+    """
+    Devuelve en UNA sola consulta todos los movimientos de ahorro del ciclo
+    para los miembros activos del grupo (los miembros sin ahorros aparecen
+    con montos nulos para poder incluirlos en la distribución igualitaria).
+    """
+    con = obtener_conexion()
+    if not con:
+        return pd.DataFrame(columns=COLUMNAS_MOVIMIENTOS)
+
+    try:
+        cursor = con.cursor()
+        cursor.execute("""
+            SELECT
+                m.ID_Miembro,
+                m.nombre AS nombre_miembro,
+                r.fecha  AS fecha_reunion,
+                a.monto_ahorro,
+                a.monto_otros,
+                a.monto_retiros
+            FROM Miembro m
+            LEFT JOIN (
+                Ahorro a
+                JOIN Reunion r ON a.ID_Reunion = r.ID_Reunion
+                              AND r.fecha BETWEEN %s AND %s
+            ) ON a.ID_Miembro = m.ID_Miembro
+            WHERE m.ID_Grupo = %s
+              AND m.ID_Estado = 1
+            ORDER BY m.nombre, r.fecha
+        """, (fecha_inicio, fecha_fin, id_grupo))
+        filas = cursor.fetchall()
+        cursor.close()
+        return pd.DataFrame(filas, columns=COLUMNAS_MOVIMIENTOS)
+
+    except Exception as e:
+        st.error(f"❌ Error obteniendo movimientos de ahorro del ciclo: {e}")
+        return pd.DataFrame(columns=COLUMNAS_MOVIMIENTOS)
+    finally:
+        con.close()
+
+
+def calcular_distribucion(movimientos, monto_a_distribuir, metodo, fecha_fin):
+    """
+    Calcula la parte de cada miembro en una sola pasada vectorizada.
+
+    - igualitario: todos los miembros activos reciben lo mismo.
+    - proporcional: según el ahorro neto (ahorro + otros - retiros) del ciclo.
+    - proporcional_tiempo: cada depósito pesa por los días que estuvo en el
+      fondo hasta `fecha_fin` (saldo-días).
+
+    Retorna un DataFrame con una fila por miembro y el monto asignado exacto
+    al centavo (la suma coincide siempre con `monto_a_distribuir`).
+    """
+    columnas = ["ID_Miembro", "miembro", "ahorro_neto", "porcentaje", "monto_asignado"]
+    if movimientos.empty:
+        return pd.DataFrame(columns=columnas)
+
+    if metodo not in METODOS_DISTRIBUCION:
+        raise ValueError(f"Método de distribución desconocido: {metodo}")
+
+    neto = (
+        centavos_serie(movimientos["monto_ahorro"])
+        + centavos_serie(movimientos["monto_otros"])
+        - centavos_serie(movimientos["monto_retiros"])
+    )
+
+    if metodo == "proporcional_tiempo":
+        fechas = pd.to_datetime(movimientos["fecha_reunion"])
+        dias = (pd.Timestamp(fecha_fin) - fechas).dt.days.clip(lower=0) + 1
+        peso_fila = neto * dias.fillna(0).astype("int64")
+    else:
+        peso_fila = neto
+
+    por_miembro = (
+        movimientos.assign(neto=neto, peso=peso_fila)
+        .groupby(["ID_Miembro", "nombre_miembro"], sort=False)
+        .agg(ahorro_neto=("neto", "sum"), peso=("peso", "sum"))
+        .reset_index()
+    )
+
+    pesos = por_miembro["peso"].clip(lower=0)
+    if metodo == "igualitario" or int(pesos.sum()) <= 0:
+        pesos = pd.Series(1, index=por_miembro.index, dtype="int64")
+
+    asignado = repartir(a_centavos(monto_a_distribuir), pesos)
+
+    return pd.DataFrame({
+        "ID_Miembro":     por_miembro["ID_Miembro"],
+        "miembro":        por_miembro["nombre_miembro"],
+        "ahorro_neto":    por_miembro["ahorro_neto"] / 100,
+        "porcentaje":     pesos / int(pesos.sum()) * 100,
+        "monto_asignado": asignado / 100,
+    })[columnas]
+
+
+def distribucion_a_registros(df_distribucion):
+    """Convierte la distribución a una lista de dicts serializable para el snapshot del ciclo."""
+    return [
+        {
+            "id_miembro":     int(fila.ID_Miembro),
+            "miembro":        fila.miembro,
+            "ahorro_neto":    round(float(fila.ahorro_neto), 2),
+            "porcentaje":     round(float(fila.porcentaje), 4),
+            "monto_asignado": round(float(fila.monto_asignado), 2),
+        }
+        for fila in df_distribucion.itertuples(index=False)
+    ]
+
+
+def mostrar_tabla_distribucion(registros):
+    """Muestra la tabla de distribución por miembro a partir de los registros del snapshot."""
+    if not registros:
+        st.info("ℹ️ No hay distribución calculada para este ciclo.")
+        return
+
+    tabla_data = {
+        "Miembro":      [r["miembro"] for r in registros],
+        "Ahorro Neto":  [formato_moneda(r["ahorro_neto"]) for r in registros],
+        "Participación": [f"{r['porcentaje']:.2f}%" for r in registros],
+        "Le Corresponde": [formato_moneda(r["monto_asignado"]) for r in registros],
+    }
+    st.dataframe(pd.DataFrame(tabla_data), use_container_width=True, hide_index=True)
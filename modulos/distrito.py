@@ -1,5 +1,6 @@
 import streamlit as st
 from modulos.config.conexion import obtener_conexion
+from modulos.calendario import obtener_reglamentos_distrito, pedir_reglas_calendario, mostrar_generador_ciclo
 
 def mostrar_distrito():
     st.header("🏛️ Registrar Distrito")
@@ -90,6 +91,39 @@ def guardar_distrito(nombre, codigo, cursor, con):
         con.rollback()
         st.error(f"❌ Error al registrar el distrito: {e}")
 
+def mostrar_generar_ciclos_distrito():
+    """Genera en lote las reuniones del ciclo de todos los grupos de un distrito."""
+    if not st.checkbox("🗓️ Generar reuniones del ciclo de un distrito", key="ver_ciclos_distrito"):
+        return
+    try:
+        con = obtener_conexion()
+        cursor = con.cursor(dictionary=True)
+        cursor.execute("SELECT ID_Distrito, nombre FROM Distrito ORDER BY nombre")
+        distritos = {d["nombre"]: d["ID_Distrito"] for d in cursor.fetchall()}
+        if not distritos:
+            st.info("No hay distritos registrados.")
+            return
+
+        nombre_distrito = st.selectbox("Distrito:", list(distritos.keys()), key="ciclo_distrito_sel")
+        id_distrito = distritos[nombre_distrito]
+
+        cursor.execute("SELECT ID_Grupo, nombre FROM Grupo WHERE ID_Distrito = %s", (id_distrito,))
+        nombres = {g["ID_Grupo"]: g["nombre"] for g in cursor.fetchall()}
+
+        reglas = pedir_reglas_calendario(f"ciclo_distrito_{id_distrito}")
+        if reglas:
+            mostrar_generador_ciclo(con, obtener_reglamentos_distrito(con, id_distrito), reglas,
+                                    f"ciclo_distrito_{id_distrito}", nombres)
+
+    except Exception as e:
+        st.error(f"❌ Error generando reuniones del distrito: {e}")
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'con' in locals():
+            con.close()
+
 # Función principal
 def gestionar_distritos():
     mostrar_distrito()
+    mostrar_generar_ciclos_distrito()
@@ -146,43 +146,6 @@ def mostrar_grupos():   # ⭐ Función para registrar grupos
             pass
 
 
-def obtener_id_grupo_por_usuario(id_usuario: int):
-    """
-    Devuelve el ID_Grupo asociado a un usuario.
-    Si el usuario tiene varios grupos, devuelve el último creado.
-    Si no tiene grupos, devuelve None.
-    """
-    # 👉 VERIFICAR SI ES USUARIO PROMOTORA
-    es_promotora = st.session_state.get("acceso_total_promotora", False)
-    
-    if es_promotora:
-        # Para promotora, no retornamos un grupo específico (se manejará en otros módulos)
-        return "TODOS_LOS_GRUPOS"
-    
-    # Para otros usuarios, comportamiento normal
-    con = obtener_conexion()
-    if not con:
-        return None
-
-    try:
-        cursor = con.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT ID_Grupo
-            FROM Grupo
-            WHERE ID_Usuario = %s
-            ORDER BY ID_Grupo DESC
-            LIMIT 1
-        """, (id_usuario,))
-        fila = cursor.fetchone()
-        return fila["ID_Grupo"] if fila else None
-
-    except Exception:
-        return None
-
-    finally:
-        con.close()
-
-
 def obtener_grupos_por_usuario():
     """
     Función auxiliar para obtener grupos según el tipo de usuario
@@ -0,0 +1,220 @@
+import streamlit as st
+import pandas as pd
+from datetime import date, timedelta
+
+from modulos.config.conexion import obtener_conexion
+from modulos.versiones_cache import version_actual, ambito_grupo
+
+# =============================================
+#  HISTORIAL DE ASISTENCIA (MATRIZ Y TASAS)
+# =============================================
+#
+# Una sola consulta agregada trae, para todos los grupos pedidos, una fila
+# por (reunión, miembro) del rango de fechas; la matriz miembros × reuniones
+# y las tasas se arman en memoria con pandas. El resultado queda en caché
+# con las versiones de los grupos, así que guardar asistencia lo invalida.
+
+TTL_HISTORIAL_ASISTENCIA = 300
+
+# Valores de Miembroxreunion.asistio (ver asistencia.mostrar_asistencia)
+AUSENTE, PRESENTE, TARDE = 0, 1, 2
+
+SIMBOLOS = {"presente": "✅", "tarde": "⏰", "justificada": "📝", "ausente": "❌"}
+
+_COLUMNAS = ["ID_Grupo", "ID_Reunion", "fecha", "ID_Miembro", "nombre", "asistio", "justificada"]
+
+
+@st.cache_data(ttl=TTL_HISTORIAL_ASISTENCIA, show_spinner=False)
+def _cargar_asistencia(_con, ids_grupo, desde, hasta, versiones):
+    """`_con` queda fuera de la llave de caché; `versiones` solo forma parte de ella."""
+    marcadores = ", ".join(["%s"] * len(ids_grupo))
+    cursor = _con.cursor()
+    # Agrupa por (reunión, miembro): si quedó un registro repetido de antes de
+    # la llave única, cuenta una sola vez
+    cursor.execute(f"""
+        SELECT r.ID_Grupo, r.ID_Reunion, r.fecha, m.ID_Miembro,
+               CONCAT(m.nombre, ' ', COALESCE(m.apellido, '')) AS nombre,
+               MAX(mr.asistio) AS asistio,
+               MAX(CASE WHEN mr.justificacion IS NOT NULL AND mr.justificacion <> '' THEN 1 ELSE 0 END) AS justificada
+        FROM Reunion r
+        JOIN Miembroxreunion mr ON mr.ID_Reunion = r.ID_Reunion
+        JOIN Miembro m ON m.ID_Miembro = mr.ID_Miembro
+        WHERE r.ID_Grupo IN ({marcadores}) AND r.fecha BETWEEN %s AND %s
+        GROUP BY r.ID_Grupo, r.ID_Reunion, r.fecha, m.ID_Miembro, m.nombre, m.apellido
+    """, (*ids_grupo, desde, hasta))
+    filas = cursor.fetchall()
+    cursor.close()
+    return pd.DataFrame(filas, columns=_COLUMNAS)
+
+
+def cargar_asistencia(con, ids_grupo, desde, hasta):
+    """
+    Registros de asistencia de los grupos entre `desde` y `hasta`, uno por
+    (reunión, miembro), con la columna `estado` (presente, tarde, justificada,
+    ausente).
+    """
+    ids_grupo = tuple(sorted(set(ids_grupo)))
+    if not ids_grupo:
+        return pd.DataFrame(columns=_COLUMNAS + ["estado"])
+    versiones = tuple(version_actual(ambito_grupo(i)) for i in ids_grupo)
+    df = _cargar_asistencia(con, ids_grupo, desde, hasta, versiones)
+
+    asistio = pd.to_numeric(df["asistio"], errors="coerce").fillna(AUSENTE).astype(int)
+    justificada = pd.to_numeric(df["justificada"], errors="coerce").fillna(0).astype(bool)
+    df = df.assign(
+        fecha=pd.to_datetime(df["fecha"]).dt.date,
+        nombre=df["nombre"].astype(str).str.strip(),
+        estado="ausente",
+    )
+    df.loc[justificada & (asistio == AUSENTE), "estado"] = "justificada"
+    df.loc[asistio == PRESENTE, "estado"] = "presente"
+    df.loc[asistio == TARDE, "estado"] = "tarde"
+    return df
+
+
+def matriz_asistencia(df):
+    """Miembros × reuniones (columnas por fecha) con el símbolo de cada estado; vacío = sin registro."""
+    if df.empty:
+        return pd.DataFrame()
+    etiquetas = df["fecha"].astype(str)
+    # Dos reuniones el mismo día no deben pisarse en la misma columna
+    repetidas = df.groupby("fecha")["ID_Reunion"].transform("nunique") > 1
+    etiquetas = etiquetas.where(~repetidas, etiquetas + " #" + df["ID_Reunion"].astype(str))
+    # Igual con dos socios/as del mismo nombre
+    homonimos = df.groupby("nombre")["ID_Miembro"].transform("nunique") > 1
+    nombres = df["nombre"].where(~homonimos, df["nombre"] + " #" + df["ID_Miembro"].astype(str))
+    matriz = (
+        df.assign(reunion=etiquetas, socio=nombres, simbolo=df["estado"].map(SIMBOLOS))
+          .pivot_table(index="socio", columns="reunion", values="simbolo", aggfunc="first")
+    )
+    return matriz.reindex(sorted(matriz.columns), axis=1).fillna("").rename_axis(index="Socio/a", columns=None)
+
+
+def _tasas(df, por):
+    conteo = pd.crosstab([df[c] for c in por], df["estado"])
+    conteo = conteo.reindex(columns=list(SIMBOLOS), fill_value=0).rename_axis(None, axis=1)
+    registradas = conteo.sum(axis=1)
+    asistencias = conteo["presente"] + conteo["tarde"]
+    return conteo.assign(
+        registradas=registradas,
+        tasa_asistencia=(asistencias / registradas * 100).round(1),
+        tasa_puntualidad=(conteo["presente"] / registradas * 100).round(1),
+    ).reset_index()
+
+
+def tasas_por_miembro(df):
+    if df.empty:
+        return pd.DataFrame()
+    return _tasas(df, ["ID_Grupo", "ID_Miembro", "nombre"]).sort_values(["tasa_asistencia", "nombre"])
+
+
+def tasas_por_reunion(df):
+    if df.empty:
+        return pd.DataFrame()
+    return _tasas(df, ["ID_Grupo", "ID_Reunion", "fecha"]).sort_values("fecha")
+
+
+def tasas_por_grupo(df):
+    if df.empty:
+        return pd.DataFrame()
+    tasas = _tasas(df, ["ID_Grupo"])
+    reuniones = df.groupby("ID_Grupo")["ID_Reunion"].nunique().rename("reuniones")
+    miembros = df.groupby("ID_Grupo")["ID_Miembro"].nunique().rename("miembros")
+    return tasas.join(reuniones, on="ID_Grupo").join(miembros, on="ID_Grupo")
+
+
+# =============================================
+#  INTERFAZ
+# =============================================
+
+_RENOMBRAR = {
+    "nombre": "Socio/a", "fecha": "Fecha", "presente": "Presente", "tarde": "Tarde",
+    "justificada": "Justificada", "ausente": "Ausente", "registradas": "Registradas",
+    "tasa_asistencia": "Asistencia %", "tasa_puntualidad": "Puntualidad %",
+    "reuniones": "Reuniones", "miembros": "Miembros", "grupo": "Grupo",
+}
+
+
+def _pedir_rango(clave, dias=180):
+    col1, col2 = st.columns(2)
+    with col1:
+        desde = st.date_input("Desde:", value=date.today() - timedelta(days=dias), key=f"{clave}_desde")
+    with col2:
+        hasta = st.date_input("Hasta:", value=date.today(), key=f"{clave}_hasta")
+    return desde, hasta
+
+
+def mostrar_historial_asistencia(con, id_grupo):
+    """Matriz de asistencia y tasas del grupo en un rango de fechas."""
+    desde, hasta = _pedir_rango(f"historial_asistencia_{id_grupo}")
+    df = cargar_asistencia(con, [id_grupo], desde, hasta)
+    if df.empty:
+        st.info("No hay asistencia registrada en ese rango.")
+        return
+
+    por_reunion = tasas_por_reunion(df)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Reuniones", len(por_reunion))
+    col2.metric("Asistencia promedio", f"{por_reunion['tasa_asistencia'].mean():.1f}%")
+    col3.metric("Puntualidad promedio", f"{por_reunion['tasa_puntualidad'].mean():.1f}%")
+
+    st.markdown("**Matriz de asistencia** (✅ presente · ⏰ tarde · 📝 justificada · ❌ ausente)")
+    st.dataframe(matriz_asistencia(df), use_container_width=True)
+
+    st.markdown("**Tasas por socio/a**")
+    st.dataframe(
+        tasas_por_miembro(df).drop(columns=["ID_Grupo", "ID_Miembro"]).rename(columns=_RENOMBRAR),
+        use_container_width=True, hide_index=True,
+    )
+
+
+def mostrar_asistencia_distrito():
+    """Tasas de asistencia de todos los grupos de un distrito, con detalle por grupo."""
+    if not st.checkbox("📊 Ver asistencia de los grupos de un distrito", key="ver_asistencia_distrito"):
+        return
+    try:
+        con = obtener_conexion()
+        cursor = con.cursor(dictionary=True)
+        cursor.execute("SELECT ID_Distrito, nombre FROM Distrito ORDER BY nombre")
+        distritos = {d["nombre"]: d["ID_Distrito"] for d in cursor.fetchall()}
+        if not distritos:
+            st.info("No hay distritos registrados.")
+            return
+
+        nombre_distrito = st.selectbox("Distrito:", list(distritos.keys()), key="asistencia_distrito_sel")
+        cursor.execute("SELECT ID_Grupo, nombre FROM Grupo WHERE ID_Distrito = %s ORDER BY nombre",
+                       (distritos[nombre_distrito],))
+        grupos = {g["ID_Grupo"]: g["nombre"] for g in cursor.fetchall()}
+        if not grupos:
+            st.info("El distrito no tiene grupos.")
+            return
+
+        desde, hasta = _pedir_rango("asistencia_distrito")
+        df = cargar_asistencia(con, list(grupos), desde, hasta)
+        if df.empty:
+            st.info("No hay asistencia registrada en ese rango.")
+            return
+
+        por_grupo = tasas_por_grupo(df)
+        por_grupo.insert(0, "grupo", por_grupo["ID_Grupo"].map(grupos))
+        st.dataframe(
+            por_grupo.drop(columns=["ID_Grupo"]).sort_values("tasa_asistencia").rename(columns=_RENOMBRAR),
+            use_container_width=True, hide_index=True,
+        )
+
+        # El detalle sale del mismo resultado en memoria, sin otra consulta
+        id_grupo = st.selectbox("Detalle del grupo:", list(grupos), format_func=grupos.get,
+                                key="asistencia_distrito_grupo")
+        detalle = df[df["ID_Grupo"] == id_grupo]
+        if detalle.empty:
+            st.info("Ese grupo no tiene asistencia registrada en el rango.")
+        else:
+            st.dataframe(matriz_asistencia(detalle), use_container_width=True)
+
+    except Exception as e:
+        st.error(f"❌ Error cargando la asistencia del distrito: {e}")
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'con' in locals():
+            con.close()
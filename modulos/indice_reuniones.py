@@ -0,0 +1,107 @@
+import bisect
+from collections import namedtuple
+from datetime import datetime
+
+import streamlit as st
+
+from modulos.versiones_cache import version_actual, ambito_grupo
+
+# =============================================
+#  ÍNDICE DE REUNIONES POR GRUPO
+# =============================================
+#
+# Todas las reuniones de un grupo ordenadas por (fecha, ID_Reunion), leídas
+# con una sola consulta y guardadas en caché por versión del grupo. Las
+# preguntas "reunión anterior / siguiente / más cercana a una fecha" se
+# contestan con bisección en memoria, sin volver a la base de datos.
+#
+# Quien crea, mueve o borra reuniones debe llamar
+# incrementar_version(ambito_grupo(id_grupo)).
+
+TTL_INDICE_REUNIONES = 300
+
+ReunionIndice = namedtuple("ReunionIndice", "id_reunion fecha")
+
+
+class IndiceReuniones:
+    """Reuniones de un grupo ordenadas por fecha; en la misma fecha, por ID_Reunion."""
+
+    def __init__(self, filas):
+        filas = sorted(filas, key=lambda f: (f[1], f[0]))
+        self.ids = [f[0] for f in filas]
+        self.fechas = [f[1] for f in filas]
+        self._posiciones = {id_reunion: i for i, id_reunion in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _en(self, i):
+        if 0 <= i < len(self.ids):
+            return ReunionIndice(self.ids[i], self.fechas[i])
+        return None
+
+    def fecha_de(self, id_reunion):
+        i = self._posiciones.get(id_reunion)
+        return self.fechas[i] if i is not None else None
+
+    def anterior(self, fecha, incluir=False):
+        """Última reunión antes de `fecha` (o en `fecha` si incluir=True)."""
+        corte = bisect.bisect_right if incluir else bisect.bisect_left
+        return self._en(corte(self.fechas, fecha) - 1)
+
+    def siguiente(self, fecha, incluir=False):
+        """Primera reunión después de `fecha` (o en `fecha` si incluir=True)."""
+        corte = bisect.bisect_left if incluir else bisect.bisect_right
+        return self._en(corte(self.fechas, fecha))
+
+    def enesima_despues(self, fecha, n):
+        """La n-ésima reunión después de `fecha` (n=1 es la siguiente)."""
+        if n < 1:
+            return None
+        return self._en(bisect.bisect_right(self.fechas, fecha) + n - 1)
+
+    def anterior_a_reunion(self, id_reunion):
+        """Reunión inmediatamente anterior a otra del mismo grupo, en orden de fecha."""
+        i = self._posiciones.get(id_reunion)
+        return self._en(i - 1) if i else None
+
+    def mas_cercana(self, fecha, desde=None, hasta=None):
+        """
+        Reunión más cercana a `fecha` dentro de [desde, hasta]; en empate gana
+        la anterior. None si no hay ninguna en el rango.
+        """
+        candidatas = [self.anterior(fecha, incluir=True), self.siguiente(fecha)]
+        candidatas = [
+            r for r in candidatas
+            if r and (desde is None or r.fecha >= desde) and (hasta is None or r.fecha <= hasta)
+        ]
+        if not candidatas:
+            return None
+        return min(candidatas, key=lambda r: abs((r.fecha - fecha).days))
+
+
+def _a_fecha(valor):
+    return valor.date() if isinstance(valor, datetime) else valor
+
+
+@st.cache_data(ttl=TTL_INDICE_REUNIONES, show_spinner=False)
+def _cargar_indice(_cursor, id_grupo, version):
+    """`_cursor` queda fuera de la llave de caché; `version` solo forma parte de ella."""
+    _cursor.execute("""
+        SELECT ID_Reunion, fecha
+        FROM Reunion
+        WHERE ID_Grupo = %s
+        ORDER BY fecha, ID_Reunion
+    """, (id_grupo,))
+    filas = []
+    for fila in _cursor.fetchall():
+        if isinstance(fila, dict):
+            fila = (fila['ID_Reunion'], fila['fecha'])
+        if fila[1] is not None:
+            filas.append((fila[0], _a_fecha(fila[1])))
+    return IndiceReuniones(filas)
+
+
+def indice_reuniones(cursor, id_grupo):
+    """Índice de reuniones del grupo; consulta la base solo si cambió la versión del grupo."""
+    return _cargar_indice(cursor, id_grupo, version_actual(ambito_grupo(id_grupo)))
@@ -0,0 +1,259 @@
+import os
+import re
+import sys
+import time
+import threading
+from datetime import datetime
+
+# =============================================
+#  INSTRUMENTACIÓN DE CONSULTAS SQL
+# =============================================
+#
+# obtener_conexion() devuelve la conexión envuelta en ConexionInstrumentada:
+# cada execute/executemany queda registrado con su texto normalizado,
+# duración, filas leídas y el módulo que lo llamó. El registro es por hilo
+# (Streamlit ejecuta cada rerun de una sesión en su propio hilo) y se
+# reinicia al comienzo de cada rerun con iniciar_rerun().
+#
+# Variables de entorno:
+#   GAPCSV_SQL_LENTO_MS  umbral en milisegundos para el log de consultas lentas (200)
+#   GAPCSV_SQL_LOG       archivo del log de consultas lentas (logs/consultas_lentas.log)
+
+UMBRAL_LENTO_MS = float(os.environ.get("GAPCSV_SQL_LENTO_MS", "200"))
+ARCHIVO_LOG_LENTAS = os.environ.get(
+    "GAPCSV_SQL_LOG", os.path.join("logs", "consultas_lentas.log")
+)
+
+# Módulos que no cuentan como "quién llamó" (son la propia capa de acceso)
+_MODULOS_INTERNOS = (__name__, "modulos.config.conexion", "modulos.lectura_lotes")
+
+_local = threading.local()
+_lock_log = threading.Lock()
+
+
+def _registro():
+    if not hasattr(_local, "consultas"):
+        _local.consultas = []
+    return _local.consultas
+
+
+def _registrar_conexion():
+    _local.conexiones = getattr(_local, "conexiones", 0) + 1
+
+
+def iniciar_rerun():
+    """Vacía el registro del hilo actual (llamar al inicio de cada rerun)."""
+    _local.consultas = []
+    _local.conexiones = 0
+
+
+def consultas_rerun():
+    """Lista de consultas registradas en el rerun actual (dicts)."""
+    return list(_registro())
+
+
+_RE_ESPACIOS = re.compile(r"\s+")
+_RE_COMENTARIO = re.compile(r"--[^\n]*")
+_RE_CADENA = re.compile(r"'(?:[^'\\]|\\.)*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)")
+
+
+def normalizar_sql(sql):
+    """
+    Texto de la consulta sin comentarios, espacios repetidos ni literales,
+    y con las listas IN (%s, %s, ...) colapsadas, para agrupar por "forma".
+    """
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode(errors="replace")
+    sql = _RE_COMENTARIO.sub(" ", sql)
+    sql = _RE_CADENA.sub("?", sql)
+    sql = _RE_NUMERO.sub("?", sql)
+    sql = _RE_LISTA.sub("(...)", sql)
+    return _RE_ESPACIOS.sub(" ", sql).strip()
+
+
+def _modulo_llamador():
+    """Primer módulo de la pila que no pertenece a la capa de acceso a datos."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        nombre = frame.f_globals.get("__name__", "")
+        if nombre not in _MODULOS_INTERNOS:
+            return f"{nombre}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def _escribir_log_lenta(entrada):
+    try:
+        carpeta = os.path.dirname(ARCHIVO_LOG_LENTAS)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        linea = (
+            f"{datetime.now():%Y-%m-%d %H:%M:%S}\t{entrada['ms']:.1f} ms\t"
+            f"{entrada['modulo']}\t{entrada['sql']}\n"
+        )
+        with _lock_log:
+            with open(ARCHIVO_LOG_LENTAS, "a", encoding="utf-8") as f:
+                f.write(linea)
+    except OSError:
+        # El log es diagnóstico: nunca debe romper la página
+        pass
+
+
+class CursorInstrumentado:
+    """Envuelve un cursor de mysql-connector registrando cada sentencia."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._entrada = None
+
+    def _registrar(self, operacion, sql, lote=1):
+        entrada = {
+            "sql": normalizar_sql(sql),
+            "modulo": _modulo_llamador(),
+            "ms": 0.0,
+            "filas": 0,
+            "lote": lote,
+        }
+        inicio = time.perf_counter()
+        try:
+            return operacion()
+        finally:
+            entrada["ms"] = (time.perf_counter() - inicio) * 1000
+            _registro().append(entrada)
+            self._entrada = entrada
+            if entrada["ms"] >= UMBRAL_LENTO_MS:
+                _escribir_log_lenta(entrada)
+
+    def execute(self, sql, *args, **kwargs):
+        return self._registrar(lambda: self._cursor.execute(sql, *args, **kwargs), sql)
+
+    def executemany(self, sql, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        return self._registrar(
+            lambda: self._cursor.executemany(sql, seq_params, *args, **kwargs),
+            sql, lote=len(seq_params)
+        )
+
+    def _contar(self, cantidad):
+        if self._entrada is not None:
+            self._entrada["filas"] += cantidad
+
+    def fetchone(self):
+        fila = self._cursor.fetchone()
+        if fila is not None:
+            self._contar(1)
+        return fila
+
+    def fetchmany(self, *args, **kwargs):
+        filas = self._cursor.fetchmany(*args, **kwargs)
+        self._contar(len(filas))
+        return filas
+
+    def fetchall(self):
+        filas = self._cursor.fetchall()
+        self._contar(len(filas))
+        return filas
+
+    def __iter__(self):
+        for fila in self._cursor:
+            self._contar(1)
+            yield fila
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+        return False
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class ConexionInstrumentada:
+    """Envuelve una conexión de mysql-connector; sus cursores quedan instrumentados."""
+
+    def __init__(self, conexion):
+        self._conexion = conexion
+        _registrar_conexion()
+
+    def cursor(self, *args, **kwargs):
+        return CursorInstrumentado(self._conexion.cursor(*args, **kwargs))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._conexion.close()
+        return False
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+def resumen_rerun():
+    """
+    Resumen del rerun actual: totales y una fila por forma de consulta,
+    ordenadas por tiempo total (las más costosas primero).
+    """
+    consultas = _registro()
+    por_forma = {}
+    for c in consultas:
+        grupo = por_forma.setdefault(c["sql"], {
+            "sql": c["sql"], "veces": 0, "ms": 0.0, "filas": 0, "modulos": set()
+        })
+        grupo["veces"] += 1
+        grupo["ms"] += c["ms"]
+        grupo["filas"] += c["filas"]
+        grupo["modulos"].add(c["modulo"])
+
+    formas = sorted(por_forma.values(), key=lambda g: g["ms"], reverse=True)
+    for g in formas:
+        g["modulos"] = ", ".join(sorted(g["modulos"]))
+
+    return {
+        "total_consultas": len(consultas),
+        "total_conexiones": getattr(_local, "conexiones", 0),
+        "total_ms": sum(c["ms"] for c in consultas),
+        "total_filas": sum(c["filas"] for c in consultas),
+        "formas": formas,
+    }
+
+
+def mostrar_panel_consultas():
+    """Panel de diagnóstico en el sidebar (solo para administradoras)."""
+    import streamlit as st
+    import pandas as pd
+
+    resumen = resumen_rerun()
+    with st.sidebar.expander(
+        f"🧪 SQL: {resumen['total_consultas']} consultas · {resumen['total_ms']:.0f} ms"
+    ):
+        st.caption(
+            f"Conexiones: {resumen['total_conexiones']} · Filas leídas: {resumen['total_filas']} · "
+            f"Log de lentas (≥ {UMBRAL_LENTO_MS:.0f} ms): {ARCHIVO_LOG_LENTAS}"
+        )
+        if not resumen["formas"]:
+            st.write("Sin consultas en este rerun.")
+            return
+
+        repetidas = [g for g in resumen["formas"] if g["veces"] >= 5]
+        if repetidas:
+            st.warning(f"⚠️ {len(repetidas)} consulta(s) repetidas 5+ veces (posible N+1)")
+
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Veces": g["veces"],
+                    "ms": round(g["ms"], 1),
+                    "Filas": g["filas"],
+                    "Módulo": g["modulos"],
+                    "SQL": g["sql"][:200],
+                }
+                for g in resumen["formas"]
+            ]),
+            use_container_width=True,
+            hide_index=True,
+        )
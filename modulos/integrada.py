@@ -7,6 +7,7 @@ from modulos.pagoprestamo import mostrar_pago_prestamo
 from modulos.multa import mostrar_multas
 from modulos.pagomulta import mostrar_pago_multas
 from modulos.movimientocaja import mostrar_movimiento_caja  # ✅ Nuevo módulo agregado
+from modulos.sincronizacion import mostrar_panel_offline
 
 def mostrar_gestion_integrada():
     """
@@ -21,6 +22,9 @@ def mostrar_gestion_integrada():
         st.warning("🔒 Acceso restringido: Solo la SECRETARIA puede acceder a esta función.")
         return
 
+    # Interruptor del modo sin conexión y cambios por sincronizar (sidebar)
+    mostrar_panel_offline()
+
     # Crear pestañas principales - ahora con 8 pestañas
     tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
         "📅 Reuniones", 
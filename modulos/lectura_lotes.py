@@ -0,0 +1,89 @@
+import csv
+import pandas as pd
+from modulos.config.conexion import obtener_conexion
+
+# =============================================
+#  LECTURA POR LOTES (STREAMING) PARA REPORTES Y EXPORTACIONES
+# =============================================
+#
+# Los cursores de mysql-connector sin `buffered=True` no traen todo el
+# resultado al cliente: las filas se leen del socket a medida que se piden
+# con fetchmany. Así un reporte o una exportación del historial completo
+# solo mantiene en memoria un lote a la vez.
+
+TAMANO_LOTE = 1000
+
+
+def iterar_lotes(query, params=None, tamano_lote=TAMANO_LOTE, con=None):
+    """
+    Ejecuta `query` y va entregando (columnas, filas) por lotes de hasta
+    `tamano_lote` tuplas.
+
+    Si no se pasa `con`, abre una conexión propia y la cierra al terminar
+    (o al abandonar el generador). Mientras el generador esté abierto la
+    conexión no puede usarse para otras consultas.
+    """
+    propia = con is None
+    if propia:
+        con = obtener_conexion()
+        if not con:
+            raise ConnectionError("No se pudo conectar a la base de datos.")
+
+    cursor = con.cursor(buffered=False)
+    try:
+        cursor.execute(query, tuple(params or ()))
+        columnas = [c[0] for c in cursor.description]
+        while True:
+            filas = cursor.fetchmany(tamano_lote)
+            if not filas:
+                break
+            yield columnas, filas
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            # Si el consumidor cortó antes de tiempo quedan filas sin leer
+            pass
+        if propia:
+            con.close()
+
+
+def iterar_filas(query, params=None, tamano_lote=TAMANO_LOTE, con=None):
+    """Igual que iterar_lotes pero entrega una tupla por fila."""
+    for _, filas in iterar_lotes(query, params, tamano_lote, con):
+        yield from filas
+
+
+def iterar_dataframes(query, params=None, tamano_lote=TAMANO_LOTE, con=None):
+    """Entrega cada lote como un DataFrame (útil para agregar por partes con pandas)."""
+    for columnas, filas in iterar_lotes(query, params, tamano_lote, con):
+        yield pd.DataFrame.from_records(filas, columns=columnas)
+
+
+def exportar_csv(query, params, archivo, tamano_lote=TAMANO_LOTE, con=None):
+    """
+    Escribe el resultado de `query` en `archivo` (ruta o archivo de texto
+    abierto) lote por lote. Retorna la cantidad de filas exportadas.
+    """
+    if isinstance(archivo, str):
+        with open(archivo, "w", newline="", encoding="utf-8") as f:
+            return exportar_csv(query, params, f, tamano_lote, con)
+
+    escritor = csv.writer(archivo)
+    total = 0
+    encabezado_escrito = False
+    for columnas, filas in iterar_lotes(query, params, tamano_lote, con):
+        if not encabezado_escrito:
+            escritor.writerow(columnas)
+            encabezado_escrito = True
+        escritor.writerows(filas)
+        total += len(filas)
+    return total
+
+
+def filas_a_dataframe(filas, tipo):
+    """
+    Convierte filas compactas (tuplas o namedtuples de `tipo`) en un DataFrame
+    sin pasar por un dict por fila.
+    """
+    return pd.DataFrame.from_records(filas, columns=list(tipo._fields))
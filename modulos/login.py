@@ -1,44 +1,7 @@
 import streamlit as st
 import hashlib
 from modulos.config.conexion import obtener_conexion
-from modulos.grupos import obtener_id_grupo_por_usuario
-
-
-def verificar_usuario(usuario, contrasena):
-    """Verifica usuario y contraseña en la base de datos."""
-    con = obtener_conexion()
-    if not con:
-        st.error("⚠️ No se pudo conectar a la base de datos.")
-        return None
-
-    try:
-        cursor = con.cursor(dictionary=True)
-
-        # Encriptar la contraseña para compararla con la guardada
-        contrasena_hash = hashlib.sha256(contrasena.encode()).hexdigest()
-
-        # Consulta: obtenemos usuario, tipo y cargo
-        query = """
-            SELECT 
-                u.ID_Usuario,
-                u.Usuario,
-                t.Tipo_usuario AS tipo_usuario,
-                c.tipo_de_cargo AS cargo
-            FROM Usuario u
-            INNER JOIN Tipo_de_usuario t ON u.ID_Tipo_usuario = t.ID_Tipo_usuario
-            INNER JOIN Cargo c ON u.ID_Cargo = c.ID_Cargo
-            WHERE u.Usuario = %s AND u.Contraseña = %s
-        """
-
-        cursor.execute(query, (usuario, contrasena_hash))
-        result = cursor.fetchone()
-        return result
-
-    except Exception as e:
-        st.error(f"❌ Error al verificar usuario: {e}")
-        return None
-    finally:
-        con.close()
+from modulos.sesion import cargar_contexto_sesion, iniciar_sesion
 
 
 def restablecer_contrasena():
@@ -161,40 +124,18 @@ def login():
     
     with col1:
         if st.button("Iniciar sesión", use_container_width=True):
-            datos_usuario = verificar_usuario(usuario, contrasena)
+            # Una sola consulta: usuario, cargo, grupo y grupos asignados
+            contexto = cargar_contexto_sesion(usuario, contrasena)
 
-            if datos_usuario:
-                # Guardar datos básicos en sesión
-                st.session_state["sesion_iniciada"] = True
-                st.session_state["usuario"] = datos_usuario["Usuario"]
-                st.session_state["tipo_usuario"] = datos_usuario["tipo_usuario"]
-                st.session_state["cargo_de_usuario"] = datos_usuario["cargo"]
-                st.session_state["id_usuario"] = datos_usuario["ID_Usuario"]
+            if contexto:
+                iniciar_sesion(contexto)
 
-                # 👉 VERIFICACIÓN ESPECIAL PARA USUARIO PROMOTORA
-                if datos_usuario["cargo"] == "Promotora":
-                    # Usuario Promotora puede ver TODOS los grupos
-                    st.session_state["id_grupo"] = "TODOS_LOS_GRUPOS"
-                    st.session_state["acceso_total_promotora"] = True
+                if contexto.acceso_total_promotora:
                     st.info("🔓 Modo Promotora: Acceso completo a todos los grupos")
-                else:
-                    # Para otros usuarios, obtener el grupo normalmente
-                    id_grupo = obtener_id_grupo_por_usuario(datos_usuario["ID_Usuario"])
-                    st.session_state["id_grupo"] = id_grupo
-                    st.session_state["acceso_total_promotora"] = False
-
-                # Obtener permisos
-                from modulos.permisos import obtener_permisos_usuario
-                permisos = obtener_permisos_usuario(
-                    datos_usuario["ID_Usuario"],
-                    datos_usuario["tipo_usuario"],
-                    datos_usuario["cargo"]
-                )
-                st.session_state["permisos_usuario"] = permisos
 
                 st.success(
-                    f"Bienvenido, {datos_usuario['Usuario']} 👋 "
-                    f"(Cargo: {datos_usuario['cargo']})"
+                    f"Bienvenido, {contexto.usuario} 👋 "
+                    f"(Cargo: {contexto.cargo})"
                 )
 
                 st.rerun()
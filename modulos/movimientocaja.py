@@ -1,6 +1,8 @@
 import streamlit as st
 from modulos.config.conexion import obtener_conexion
 from datetime import datetime
+from modulos.dinero import formato_moneda
+from modulos.indice_reuniones import indice_reuniones
 
 # =====================================================================================
 #  MÓDULO PRINCIPAL - MOVIMIENTO DE CAJA SIMPLIFICADO
@@ -27,7 +29,7 @@ def mostrar_movimiento_caja():
 
         # SALDO INICIAL = saldo_final de reunión previa
         saldo_anterior = obtener_saldo_anterior(cursor, id_reunion, id_grupo)
-        st.success(f"💰 **Saldo inicial: ${saldo_anterior:,.2f}**")
+        st.success(f"💰 **Saldo inicial: {formato_moneda(saldo_anterior)}**")
 
         # Obtener y mostrar resumen automático
         resumen_automatico(cursor, con, id_reunion, saldo_anterior)
@@ -48,15 +50,9 @@ def mostrar_movimiento_caja():
 
 def obtener_saldo_anterior(cursor, id_reunion_actual, id_grupo):
     try:
-        cursor.execute("""
-            SELECT ID_Reunion
-            FROM Reunion
-            WHERE ID_Grupo = %s AND ID_Reunion < %s
-            ORDER BY ID_Reunion DESC
-            LIMIT 1
-        """, (id_grupo, id_reunion_actual))
-
-        reunion_anterior = cursor.fetchone()
+        # Reunión previa en orden de fecha (el ID no sigue la fecha cuando el
+        # ciclo se genera por adelantado o se registra una reunión atrasada)
+        reunion_anterior = indice_reuniones(cursor, id_grupo).anterior_a_reunion(id_reunion_actual)
 
         if not reunion_anterior:
             return 0
@@ -67,7 +63,7 @@ def obtener_saldo_anterior(cursor, id_reunion_actual, id_grupo):
             WHERE ID_Reunion = %s
             ORDER BY ID_Movimiento_caja DESC
             LIMIT 1
-        """, (reunion_anterior['ID_Reunion'],))
+        """, (reunion_anterior.id_reunion,))
 
         mov = cursor.fetchone()
 
@@ -81,6 +77,19 @@ def obtener_saldo_anterior(cursor, id_reunion_actual, id_grupo):
 #  OBTENER TOTALES POR REUNIÓN - TODOS LOS PRÉSTAMOS COMO EGRESOS
 # =====================================================================================
 
+# Auditadas por herramientas.auditar_explain
+CONSULTA_TOTAL_AHORROS = """
+    SELECT COALESCE(SUM(Monto_Ahorro), 0) as total
+    FROM Ahorro
+    WHERE ID_Reunion = %s
+"""
+
+CONSULTA_TOTAL_PAGOS_MULTAS = """
+    SELECT COALESCE(SUM(monto_pagado), 0) as total
+    FROM PagoMulta
+    WHERE ID_Reunion_pago = %s
+"""
+
 def obtener_totales_reunion(cursor, id_reunion):
     try:
         totales = {
@@ -95,11 +104,7 @@ def obtener_totales_reunion(cursor, id_reunion):
         # =============================================================================
         
         # 1) TOTAL AHORROS (INGRESO)
-        cursor.execute("""
-            SELECT COALESCE(SUM(Monto_Ahorro), 0) as total
-            FROM Ahorro 
-            WHERE ID_Reunion = %s
-        """, (id_reunion,))
+        cursor.execute(CONSULTA_TOTAL_AHORROS, (id_reunion,))
         resultado = cursor.fetchone()
         total_ahorros = float(resultado['total']) if resultado else 0
         
@@ -133,11 +138,7 @@ def obtener_totales_reunion(cursor, id_reunion):
 
         # 3) TOTAL PAGOS MULTAS (INGRESO)
         try:
-            cursor.execute("""
-                SELECT COALESCE(SUM(monto_pagado), 0) as total
-                FROM PagoMulta 
-                WHERE ID_Reunion_pago = %s
-            """, (id_reunion,))
+            cursor.execute(CONSULTA_TOTAL_PAGOS_MULTAS, (id_reunion,))
             resultado = cursor.fetchone()
             total_pagos_multas = float(resultado['total']) if resultado else 0
             
@@ -166,7 +167,7 @@ def obtener_totales_reunion(cursor, id_reunion):
         
         # MOSTRAR INFORMACIÓN DE DEPURACIÓN
         st.write("🔍 **Información de Préstamos:**")
-        st.write(f"💰 **Total de préstamos en la reunión: ${total_prestamos:,.2f}**")
+        st.write(f"💰 **Total de préstamos en la reunión: {formato_moneda(total_prestamos)}**")
         
         # También mostrar el detalle de cada préstamo
         cursor.execute("""
@@ -179,7 +180,7 @@ def obtener_totales_reunion(cursor, id_reunion):
         if prestamos:
             st.write("📋 **Detalle de préstamos:**")
             for prestamo in prestamos:
-                st.write(f"  - Préstamo ID: {prestamo['ID_Prestamo']}, Monto: ${prestamo['monto']:,.2f}, Estado: {prestamo['ID_Estado_prestamo']}")
+                st.write(f"  - Préstamo ID: {prestamo['ID_Prestamo']}, Monto: {formato_moneda(prestamo['monto'])}, Estado: {prestamo['ID_Estado_prestamo']}")
         
         # AGREGAR PRÉSTAMOS COMO EGRESOS
         if total_prestamos > 0:
@@ -215,13 +216,13 @@ def resumen_automatico(cursor, con, id_reunion, saldo_anterior):
     st.write("### 📈 Resumen Financiero")
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("💰 Saldo Inicial", f"${saldo_anterior:,.2f}")
+        st.metric("💰 Saldo Inicial", formato_moneda(saldo_anterior))
     with col2:
-        st.metric("📈 Total Ingresos", f"${totales['total_ingresos']:,.2f}")
+        st.metric("📈 Total Ingresos", formato_moneda(totales['total_ingresos']))
     with col3:
-        st.metric("📉 Total Egresos", f"${totales['total_egresos']:,.2f}")
+        st.metric("📉 Total Egresos", formato_moneda(totales['total_egresos']))
     with col4:
-        st.metric("💵 Saldo Final", f"${saldo_final:,.2f}")
+        st.metric("💵 Saldo Final", formato_moneda(saldo_final))
 
     st.divider()
 
@@ -234,7 +235,7 @@ def resumen_automatico(cursor, con, id_reunion, saldo_anterior):
                 st.write(f"**{ingreso['concepto']}**")
                 st.caption(ingreso['descripcion'])
             with col2:
-                st.success(f"${ingreso['monto']:,.2f}")
+                st.success(formato_moneda(ingreso['monto']))
     else:
         st.info("📭 No hay ingresos registrados en esta reunión")
 
@@ -247,7 +248,7 @@ def resumen_automatico(cursor, con, id_reunion, saldo_anterior):
                 st.write(f"**{egreso['concepto']}**")
                 st.caption(egreso['descripcion'])
             with col2:
-                st.error(f"${egreso['monto']:,.2f}")
+                st.error(formato_moneda(egreso['monto']))
     else:
         st.info("📭 No hay egresos (préstamos) registrados en esta reunión")
 
@@ -255,7 +256,7 @@ def resumen_automatico(cursor, con, id_reunion, saldo_anterior):
     st.divider()
     st.write("### 🧮 Cálculo del Saldo Final")
     st.write(f"**Saldo Final = Saldo Inicial + Total Ingresos - Total Egresos**")
-    st.write(f"**${saldo_final:,.2f} = ${saldo_anterior:,.2f} + ${totales['total_ingresos']:,.2f} - ${totales['total_egresos']:,.2f}**")
+    st.write(f"**{formato_moneda(saldo_final)} = {formato_moneda(saldo_anterior)} + {formato_moneda(totales['total_ingresos'])} - {formato_moneda(totales['total_egresos'])}**")
 
     # Botón para guardar el resumen en la base de datos
     st.divider()
@@ -1,6 +1,105 @@
 import streamlit as st
 from modulos.config.conexion import obtener_conexion
 from datetime import datetime
+from modulos.dinero import formato_moneda, a_centavos
+
+# =============================================
+#  MULTAS AUTOMÁTICAS AL GUARDAR ASISTENCIA
+# =============================================
+
+ESTADO_MULTA_PENDIENTE = 1
+
+# Auditadas por herramientas.auditar_explain
+CONSULTA_REGLAMENTO_MULTA = """
+    SELECT ID_Reglamento, monto_multa_asistencia
+    FROM Reglamento
+    WHERE ID_Grupo = %s
+    ORDER BY ID_Reglamento DESC
+    LIMIT 1
+"""
+
+CONSULTA_MULTAS_REUNION = """
+    SELECT mxm.ID_Miembro, mxm.ID_Multa, mxm.monto_pagado,
+           (SELECT COUNT(*) FROM PagoMulta pm
+            WHERE pm.ID_Multa = mxm.ID_Multa AND pm.ID_Miembro = mxm.ID_Miembro) AS pagos
+    FROM MiembroxMulta mxm
+    JOIN Multa mu ON mu.ID_Multa = mxm.ID_Multa
+    WHERE mu.ID_Reunion = %s
+"""
+
+
+def _es_falta_sin_justificar(asistio, justificacion):
+    return asistio == 0 and not (justificacion or "").strip()
+
+
+def sincronizar_multas_asistencia(cursor, id_reunion, id_grupo, asistencias, fecha_multa):
+    """
+    Deja las multas por inasistencia de la reunión de acuerdo con `asistencias`
+    ({ID_Miembro: (asistio, justificacion)}), dentro de la transacción de
+    quien llama (no hace commit):
+
+      - a quien faltó sin justificación y no tiene multa en esta reunión se le
+        crea una (Multa + MiembroxMulta, en lote) por monto_multa_asistencia;
+      - a quien ya no corresponde (se corrigió la asistencia) se le anula la
+        multa si no tiene nada pagado.
+
+    Volver a guardar la misma asistencia no cambia nada. Retorna
+    (creadas, anuladas), o None si el reglamento no define monto de multa.
+    Quien llama debe tener bloqueada la fila de Reunion (SELECT ... FOR UPDATE)
+    para que dos guardados simultáneos no dupliquen multas.
+    """
+    cursor.execute(CONSULTA_REGLAMENTO_MULTA, (id_grupo,))
+    reglamento = cursor.fetchone()
+    if not reglamento or not a_centavos(reglamento[1]):
+        return None
+    id_reglamento, monto_multa = reglamento
+
+    cursor.execute(CONSULTA_MULTAS_REUNION, (id_reunion,))
+    existentes = {}
+    for id_miembro, id_multa, monto_pagado, pagos in cursor.fetchall():
+        existentes.setdefault(id_miembro, []).append((id_multa, a_centavos(monto_pagado), pagos))
+
+    a_multar = {i for i, (asistio, just) in asistencias.items() if _es_falta_sin_justificar(asistio, just)}
+    nuevos = sorted(a_multar - existentes.keys())
+    anular = [
+        (id_miembro, id_multa)
+        for id_miembro, multas in existentes.items()
+        if id_miembro in asistencias and id_miembro not in a_multar
+        for id_multa, pagado_c, pagos in multas
+        if pagado_c == 0 and not pagos
+    ]
+
+    if nuevos:
+        cursor.executemany("""
+            INSERT INTO Multa (ID_Reunion, ID_Reglamento, fecha, ID_Estado_multa)
+            VALUES (%s, %s, %s, %s)
+        """, [(id_reunion, id_reglamento, fecha_multa, ESTADO_MULTA_PENDIENTE)] * len(nuevos))
+        # Las multas recién creadas son las últimas de la reunión sin miembro
+        # asignado; el autoincremento conserva el orden de inserción
+        cursor.execute("""
+            SELECT mu.ID_Multa
+            FROM Multa mu
+            WHERE mu.ID_Reunion = %s
+              AND NOT EXISTS (SELECT 1 FROM MiembroxMulta x WHERE x.ID_Multa = mu.ID_Multa)
+            ORDER BY mu.ID_Multa DESC
+            LIMIT %s
+        """, (id_reunion, len(nuevos)))
+        ids_multa = sorted(fila[0] for fila in cursor.fetchall())
+        cursor.executemany("""
+            INSERT INTO MiembroxMulta (ID_Miembro, ID_Multa, monto_a_pagar, monto_pagado)
+            VALUES (%s, %s, %s, %s)
+        """, [(id_miembro, id_multa, monto_multa, 0) for id_miembro, id_multa in zip(nuevos, ids_multa)])
+
+    if anular:
+        cursor.executemany("DELETE FROM MiembroxMulta WHERE ID_Miembro = %s AND ID_Multa = %s", anular)
+        cursor.executemany("""
+            DELETE FROM Multa
+            WHERE ID_Multa = %s
+              AND NOT EXISTS (SELECT 1 FROM MiembroxMulta x WHERE x.ID_Multa = %s)
+        """, [(id_multa, id_multa) for _, id_multa in anular])
+
+    return len(nuevos), len(anular)
+
 
 def mostrar_multas():
     st.header("📋 Sistema de Multas")
@@ -54,7 +153,7 @@ def mostrar_multas():
                 cursor.execute("SELECT LAST_INSERT_ID() as ID_Reglamento")
                 id_reglamento = cursor.fetchone()['ID_Reglamento']
 
-        st.success(f"💰 **Monto de multa por inasistencia:** ${monto_multa:,.2f}")
+        st.success(f"💰 **Monto de multa por inasistencia:** {formato_moneda(monto_multa)}")
 
         # Cargar miembros del grupo y asistencia
         cursor.execute("""
@@ -128,7 +227,7 @@ def mostrar_multas():
             multa_existente = cursor.fetchone()
             
             with cols[1]:
-                st.write(f"${monto_multa:,.2f}")
+                st.write(formato_moneda(monto_multa))
             
             with cols[2]:
                 if multa_existente:
@@ -222,12 +321,12 @@ def mostrar_multas():
                 with col1:
                     st.write(f"**{multa['nombre_completo']}**")
                 with col2:
-                    st.write(f"${multa['monto_a_pagar']:,.2f}")
+                    st.write(formato_moneda(multa['monto_a_pagar']))
                 with col3:
                     if multa["monto_pagado"] >= multa["monto_a_pagar"]:
                         st.write("✅ Pagada")
                     else:
-                        st.write(f"⏳ ${multa['monto_pagado']:,.2f}")
+                        st.write(f"⏳ {formato_moneda(multa['monto_pagado'])}")
                 with col4:
                     st.write(multa["fecha"])
 
@@ -1,14 +1,23 @@
 import streamlit as st
 from modulos.config.conexion import obtener_conexion
 from datetime import datetime, timedelta, date
-from decimal import Decimal
+from collections import namedtuple
 import calendar
+from modulos.dinero import formato_moneda, a_centavos, desde_centavos, redondear, sumar, a_float
+from modulos.indice_reuniones import indice_reuniones
+
+# Fila compacta de PagoMulta (tupla con nombre, sin dict por fila)
+PagoMultaFila = namedtuple(
+    "PagoMultaFila",
+    "ID_PagoMulta ID_Miembro ID_Multa monto_pagado fecha_pago ID_Reunion_pago "
+    "fecha_limite_pago nombre_miembro fecha_multa"
+)
 
 # -------------------------
 # Helpers de fecha / util
 # -------------------------
 SPANISH_WEEKDAY = {
-    'LUNES': 0, 'MARTARTES': 1, 'MIERCOLES': 2, 'MIÉRCOLES': 2, 'MIERCOLES': 2,
+    'LUNES': 0, 'MARTES': 1, 'MIERCOLES': 2, 'MIÉRCOLES': 2,
     'JUEVES': 3, 'VIERNES': 4, 'SABADO': 5, 'SÁBADO': 5, 'DOMINGO': 6
 }
 
@@ -28,7 +37,16 @@ def parsear_dia_reunion(valor):
     except Exception:
         return 0
 
-def calcular_fecha_siguiente_reunion(fecha_base: date, dia_reunion, frecuencia: str) -> date:
+def calcular_fecha_siguiente_reunion(fecha_base: date, dia_reunion, frecuencia: str, indice=None) -> date:
+    """
+    Fecha de la reunión siguiente a `fecha_base`. Con `indice` (IndiceReuniones
+    del grupo) se usa la próxima reunión registrada; si no hay, se calcula con
+    el día y la frecuencia del reglamento.
+    """
+    if indice is not None:
+        siguiente = indice.siguiente(fecha_base)
+        if siguiente:
+            return siguiente.fecha
     try:
         dia = parsear_dia_reunion(dia_reunion)
         freq = (frecuencia or 'SEMANAL').strip().upper()
@@ -67,7 +85,7 @@ def calcular_fecha_siguiente_reunion(fecha_base: date, dia_reunion, frecuencia:
 def obtener_multas_grupo():
     try:
         con = obtener_conexion()
-        cursor = con.cursor(dictionary=True)
+        cursor = con.cursor()
 
         if 'reunion_actual' not in st.session_state:
             st.error("No hay reunión activa seleccionada")
@@ -93,21 +111,11 @@ def obtener_multas_grupo():
             ORDER BY pm.fecha_pago
         """, (id_grupo,))
 
-        datos = cursor.fetchall()
-        resultado = []
-        for row in datos:
-            resultado.append({
-                'ID_PagoMulta': row['ID_PagoMulta'],
-                'ID_Miembro': row['ID_Miembro'],
-                'ID_Multa': row['ID_Multa'],
-                'monto_pagado': float(row['monto_pagado'] or 0),
-                'fecha_pago': row['fecha_pago'],
-                'ID_Reunion_pago': row['ID_Reunion_pago'],
-                'fecha_limite_pago': row.get('fecha_limite_pago'),
-                'nombre_miembro': row.get('nombre_miembro'),
-                'fecha_multa': row.get('fecha_multa')
-            })
-        return resultado
+        # Se recorre el cursor directamente y se arma una tupla por fila
+        return [
+            PagoMultaFila(*fila[:3], float(fila[3] or 0), *fila[4:])
+            for fila in cursor
+        ]
 
     except Exception as e:
         st.error(f"❌ Error en obtener_multas_grupo: {e}")
@@ -121,7 +129,7 @@ def obtener_total_multas_ciclo():
         pagos = obtener_multas_grupo()
         if not pagos:
             return 0.00
-        return sum(p['monto_pagado'] for p in pagos)
+        return sum(p.monto_pagado for p in pagos)
     except Exception as e:
         st.error(f"❌ Error calculando total de multas: {e}")
         return 0.00
@@ -160,9 +168,8 @@ def mostrar_pago_multas():
         dia_reunion_raw = regl.get('dia_reunion')
         dia_reunion = parsear_dia_reunion(dia_reunion_raw)
 
-        cursor.execute("SELECT fecha FROM Reunion WHERE ID_Reunion = %s", (id_reunion,))
-        row_reunion = cursor.fetchone()
-        fecha_reunion_actual = row_reunion['fecha'] if row_reunion and row_reunion.get('fecha') else datetime.now().date()
+        indice = indice_reuniones(cursor, id_grupo)
+        fecha_reunion_actual = indice.fecha_de(id_reunion) or datetime.now().date()
 
         cursor.execute("""
             SELECT
@@ -200,18 +207,18 @@ def mostrar_pago_multas():
         total_monto_pagado = float(resumen['total_monto_pagado'])
 
         if multas_pendientes:
-            total_pendiente = sum(float(m['saldo_pendiente']) for m in multas_pendientes)
+            total_pendiente = a_float(sumar([m['saldo_pendiente'] for m in multas_pendientes]))
             multas_vencidas = [m for m in multas_pendientes if m.get('dias_transcurridos') is not None and m['dias_transcurridos'] > 7]
 
             col1, col2, col3, col4 = st.columns(4)
             with col1:
                 st.metric("👥 Total Pendientes", len(multas_pendientes))
             with col2:
-                st.metric("💰 Total Pendiente", f"${total_pendiente:,.2f}")
+                st.metric("💰 Total Pendiente", formato_moneda(total_pendiente))
             with col3:
                 st.metric("⚠️ Multas Vencidas", len(multas_vencidas))
             with col4:
-                st.metric("✅ Pagadas Hoy", total_multas_pagadas, f"${total_monto_pagado:,.2f}")
+                st.metric("✅ Pagadas Hoy", total_multas_pagadas, formato_moneda(total_monto_pagado))
 
             for multa in multas_pendientes:
                 monto_a_pagar = float(multa['monto_a_pagar'])
@@ -229,9 +236,9 @@ def mostrar_pago_multas():
                             st.caption(f"📝 Justificación: {multa['justificacion']}")
                         st.write("🚩 Vencida" if esta_vencida else f"⏳ {dias} días")
                     with c2:
-                        st.write(f"**Monto:** ${monto_a_pagar:,.2f}")
-                        st.write(f"**Pagado:** ${monto_pagado:,.2f}")
-                        st.write(f"**Saldo:** ${saldo_pendiente:,.2f}")
+                        st.write(f"**Monto:** {formato_moneda(monto_a_pagar)}")
+                        st.write(f"**Pagado:** {formato_moneda(monto_pagado)}")
+                        st.write(f"**Saldo:** {formato_moneda(saldo_pendiente)}")
                     with c3:
                         if saldo_pendiente > 0:
                             monto_pago = st.number_input(
@@ -246,14 +253,14 @@ def mostrar_pago_multas():
                             monto_pago = 0.0
 
                         if monto_pagado > 0:
-                            st.success(f"✅ {monto_pagado:,.2f} pagados")
+                            st.success(f"✅ {formato_moneda(monto_pagado)} pagados")
                         if esta_vencida:
                             st.error("🚨 MULTA VENCIDA")
 
                     with c4:
                         if saldo_pendiente > 0 and st.button("💳 Pagar", key=f"btn_pagar_{multa['ID_Miembro']}_{multa['ID_Multa']}"):
                             try:
-                                nuevo_pagado = Decimal(str(monto_pagado + monto_pago))
+                                nuevo_pagado = desde_centavos(a_centavos(monto_pagado) + a_centavos(monto_pago))
 
                                 cursor.execute("""
                                     UPDATE MiembroxMulta
@@ -264,7 +271,7 @@ def mostrar_pago_multas():
                                 fecha_multa = multa.get('fecha_multa') or fecha_reunion_actual
                                 if isinstance(fecha_multa, datetime):
                                     fecha_multa = fecha_multa.date()
-                                fecha_limite = calcular_fecha_siguiente_reunion(fecha_multa, dia_reunion, frecuencia)
+                                fecha_limite = calcular_fecha_siguiente_reunion(fecha_multa, dia_reunion, frecuencia, indice)
 
                                 cursor.execute("""
                                     INSERT INTO PagoMulta
@@ -273,14 +280,14 @@ def mostrar_pago_multas():
                                 """, (
                                     multa['ID_Miembro'],
                                     multa['ID_Multa'],
-                                    Decimal(str(monto_pago)),
+                                    redondear(monto_pago),
                                     datetime.now().date(),
                                     id_reunion,
                                     fecha_limite
                                 ))
 
                                 con.commit()
-                                st.success(f"✅ Pago ${monto_pago:,.2f} registrado para {multa['nombre_completo']}")
+                                st.success(f"✅ Pago {formato_moneda(monto_pago)} registrado para {multa['nombre_completo']}")
                                 st.rerun()
 
                             except Exception as e:
@@ -297,7 +304,7 @@ def mostrar_pago_multas():
             with c2:
                 if st.button("💳 Pagar Todas (saldos)", use_container_width=True):
                     try:
-                        total_pagado = 0
+                        total_pagado = 0  # centavos
                         cont = 0
                         for multa in multas_pendientes:
                             saldo = float(multa['saldo_pendiente'])
@@ -309,7 +316,7 @@ def mostrar_pago_multas():
                                 SET monto_pagado = %s
                                 WHERE ID_Miembro = %s AND ID_Multa = %s
                             """, (
-                                Decimal(str(multa['monto_a_pagar'])),
+                                redondear(multa['monto_a_pagar']),
                                 multa['ID_Miembro'],
                                 multa['ID_Multa']
                             ))
@@ -317,7 +324,7 @@ def mostrar_pago_multas():
                             fecha_multa = multa.get('fecha_multa') or fecha_reunion_actual
                             if isinstance(fecha_multa, datetime):
                                 fecha_multa = fecha_multa.date()
-                            fecha_limite = calcular_fecha_siguiente_reunion(fecha_multa, dia_reunion, frecuencia)
+                            fecha_limite = calcular_fecha_siguiente_reunion(fecha_multa, dia_reunion, frecuencia, indice)
 
                             try:
                                 cursor.execute("""
@@ -327,7 +334,7 @@ def mostrar_pago_multas():
                                 """, (
                                     multa['ID_Miembro'],
                                     multa['ID_Multa'],
-                                    Decimal(str(saldo)),
+                                    redondear(saldo),
                                     datetime.now().date(),
                                     id_reunion,
                                     fecha_limite
@@ -335,11 +342,11 @@ def mostrar_pago_multas():
                             except:
                                 pass
 
-                            total_pagado += saldo
+                            total_pagado += a_centavos(saldo)
                             cont += 1
 
                         con.commit()
-                        st.success(f"✅ Se pagaron {cont} multas (todos los saldos) por un total de ${total_pagado:,.2f}")
+                        st.success(f"✅ Se pagaron {cont} multas (todos los saldos) por un total de {formato_moneda(a_float(total_pagado))}")
                         st.rerun()
 
                     except Exception as e:
@@ -351,15 +358,15 @@ def mostrar_pago_multas():
                     st.info(f"""
                     **Resumen de la reunión {nombre_reunion}:**
                     - Multas pagadas (hoy): {total_multas_pagadas}
-                    - Total recaudado (hoy): ${total_monto_pagado:,.2f}
+                    - Total recaudado (hoy): {formato_moneda(total_monto_pagado)}
                     - Multas pendientes totales: {len(multas_pendientes)}
-                    - Total pendiente: ${total_pendiente:,.2f}
+                    - Total pendiente: {formato_moneda(total_pendiente)}
                     """)
 
         else:
             st.success("🎉 No hay multas pendientes de pago")
             if total_multas_pagadas > 0:
-                st.info(f"**Resumen de esta reunión:** {total_multas_pagadas} multas pagadas por un total de ${total_monto_pagado:,.2f}")
+                st.info(f"**Resumen de esta reunión:** {total_multas_pagadas} multas pagadas por un total de {formato_moneda(total_monto_pagado)}")
 
     except Exception as e:
         st.error(f"❌ Error en mostrar_pago_multas: {e}")
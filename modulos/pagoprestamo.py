@@ -1,26 +1,53 @@
 import streamlit as st
+import pandas as pd
 from modulos.config.conexion import obtener_conexion
 from datetime import date, timedelta
-from decimal import Decimal, ROUND_HALF_UP
+from modulos.dinero import formato_moneda, a_centavos, centavos_serie, desde_centavos, dividir, sumar, a_float
+from modulos.versiones_cache import incrementar_version, ambito_grupo
+from modulos.indice_reuniones import indice_reuniones
+from modulos.diario_local import diario_compartido, modo_offline_activo, capturar_pagos, PAGO_PRESTAMO, FOTO_CUOTAS
 
-def obtener_reunion_mas_cercana_fin_mes(con, id_grupo, fecha_referencia, mes_offset=0):
+def buscar_reunion_mas_cercana(cursor, id_grupo, fecha_objetivo, desde, hasta):
     """
-    Retorna la fecha de la reunión más cercana al fin del mes objetivo.
-    Usa la tabla Reglamento para obtener frecuencia (solo para referencia; la función
-    busca reuniones en la tabla Reunion y devuelve la que esté más cerca del fin de mes).
+    (ID_Reunion, fecha, lugar) de la reunión del grupo entre `desde` y `hasta`
+    más cercana a `fecha_objetivo`, o None. Son dos búsquedas LIMIT 1 sobre el
+    índice (ID_Grupo, fecha): la última en o antes del objetivo y la primera
+    después; en empate gana la anterior.
+
+    Las páginas usan indice_reuniones, que contesta lo mismo en memoria; esta
+    forma queda para consultas sueltas sin caché (benchmark_consultas).
     """
-    cursor = con.cursor()
     cursor.execute("""
-        SELECT frecuencia_reunion
-        FROM Reglamento
-        WHERE ID_Grupo = %s
-        ORDER BY ID_Reglamento DESC
+        SELECT ID_Reunion, fecha, lugar
+        FROM Reunion
+        WHERE ID_Grupo = %s AND fecha >= %s AND fecha <= %s
+        ORDER BY fecha DESC
+        LIMIT 1
+    """, (id_grupo, desde, fecha_objetivo))
+    anterior = cursor.fetchone()
+
+    cursor.execute("""
+        SELECT ID_Reunion, fecha, lugar
+        FROM Reunion
+        WHERE ID_Grupo = %s AND fecha > %s AND fecha <= %s
+        ORDER BY fecha ASC
         LIMIT 1
-    """, (id_grupo,))
-    row = cursor.fetchone()
-    # frecuencia la mostramos en UI; la lógica para elegir reunión sigue siendo por fecha
-    frecuencia = row[0] if row else "Mensual"
+    """, (id_grupo, fecha_objetivo, hasta))
+    siguiente = cursor.fetchone()
+
+    if anterior and siguiente:
+        if (siguiente[1] - fecha_objetivo) < (fecha_objetivo - anterior[1]):
+            return siguiente
+        return anterior
+    return anterior or siguiente
 
+
+def obtener_reunion_mas_cercana_fin_mes(con, id_grupo, fecha_referencia, mes_offset=0):
+    """
+    Retorna la fecha de la reunión más cercana al fin del mes objetivo, buscada
+    en el índice de reuniones del grupo (en memoria). Si ese mes no tiene
+    reuniones retorna la fecha objetivo.
+    """
     if mes_offset == 0:
         fecha_objetivo = fecha_referencia
     else:
@@ -35,19 +62,15 @@ def obtener_reunion_mas_cercana_fin_mes(con, id_grupo, fecha_referencia, mes_off
             next_month = date(year, month + 1, 1)
         fecha_objetivo = next_month - timedelta(days=1)
 
-    cursor.execute("""
-        SELECT ID_Reunion, fecha, lugar
-        FROM Reunion
-        WHERE ID_Grupo = %s
-          AND YEAR(fecha) = %s AND MONTH(fecha) = %s
-        ORDER BY ABS(DATEDIFF(fecha, %s)) ASC
-        LIMIT 1
-    """, (id_grupo, fecha_objetivo.year, fecha_objetivo.month, fecha_objetivo))
-
-    reunion = cursor.fetchone()
-    cursor.close()
+    primer_dia = fecha_objetivo.replace(day=1)
+    ultimo_dia = (primer_dia + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    cursor = con.cursor()
+    try:
+        reunion = indice_reuniones(cursor, id_grupo).mas_cercana(fecha_objetivo, primer_dia, ultimo_dia)
+    finally:
+        cursor.close()
     if reunion:
-        return reunion[1]
+        return reunion.fecha
     return fecha_objetivo
 
 
@@ -91,23 +114,23 @@ def generar_cronograma_pagos(id_prestamo, con, id_grupo=None):
     # Eliminar cronograma anterior del préstamo
     cursor.execute("DELETE FROM CuotaPrestamo WHERE ID_Prestamo = %s", (id_prestamo,))
 
-    # Preparar Decimals
-    monto_d = Decimal(str(monto)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-    monto_total_d = Decimal(str(monto_total_pagar)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-    total_interes_d = Decimal(str(total_interes)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    # Montos en centavos enteros
+    monto_c = a_centavos(monto)
+    monto_total_c = a_centavos(monto_total_pagar)
+    total_interes_c = a_centavos(total_interes)
     plazo_i = int(plazo)
 
     # Determinar total por cuota:
     if cuota_mensual_reg is not None:
-        cuota_d = Decimal(str(cuota_mensual_reg)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        cuota_c = a_centavos(cuota_mensual_reg)
     else:
-        cuota_d = (monto_total_d / plazo_i).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        cuota_c = dividir(monto_total_c, plazo_i)
 
     # Interés por cuota (distribuir interés total si existe)
-    interes_por_cuota = (total_interes_d / plazo_i).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) if total_interes_d > 0 else Decimal("0.00")
+    interes_por_cuota = dividir(total_interes_c, plazo_i) if total_interes_c > 0 else 0
 
-    saldo_capital = monto_d
-    saldo_interes = total_interes_d
+    saldo_capital = monto_c
+    saldo_interes = total_interes_c
 
     # Fecha base: para cada mes tomamos la reunión más cercana al fin de mes (mes_offset = i)
     for i in range(1, plazo_i + 1):
@@ -116,15 +139,15 @@ def generar_cronograma_pagos(id_prestamo, con, id_grupo=None):
             # última cuota: absorber los saldos por redondeo
             interes_cuota = saldo_interes
             if cuota_mensual_reg is not None:
-                total_cuota = cuota_d
-                capital_cuota = (total_cuota - interes_cuota).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+                total_cuota = cuota_c
+                capital_cuota = total_cuota - interes_cuota
             else:
-                total_cuota = (saldo_capital + saldo_interes).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+                total_cuota = saldo_capital + saldo_interes
                 capital_cuota = saldo_capital
         else:
             interes_cuota = interes_por_cuota
-            total_cuota = cuota_d
-            capital_cuota = (total_cuota - interes_cuota).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            total_cuota = cuota_c
+            capital_cuota = total_cuota - interes_cuota
 
         # Determinar fecha de pago: la reunión más cercana al fin del mes i desde fecha_desembolso
         if id_grupo is not None:
@@ -140,7 +163,7 @@ def generar_cronograma_pagos(id_prestamo, con, id_grupo=None):
             VALUES (%s, %s, %s, %s, %s, %s, 'pendiente', 0, 0, 0)
         """, (
             id_prestamo, i, fecha_pago,
-            float(capital_cuota), float(interes_cuota), float(total_cuota)
+            desde_centavos(capital_cuota), desde_centavos(interes_cuota), desde_centavos(total_cuota)
         ))
 
         saldo_capital -= capital_cuota
@@ -151,62 +174,25 @@ def generar_cronograma_pagos(id_prestamo, con, id_grupo=None):
     return True
 
 
-def aplicar_pago_cuota(id_prestamo, monto_pagado, fecha_pago, tipo_pago, con, id_grupo=None, numero_cuota=None):
+def repartir_pago_cuota(cuota, monto_pagado_c, tipo_pago):
     """
-    Aplica pago completo o parcial a la próxima cuota (o número específico si tipo='completo').
-    Si es parcial y después del pago hay saldo pendiente, crea UNA NUEVA CUOTA con el saldo pendiente
-    y la programa para la próxima reunión (según id_grupo) o +30 días.
+    Reparte un pago (centavos) sobre una cuota leída de CuotaPrestamo.
+    'completo' la deja pagada; 'parcial' cubre primero interés y luego capital.
+    Retorna (capital_pagado, interes_pagado, total_pagado, estado, sobrante),
+    montos en centavos.
     """
-    cursor = con.cursor(dictionary=True)
-
-    if tipo_pago == "completo" and numero_cuota:
-        cursor.execute("""
-            SELECT ID_Cuota, capital_programado, interes_programado, total_programado,
-                   capital_pagado, interes_pagado, total_pagado, estado, fecha_programada
-            FROM CuotaPrestamo
-            WHERE ID_Prestamo = %s AND numero_cuota = %s
-        """, (id_prestamo, numero_cuota))
-    else:
-        cursor.execute("""
-            SELECT ID_Cuota, numero_cuota, capital_programado, interes_programado, total_programado,
-                   COALESCE(capital_pagado,0) AS capital_pagado, COALESCE(interes_pagado,0) AS interes_pagado,
-                   COALESCE(total_pagado,0) AS total_pagado, estado, fecha_programada
-            FROM CuotaPrestamo
-            WHERE ID_Prestamo = %s AND estado != 'pagado'
-            ORDER BY fecha_programada ASC
-            LIMIT 1
-        """, (id_prestamo,))
-
-    cuota = cursor.fetchone()
-    if not cuota:
-        cursor.close()
-        return False, "No hay cuotas pendientes"
-
-    # extraer campos
-    if tipo_pago == "completo" and numero_cuota:
-        id_cuota = cuota['ID_Cuota']
-        capital_prog = Decimal(str(cuota['capital_programado']))
-        interes_prog = Decimal(str(cuota['interes_programado']))
-        total_prog = Decimal(str(cuota['total_programado']))
-        capital_pag = Decimal(str(cuota.get('capital_pagado', 0)))
-        interes_pag = Decimal(str(cuota.get('interes_pagado', 0)))
-    else:
-        id_cuota = cuota['ID_Cuota']
-        numero_cuota = cuota['numero_cuota']
-        capital_prog = Decimal(str(cuota['capital_programado']))
-        interes_prog = Decimal(str(cuota['interes_programado']))
-        total_prog = Decimal(str(cuota['total_programado']))
-        capital_pag = Decimal(str(cuota.get('capital_pagado', 0)))
-        interes_pag = Decimal(str(cuota.get('interes_pagado', 0)))
-
-    monto_pagado_d = Decimal(str(monto_pagado))
+    capital_prog = a_centavos(cuota['capital_programado'])
+    interes_prog = a_centavos(cuota['interes_programado'])
+    total_prog = a_centavos(cuota['total_programado'])
+    capital_pag = a_centavos(cuota.get('capital_pagado', 0))
+    interes_pag = a_centavos(cuota.get('interes_pagado', 0))
 
     if tipo_pago == "completo":
         nuevo_capital_pagado = capital_prog
         nuevo_interes_pagado = interes_prog
         nuevo_total_pagado = total_prog
         nuevo_estado = 'pagado'
-        monto_sobrante = Decimal('0')
+        monto_sobrante = 0
     else:
         # aplicar a interés primero
         interes_faltante = interes_prog - interes_pag
@@ -216,22 +202,22 @@ def aplicar_pago_cuota(id_prestamo, monto_pagado, fecha_pago, tipo_pago, con, id
         nuevo_capital_pagado = capital_pag
 
         if interes_faltante > 0:
-            if monto_pagado_d >= interes_faltante:
+            if monto_pagado_c >= interes_faltante:
                 nuevo_interes_pagado = interes_prog
-                monto_pagado_d -= interes_faltante
+                monto_pagado_c -= interes_faltante
             else:
-                nuevo_interes_pagado = interes_pag + monto_pagado_d
-                monto_pagado_d = Decimal('0')
+                nuevo_interes_pagado = interes_pag + monto_pagado_c
+                monto_pagado_c = 0
 
-        if monto_pagado_d > 0 and capital_faltante > 0:
-            if monto_pagado_d >= capital_faltante:
+        if monto_pagado_c > 0 and capital_faltante > 0:
+            if monto_pagado_c >= capital_faltante:
                 nuevo_capital_pagado = capital_prog
-                monto_pagado_d -= capital_faltante
+                monto_pagado_c -= capital_faltante
             else:
-                nuevo_capital_pagado = capital_pag + monto_pagado_d
-                monto_pagado_d = Decimal('0')
+                nuevo_capital_pagado = capital_pag + monto_pagado_c
+                monto_pagado_c = 0
 
-        nuevo_total_pagado = (nuevo_capital_pagado + nuevo_interes_pagado).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        nuevo_total_pagado = nuevo_capital_pagado + nuevo_interes_pagado
         if nuevo_total_pagado >= total_prog:
             nuevo_estado = 'pagado'
         elif nuevo_total_pagado > 0:
@@ -239,57 +225,409 @@ def aplicar_pago_cuota(id_prestamo, monto_pagado, fecha_pago, tipo_pago, con, id
         else:
             nuevo_estado = 'pendiente'
 
-        monto_sobrante = monto_pagado_d
+        monto_sobrante = monto_pagado_c
 
-    # actualizar cuota actual
-    cursor.execute("""
+    return nuevo_capital_pagado, nuevo_interes_pagado, nuevo_total_pagado, nuevo_estado, monto_sobrante
+
+
+def repartir_pago_en_cuotas(cuotas, monto_pagado_c):
+    """
+    Reparte un pago (centavos) sobre las cuotas pendientes en orden: cada una
+    cubre interés y luego capital, y lo que sobra pasa a la siguiente.
+    Retorna ([(cuota, capital_pagado, interes_pagado, total_pagado, estado)], sobrante).
+    """
+    aplicadas = []
+    for cuota in cuotas:
+        if monto_pagado_c <= 0:
+            break
+        capital, interes, total, estado, monto_pagado_c = repartir_pago_cuota(cuota, monto_pagado_c, "parcial")
+        aplicadas.append((cuota, capital, interes, total, estado))
+    return aplicadas, monto_pagado_c
+
+
+# =============================================
+#  APLICACIÓN DE PAGOS CON BLOQUEO DE FILAS
+# =============================================
+# El pago individual y el cobro en lote comparten el mismo núcleo: dentro de
+# una sola transacción se bloquean (FOR UPDATE) los préstamos y sus cuotas
+# no pagadas, el reparto se calcula en memoria y las escrituras (cuotas,
+# cuota condensada y Pago_prestamo) van agrupadas antes del único commit.
+# Así dos pagos simultáneos del mismo préstamo no leen la misma cuota.
+
+# Consultas del cobro, auditadas por herramientas.auditar_explain. Las de
+# lote llevan la lista IN en {marcadores}.
+CONSULTA_BLOQUEO_PRESTAMOS = """
+    SELECT ID_Prestamo, monto_total_pagar FROM Prestamo
+    WHERE ID_Prestamo IN ({marcadores})
+    ORDER BY ID_Prestamo
+    FOR UPDATE
+"""
+
+CONSULTA_PAGADO_PRESTAMOS = """
+    SELECT ID_Prestamo, COALESCE(SUM(total_pagado), 0) AS pagado
+    FROM CuotaPrestamo
+    WHERE ID_Prestamo IN ({marcadores})
+    GROUP BY ID_Prestamo
+"""
+
+CONSULTA_BLOQUEO_CUOTAS = """
+    SELECT ID_Prestamo, ID_Cuota, numero_cuota, capital_programado, interes_programado,
+           total_programado,
+           COALESCE(capital_pagado, 0) AS capital_pagado,
+           COALESCE(interes_pagado, 0) AS interes_pagado,
+           COALESCE(total_pagado, 0) AS total_pagado,
+           estado, fecha_programada
+    FROM CuotaPrestamo
+    WHERE ID_Prestamo IN ({marcadores}) AND estado != 'pagado'
+    ORDER BY ID_Prestamo, fecha_programada, numero_cuota
+    FOR UPDATE
+"""
+
+# Próxima cuota no pagada de cada préstamo activo de las presentes
+CONSULTA_CUOTAS_A_COBRAR = """
+    SELECT ID_Prestamo, ID_Miembro, nombre, ID_Cuota, numero_cuota, fecha_programada,
+           total_programado, total_pagado
+    FROM (
+        SELECT p.ID_Prestamo, p.ID_Miembro, m.nombre, c.ID_Cuota, c.numero_cuota,
+               c.fecha_programada, c.total_programado,
+               COALESCE(c.total_pagado, 0) AS total_pagado,
+               ROW_NUMBER() OVER (
+                   PARTITION BY p.ID_Prestamo ORDER BY c.fecha_programada, c.numero_cuota
+               ) AS orden
+        FROM Miembroxreunion mr
+        JOIN Miembro m ON m.ID_Miembro = mr.ID_Miembro
+        JOIN Prestamo p ON p.ID_Miembro = mr.ID_Miembro AND p.ID_Estado_prestamo != 3
+        JOIN CuotaPrestamo c ON c.ID_Prestamo = p.ID_Prestamo AND c.estado != 'pagado'
+        WHERE mr.ID_Reunion = %s AND mr.asistio = 1
+    ) proximas
+    WHERE orden = 1
+    ORDER BY nombre, ID_Prestamo
+"""
+
+# Próxima cuota pendiente de un préstamo (pago parcial de "Un préstamo")
+CONSULTA_PROXIMA_CUOTA = """
+    SELECT numero_cuota, total_programado, total_pagado, fecha_programada
+    FROM CuotaPrestamo
+    WHERE ID_Prestamo = %s AND estado != 'pagado'
+    ORDER BY fecha_programada ASC
+    LIMIT 1
+"""
+
+
+def _bloquear_cuotas_pendientes(cursor, ids_prestamos):
+    """
+    Bloquea los préstamos (en orden de ID, para no cruzar bloqueos entre
+    lotes) y sus cuotas no pagadas. Retorna ({ID_Prestamo: [cuotas en
+    orden]}, {ID_Prestamo: saldo en centavos o None si el préstamo no tiene
+    monto_total_pagar}).
+    """
+    marcadores = ", ".join(["%s"] * len(ids_prestamos))
+    cursor.execute(CONSULTA_BLOQUEO_PRESTAMOS.format(marcadores=marcadores), tuple(ids_prestamos))
+    totales = {f['ID_Prestamo']: f['monto_total_pagar'] for f in cursor.fetchall()}
+
+    # El saldo sale del préstamo y no de sumar las cuotas pendientes: la
+    # cuota condensada de un pago parcial repite la deuda de las cuotas
+    # siguientes, que siguen pendientes
+    cursor.execute(CONSULTA_PAGADO_PRESTAMOS.format(marcadores=marcadores), tuple(ids_prestamos))
+    pagados = {f['ID_Prestamo']: a_centavos(f['pagado']) for f in cursor.fetchall()}
+    saldos = {
+        id_prestamo: (a_centavos(total) - pagados.get(id_prestamo, 0)) if total is not None else None
+        for id_prestamo, total in totales.items()
+    }
+
+    cursor.execute(CONSULTA_BLOQUEO_CUOTAS.format(marcadores=marcadores), tuple(ids_prestamos))
+    cuotas = {id_prestamo: [] for id_prestamo in ids_prestamos}
+    for cuota in cursor.fetchall():
+        cuotas[cuota['ID_Prestamo']].append(cuota)
+    return cuotas, saldos
+
+
+def _registrar_pagos(con, cursor, pagos, fecha_pago, id_reunion, id_grupo):
+    """
+    Aplica `pagos` [(ID_Prestamo, monto_c, tipo_pago, numero_cuota)] dentro de
+    la transacción abierta, sin commit. 'completo' salda la cuota indicada (o
+    la próxima); 'parcial' reparte el monto en cascada sobre las cuotas
+    pendientes. Si una cuota queda a medio pagar, el saldo pendiente se
+    condensa en una cuota nueva, como siempre hizo el pago parcial.
+    Lanza ValueError si un pago no se puede aplicar.
+    """
+    ids = [pago[0] for pago in pagos]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Un préstamo aparece más de una vez en el lote")
+    pendientes, saldos = _bloquear_cuotas_pendientes(cursor, ids)
+
+    actualizaciones, registros, condensar = [], [], {}
+    for id_prestamo, monto_c, tipo_pago, numero_cuota in pagos:
+        cuotas = pendientes[id_prestamo]
+        if not cuotas:
+            raise ValueError(f"El préstamo {id_prestamo} no tiene cuotas pendientes")
+
+        if tipo_pago == "completo":
+            cuota = next((c for c in cuotas if numero_cuota in (None, c['numero_cuota'])), None)
+            if cuota is None:
+                raise ValueError(f"La cuota {numero_cuota} del préstamo {id_prestamo} ya está pagada")
+            capital, interes, total, estado, _ = repartir_pago_cuota(cuota, 0, "completo")
+            aplicadas = [(cuota, capital, interes, total, estado)]
+            monto_c = a_centavos(cuota['total_programado']) - a_centavos(cuota['total_pagado'])
+        else:
+            aplicadas, sobrante = repartir_pago_en_cuotas(cuotas, monto_c)
+            if sobrante > 0:
+                raise ValueError(
+                    f"El pago del préstamo {id_prestamo} supera su saldo pendiente "
+                    f"por {formato_moneda(desde_centavos(sobrante))}"
+                )
+
+        saldo = saldos.get(id_prestamo)
+        if saldo is not None and monto_c > saldo:
+            raise ValueError(
+                f"El pago del préstamo {id_prestamo} supera su saldo pendiente "
+                f"por {formato_moneda(desde_centavos(monto_c - max(saldo, 0)))}"
+            )
+
+        capital_aplicado = interes_aplicado = 0
+        nuevos = {}
+        for cuota, capital, interes, total, estado in aplicadas:
+            actualizaciones.append((
+                desde_centavos(capital), desde_centavos(interes), desde_centavos(total), estado, cuota['ID_Cuota']
+            ))
+            capital_aplicado += capital - a_centavos(cuota['capital_pagado'])
+            interes_aplicado += interes - a_centavos(cuota['interes_pagado'])
+            nuevos[cuota['ID_Cuota']] = (capital, interes, estado)
+
+        registros.append((
+            id_prestamo, id_reunion, fecha_pago,
+            desde_centavos(capital_aplicado), desde_centavos(interes_aplicado), desde_centavos(monto_c),
+        ))
+
+        if tipo_pago == "parcial" and aplicadas[-1][4] == 'parcial':
+            capital_pendiente = interes_pendiente = 0
+            for cuota in cuotas:
+                capital, interes, estado = nuevos.get(
+                    cuota['ID_Cuota'],
+                    (a_centavos(cuota['capital_pagado']), a_centavos(cuota['interes_pagado']), cuota['estado'])
+                )
+                if estado != 'pagado':
+                    capital_pendiente += a_centavos(cuota['capital_programado']) - capital
+                    interes_pendiente += a_centavos(cuota['interes_programado']) - interes
+            condensar[id_prestamo] = (capital_pendiente, interes_pendiente)
+
+    cursor.executemany("""
         UPDATE CuotaPrestamo
         SET capital_pagado = %s, interes_pagado = %s, total_pagado = %s, estado = %s
         WHERE ID_Cuota = %s
-    """, (float(nuevo_capital_pagado), float(nuevo_interes_pagado), float(nuevo_total_pagado), nuevo_estado, id_cuota))
+    """, actualizaciones)
 
-    # si es parcial y quedó monto sobrante (no aplicable si monto_sobrante==0)
-    # o si queda saldo pendiente total en todas las cuotas, creamos UNA nueva cuota con saldo pendiente
-    if tipo_pago == "parcial":
-        # calcular saldos pendientes restantes (capital e interés)
-        cursor.execute("""
-            SELECT
-                COALESCE(SUM(capital_programado - COALESCE(capital_pagado,0)),0) AS capital_pendiente,
-                COALESCE(SUM(interes_programado - COALESCE(interes_pagado,0)),0) AS interes_pendiente
+    condensar = {i: saldos for i, saldos in condensar.items() if sum(saldos) > 0}
+    if condensar:
+        # fecha para la nueva cuota: siguiente reunión (si id_grupo) o +30 días desde fecha_pago
+        if id_grupo is not None:
+            fecha_nueva = obtener_reunion_mas_cercana_fin_mes(con, id_grupo, fecha_pago, 1)
+        else:
+            fecha_nueva = fecha_pago + timedelta(days=30)
+
+        cursor.execute(f"""
+            SELECT ID_Prestamo, COALESCE(MAX(numero_cuota), 0) AS ultimo
             FROM CuotaPrestamo
-            WHERE ID_Prestamo = %s AND estado != 'pagado'
-        """, (id_prestamo,))
-        saldos = cursor.fetchone()
-        capital_pendiente = Decimal(str(saldos['capital_pendiente'] or 0)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        interes_pendiente = Decimal(str(saldos['interes_pendiente'] or 0)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-
-        # Si hay deuda pendiente > 0, crear UNA nueva cuota que condense el saldo pendiente
-        if (capital_pendiente + interes_pendiente) > Decimal('0.00'):
-            # fecha para la nueva cuota: siguiente reunión (si id_grupo) o +30 días desde fecha_pago
-            if id_grupo is not None:
-                fecha_nueva = obtener_reunion_mas_cercana_fin_mes(con, id_grupo, fecha_pago, 1)
-            else:
-                fecha_nueva = fecha_pago + timedelta(days=30)
+            WHERE ID_Prestamo IN ({", ".join(["%s"] * len(condensar))})
+            GROUP BY ID_Prestamo
+        """, tuple(condensar))
+        ultimos = {f['ID_Prestamo']: int(f['ultimo']) for f in cursor.fetchall()}
 
-            # buscar ultimo numero de cuota
-            cursor.execute("SELECT COALESCE(MAX(numero_cuota),0) AS ultimo FROM CuotaPrestamo WHERE ID_Prestamo = %s", (id_prestamo,))
-            ultimo = cursor.fetchone().get('ultimo', 0) or 0
-            nuevo_num = int(ultimo) + 1
+        cursor.executemany("""
+            INSERT INTO CuotaPrestamo
+            (ID_Prestamo, numero_cuota, fecha_programada, capital_programado,
+             interes_programado, total_programado, estado, capital_pagado, interes_pagado, total_pagado)
+            VALUES (%s, %s, %s, %s, %s, %s, 'pendiente', 0, 0, 0)
+        """, [
+            (
+                id_prestamo, ultimos.get(id_prestamo, 0) + 1, fecha_nueva,
+                desde_centavos(capital_pendiente), desde_centavos(interes_pendiente),
+                desde_centavos(capital_pendiente + interes_pendiente),
+            )
+            for id_prestamo, (capital_pendiente, interes_pendiente) in condensar.items()
+        ])
+
+    cursor.executemany("""
+        INSERT INTO Pago_prestamo (ID_Prestamo, ID_Reunion, fecha_pago, monto_capital, monto_interes, total_cancelado)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, registros)
+
+
+def _ejecutar_pagos(con, pagos, fecha_pago, id_reunion, id_grupo):
+    """Corre _registrar_pagos en una transacción: un commit o rollback total. Retorna (ok, mensaje)."""
+    cursor = con.cursor(dictionary=True)
+    try:
+        _registrar_pagos(con, cursor, pagos, fecha_pago, id_reunion, id_grupo)
+        con.commit()
+    except ValueError as e:
+        con.rollback()
+        return False, str(e)
+    except Exception:
+        con.rollback()
+        raise
+    finally:
+        cursor.close()
 
-            cursor.execute("""
-                INSERT INTO CuotaPrestamo
-                (ID_Prestamo, numero_cuota, fecha_programada, capital_programado,
-                 interes_programado, total_programado, estado, capital_pagado, interes_pagado, total_pagado)
-                VALUES (%s, %s, %s, %s, %s, %s, 'pendiente', 0, 0, 0)
-            """, (
-                id_prestamo, nuevo_num, fecha_nueva,
-                float(capital_pendiente), float(interes_pendiente),
-                float(capital_pendiente + interes_pendiente)
-            ))
+    if id_grupo is not None:
+        incrementar_version(ambito_grupo(id_grupo))
+    return True, None
 
-    con.commit()
+
+def aplicar_pago_cuota(id_prestamo, monto_pagado, fecha_pago, tipo_pago, con, id_grupo=None,
+                       numero_cuota=None, id_reunion=None):
+    """
+    Aplica pago completo a una cuota (la indicada o la próxima) o un pago parcial
+    que se reparte en cascada sobre las cuotas pendientes, y lo registra en
+    Pago_prestamo, todo en una transacción con las cuotas bloqueadas.
+    Si el pago parcial deja una cuota a medio pagar, crea UNA NUEVA CUOTA con el
+    saldo pendiente y la programa para la próxima reunión (según id_grupo) o +30 días.
+    """
+    ok, msg = _ejecutar_pagos(
+        con, [(id_prestamo, a_centavos(monto_pagado), tipo_pago, numero_cuota)], fecha_pago, id_reunion, id_grupo
+    )
+    return ok, msg or "Pago aplicado correctamente"
+
+
+# =============================================
+#  COBRO DE REUNIÓN (TODOS LOS PRÉSTAMOS)
+# =============================================
+# En la reunión se cobra la próxima cuota de cada préstamo activo de las
+# presentes desde una sola tabla: las cuotas se leen con una consulta y el
+# lote completo se aplica con lecturas y escrituras agrupadas (IN +
+# executemany) en una sola transacción.
+
+def obtener_cuotas_a_cobrar(con, id_reunion):
+    """Próxima cuota no pagada de cada préstamo activo de las presentes, en una consulta."""
+    cursor = con.cursor(dictionary=True)
+    cursor.execute(CONSULTA_CUOTAS_A_COBRAR, (id_reunion,))
+    cuotas = cursor.fetchall()
     cursor.close()
-    return True, "Pago aplicado correctamente"
+    return cuotas
+
+
+def aplicar_pagos_lote(con, pagos, fecha_pago, id_reunion, id_grupo=None):
+    """
+    Versión por lotes de aplicar_pago_cuota. `pagos` es [(ID_Prestamo, monto)];
+    cada monto se reparte en cascada desde la próxima cuota pendiente de su
+    préstamo. Todo el lote se confirma o se revierte junto. Retorna
+    (ok, mensaje); los errores de la base se propagan después del rollback.
+    """
+    pagos = [(id_prestamo, a_centavos(monto), "parcial", None) for id_prestamo, monto in pagos]
+    pagos = [pago for pago in pagos if pago[1] > 0]
+    if not pagos:
+        return False, "No hay pagos para aplicar"
+
+    ok, msg = _ejecutar_pagos(con, pagos, fecha_pago, id_reunion, id_grupo)
+    return ok, msg or f"{len(pagos)} pagos aplicados"
+
+
+def registrar_pagos_lote(con, pagos, fecha_pago, id_reunion, id_grupo=None):
+    """
+    Como aplicar_pagos_lote, pero dentro de la transacción de quien llama:
+    no hace commit ni rollback y lanza ValueError si un pago no se puede
+    aplicar (lo usa la sincronización del modo sin conexión).
+    """
+    pagos = [(id_prestamo, a_centavos(monto), "parcial", None) for id_prestamo, monto in pagos]
+    cursor = con.cursor(dictionary=True)
+    try:
+        _registrar_pagos(con, cursor, pagos, fecha_pago, id_reunion, id_grupo)
+    finally:
+        cursor.close()
+
+
+def mostrar_cobro_reunion(con, id_reunion, id_grupo):
+    """
+    Tabla con la próxima cuota de cada préstamo de las presentes para cobrar todo junto.
+    Sin conexión (`con` en None) las cuotas salen de la foto de la última carga en línea.
+    """
+    aplicados = st.session_state.pop("cobro_reunion_aplicado", None)
+    if aplicados:
+        st.success(f"✅ {aplicados}")
+
+    sin_conexion = con is None
+    diario = diario_compartido()
+    if sin_conexion:
+        cuotas = diario.leer_foto(id_grupo, id_reunion, FOTO_CUOTAS)
+        if cuotas is None:
+            st.warning("📴 Este equipo no tiene copia de las cuotas de esta reunión; "
+                       "abre esta página una vez con conexión.")
+            return
+    else:
+        cuotas = obtener_cuotas_a_cobrar(con, id_reunion)
+        diario.guardar_foto(id_grupo, id_reunion, FOTO_CUOTAS, cuotas)
+    if not cuotas:
+        st.info("No hay cuotas pendientes de los miembros presentes.")
+        return
+
+    pendientes = [a_centavos(c['total_programado']) - a_centavos(c['total_pagado']) for c in cuotas]
+    tabla = pd.DataFrame({
+        "Socio/a": [c['nombre'] for c in cuotas],
+        "Préstamo": [c['ID_Prestamo'] for c in cuotas],
+        "Cuota": [c['numero_cuota'] for c in cuotas],
+        "Fecha programada": [c['fecha_programada'] for c in cuotas],
+        "Pendiente": [a_float(p) for p in pendientes],
+        "Cobrar": False,
+        "Monto a cobrar": [a_float(p) for p in pendientes],
+    }, index=[c['ID_Prestamo'] for c in cuotas])
+
+    # En modo sin conexión se marcan los cobros capturados aquí que aún no se sincronizaron
+    if sin_conexion:
+        capturados = diario.capturas_pendientes(PAGO_PRESTAMO, id_reunion)
+        capturados = {i: d for i, d in capturados.items() if i in tabla.index}
+        if capturados:
+            st.caption(f"📴 {len(capturados)} cobros de esta reunión esperan sincronizarse.")
+            for id_prestamo, d in capturados.items():
+                tabla.loc[id_prestamo, ["Cobrar", "Monto a cobrar"]] = [True, a_float(d["monto"])]
+
+    st.metric("Total pendiente de estas cuotas", formato_moneda(desde_centavos(sum(pendientes))))
+
+    with st.form("form_cobro_reunion"):
+        fecha_pago = st.date_input("Fecha pago:", value=date.today(), key="fecha_cobro_reunion")
+        formato = st.column_config.NumberColumn(format="$%.2f")
+        editada = st.data_editor(
+            tabla,
+            key=f"tabla_cobro_{id_reunion}",
+            hide_index=True,
+            use_container_width=True,
+            disabled=["Socio/a", "Préstamo", "Cuota", "Fecha programada", "Pendiente"],
+            column_config={
+                "Pendiente": formato,
+                "Cobrar": st.column_config.CheckboxColumn(help="Marcar las cuotas que se cobran hoy"),
+                "Monto a cobrar": st.column_config.NumberColumn(
+                    min_value=0.0, step=0.01, format="$%.2f",
+                    help="Lo que supere la cuota se aplica a las cuotas siguientes",
+                ),
+            },
+        )
+        enviar = st.form_submit_button("💾 Aplicar cobros")
+
+    if not enviar:
+        return
+
+    cobrar = editada["Cobrar"].fillna(False).astype(bool)
+    marcados = editada[cobrar]
+    montos = centavos_serie(marcados["Monto a cobrar"])
+    if sin_conexion:
+        # Las filas sin marcar van en cero: descartan el cobro pendiente que tuvieran
+        por_prestamo = {c['ID_Prestamo']: c for c in cuotas}
+        todos = centavos_serie(editada["Monto a cobrar"]).where(cobrar, 0)
+        anotados = capturar_pagos(diario, id_grupo, id_reunion, fecha_pago,
+                                  [(por_prestamo[int(i)], int(monto)) for i, monto in todos.items()])
+        st.session_state["cobro_reunion_aplicado"] = (
+            f"{anotados} cobros guardados en este equipo (modo sin conexión); "
+            "se suben a la base central en segundo plano"
+        )
+        st.rerun()
+    elif marcados.empty:
+        st.warning("Marca al menos una cuota para cobrar.")
+    else:
+        pagos = [(int(id_prestamo), desde_centavos(monto)) for id_prestamo, monto in montos.items()]
+        ok, msg = aplicar_pagos_lote(con, pagos, fecha_pago, id_reunion, id_grupo)
+        if ok:
+            st.session_state["cobro_reunion_aplicado"] = msg
+            st.rerun()
+        else:
+            st.error(f"❌ {msg}")
 
 
 def mostrar_pago_prestamo():
@@ -303,16 +641,32 @@ def mostrar_pago_prestamo():
         st.warning("⚠️ Primero debes seleccionar una reunión en el módulo de Asistencia.")
         return
 
+    reunion_info = st.session_state.reunion_actual
+    id_reunion = reunion_info['id_reunion']
+    id_grupo = reunion_info.get('id_grupo')
+    nombre_reunion = reunion_info.get('nombre_reunion', 'Reunión')
+
+    st.info(f"📅 Reunión actual: {nombre_reunion}")
+
+    # Sin conexión solo se captura el cobro de la reunión, desde la foto local
+    if modo_offline_activo():
+        st.caption("📴 Sin conexión solo está disponible el cobro de la reunión.")
+        mostrar_cobro_reunion(None, id_reunion, id_grupo)
+        return
+
     try:
         con = obtener_conexion()
         cursor = con.cursor(dictionary=True)
 
-        reunion_info = st.session_state.reunion_actual
-        id_reunion = reunion_info['id_reunion']
-        id_grupo = reunion_info.get('id_grupo')
-        nombre_reunion = reunion_info.get('nombre_reunion', 'Reunión')
-
-        st.info(f"📅 Reunión actual: {nombre_reunion}")
+        modo = st.radio(
+            "Modo de cobro:",
+            ["🧾 Cobro de la reunión", "🔎 Un préstamo"],
+            horizontal=True,
+            key="modo_pago_prestamo",
+        )
+        if modo == "🧾 Cobro de la reunión":
+            mostrar_cobro_reunion(con, id_reunion, id_grupo)
+            return
 
         # Obtener miembros presentes
         cursor.execute("""
@@ -348,7 +702,7 @@ def mostrar_pago_prestamo():
 
         # selector
         prestamos_dict = {
-            f"Préstamo {p['ID_Prestamo']} - {p['miembro_nombre']} - ${p['monto']:,.2f} - {p['plazo']} meses": p['ID_Prestamo']
+            f"Préstamo {p['ID_Prestamo']} - {p['miembro_nombre']} - {formato_moneda(p['monto'])} - {p['plazo']} meses": p['ID_Prestamo']
             for p in prestamos
         }
         sel = st.selectbox("Selecciona el préstamo:", list(prestamos_dict.keys()))
@@ -374,15 +728,15 @@ def mostrar_pago_prestamo():
             st.write(f"• Propósito: {proposito}")
         with c2:
             st.markdown("**Montos (registrados en Prestamo)**")
-            st.write(f"• Monto préstamo: ${monto:,.2f}")
+            st.write(f"• Monto préstamo: {formato_moneda(monto)}")
             # total_interes es INTERÉS TOTAL EN $
-            st.write(f"• Interés total (registrado): ${total_interes:,.2f}")
+            st.write(f"• Interés total (registrado): {formato_moneda(total_interes)}")
             if monto_total_pagar is not None:
-                st.write(f"• Total a pagar (registrado): ${monto_total_pagar:,.2f}")
+                st.write(f"• Total a pagar (registrado): {formato_moneda(monto_total_pagar)}")
             else:
                 st.warning("⚠️ En Prestamo no hay 'monto_total_pagar' guardado. No puedo mostrar el total exacto.")
             if cuota_mensual is not None:
-                st.write(f"• Cuota mensual (registrada): ${cuota_mensual:,.2f}")
+                st.write(f"• Cuota mensual (registrada): {formato_moneda(cuota_mensual)}")
             else:
                 st.info("• Cuota mensual (registrada): (no existe o no fue guardada)")
 
@@ -444,17 +798,17 @@ def mostrar_pago_prestamo():
             estado = c['estado']
 
             if estado == 'pagado':
-                cap_m = f"${cap_pag:,.2f}"
-                int_m = f"${int_pag:,.2f}"
-                tot_m = f"${tot_pag:,.2f}"
+                cap_m = formato_moneda(cap_pag)
+                int_m = formato_moneda(int_pag)
+                tot_m = formato_moneda(tot_pag)
             elif estado == 'parcial':
-                cap_m = f"${cap_pag:,.2f} de ${cap_prog:,.2f}"
-                int_m = f"${int_pag:,.2f} de ${int_prog:,.2f}"
-                tot_m = f"${tot_pag:,.2f} de ${tot_prog:,.2f}"
+                cap_m = f"{formato_moneda(cap_pag)} de {formato_moneda(cap_prog)}"
+                int_m = f"{formato_moneda(int_pag)} de {formato_moneda(int_prog)}"
+                tot_m = f"{formato_moneda(tot_pag)} de {formato_moneda(tot_prog)}"
             else:
-                cap_m = f"${cap_prog:,.2f}"
-                int_m = f"${int_prog:,.2f}"
-                tot_m = f"${tot_prog:,.2f}"
+                cap_m = formato_moneda(cap_prog)
+                int_m = formato_moneda(int_prog)
+                tot_m = formato_moneda(tot_prog)
 
             tabla.append({
                 "Cuota": numero,
@@ -468,15 +822,15 @@ def mostrar_pago_prestamo():
         st.dataframe(tabla, use_container_width=True)
 
         # Totales y saldo pendiente
-        total_pagado = sum(c['total_pagado'] or 0 for c in cuotas)
+        total_pagado = sumar([c['total_pagado'] for c in cuotas])
         if monto_total_pagar is not None:
-            saldo = Decimal(str(monto_total_pagar)) - Decimal(str(total_pagado or 0))
+            saldo = desde_centavos(a_centavos(monto_total_pagar) - total_pagado)
             st.markdown("---")
-            st.markdown(f"**TOTAL (registro):** ${monto:,.2f} (capital) + ${total_interes:,.2f} (interés) = **${monto_total_pagar:,.2f}**")
+            st.markdown(f"**TOTAL (registro):** {formato_moneda(monto)} (capital) + {formato_moneda(total_interes)} (interés) = **{formato_moneda(monto_total_pagar)}**")
             if saldo <= 0:
                 st.success("**SALDO: $0 (COMPLETAMENTE PAGADO)** 🎉")
             else:
-                st.warning(f"**SALDO PENDIENTE: ${saldo:,.2f}**")
+                st.warning(f"**SALDO PENDIENTE: {formato_moneda(saldo)}**")
         else:
             st.info("Saldo: no disponible (monto_total_pagar no registrado en Prestamo).")
 
@@ -495,7 +849,7 @@ def mostrar_pago_prestamo():
                 """, (id_prestamo,))
                 pendientes = cursor.fetchall()
                 if pendientes:
-                    opciones = [f"Cuota {r['numero_cuota']} - ${r['total_programado']:,.2f} - {r['fecha_programada']}" for r in pendientes]
+                    opciones = [f"Cuota {r['numero_cuota']} - {formato_moneda(r['total_programado'])} - {r['fecha_programada']}" for r in pendientes]
                     sel_c = st.selectbox("Selecciona cuota:", opciones, key="c_complete")
                     num_sel = int(sel_c.split(" ")[1])
                     fecha_pago = st.date_input("Fecha pago:", value=date.today(), key="fecha_complete")
@@ -503,14 +857,9 @@ def mostrar_pago_prestamo():
                     if enviar:
                         fila = next(r for r in pendientes if r['numero_cuota'] == num_sel)
                         monto_cuota = fila['total_programado']
-                        ok, msg = aplicar_pago_cuota(id_prestamo, monto_cuota, fecha_pago, "completo", con, id_grupo, num_sel)
+                        ok, msg = aplicar_pago_cuota(id_prestamo, monto_cuota, fecha_pago, "completo", con, id_grupo,
+                                                     num_sel, id_reunion)
                         if ok:
-                            # insertar registro de pago (opcional: completar campos reales)
-                            cursor.execute("""
-                                INSERT INTO Pago_prestamo (ID_Prestamo, ID_Reunion, fecha_pago, monto_capital, monto_interes, total_cancelado)
-                                VALUES (%s, %s, %s, %s, %s, %s)
-                            """, (id_prestamo, id_reunion, fecha_pago, 0, 0, float(monto_cuota)))
-                            con.commit()
                             st.success("✅ Pago completo registrado.")
                             st.rerun()  # CORREGIDO: experimental_rerun() -> rerun()
                         else:
@@ -520,36 +869,35 @@ def mostrar_pago_prestamo():
         with col2:
             st.markdown("Pago parcial")
             with st.form("form_parcial"):
-                cursor.execute("""
-                    SELECT numero_cuota, total_programado, total_pagado, fecha_programada
-                    FROM CuotaPrestamo
-                    WHERE ID_Prestamo = %s AND estado != 'pagado'
-                    ORDER BY fecha_programada ASC
-                    LIMIT 1
-                """, (id_prestamo,))
+                cursor.execute(CONSULTA_PROXIMA_CUOTA, (id_prestamo,))
                 prox = cursor.fetchone()
                 if prox:
                     num = prox['numero_cuota']
                     total_prog = prox['total_programado']
                     total_pag = prox['total_pagado'] or 0
-                    pendiente = total_prog - total_pag
+                    pendiente = a_float(a_centavos(total_prog) - a_centavos(total_pag))
+                    # Lo que supere la cuota pasa en cascada a las siguientes, hasta
+                    # el saldo del préstamo (sumar las cuotas pendientes cuenta dos
+                    # veces la deuda de una cuota condensada)
+                    if monto_total_pagar is not None:
+                        pendiente_prestamo = a_float(max(a_centavos(monto_total_pagar) - total_pagado, 0))
+                    else:
+                        pendiente_prestamo = pendiente
                     st.write(f"Próxima cuota: #{num}")
-                    st.write(f"Total pendiente: ${pendiente:,.2f}")
+                    st.write(f"Total pendiente: {formato_moneda(pendiente)}")
                     st.write(f"Fecha programada: {prox['fecha_programada']}")
                     fecha_pago_par = st.date_input("Fecha pago:", value=date.today(), key="fecha_parcial")
-                    monto_par = st.number_input("Monto a pagar:", min_value=0.01, max_value=float(pendiente), value=float(min(pendiente,100)), step=1.0, format="%.2f")
+                    monto_par = st.number_input("Monto a pagar:", min_value=0.01, max_value=max(pendiente_prestamo, 0.01),
+                                                value=max(min(pendiente, pendiente_prestamo, 100.0), 0.01), step=1.0, format="%.2f",
+                                                help="Si supera la cuota, el excedente se aplica a las cuotas siguientes")
                     enviar_par = st.form_submit_button("Registrar pago parcial")
                     if enviar_par:
                         if monto_par <= 0:
                             st.warning("El monto debe ser mayor a cero.")
                         else:
-                            ok, msg = aplicar_pago_cuota(id_prestamo, monto_par, fecha_pago_par, "parcial", con, id_grupo)
+                            ok, msg = aplicar_pago_cuota(id_prestamo, monto_par, fecha_pago_par, "parcial", con, id_grupo,
+                                                         id_reunion=id_reunion)
                             if ok:
-                                cursor.execute("""
-                                    INSERT INTO Pago_prestamo (ID_Prestamo, ID_Reunion, fecha_pago, monto_capital, monto_interes, total_cancelado)
-                                    VALUES (%s, %s, %s, %s, %s, %s)
-                                """, (id_prestamo, id_reunion, fecha_pago_par, 0, 0, float(monto_par)))
-                                con.commit()
                                 st.success("✅ Pago parcial registrado y cronograma actualizado si aplica.")
                                 st.rerun()  # CORREGIDO: experimental_rerun() -> rerun()
                             else:
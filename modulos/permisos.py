@@ -1,14 +1,21 @@
 import streamlit as st
 from modulos.config.conexion import obtener_conexion
 
-def obtener_permisos_usuario(id_usuario, tipo_usuario, cargo):
-    """Obtiene los permisos y filtros específicos para cada usuario"""
+# Red de seguridad para cambios hechos fuera de la app (directo en la BD)
+TTL_ALCANCE_PERMISOS = 300
+
+def obtener_permisos_usuario(id_usuario, tipo_usuario, cargo, grupos_asignados=None):
+    """
+    Obtiene los permisos y filtros específicos para cada usuario.
+    Si se pasan los `grupos_asignados` (ya cargados en el login) no se consulta la BD.
+    """
     permisos = {
         "puede_ver_todo": False,
         "solo_sus_registros": False,
         "puede_registrar_distritos": False,
         "filtro_grupos": None,
-        "filtro_usuario": None
+        "filtro_usuario": None,
+        "id_usuario": id_usuario
     }
     
     # ADMINISTRADOR - Acceso total
@@ -24,7 +31,9 @@ def obtener_permisos_usuario(id_usuario, tipo_usuario, cargo):
     # PROMOTORA - Registra distritos y ve grupos asignados
     elif cargo.lower() == "promotora" or tipo_usuario.lower() == "promotora":
         permisos["puede_registrar_distritos"] = True
-        permisos["filtro_grupos"] = obtener_grupos_asignados(id_usuario)
+        if grupos_asignados is None:
+            grupos_asignados = obtener_grupos_asignados(id_usuario)
+        permisos["filtro_grupos"] = grupos_asignados
     
     return permisos
 
@@ -49,35 +58,100 @@ def obtener_grupos_asignados(id_usuario):
     finally:
         con.close()
 
-def aplicar_filtros_usuarios(query_base, permisos, params=None):
-    """Aplica filtros según los permisos del usuario"""
-    if params is None:
-        params = []
-    
-    query_final = query_base
-    params_final = params.copy()
-    
+@st.cache_data(ttl=TTL_ALCANCE_PERMISOS, show_spinner=False)
+def _cargar_alcance_permisos(id_usuario):
+    """Grupos asignados del usuario (Grupos_Asignados), cacheados por el TTL."""
+    con = obtener_conexion()
+    if not con:
+        raise ConnectionError("No se pudo conectar a la base de datos.")
+
+    try:
+        cursor = con.cursor()
+        cursor.execute("""
+            SELECT ID_Grupo
+            FROM Grupos_Asignados
+            WHERE ID_Usuario = %s
+        """, (id_usuario,))
+        filas = cursor.fetchall()
+        cursor.close()
+    finally:
+        con.close()
+
+    return {"grupos_asignados": tuple(sorted(f[0] for f in filas))}
+
+def obtener_alcance_permisos(id_usuario):
+    """
+    Devuelve el alcance vigente del usuario desde la caché compartida, o None
+    si no se pudo leer. La app no escribe Grupos_Asignados, así que las
+    asignaciones hechas directo en la BD se ven al vencer el TTL.
+    """
+    try:
+        return _cargar_alcance_permisos(id_usuario)
+    except Exception as e:
+        st.error(f"❌ Error al obtener grupos asignados: {e}")
+        return None
+
+def condiciones_de_alcance(permisos, columna_grupo="ID_Grupo", columna_registro="ID_Usuario_Registro"):
+    """
+    Devuelve (condiciones, params) con el predicado de permisos del usuario.
+    Las columnas deben ir calificadas con el alias de su tabla (ej. "m.ID_Grupo").
+
+    Para promotoras se usa un semi-join contra Grupos_Asignados: la sentencia
+    tiene siempre el mismo tamaño (un solo parámetro) sin importar cuántos
+    grupos tenga asignados, y MySQL puede reutilizar el plan.
+    """
     # Si es secretaria, filtrar por su ID de usuario
-    if permisos["solo_sus_registros"] and permisos["filtro_usuario"]:
-        if "WHERE" in query_base:
-            query_final += " AND ID_Usuario_Registro = %s"
-        else:
-            query_final += " WHERE ID_Usuario_Registro = %s"
-        params_final.append(permisos["filtro_usuario"])
-    
-    # Si es promotora, filtrar por grupos asignados
-    elif permisos["filtro_grupos"]:
-        if permisos["filtro_grupos"]:  # Si tiene grupos asignados
-            placeholders = ",".join(["%s"] * len(permisos["filtro_grupos"]))
-            if "WHERE" in query_base:
-                query_final += f" AND ID_Grupo IN ({placeholders})"
-            else:
-                query_final += f" WHERE ID_Grupo IN ({placeholders})"
-            params_final.extend(permisos["filtro_grupos"])
-    
+    if permisos.get("solo_sus_registros") and permisos.get("filtro_usuario"):
+        return [f"{columna_registro} = %s"], [permisos["filtro_usuario"]]
+
+    # Si es promotora, filtrar por grupos asignados (solo si tiene alguno,
+    # igual que antes: sin asignaciones no se restringe)
+    if permisos.get("filtro_grupos") is not None and permisos.get("id_usuario") is not None:
+        alcance = obtener_alcance_permisos(permisos["id_usuario"])
+        # Si no se pudo leer el alcance no se muestra nada (nunca todo)
+        if alcance is None:
+            return ["1 = 0"], []
+        if alcance["grupos_asignados"]:
+            return [
+                f"""EXISTS (
+                    SELECT 1 FROM Grupos_Asignados ga_permiso
+                    WHERE ga_permiso.ID_Usuario = %s
+                      AND ga_permiso.ID_Grupo = {columna_grupo}
+                )"""
+            ], [permisos["id_usuario"]]
+
     # Administrador no necesita filtros adicionales
-    
-    return query_final, params_final
+    return [], []
+
+def construir_consulta(query_base, condiciones=None, params=None, orden=None):
+    """
+    Arma la consulta final agregando UN solo WHERE con todas las condiciones
+    unidas por AND. `query_base` no debe traer su propio WHERE: las
+    condiciones extra se pasan en `condiciones`.
+    """
+    condiciones = list(condiciones or [])
+    query_final = query_base.rstrip()
+    if condiciones:
+        query_final += "\n        WHERE " + "\n          AND ".join(condiciones)
+    if orden:
+        query_final += f"\n        ORDER BY {orden}"
+    return query_final, list(params or [])
+
+def aplicar_filtros_usuarios(query_base, permisos, params=None, condiciones=None,
+                             columna_grupo="ID_Grupo", columna_registro="ID_Usuario_Registro"):
+    """
+    Aplica filtros según los permisos del usuario.
+    `condiciones`/`params` son filtros propios de la consulta que se combinan
+    con el predicado de permisos en un único WHERE.
+    """
+    condiciones_permiso, params_permiso = condiciones_de_alcance(
+        permisos, columna_grupo, columna_registro
+    )
+    return construir_consulta(
+        query_base,
+        list(condiciones or []) + condiciones_permiso,
+        list(params or []) + params_permiso,
+    )
 
 def verificar_permisos(accion_requerida):
     """
@@ -1,6 +1,8 @@
 import streamlit as st
 from modulos.config.conexion import obtener_conexion
 from datetime import datetime
+from modulos.dinero import formato_moneda
+from modulos.versiones_cache import incrementar_version, ambito_grupo
 
 #from modulos.consultas_db import obtener_prestamos
 #from modulos.permisos import verificar_permisos
@@ -123,10 +125,10 @@ def mostrar_prestamo():
 
                 st.info("📊 **Resumen del préstamo:**")
                 st.write(f"- Tasa mensual: **{tasa_mensual:.2f}%**")
-                st.write(f"- Interés mensual: **${interes_mensual:,.2f}**")
-                st.write(f"- Interés total a pagar: **${interes_total:,.2f}**")
-                st.write(f"- Monto total a pagar: **${monto_total:,.2f}**")
-                st.write(f"- 💵 **Cuota mensual: ${cuota_mensual:,.2f}**")
+                st.write(f"- Interés mensual: **{formato_moneda(interes_mensual)}**")
+                st.write(f"- Interés total a pagar: **{formato_moneda(interes_total)}**")
+                st.write(f"- Monto total a pagar: **{formato_moneda(monto_total)}**")
+                st.write(f"- 💵 **Cuota mensual: {formato_moneda(cuota_mensual)}**")
 
             enviar = st.form_submit_button("✅ Registrar Préstamo")
 
@@ -161,10 +163,11 @@ def mostrar_prestamo():
                               ID_Estado_prestamo, plazo, proposito_val, monto_total, cuota_mensual))
 
                         con.commit()
+                        incrementar_version(ambito_grupo(id_grupo))
 
                         st.success("✅ Préstamo registrado correctamente!")
-                        st.success(f"- Interés total: ${interes_total:,.2f}")
-                        st.success(f"- Cuota mensual: ${cuota_mensual:,.2f}")
+                        st.success(f"- Interés total: {formato_moneda(interes_total)}")
+                        st.success(f"- Cuota mensual: {formato_moneda(cuota_mensual)}")
 
                         if st.button("🆕 Registrar otro préstamo"):
                             st.rerun()
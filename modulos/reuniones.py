@@ -1,6 +1,8 @@
 import streamlit as st
 from datetime import datetime
 from modulos.config.conexion import obtener_conexion
+from modulos.versiones_cache import incrementar_version, ambito_grupo
+from modulos.calendario import obtener_reglamento_grupo, fin_de_ciclo, pedir_reglas_calendario, mostrar_generador_ciclo
 import pandas as pd
 
 # ==========================================================
@@ -111,6 +113,24 @@ def mostrar_reuniones():
             # Mostrar solo las columnas que quieres
             st.dataframe(pd.DataFrame(filas), use_container_width=True)
 
+        # ======================================================
+        # GENERAR TODAS LAS REUNIONES DEL CICLO
+        # ======================================================
+        # Detrás de un checkbox: el contenido de un expander se ejecuta aunque esté cerrado
+        if st.checkbox("🗓️ Generar reuniones del ciclo según el reglamento", key="ver_generador_ciclo"):
+            reglamento = obtener_reglamento_grupo(con, id_grupo)
+            if not reglamento or not reglamento.get("fecha_inicio_ciclo"):
+                st.info("El grupo no tiene reglamento con fecha de inicio de ciclo.")
+            else:
+                st.caption(
+                    f"{reglamento.get('frecuencia_reunion') or 'SEMANAL'} · {reglamento.get('dia_reunion')} · "
+                    f"{reglamento['fecha_inicio_ciclo']} a {fin_de_ciclo(reglamento)}"
+                )
+                reglas = pedir_reglas_calendario("ciclo_grupo")
+                if reglas:
+                    mostrar_generador_ciclo(con, [reglamento], reglas, "ciclo_grupo",
+                                            {id_grupo: nombre_grupo})
+
         st.write("---")
 
         # ======================================================
@@ -212,6 +232,7 @@ def mostrar_reuniones():
                     """, (id_grupo, fecha, hora_str_full, lugar, int(estado), int(total_presentes)))
 
                 con.commit()
+                incrementar_version(ambito_grupo(id_grupo))
                 st.success("✅ Reunión guardada correctamente.")
                 st.rerun()
 
@@ -226,6 +247,7 @@ def mostrar_reuniones():
             try:
                 cursor.execute("DELETE FROM Reunion WHERE ID_Reunion=%s", (id_reunion,))
                 con.commit()
+                incrementar_version(ambito_grupo(id_grupo))
                 st.success("🗑️ Reunión eliminada.")
                 st.rerun()
             except Exception as e:
@@ -300,6 +322,7 @@ def mostrar_reuniones():
                             """, (total, id_reunion))
 
                             con.commit()
+                            incrementar_version(ambito_grupo(id_grupo))
                             st.success(f"✅ Asistencia guardada. Total presentes: {total}")
                             st.rerun()
 
@@ -0,0 +1,116 @@
+import streamlit as st
+import hashlib
+import json
+from dataclasses import dataclass
+from modulos.config.conexion import obtener_conexion
+
+TODOS_LOS_GRUPOS = "TODOS_LOS_GRUPOS"
+
+
+@dataclass(frozen=True)
+class ContextoSesion:
+    """Datos del usuario logueado, cargados una sola vez al iniciar sesión."""
+    id_usuario: int
+    usuario: str
+    tipo_usuario: str
+    cargo: str
+    id_grupo: object            # ID_Grupo, TODOS_LOS_GRUPOS (promotora) o None
+    grupos_asignados: tuple     # IDs de Grupos_Asignados
+    acceso_total_promotora: bool
+
+
+def cargar_contexto_sesion(usuario, contrasena):
+    """
+    Verifica las credenciales y carga en UNA sola consulta el usuario, su tipo,
+    su cargo, el último grupo que creó y los grupos que tiene asignados.
+    Retorna un ContextoSesion o None si las credenciales no son válidas.
+    """
+    con = obtener_conexion()
+    if not con:
+        st.error("⚠️ No se pudo conectar a la base de datos.")
+        return None
+
+    try:
+        cursor = con.cursor(dictionary=True)
+        contrasena_hash = hashlib.sha256(contrasena.encode()).hexdigest()
+
+        cursor.execute("""
+            SELECT
+                u.ID_Usuario,
+                u.Usuario,
+                t.Tipo_usuario AS tipo_usuario,
+                c.tipo_de_cargo AS cargo,
+                (
+                    SELECT g.ID_Grupo
+                    FROM Grupo g
+                    WHERE g.ID_Usuario = u.ID_Usuario
+                    ORDER BY g.ID_Grupo DESC
+                    LIMIT 1
+                ) AS id_grupo,
+                (
+                    SELECT JSON_ARRAYAGG(ga.ID_Grupo)
+                    FROM Grupos_Asignados ga
+                    WHERE ga.ID_Usuario = u.ID_Usuario
+                ) AS grupos_asignados
+            FROM Usuario u
+            INNER JOIN Tipo_de_usuario t ON u.ID_Tipo_usuario = t.ID_Tipo_usuario
+            INNER JOIN Cargo c ON u.ID_Cargo = c.ID_Cargo
+            WHERE u.Usuario = %s AND u.Contraseña = %s
+        """, (usuario, contrasena_hash))
+        fila = cursor.fetchone()
+        cursor.close()
+
+        if not fila:
+            return None
+
+        grupos_asignados = fila["grupos_asignados"]
+        if isinstance(grupos_asignados, (bytes, bytearray)):
+            grupos_asignados = grupos_asignados.decode()
+        grupos_asignados = tuple(sorted(json.loads(grupos_asignados))) if grupos_asignados else ()
+
+        # Usuario Promotora puede ver TODOS los grupos
+        es_promotora = fila["cargo"] == "Promotora"
+
+        return ContextoSesion(
+            id_usuario=fila["ID_Usuario"],
+            usuario=fila["Usuario"],
+            tipo_usuario=fila["tipo_usuario"],
+            cargo=fila["cargo"],
+            id_grupo=TODOS_LOS_GRUPOS if es_promotora else fila["id_grupo"],
+            grupos_asignados=grupos_asignados,
+            acceso_total_promotora=es_promotora,
+        )
+
+    except Exception as e:
+        st.error(f"❌ Error al verificar usuario: {e}")
+        return None
+    finally:
+        con.close()
+
+
+def iniciar_sesion(contexto):
+    """
+    Guarda el contexto inmutable en la sesión y las claves sueltas que siguen
+    leyendo los demás módulos (usuario, cargo_de_usuario, id_grupo, ...).
+    """
+    from modulos.permisos import obtener_permisos_usuario
+
+    st.session_state["contexto_sesion"] = contexto
+    st.session_state["sesion_iniciada"] = True
+    st.session_state["usuario"] = contexto.usuario
+    st.session_state["tipo_usuario"] = contexto.tipo_usuario
+    st.session_state["cargo_de_usuario"] = contexto.cargo
+    st.session_state["id_usuario"] = contexto.id_usuario
+    st.session_state["id_grupo"] = contexto.id_grupo
+    st.session_state["acceso_total_promotora"] = contexto.acceso_total_promotora
+    st.session_state["permisos_usuario"] = obtener_permisos_usuario(
+        contexto.id_usuario,
+        contexto.tipo_usuario,
+        contexto.cargo,
+        grupos_asignados=list(contexto.grupos_asignados),
+    )
+
+
+def obtener_contexto_sesion():
+    """Devuelve el ContextoSesion de la sesión actual (o None si no hay sesión)."""
+    return st.session_state.get("contexto_sesion")
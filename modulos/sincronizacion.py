@@ -0,0 +1,452 @@
+import argparse
+import threading
+from collections import Counter, namedtuple
+from datetime import date, datetime
+from itertools import groupby
+
+import streamlit as st
+import pandas as pd
+
+from modulos.config.conexion import obtener_conexion
+from modulos.versiones_cache import incrementar_version, ambito_grupo
+from modulos.dinero import a_centavos
+from modulos.instrumentacion import iniciar_rerun
+from modulos.asistencia import guardar_asistencia
+from modulos.ahorros import obtener_saldos_iniciales, obtener_deudas_pendientes, calcular_ahorros, guardar_ahorros
+from modulos.pagoprestamo import registrar_pagos_lote
+from modulos.diario_local import (
+    DiarioLocal, diario_compartido, describir_valor, valor_asistencia, RUTA_DIARIO, CLAVE_MODO_OFFLINE,
+    MODO_OFFLINE_POR_DEFECTO, ASISTENCIA, AHORRO, PAGO_PRESTAMO,
+    PENDIENTE, SINCRONIZADO, CONFLICTO, ERROR,
+)
+
+# =============================================
+#  SINCRONIZACIÓN DEL DIARIO LOCAL
+# =============================================
+#
+# Sube los cambios pendientes del diario (modulos/diario_local.py) a la base
+# central. Por lote:
+#
+#   1. Los cambios que ya figuran en Cambio_sincronizado (se aplicaron pero
+#      el diario no alcanzó a marcarlos) solo se marcan.
+#   2. El resto se agrupa por (tipo, reunión). Cada grupo es una transacción:
+#      bloquea la fila de Reunion, lee el valor central de cada
+#      (miembro, reunión), decide, aplica en lote con las mismas funciones
+#      que las páginas y anota los aplicados en Cambio_sincronizado antes del
+#      commit. Recién después se marca el diario.
+#
+# Reintentar es seguro: lo que llegó al commit queda en Cambio_sincronizado
+# y no se vuelve a aplicar. Si la base central no tiene el valor que se vio
+# al capturar (`base`), el cambio queda en conflicto; si ya tiene el valor
+# capturado, se marca sin escribir nada.
+
+TAMANO_LOTE = 200
+INTERVALO_SINCRONIZACION = 30    # segundos entre intentos con pendientes
+ESPERA_MAXIMA = 600              # tope del reintento exponencial si la base no responde
+
+# Qué pasó con un cambio al sincronizarlo
+APLICADO = "aplicado"
+SIN_CAMBIOS = "sin_cambios"
+RECHAZADO = "rechazado"
+YA_APLICADO = "ya_aplicado"
+
+_ESTADO_DIARIO = {APLICADO: SINCRONIZADO, SIN_CAMBIOS: SINCRONIZADO, YA_APLICADO: SINCRONIZADO,
+                  CONFLICTO: CONFLICTO, RECHAZADO: ERROR}
+
+ORDEN_TIPOS = (ASISTENCIA, AHORRO, PAGO_PRESTAMO)
+
+Resultado = namedtuple("Resultado", "cambio accion detalle central")
+ReunionCentral = namedtuple("ReunionCentral", "id_grupo fecha")
+
+
+def _marcadores(valores):
+    return ", ".join(["%s"] * len(valores))
+
+
+def _decidir(cambio, central, deseado, vacio=None):
+    """
+    Compara el valor central actual con la base de la captura. `vacio` es
+    el valor equivalente a "sin registro" (None si no hay equivalente).
+    """
+    base = cambio.base if cambio.base is not None else vacio
+    central = central if central is not None else vacio
+    if deseado is not None and central == deseado:
+        return Resultado(cambio, SIN_CAMBIOS, "Ya estaba así en la base central", central)
+    if central != base:
+        return Resultado(cambio, CONFLICTO, "Cambió en la base central después de la captura", central)
+    return Resultado(cambio, APLICADO, None, deseado)
+
+
+# =============================================
+#  APLICACIÓN POR TIPO
+# =============================================
+# Cada función corre dentro de la transacción del grupo, con la reunión ya
+# bloqueada, y retorna un Resultado por cambio.
+
+def _aplicar_asistencia(con, cursor, id_reunion, reunion, cambios):
+    ids = [c.id_miembro for c in cambios]
+    cursor.execute(f"""
+        SELECT ID_Miembro, asistio, justificacion
+        FROM Miembroxreunion
+        WHERE ID_Reunion = %s AND ID_Miembro IN ({_marcadores(ids)})
+    """, (id_reunion, *ids))
+    centrales = {id_miembro: valor_asistencia(asistio, just) for id_miembro, asistio, just in cursor.fetchall()}
+
+    resultados = [
+        _decidir(c, centrales.get(c.id_miembro), valor_asistencia(c.datos["asistio"], c.datos["justificacion"]))
+        for c in cambios
+    ]
+    aplicar = [r.cambio for r in resultados if r.accion == APLICADO]
+    if not aplicar:
+        return resultados
+
+    # Mismas escrituras que "Guardar asistencia"; las multas solo para las
+    # capturas que las pidieron
+    for generar_multas in (False, True):
+        grupo = {
+            c.id_miembro: (c.datos["asistio"], c.datos["justificacion"])
+            for c in aplicar if bool(c.datos.get("generar_multas")) == generar_multas
+        }
+        if grupo:
+            guardar_asistencia(cursor, id_reunion, reunion.id_grupo, grupo,
+                               reunion.fecha or date.today(), generar_multas)
+    return resultados
+
+
+def _valor_ahorro(ahorro_c, otros_c, retiro_c):
+    return {"ahorro": int(ahorro_c), "otros": int(otros_c), "retiro": bool(retiro_c > 0)}
+
+
+def _aplicar_ahorros(con, cursor, id_reunion, reunion, cambios):
+    ids = [c.id_miembro for c in cambios]
+    cursor.execute(f"""
+        SELECT ID_Miembro, monto_ahorro, monto_otros, monto_retiros
+        FROM Ahorro
+        WHERE ID_Reunion = %s AND ID_Miembro IN ({_marcadores(ids)})
+    """, (id_reunion, *ids))
+    centrales = {
+        id_miembro: _valor_ahorro(a_centavos(ahorro), a_centavos(otros), a_centavos(retiros))
+        for id_miembro, ahorro, otros, retiros in cursor.fetchall()
+    }
+
+    # Saldos y deudas de ahora, no los de la captura: el saldo final se
+    # recalcula con lo que hay en la base central al momento de aplicar
+    base = pd.DataFrame({"nombre": ""}, index=ids)
+    saldos = obtener_saldos_iniciales(con, ids, reunion.fecha)
+    deudas = obtener_deudas_pendientes(con, ids)
+    base["saldo_inicial"] = pd.Series(saldos, dtype="int64").reindex(base.index, fill_value=0)
+    base["deuda"] = pd.Series(deudas, dtype="int64").reindex(base.index, fill_value=0)
+    calculo = calcular_ahorros(base, pd.DataFrame({
+        "Ahorro": [c.datos["ahorro"] / 100 for c in cambios],
+        "Otras actividades": [c.datos["otros"] / 100 for c in cambios],
+        "Retiro": [c.datos["retiro"] for c in cambios],
+    }, index=ids))
+
+    vacio = _valor_ahorro(0, 0, 0)
+    resultados = []
+    for c in cambios:
+        fila = calculo.loc[c.id_miembro]
+        deseado = _valor_ahorro(fila["ahorro"], fila["otros"], fila["monto_retiro"])
+        resultados.append(_decidir(c, centrales.get(c.id_miembro), deseado, vacio))
+
+    aplicar = sorted((r.cambio for r in resultados if r.accion == APLICADO), key=lambda c: c.datos["fecha"])
+    for fecha, grupo in groupby(aplicar, key=lambda c: c.datos["fecha"]):
+        guardar_ahorros(con, id_reunion, date.fromisoformat(fecha), calculo.loc[[c.id_miembro for c in grupo]])
+    return resultados
+
+
+def _aplicar_pagos(con, cursor, id_reunion, reunion, cambios):
+    # Mismo orden de bloqueo que el cobro en línea: préstamos por ID, luego cuotas
+    ids_prestamo = sorted({c.id_prestamo for c in cambios})
+    cursor.execute(f"""
+        SELECT ID_Prestamo FROM Prestamo
+        WHERE ID_Prestamo IN ({_marcadores(ids_prestamo)})
+        ORDER BY ID_Prestamo
+        FOR UPDATE
+    """, tuple(ids_prestamo))
+    cursor.fetchall()
+
+    ids_cuota = [c.base["id_cuota"] for c in cambios if c.base]
+    centrales = {}
+    if ids_cuota:
+        cursor.execute(f"""
+            SELECT ID_Cuota, COALESCE(total_pagado, 0)
+            FROM CuotaPrestamo
+            WHERE ID_Cuota IN ({_marcadores(ids_cuota)})
+        """, tuple(ids_cuota))
+        centrales = {
+            id_cuota: {"id_cuota": id_cuota, "total_pagado": a_centavos(pagado)}
+            for id_cuota, pagado in cursor.fetchall()
+        }
+
+    # Un pago no es un valor que se pisa: si la cuota cambió desde la
+    # captura (otro cobro), se pide confirmación en vez de cobrar dos veces
+    resultados = [_decidir(c, centrales.get(c.base["id_cuota"]) if c.base else None, None) for c in cambios]
+    aplicar = sorted((r.cambio for r in resultados if r.accion == APLICADO), key=lambda c: c.datos["fecha"])
+    for fecha, grupo in groupby(aplicar, key=lambda c: c.datos["fecha"]):
+        pagos = [(c.id_prestamo, c.datos["monto"] / 100) for c in grupo]
+        registrar_pagos_lote(con, pagos, date.fromisoformat(fecha), id_reunion, reunion.id_grupo)
+    return [r._replace(central=None) if r.accion == APLICADO else r for r in resultados]
+
+
+APLICADORES = {
+    ASISTENCIA: _aplicar_asistencia,
+    AHORRO: _aplicar_ahorros,
+    PAGO_PRESTAMO: _aplicar_pagos,
+}
+
+
+# =============================================
+#  PROTOCOLO
+# =============================================
+
+def _ya_aplicados(con, ids_cambio):
+    cursor = con.cursor()
+    cursor.execute(f"""
+        SELECT id_cambio FROM Cambio_sincronizado
+        WHERE id_cambio IN ({_marcadores(ids_cambio)})
+    """, tuple(ids_cambio))
+    ya = {fila[0] for fila in cursor.fetchall()}
+    cursor.close()
+    return ya
+
+
+def _sincronizar_grupo(diario, con, tipo, id_reunion, cambios, resumen):
+    cursor = con.cursor()
+    try:
+        cursor.execute("SELECT ID_Grupo, fecha FROM Reunion WHERE ID_Reunion = %s FOR UPDATE", (id_reunion,))
+        fila = cursor.fetchone()
+        if fila is None:
+            resultados = [Resultado(c, CONFLICTO, "La reunión ya no existe en la base central", None)
+                          for c in cambios]
+        else:
+            reunion = ReunionCentral(*fila)
+            resultados = APLICADORES[tipo](con, cursor, id_reunion, reunion, cambios)
+
+        aplicados = [r.cambio for r in resultados if r.accion == APLICADO]
+        if aplicados:
+            ahora = datetime.now()
+            cursor.executemany("""
+                INSERT INTO Cambio_sincronizado (id_cambio, tipo, ID_Reunion, ID_Miembro, aplicado)
+                VALUES (%s, %s, %s, %s, %s)
+            """, [(c.id_cambio, c.tipo, c.id_reunion, c.id_miembro, ahora) for c in aplicados])
+        con.commit()
+    except ValueError as e:
+        # Un pago que la base rechaza no debe frenar al resto del grupo
+        con.rollback()
+        rechazo = str(e)
+    except Exception as e:
+        con.rollback()
+        diario.fallo([c.id for c in cambios], str(e))
+        raise
+    else:
+        rechazo = None
+    finally:
+        cursor.close()
+
+    if rechazo is not None:
+        if len(cambios) > 1:
+            for cambio in cambios:
+                _sincronizar_grupo(diario, con, tipo, id_reunion, [cambio], resumen)
+        else:
+            diario.marcar([(cambios[0].id, ERROR, rechazo, None)])
+            resumen[RECHAZADO] += 1
+        return
+
+    diario.marcar([(r.cambio.id, _ESTADO_DIARIO[r.accion], r.detalle, r.central) for r in resultados])
+    resumen.update(r.accion for r in resultados)
+    if fila is not None and aplicados:
+        incrementar_version(ambito_grupo(reunion.id_grupo))
+
+
+def sincronizar(diario, con, lote=TAMANO_LOTE):
+    """
+    Sube todos los cambios pendientes del diario, de a `lote`. Retorna un
+    Counter {aplicado, sin_cambios, ya_aplicado, conflicto, rechazado}. Si la
+    base central falla, los cambios del grupo quedan pendientes y el error se
+    propaga.
+    """
+    resumen = Counter()
+    vistos = set()
+    while True:
+        cambios = [c for c in diario.pendientes(lote) if c.id not in vistos]
+        if not cambios:
+            return resumen
+        vistos.update(c.id for c in cambios)
+
+        ya = _ya_aplicados(con, [c.id_cambio for c in cambios])
+        if ya:
+            diario.marcar([(c.id, SINCRONIZADO, "Ya estaba aplicado", None) for c in cambios if c.id_cambio in ya])
+            resumen[YA_APLICADO] += len(ya)
+
+        restantes = sorted(
+            (c for c in cambios if c.id_cambio not in ya),
+            key=lambda c: (ORDEN_TIPOS.index(c.tipo), c.id_reunion, c.id),
+        )
+        for (tipo, id_reunion), grupo in groupby(restantes, key=lambda c: (c.tipo, c.id_reunion)):
+            _sincronizar_grupo(diario, con, tipo, id_reunion, list(grupo), resumen)
+
+
+# =============================================
+#  HILO EN SEGUNDO PLANO
+# =============================================
+
+class SincronizadorFondo:
+    """
+    Hilo que sincroniza el diario cada INTERVALO_SINCRONIZACION segundos o
+    apenas se captura algo. Si la base no responde, espera el doble cada vez
+    (hasta ESPERA_MAXIMA) sin bloquear a las páginas.
+    """
+
+    def __init__(self, diario, conectar, intervalo=INTERVALO_SINCRONIZACION):
+        self.diario = diario
+        self._conectar = conectar
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self.ultimo_intento = None
+        self.ultimo_resumen = None
+        self.ultimo_error = None
+        self._hilo = threading.Thread(target=self._correr, name="gapcsv-sincronizacion", daemon=True)
+        self._hilo.start()
+
+    def despertar(self):
+        self.diario.hay_cambios.set()
+
+    def sincronizar_ahora(self):
+        """Una pasada completa; el lock evita dos pasadas a la vez."""
+        with self._lock:
+            self.ultimo_intento = datetime.now()
+            con = self._conectar()
+            if con is None:
+                self.ultimo_error = "No se pudo conectar a la base central"
+                raise ConnectionError(self.ultimo_error)
+            try:
+                self.ultimo_resumen = sincronizar(self.diario, con)
+                self.ultimo_error = None
+                return self.ultimo_resumen
+            except Exception as e:
+                self.ultimo_error = str(e)
+                raise
+            finally:
+                con.close()
+
+    def _correr(self):
+        espera = self.intervalo
+        while True:
+            self.diario.hay_cambios.wait(espera)
+            self.diario.hay_cambios.clear()
+            if not self.diario.hay_pendientes():
+                espera = self.intervalo
+                continue
+            # Este hilo nunca pasa por el inicio de un rerun: sin esto el
+            # registro de sentencias de instrumentacion crece sin límite
+            iniciar_rerun()
+            try:
+                self.sincronizar_ahora()
+                espera = self.intervalo
+            except Exception:
+                espera = min(espera * 2, ESPERA_MAXIMA)
+
+
+@st.cache_resource
+def obtener_sincronizador():
+    """Un hilo de sincronización por proceso, sobre el diario compartido."""
+    return SincronizadorFondo(diario_compartido(), obtener_conexion)
+
+
+# =============================================
+#  INTERFAZ
+# =============================================
+
+_ETIQUETAS_TIPO = {ASISTENCIA: "Asistencia", AHORRO: "Ahorro", PAGO_PRESTAMO: "Pago de préstamo"}
+
+
+def mostrar_panel_offline():
+    """Interruptor del modo sin conexión y estado del diario, en el sidebar."""
+    sincronizador = obtener_sincronizador()
+    diario = sincronizador.diario
+    conteo = diario.resumen()
+
+    with st.sidebar:
+        st.markdown("### 📴 Modo sin conexión")
+        st.checkbox(
+            "Guardar primero en este equipo",
+            value=MODO_OFFLINE_POR_DEFECTO,
+            key=CLAVE_MODO_OFFLINE,
+            help="Asistencia, ahorros y cobro de la reunión se guardan en el diario local "
+                 "y se suben a la base central en segundo plano",
+        )
+        col1, col2 = st.columns(2)
+        col1.metric("Pendientes", conteo.get(PENDIENTE, 0))
+        col2.metric("Por resolver", conteo.get(CONFLICTO, 0) + conteo.get(ERROR, 0))
+
+        if sincronizador.ultimo_error:
+            st.caption(f"⚠️ Último intento {sincronizador.ultimo_intento:%H:%M}: {sincronizador.ultimo_error}")
+        elif sincronizador.ultimo_intento:
+            st.caption(f"✅ Última sincronización: {sincronizador.ultimo_intento:%H:%M}")
+
+        if st.button("🔄 Sincronizar ahora", key="sincronizar_ahora", disabled=not conteo.get(PENDIENTE)):
+            sincronizador.despertar()
+            st.caption("Sincronizando en segundo plano…")
+
+        if conteo.get(CONFLICTO) or conteo.get(ERROR):
+            with st.expander("⚠️ Cambios por resolver"):
+                _mostrar_por_resolver(diario)
+
+
+def _mostrar_por_resolver(diario):
+    for cambio in diario.por_resolver():
+        st.markdown(
+            f"**{_ETIQUETAS_TIPO.get(cambio.tipo, cambio.tipo)}** · reunión {cambio.id_reunion} · "
+            f"socio/a {cambio.id_miembro}"
+        )
+        st.caption(f"Aquí: {describir_valor(cambio.tipo, cambio.datos)}")
+        if cambio.estado == CONFLICTO:
+            st.caption(f"En la base central: {describir_valor(cambio.tipo, cambio.central)}")
+        st.caption(cambio.detalle or "")
+        col1, col2 = st.columns(2)
+        if col1.button("Usar el de aquí", key=f"conservar_local_{cambio.id}"):
+            diario.resolver(cambio.id, "local")
+            st.rerun()
+        if col2.button("Usar el central", key=f"conservar_central_{cambio.id}"):
+            diario.resolver(cambio.id, "central")
+            st.rerun()
+
+
+# =============================================
+#  LÍNEA DE COMANDOS
+# =============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Estado y sincronización del diario del modo sin conexión.")
+    parser.add_argument("--diario", default=RUTA_DIARIO, help=f"Archivo del diario (por defecto {RUTA_DIARIO})")
+    parser.add_argument("--sincronizar", action="store_true", help="Subir ahora los cambios pendientes")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE)
+    args = parser.parse_args()
+
+    diario = DiarioLocal(args.diario)
+    try:
+        if args.sincronizar:
+            con = obtener_conexion()
+            if not con:
+                raise SystemExit("❌ No se pudo conectar a la base de datos.")
+            try:
+                resumen = sincronizar(diario, con, args.lote)
+            finally:
+                con.close()
+            print("Sincronización: " + (", ".join(f"{k}={v}" for k, v in sorted(resumen.items())) or "nada pendiente"))
+
+        conteo = diario.resumen()
+        if not conteo:
+            print(f"El diario {args.diario} está vacío.")
+        for estado, cantidad in sorted(conteo.items()):
+            print(f"{estado:<14}{cantidad:>6}")
+        for cambio in diario.por_resolver():
+            print(f"  [{cambio.estado}] {cambio.clave}: {describir_valor(cambio.tipo, cambio.datos)}"
+                  f" — {cambio.detalle}")
+    finally:
+        diario.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import threading
+import streamlit as st
+
+# =============================================
+#  SELLOS DE VERSIÓN PARA INVALIDAR CACHÉS
+# =============================================
+#
+# Cada "ámbito" (por ejemplo "grupo:15") tiene un contador compartido por
+# todas las sesiones del servidor. Las funciones cacheadas reciben la versión
+# como argumento: al incrementarla, la siguiente llamada ya no encuentra la
+# entrada vieja en caché y vuelve a consultar la base de datos.
+
+
+@st.cache_resource
+def _registro_versiones():
+    """Registro único por proceso: {ámbito: versión} protegido con un lock."""
+    return {"lock": threading.Lock(), "versiones": {}}
+
+
+def version_actual(ambito):
+    """Devuelve la versión vigente de un ámbito (0 si nunca se invalidó)."""
+    registro = _registro_versiones()
+    with registro["lock"]:
+        return registro["versiones"].get(ambito, 0)
+
+
+def incrementar_version(*ambitos):
+    """Invalida uno o varios ámbitos incrementando su versión."""
+    registro = _registro_versiones()
+    with registro["lock"]:
+        for ambito in ambitos:
+            registro["versiones"][ambito] = registro["versiones"].get(ambito, 0) + 1
+
+
+def ambito_grupo(id_grupo):
+    """Ámbito de los datos de reunión de un grupo (reuniones, ahorros, asistencia, préstamos)."""
+    return f"grupo:{id_grupo}"